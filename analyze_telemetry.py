@@ -0,0 +1,153 @@
+"""Throughput and phase timings from recorded telemetry sessions.
+
+The bot records a session per run under ``telemetry.dir`` (see
+``bot/telemetry.py``): game-state samples every ``telemetry.interval``
+seconds and one event per kill, heal, looted item, waypoint, stuck spot
+and spell.  This reads the columns through memory maps and reports, over
+all given sessions:
+
+* active time – gaps between samples longer than ``--max-gap`` intervals
+  (the bot was stopped or paused) do not count,
+* kills, heals, mana potions, looted items, waypoints, spells and stuck
+  spots, in total and per hour / minute of active time,
+* median and 90th-percentile time to kill,
+* time spent walking, fighting, looting and idle,
+* time below ``--low-hp`` HP and deaths (HP reaching 0).
+
+The bot does not read experience, so exp/hour is only shown when the
+average experience per kill is given with ``--exp-per-kill``.
+
+Usage
+-----
+    uv run python analyze_telemetry.py                         # every session
+    uv run python analyze_telemetry.py telemetry/20240101-120000
+    uv run python analyze_telemetry.py --last 5 --exp-per-kill 350 --per-session
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from bot.config import BotConfig, load_config
+from bot.telemetry import EVENTS, PHASES, open_table, sessions
+
+_KIND = {name: i for i, name in enumerate(EVENTS)}
+
+
+def _summarise(path: str, interval: float, max_gap: float, low_hp: float) -> Dict:
+    """Totals for one session – added up across sessions by :func:`_merge`."""
+    samples = open_table(os.path.join(path, "samples"))
+    events = open_table(os.path.join(path, "events"))
+    t = np.asarray(samples["t"])
+    hp = np.asarray(samples["hp"])
+    phase = np.asarray(samples["phase"])
+
+    # Each sample stands for the time until the next one, unless that gap
+    # means the bot was not running
+    dt = np.diff(t)
+    dt[dt > max_gap * interval] = 0.0
+    active = float(dt.sum())
+    phases = np.bincount(phase[:-1], weights=dt, minlength=len(PHASES))
+    low = float(dt[hp[:-1] < low_hp].sum())
+    dead = hp <= 0.0
+    deaths = int(np.count_nonzero(dead[1:] & ~dead[:-1]))
+
+    kind = np.asarray(events["kind"])
+    counts = np.bincount(kind, minlength=len(EVENTS))
+    ttk = np.asarray(events["value"])[kind == _KIND["kill"]]
+    return {
+        "rows": len(t) + len(kind),
+        "active": active,
+        "phases": phases,
+        "low": low,
+        "deaths": deaths,
+        "counts": counts,
+        "ttk": ttk,
+    }
+
+
+def _merge(parts: List[Dict]) -> Dict:
+    return {
+        "rows": sum(p["rows"] for p in parts),
+        "active": sum(p["active"] for p in parts),
+        "phases": np.sum([p["phases"] for p in parts], axis=0),
+        "low": sum(p["low"] for p in parts),
+        "deaths": sum(p["deaths"] for p in parts),
+        "counts": np.sum([p["counts"] for p in parts], axis=0),
+        "ttk": np.concatenate([p["ttk"] for p in parts]),
+    }
+
+
+def _duration(seconds: float) -> str:
+    h, rem = divmod(int(seconds), 3600)
+    return f"{h}h{rem // 60:02d}m" if h else f"{rem // 60}m{rem % 60:02d}s"
+
+
+def _report(s: Dict, exp_per_kill: Optional[float], low_hp: float) -> None:
+    active = s["active"]
+    hours = active / 3600 or float("nan")
+    minutes = active / 60 or float("nan")
+    n = dict(zip(EVENTS, (int(c) for c in s["counts"])))
+    print(f"  active time   {_duration(active)}")
+    print(f"  kills         {n['kill']:>7}  {n['kill'] / hours:8.1f}/h")
+    if exp_per_kill is not None:
+        print(f"  exp           {n['kill'] * exp_per_kill:>7.0f}  "
+              f"{n['kill'] * exp_per_kill / hours:8.0f}/h")
+    print(f"  heals         {n['heal']:>7}  {n['heal'] / minutes:8.2f}/min")
+    print(f"  mana potions  {n['mana']:>7}  {n['mana'] / minutes:8.2f}/min")
+    print(f"  spells        {n['spell']:>7}  {n['spell'] / minutes:8.2f}/min")
+    print(f"  looted items  {n['loot_item']:>7}  {n['loot_item'] / hours:8.1f}/h")
+    print(f"  waypoints     {n['waypoint']:>7}  {n['waypoint'] / hours:8.1f}/h")
+    print(f"  stuck         {n['stuck']:>7}")
+    if len(s["ttk"]):
+        p50, p90 = np.percentile(s["ttk"], (50, 90))
+        print(f"  time to kill  median {p50:.1f}s, p90 {p90:.1f}s")
+    print(f"  HP < {low_hp:g}%     {_duration(s['low'])}  "
+          f"({100 * s['low'] / (active or float('nan')):.1f}%), {s['deaths']} death(s)")
+    print("  phases")
+    for name, secs in zip(PHASES, s["phases"]):
+        share = 100 * secs / (active or float("nan"))
+        print(f"    {name:<10}  {_duration(secs):>7}  {share:5.1f}%")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Summarise recorded telemetry sessions")
+    p.add_argument("sessions", nargs="*",
+                   help="session directories (default: all under telemetry.dir)")
+    p.add_argument("--config", default="bot_config.yaml")
+    p.add_argument("--last", type=int, metavar="N", help="only the N most recent sessions")
+    p.add_argument("--per-session", action="store_true", help="also report every session")
+    p.add_argument("--exp-per-kill", type=float, help="average experience per kill, for exp/h")
+    p.add_argument("--low-hp", type=float, default=50.0, help="HP %% counted as low (default 50)")
+    p.add_argument("--max-gap", type=float, default=5.0,
+                   help="sample gaps longer than this many intervals are not active time")
+    args = p.parse_args()
+
+    cfg = (load_config(args.config) if os.path.exists(args.config) else BotConfig()).telemetry
+    paths = args.sessions or sessions(cfg.dir)
+    if args.last:
+        paths = paths[-args.last:]
+    if not paths:
+        print(f"ERROR: no telemetry sessions under {cfg.dir}/")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    parts = [_summarise(path, cfg.interval, args.max_gap, args.low_hp) for path in paths]
+    total = _merge(parts)
+    elapsed = time.perf_counter() - t0
+
+    if args.per_session:
+        for path, part in zip(paths, parts):
+            print(os.path.basename(os.path.normpath(path)))
+            _report(part, args.exp_per_kill, args.low_hp)
+            print()
+    print(f"{len(paths)} session(s), {total['rows']:,} rows read in {elapsed:.2f}s")
+    _report(total, args.exp_per_kill, args.low_hp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""Performance benchmarks.  Run each one as a module from the project root,
+e.g.  ``uv run python -m benchmarks.bench_find_all_templates``.
+"""
@@ -0,0 +1,66 @@
+"""Benchmark: BattleListReader on a full-screen frame.
+
+Draws ``--entries`` synthetic battle-list entries (icon, name glyphs, HP bar,
+one targeted) into a 1920 × 1080 BGRA frame and times ``read``, the per-frame
+cost ``CombatModule`` pays for decoding the whole list.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_battle_list
+    uv run python -m benchmarks.bench_battle_list --entries 5 10 15
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from bot.battle_list import BattleListReader
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def _frame(n: int, origin: tuple, pitch: int, rng: np.random.Generator) -> np.ndarray:
+    frame = np.full((1080, 1920, 4), 70, dtype=np.uint8)
+    row, col = origin
+    for i in range(n):
+        top = row + i * pitch
+        frame[top : top + 20, col : col + 20, :3] = rng.integers(0, 256, 3, dtype=np.uint8)
+        frame[top + 1 : top + 12, col + 22 : col + 118, :3] = np.where(
+            rng.random((11, 96, 1)) < 0.3, 192, 70
+        )
+        fill = int(rng.integers(1, 133))
+        frame[top + 15, col + 22 : col + 22 + fill, :3] = (0, 192, 0)
+        frame[top + 15, col + 22 + fill : col + 154, :3] = 0
+    frame[row : row + 3, col : col + 3, :3] = (0, 0, 255)   # slot 0 targeted
+    return frame
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Battle-list reader benchmark")
+    p.add_argument("--entries", type=int, nargs="+", default=[1, 5, 10, 15])
+    p.add_argument("--repeat", type=int, default=2000)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    origin, pitch = (300, 1700), 22
+    print(f"1920×1080 frame, median of {args.repeat} runs")
+    print(f"  {'entries':>7}  {'read':>10}  {'decoded':>7}")
+    for n in args.entries:
+        frame = _frame(n, origin, pitch, rng)
+        reader = BattleListReader(origin, pitch, max_entries=max(args.entries))
+        decoded = reader.read(frame)
+        t = _time(lambda: reader.read(frame), args.repeat)
+        print(f"  {n:>7}  {t * 1e3:8.3f}ms  {len(decoded):>7}")
+
+
+if __name__ == "__main__":
+    main()
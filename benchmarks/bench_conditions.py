@@ -0,0 +1,78 @@
+"""Benchmark: ConditionReader vs one find_template per condition icon.
+
+Writes ``--templates`` random 9 × 9 icons to a temporary directory, draws
+``--shown`` of them into the condition strip of a 1920 × 1080 BGRA frame and
+times the hashed strip lookup against the alternative it replaces: a
+``find_template`` search per known icon.  The search is timed on a crop
+around the strip (an already generous head start) and on the full frame.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_conditions
+    uv run python -m benchmarks.bench_conditions --templates 17 --shown 4
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from bot.conditions import CONDITIONS, ConditionReader
+from bot.vision import find_template
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Condition strip reader benchmark")
+    p.add_argument("--templates", type=int, default=len(CONDITIONS))
+    p.add_argument("--shown", type=int, default=4)
+    p.add_argument("--repeat", type=int, default=2000)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    origin, size, pitch = (300, 1770), 9, 11
+    names = list(CONDITIONS[: args.templates])
+    icons = {n: rng.integers(0, 256, (size, size, 3), dtype=np.uint8) for n in names}
+
+    frame = np.full((1080, 1920, 4), 40, dtype=np.uint8)
+    row, col = origin
+    for i, name in enumerate(names[: args.shown]):
+        x = col + i * pitch
+        frame[row : row + size, x : x + size, :3] = icons[name]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name, icon in icons.items():
+            paths.append(os.path.join(tmp, f"{name}.png"))
+            cv2.imwrite(paths[-1], icon)
+
+        reader = ConditionReader(origin, size, pitch, templates_dir=tmp)
+        found = reader.decode(reader.read(frame))
+        crop = frame[row - 8 : row + size + 8, col - 8 : col + reader.max_icons * pitch + 8]
+        for path in paths:
+            find_template(crop, path)           # load into the template cache
+
+        t_read = _time(lambda: reader.read(frame), args.repeat)
+        t_crop = _time(lambda: [find_template(crop, q) for q in paths], args.repeat // 10)
+        t_full = _time(lambda: [find_template(frame, q) for q in paths], 1)
+
+    print(f"{len(names)} templates, {args.shown} icons shown – recognised {len(found)}")
+    print(f"  hashed strip read        : {t_read * 1e3:8.3f}ms")
+    print(f"  find_template × {len(paths):<2} (crop) : {t_crop * 1e3:8.3f}ms")
+    print(f"  find_template × {len(paths):<2} (full) : {t_full * 1e3:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
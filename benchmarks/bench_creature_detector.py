@@ -0,0 +1,84 @@
+"""Benchmark: CreatureDetector on a full viewport.
+
+Fills the default 1700 × 1280 viewport with smoothed green/brown noise (the
+worst case for the colour mask: lots of saturated grass) and draws
+``--creatures`` health bars at random tiles, then times ``scan`` and checks
+how many bars came back at the right tile.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_creature_detector
+    uv run python -m benchmarks.bench_creature_detector --creatures 0 5 20
+"""
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from bot.config import ViewportConfig
+from bot.creature_detector import CreatureDetector
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def _terrain(h: int, w: int, rng: np.random.Generator) -> np.ndarray:
+    noise = cv2.GaussianBlur(rng.random((h // 4, w // 4)).astype(np.float32), (0, 0), 2.0)
+    noise = cv2.resize(noise, (w, h), interpolation=cv2.INTER_NEAREST)
+    grass = np.array([40, 150, 60], np.float32)     # BGR
+    dirt = np.array([40, 90, 140], np.float32)
+    t = ((noise - noise.min()) / np.ptp(noise))[..., None]
+    frame = np.zeros((h, w, 4), np.uint8)
+    frame[..., :3] = (grass * (1 - t) + dirt * t).astype(np.uint8)
+    return frame
+
+
+def _draw_bars(frame: np.ndarray, vp: ViewportConfig, n: int, rng: np.random.Generator):
+    tiles = set()
+    while len(tiles) < n:
+        dx = int(rng.integers(-6, 7))
+        dy = int(rng.integers(-4, 5))
+        if (dx, dy) != (0, 0):
+            tiles.add((dx, dy))
+    for dx, dy in tiles:
+        cx = vp.center_x + dx * vp.tile_size
+        tile_top = vp.center_y + dy * vp.tile_size - vp.tile_size // 2
+        y = tile_top - 6 - 4          # frame top row
+        x = cx - 13                   # frame left column
+        frame[y : y + 4, x : x + 27, :3] = 0
+        fill = int(rng.integers(1, 26))
+        frame[y + 1 : y + 3, x + 1 : x + 1 + fill, :3] = (0, 192, 0)
+    return tiles
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Creature detector benchmark")
+    p.add_argument("--creatures", type=int, nargs="+", default=[0, 3, 10, 30])
+    p.add_argument("--repeat", type=int, default=100)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    vp = ViewportConfig()
+    detector = CreatureDetector(vp)
+    print(f"{vp.width}×{vp.height} viewport, median of {args.repeat} runs")
+    print(f"  {'creatures':>9}  {'scan':>10}  {'found':>5}  {'at tile':>7}")
+    for n in args.creatures:
+        frame = _terrain(vp.top + vp.height, vp.left + vp.width, rng)
+        tiles = _draw_bars(frame, vp, n, rng)
+        found = detector.scan(frame)
+        hits = sum((int(c["dx"]), int(c["dy"])) in tiles for c in found)
+        t = _time(lambda: detector.scan(frame), args.repeat)
+        print(f"  {n:>9}  {t * 1e3:8.3f}ms  {len(found):>5}  {hits:>7}")
+
+
+if __name__ == "__main__":
+    main()
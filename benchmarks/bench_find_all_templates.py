@@ -0,0 +1,83 @@
+"""Benchmark: find_all_templates vs a single find_template call.
+
+Builds a synthetic full-screen frame containing several copies of an item
+template, then times both functions on it.  ``find_all_templates`` does the
+same single ``matchTemplate`` pass as ``find_template``; the extra peak
+extraction and NMS must not make it measurably slower.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_find_all_templates
+    uv run python -m benchmarks.bench_find_all_templates --width 1920 --height 1080 --copies 12
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from bot.vision import find_all_templates, find_template
+
+
+def _make_scene(width: int, height: int, copies: int, size: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    template = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+
+    # Place the copies on a container-like grid in the top-right corner
+    x0, y0 = width - 8 * (size + 2), 40
+    for i in range(copies):
+        r, c = divmod(i, 4)
+        y, x = y0 + r * (size + 2), x0 + c * (size + 2)
+        frame[y : y + size, x : x + size, :3] = template
+    return frame, template
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="find_all_templates benchmark")
+    p.add_argument("--width", type=int, default=2560)
+    p.add_argument("--height", type=int, default=1440)
+    p.add_argument("--copies", type=int, default=8, help="template instances in the frame")
+    p.add_argument("--size", type=int, default=32, help="template size in px")
+    p.add_argument("--repeat", type=int, default=15)
+    args = p.parse_args()
+
+    frame, template = _make_scene(args.width, args.height, args.copies, args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "item.png")
+        cv2.imwrite(path, template)
+
+        # Warm the template cache and check correctness before timing
+        hits = find_all_templates(frame, path, threshold=0.90)
+        single = find_template(frame, path, threshold=0.90)
+        print(f"Frame {args.width}×{args.height}, {args.copies} copies of a "
+              f"{args.size}×{args.size} template")
+        print(f"  find_template      → {single}")
+        print(f"  find_all_templates → {len(hits)} hits")
+
+        t_one = _time(lambda: find_template(frame, path, threshold=0.90), args.repeat)
+        t_all = _time(lambda: find_all_templates(frame, path, threshold=0.90), args.repeat)
+
+    ratio = t_all / t_one if t_one else float("inf")
+    print(f"  find_template      : {t_one * 1000:8.2f} ms (median of {args.repeat})")
+    print(f"  find_all_templates : {t_all * 1000:8.2f} ms (median of {args.repeat})")
+    print(f"  ratio              : {ratio:.3f}×")
+    if len(hits) != args.copies:
+        print(f"WARNING: expected {args.copies} hits, got {len(hits)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark: end-to-end reaction latency in the headless simulator.
+
+Runs the real health, mana, combat and loot modules against ``bot.sim``
+frames and reports, per scenario, the distribution of the delay from a
+stimulus in the simulated game to the bot's answer:
+
+* **heal**   – HP drop → heal key pressed
+* **attack** – enemy appears → it is targeted
+* **loot**   – kill → last item taken (includes ``loot.delay_after_kill``)
+
+Trials run in real time (a few seconds each).  ``--budget`` fails the run
+(exit status 1) when a scenario's p90 exceeds the given milliseconds, for
+regression checks on a headless box.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_latency
+    uv run python -m benchmarks.bench_latency --scenarios heal attack --trials 50
+    uv run python -m benchmarks.bench_latency --budget heal=150 attack=200 --json latency.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict
+
+from bot.sim.runner import run_scenario
+from bot.sim.scenarios import SCENARIOS
+
+
+def _ms(v) -> str:
+    return f"{v * 1e3:8.1f}" if v is not None else f"{'–':>8}"
+
+
+def _budgets(pairs) -> Dict[str, float]:
+    out = {}
+    for pair in pairs or []:
+        name, _, ms = pair.partition("=")
+        out[name] = float(ms)
+    return out
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="End-to-end latency benchmark (simulator)")
+    p.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    p.add_argument("--trials", type=int, help="trials per scenario (default: per scenario)")
+    p.add_argument("--config", help="bot config whose healing / combat settings to use")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--budget", nargs="+", metavar="NAME=MS", help="fail if p90 exceeds MS")
+    p.add_argument("--json", help="also write the latencies to this file")
+    p.add_argument("--verbose", action="store_true", help="show the modules' output")
+    args = p.parse_args()
+    budgets = _budgets(args.budget)
+
+    results = []
+    print(f"  {'scenario':<8}  {'trials':>6}  {'miss':>4}  {'p50 ms':>8}  {'p90 ms':>8}  "
+          f"{'p99 ms':>8}  {'max ms':>8}  {'frames':>6}  {'render':>7}")
+    for name in args.scenarios:
+        r = run_scenario(SCENARIOS[name], args.trials, args.config, args.seed, args.verbose)
+        results.append(r)
+        worst = max(r.latencies) if r.latencies else None
+        print(f"  {name:<8}  {len(r.latencies) + r.timeouts:>6}  {r.timeouts:>4}  "
+              f"{_ms(r.percentile(50))}  {_ms(r.percentile(90))}  {_ms(r.percentile(99))}  "
+              f"{_ms(worst)}  {r.frames:>6}  {r.render_ms:5.2f}ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({r.name: {"latencies": r.latencies, "timeouts": r.timeouts}
+                       for r in results}, f, indent=2)
+        print(f"Latencies → {args.json}")
+
+    failed = []
+    for r in results:
+        limit = budgets.get(r.name)
+        p90 = r.percentile(90)
+        if limit is not None and (r.timeouts or p90 is None or p90 * 1e3 > limit):
+            failed.append(f"{r.name} p90 {_ms(p90).strip()}ms > {limit:g}ms"
+                          + (f", {r.timeouts} missed" if r.timeouts else ""))
+    if failed:
+        print("FAIL: " + "; ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark: hot-path cost of a log call vs a synchronous print().
+
+Times, call by call, the line the navigation modules emit on every move:
+
+* ``print()`` to a line-buffered file (each call ends in a ``write``
+  syscall, as on a terminal), or to the real stdout with ``--stdout``,
+* ``log.info`` with the writer thread draining to a JSON-lines file (the
+  queue is sized to hold every call, so none is dropped and every one
+  is timed in full),
+* ``log.info`` past the rate limit (counted, not queued),
+* ``log.debug`` below the logger's level (filtered out).
+
+The median shows the typical cost; p99 and max show the stalls a module
+loop would see.  The log counters at the end show how many of the records
+the writer kept, folded, dropped or rate-limited.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_log
+    uv run python -m benchmarks.bench_log --calls 50000 --stdout
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bot import log
+from bot.config import LoggingConfig
+
+
+def _per_call(fn, calls: int) -> np.ndarray:
+    samples = np.empty(calls)
+    clock = time.perf_counter
+    for i in range(calls):
+        t0 = clock()
+        fn(i)
+        samples[i] = clock() - t0
+    return samples
+
+
+def _row(label: str, s: np.ndarray) -> str:
+    p50, p99 = np.percentile(s, (50, 99)) * 1e6
+    return f"  {label:<28} {p50:8.2f}µs  {p99:8.2f}µs  {s.max() * 1e6:9.1f}µs"
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Logging hot-path benchmark")
+    p.add_argument("--calls", type=int, default=20000)
+    p.add_argument("--stdout", action="store_true", help="print() to the real stdout")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.ExitStack() as stack:
+            out = sys.stdout if args.stdout else stack.enter_context(
+                open(os.path.join(tmp, "print.txt"), "w", buffering=1))
+
+            def printed(i: int) -> None:
+                print(f"[Navigation] WP {i % 7} (32100,31200) curr=(32090,31195) Δ=(10,5)",
+                      file=out, flush=args.stdout)
+
+            t_print = _per_call(printed, args.calls)
+
+        log.configure(LoggingConfig(console=False, file=os.path.join(tmp, "bot.jsonl"),
+                                    levels={"Bench": "info"}, rate_limit=0.0,
+                                    queue_size=args.calls + 1))
+        nav = log.get_logger("Bench")
+        t_info = _per_call(
+            lambda i: nav.info(f"WP {i % 7} (32100,31200) curr=(32090,31195) Δ=(10,5)"),
+            args.calls,
+        )
+        t_debug = _per_call(lambda i: nav.debug(f"WP {i % 7}"), args.calls)
+        log.flush()
+        log.configure(LoggingConfig(console=False, file=os.path.join(tmp, "limited.jsonl"),
+                                    levels={"Bench": "info"}))
+        t_limited = _per_call(
+            lambda i: nav.info(f"WP {i % 7} (32100,31200) curr=(32090,31195) Δ=(10,5)"),
+            args.calls,
+        )
+        log.shutdown()
+        counts = log.stats()
+
+    print(f"{args.calls} calls each")
+    print(f"  {'':<28} {'p50':>10}  {'p99':>10}  {'max':>11}")
+    print(_row("print()" + (" → stdout" if args.stdout else " → file"), t_print))
+    print(_row("log.info (writer running)", t_info))
+    print(_row("log.info (rate-limited)", t_limited))
+    print(_row("log.debug (filtered)", t_debug))
+    print(f"  log: {counts['written']} written, {counts['deduplicated']} folded, "
+          f"{counts['rate_limited']} rate-limited, {counts['dropped']} dropped, "
+          f"deepest queue {counts['max_depth']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark: minimap colour classification and A* click planning.
+
+Synthetic grids at the sizes the bot plans on – the live minimap (106 × 109)
+and a full atlas planning window (256 × 256) – with three terrain types:
+
+* ``open``  – grass with scattered single-tile obstacles
+* ``cave``  – smoothed noise thresholded into ~35 % wall, the usual hunt
+* ``rooms`` – a grid of walled rooms joined by one-tile doors (long detours)
+
+Each run plans from the grid centre to a far reachable cell, the way a
+navigation click does, and reports the median time.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_path_planner
+    uv run python -m benchmarks.bench_path_planner --repeat 50
+"""
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from bot.pathfinding import BLOCKED, WALKABLE, PathPlanner, classify, find_path
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def _open(h: int, w: int, rng: np.random.Generator) -> np.ndarray:
+    grid = np.full((h, w), WALKABLE, dtype=np.uint8)
+    grid[rng.random((h, w)) < 0.08] = BLOCKED
+    return grid
+
+
+def _cave(h: int, w: int, rng: np.random.Generator) -> np.ndarray:
+    noise = cv2.GaussianBlur(rng.random((h, w)).astype(np.float32), (0, 0), 2.5)
+    grid = np.full((h, w), WALKABLE, dtype=np.uint8)
+    grid[noise > np.quantile(noise, 0.65)] = BLOCKED
+    return grid
+
+
+def _rooms(h: int, w: int, rng: np.random.Generator, room: int = 12) -> np.ndarray:
+    grid = np.full((h, w), WALKABLE, dtype=np.uint8)
+    grid[::room, :] = BLOCKED
+    grid[:, ::room] = BLOCKED
+    # One door per room wall
+    for y in range(0, h, room):
+        for x in range(0, w, room):
+            grid[y, min(w - 1, x + rng.integers(1, room))] = WALKABLE
+            grid[min(h - 1, y + rng.integers(1, room)), x] = WALKABLE
+    return grid
+
+
+def _far_goal(grid: np.ndarray, start: tuple) -> tuple:
+    """A reachable cell near the opposite corner of *grid*."""
+    h, w = grid.shape
+    for r in range(0, min(h, w) // 2):
+        goal = (w - 4 - r, h - 4 - r)
+        if grid[goal[1], goal[0]] == WALKABLE and find_path(grid, start, goal) is not None:
+            return goal
+    return start
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Path planner benchmark")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--reach", type=int, nargs=2, default=[7, 8], metavar=("X", "Y"),
+                   help="viewport reach in tiles (default: 7 8)")
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    palette = np.array([[0, 204, 0], [102, 102, 102], [153, 102, 51], [0, 0, 0]], np.uint8)
+
+    print(f"Classification, median of {args.repeat} runs")
+    for h, w in ((109, 106), (2048, 2048)):
+        bgr = palette[rng.integers(0, len(palette), (h, w))][:, :, ::-1].copy()
+        t = _time(lambda: classify(bgr), args.repeat)
+        print(f"  {w:>4}×{h:<4}  {t * 1e3:8.3f}ms")
+
+    planner = PathPlanner(tuple(args.reach))
+    print(f"\nA* + click point (centre → far corner), median of {args.repeat} runs")
+    print(f"  {'terrain':<7}  {'size':>9}  {'path':>5}  {'time':>10}")
+    for h, w in ((109, 106), (256, 256)):
+        for name, make in (("open", _open), ("cave", _cave), ("rooms", _rooms)):
+            grid = make(h, w, rng)
+            start = (w // 2, h // 2)
+            grid[start[1], start[0]] = WALKABLE
+            goal = _far_goal(grid, start)
+            path = find_path(grid, start, goal)
+            n = len(path) if path else 0
+            t = _time(lambda: planner.next_click(grid, start, goal), args.repeat)
+            print(f"  {name:<7}  {w:>4}×{h:<4}  {n:>5}  {t * 1e3:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark: telemetry recording cost and offline analysis speed.
+
+Times, call by call, what a running bot pays for telemetry:
+
+* ``Telemetry.sample()`` – one GameState row, every ``telemetry.interval``,
+* ``telemetry.event()`` – one event row, from a module loop,
+
+with batches appended by the writer thread as in the bot.  Then writes a
+synthetic session of ``--rows`` samples (plus one event per 10 samples)
+and times ``analyze_telemetry.py``'s per-session summary over it, with
+the page cache warm.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_telemetry
+    uv run python -m benchmarks.bench_telemetry --rows 10000000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from analyze_telemetry import _summarise
+from bot import telemetry
+from bot.config import TelemetryConfig
+from bot.state import GameState
+from bot.telemetry import EVENT_DTYPE, EVENTS, PHASES, SAMPLE_DTYPE, ColumnWriter, Telemetry
+
+
+def _row(label: str, s: np.ndarray) -> str:
+    p50, p99 = np.percentile(s, (50, 99)) * 1e6
+    return f"  {label:<24} {p50:8.2f}µs  {p99:8.2f}µs  {s.max() * 1e6:9.1f}µs"
+
+
+async def _record(cfg: TelemetryConfig, calls: int):
+    state = GameState()
+    rec = Telemetry(cfg, state, session="bench")
+    rec.start()
+    clock = time.perf_counter
+    t_sample = np.empty(calls)
+    t_event = np.empty(calls)
+    for i in range(calls):
+        state.hp_percent = 100.0 - i % 60
+        t0 = clock()
+        rec.sample()
+        t_sample[i] = clock() - t0
+        t0 = clock()
+        telemetry.event("heal", state.hp_percent)
+        t_event[i] = clock() - t0
+        if i % 256 == 0:
+            await asyncio.sleep(0)  # let the writer's callbacks run
+    await rec.close()
+    return t_sample, t_event
+
+
+def _synthetic(path: str, rows: int, interval: float) -> None:
+    rng = np.random.default_rng(0)
+    samples = np.zeros(rows, SAMPLE_DTYPE)
+    samples["t"] = 1.7e9 + np.arange(rows) * interval
+    samples["t"][rows // 2:] += 3600.0  # a pause – not active time
+    samples["hp"] = np.clip(100 - np.abs(rng.normal(0, 30, rows)), 0, 100)
+    samples["phase"] = rng.integers(0, len(PHASES), rows)
+    events = np.zeros(rows // 10, EVENT_DTYPE)
+    events["t"] = np.sort(rng.choice(samples["t"], len(events)))
+    events["kind"] = rng.integers(0, len(EVENTS), len(events))
+    events["value"] = rng.uniform(1, 20, len(events))
+    for name, table, dtype in (("samples", samples, SAMPLE_DTYPE), ("events", events, EVENT_DTYPE)):
+        writer = ColumnWriter(os.path.join(path, name), dtype)
+        for start in range(0, len(table), 1_000_000):
+            writer.append(table[start:start + 1_000_000])
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Telemetry recording and analysis benchmark")
+    p.add_argument("--calls", type=int, default=20000)
+    p.add_argument("--rows", type=int, default=2_000_000, help="samples in the synthetic session")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg = TelemetryConfig(dir=tmp)
+        t_sample, t_event = asyncio.run(_record(cfg, args.calls))
+        print(f"{args.calls} calls each, {cfg.flush_rows}-row batches")
+        print(f"  {'':<24} {'p50':>10}  {'p99':>10}  {'max':>11}")
+        print(_row("Telemetry.sample()", t_sample))
+        print(_row("telemetry.event()", t_event))
+
+        session = os.path.join(tmp, "synthetic")
+        _synthetic(session, args.rows, cfg.interval)
+        _summarise(session, cfg.interval, 5.0, 50.0)  # warm the page cache
+        t0 = time.perf_counter()
+        s = _summarise(session, cfg.interval, 5.0, 50.0)
+        elapsed = time.perf_counter() - t0
+        size = sum(os.path.getsize(os.path.join(d, f))
+                   for d, _, files in os.walk(session) for f in files)
+    print(f"\nanalysis: {s['rows']:,} rows ({size / 1e6:.0f} MB) in {elapsed:.3f}s "
+          f"– {s['rows'] / elapsed / 1e6:.1f}M rows/s, {s['active'] / 3600:.1f}h active")
+
+
+if __name__ == "__main__":
+    main()
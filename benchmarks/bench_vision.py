@@ -0,0 +1,352 @@
+"""Benchmark suite: the vision hot paths at realistic screen resolutions.
+
+Times every per-frame vision call the modules make, on 1920×1080,
+2560×1440 and 3840×2160 frames:
+
+* ``find_template`` on the full frame and on a ROI around the match,
+* ``read_bar_percent`` on a full and an empty bar (worst case: full scan),
+* ``pixel_rgb``,
+* ``BattleListReader.read`` – how ``CombatModule`` decides it is attacking,
+* minimap matching: ``WaypointMatcher.match`` for the lookahead waypoints
+  and ``MinimapOdometry.update``,
+* ``read_coordinates_ocr`` (skipped without pytesseract),
+* ``LootModule._find_whitelisted_items`` for whitelists of 1–100 items.
+
+Frames are synthetic – a textured background with the UI elements drawn
+in the client's layout – or, with ``--frames``, recorded screenshots
+(e.g. ``replay_flight.py --export`` output) scaled to each resolution with
+the same elements drawn on top.  Each case is called once untimed to warm
+up, then runs until ``--budget`` seconds or ``--repeat`` runs, and never
+fewer than 3; the median, p10 and p90 per call are printed and, with
+``--json``, written to a file.  ``--compare`` checks a run against a saved
+one and exits with status 1 when a case got slower by more than
+``--tolerance``; a case with fewer than 3 runs on either side is not
+compared.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_vision --json vision_base.json
+    uv run python -m benchmarks.bench_vision --compare vision_base.json --tolerance 0.15
+    uv run python -m benchmarks.bench_vision --compare vision_base.json vision_new.json
+    uv run python -m benchmarks.bench_vision --resolutions 1920x1080 --only loot
+    uv run python -m benchmarks.bench_vision --frames flights/export/
+"""
+
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from bot import log
+from bot.battle_list import BattleListReader
+from bot.config import LoggingConfig, LootConfig, ViewportConfig
+from bot.minimap_odometry import MinimapOdometry
+from bot.modules.loot import LootModule
+from bot.state import GameState
+from bot.vision import (
+    find_template,
+    ocr_available,
+    pixel_rgb,
+    read_bar_percent,
+    read_coordinates_ocr,
+)
+from bot.waypoint_matcher import WaypointMatcher
+
+_RESOLUTIONS = ("1920x1080", "2560x1440", "3840x2160")
+_WHITELISTS = (1, 10, 100)
+_MIN_RUNS = 3         # timed runs per case, and the fewest --compare trusts
+_BAR_WIDTH = 92
+_HP_RGB = (255, 113, 113)
+_ICON = 11            # status-bar icon template (images/health.png)
+_ITEM = 32            # loot item slot
+_MINIMAP = (109, 106)
+_WP_TEMPLATE = 40
+_LOOKAHEAD = 3
+_BATTLE_ENTRIES = 10
+_BATTLE_PITCH = 22
+# Items actually present in the open container
+_ITEMS_SHOWN = 8
+
+Case = Tuple[str, Callable[[], object], int]   # name, call, calls per run
+
+
+class _Scene:
+    """One frame at *width*×*height* with the UI elements at known places.
+
+    Positions follow the default client layout: status bars, battle list,
+    minimap, coordinates and an open loot container in the right-hand panel.
+    """
+
+    def __init__(self, width: int, height: int, background: Optional[np.ndarray],
+                 tmp: str, rng: np.random.Generator) -> None:
+        self.width, self.height = width, height
+        if background is None:
+            noise = rng.integers(0, 256, (height // 8 + 1, width // 8 + 1, 3), dtype=np.uint8)
+            bgr = cv2.resize(noise, (width, height), interpolation=cv2.INTER_LINEAR)
+        else:
+            bgr = cv2.resize(background[:, :, :3], (width, height), interpolation=cv2.INTER_AREA)
+        self.frame = np.dstack([bgr, np.full((height, width), 255, np.uint8)])
+        panel = width - 260
+
+        # Status icon + HP bar
+        self.icon = (60, panel)
+        icon = rng.integers(0, 256, (_ICON, _ICON, 3), dtype=np.uint8)
+        self._paste(icon, *self.icon)
+        self.icon_path = self._write(tmp, "icon.png", icon)
+        self.bar = (panel + 16, 67)
+        self.frame[67, panel + 16 : panel + 16 + _BAR_WIDTH, :3] = _HP_RGB[::-1]
+        self.empty_bar = (panel + 16, 81)
+        self.frame[81, panel + 16 : panel + 16 + _BAR_WIDTH, :3] = 30
+
+        # Battle list, slot 0 targeted
+        self.battle = (300, panel + 20)
+        row, col = self.battle
+        for i in range(_BATTLE_ENTRIES):
+            top = row + i * _BATTLE_PITCH
+            self.frame[top : top + 20, col : col + 20, :3] = rng.integers(0, 256, 3, dtype=np.uint8)
+            self.frame[top + 15, col + 22 : col + 154, :3] = (0, 192, 0)
+        self.frame[row : row + 3, col : col + 3, :3] = (0, 0, 255)
+
+        # Minimap and the coordinate line below it
+        self.minimap = (44, width - 290)
+        mh, mw = _MINIMAP
+        self.frame[44 : 44 + mh, width - 290 : width - 290 + mw, :3] = cv2.resize(
+            rng.integers(0, 256, (mh // 4 + 1, mw // 4 + 1, 3), dtype=np.uint8), (mw, mh),
+            interpolation=cv2.INTER_NEAREST,
+        )
+        self.coords = (44 + mh + 6, width - 290)
+        cv2.putText(self.frame, "32372, 31949, 7", (self.coords[1] + 2, self.coords[0] + 14),
+                    cv2.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 255, 255), 1)
+
+        # Open container: the first _ITEMS_SHOWN whitelist items in its slots
+        self.container = (560, panel + 40)
+        self.items: List[np.ndarray] = [
+            rng.integers(0, 256, (_ITEM, _ITEM, 3), dtype=np.uint8) for _ in range(max(_WHITELISTS))
+        ]
+        for i, item in enumerate(self.items[:_ITEMS_SHOWN]):
+            r, c = divmod(i, 4)
+            self._paste(
+                item, self.container[0] + r * (_ITEM + 2), self.container[1] + c * (_ITEM + 2)
+            )
+
+    def _paste(self, img: np.ndarray, row: int, col: int) -> None:
+        self.frame[row : row + img.shape[0], col : col + img.shape[1], :3] = img
+
+    @staticmethod
+    def _write(tmp: str, name: str, img: np.ndarray) -> str:
+        path = os.path.join(tmp, name)
+        cv2.imwrite(path, img)
+        return path
+
+    def minimap_gray(self) -> np.ndarray:
+        row, col = self.minimap
+        mh, mw = _MINIMAP
+        return cv2.cvtColor(self.frame[row : row + mh, col : col + mw, :3], cv2.COLOR_BGR2GRAY)
+
+
+def _cases(scene: _Scene, tmp: str) -> List[Case]:
+    frame = scene.frame
+    row, col = scene.icon
+    roi = frame[max(0, row - 40) : row + 60, max(0, col - 40) : col + 140]
+    bx, by = scene.bar
+    ex, ey = scene.empty_bar
+    reader = BattleListReader(scene.battle, _BATTLE_PITCH, _BATTLE_ENTRIES)
+
+    gray = scene.minimap_gray()
+    mh, mw = gray.shape
+    rng = np.random.default_rng(1)
+    templates = []
+    for _ in range(_LOOKAHEAD):
+        y, x = rng.integers(0, mh - _WP_TEMPLATE), rng.integers(0, mw - _WP_TEMPLATE)
+        templates.append(gray[y : y + _WP_TEMPLATE, x : x + _WP_TEMPLATE].copy())
+    matcher = WaypointMatcher(templates, gray.shape)
+    odometry = MinimapOdometry()
+    shifted = itertools.cycle([gray, np.roll(gray, 1, axis=1)])
+
+    crow, ccol = scene.coords
+    coord_roi = frame[crow : crow + 20, ccol : ccol + 180]
+
+    cases: List[Case] = [
+        ("find_template/full", lambda: find_template(frame, scene.icon_path), 1),
+        ("find_template/roi", lambda: find_template(roi, scene.icon_path), 1),
+        ("read_bar_percent/full", lambda: read_bar_percent(frame, bx, by, _BAR_WIDTH, _HP_RGB), 1),
+        ("read_bar_percent/empty", lambda: read_bar_percent(frame, ex, ey, _BAR_WIDTH, _HP_RGB), 1),
+        ("pixel_rgb", lambda: pixel_rgb(frame, bx, by) == _HP_RGB, 100),
+        ("battle_list/read", lambda: reader.read(frame), 1),
+        (f"minimap/match_lookahead{_LOOKAHEAD}",
+         lambda: matcher.match(gray, list(range(_LOOKAHEAD))), 1),
+        ("minimap/odometry", lambda: odometry.update(next(shifted)), 1),
+    ]
+    if ocr_available():
+        cases.append(("read_coordinates_ocr", lambda: read_coordinates_ocr(coord_roi), 1))
+
+    for n in _WHITELISTS:
+        items = os.path.join(tmp, f"loot{n}")
+        os.makedirs(items, exist_ok=True)
+        names = []
+        for i, item in enumerate(scene.items[:n]):
+            cv2.imwrite(os.path.join(items, f"item{i}.png"), item)
+            names.append(f"item{i}")
+        loot = LootModule(None, GameState(), LootConfig(templates_dir=items, whitelist=names),
+                          ViewportConfig())
+        cases.append((f"loot/whitelist{n}", lambda m=loot: m._find_whitelisted_items(frame), 1))
+    return cases
+
+
+def _measure(fn: Callable[[], object], number: int, repeat: int, budget: float) -> np.ndarray:
+    """Seconds per call of *fn*, one sample per run of *number* calls; at
+    least :data:`_MIN_RUNS` runs however slow *fn* is."""
+    clock = time.perf_counter
+    fn()  # warm caches (template loads, DFT buffers) – not timed
+    samples: List[float] = []
+    start = clock()
+    while len(samples) < _MIN_RUNS or (
+        len(samples) < repeat and clock() - start < budget
+    ):
+        t0 = clock()
+        for _ in range(number):
+            fn()
+        samples.append((clock() - t0) / number)
+    return np.array(samples)
+
+
+def _machine() -> Dict[str, str]:
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": str(os.cpu_count()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "opencv_threads": str(cv2.getNumThreads()),
+    }
+
+
+def _load_backgrounds(path: str) -> List[np.ndarray]:
+    files = sorted(f for f in os.listdir(path) if f.lower().endswith(".png"))
+    frames = [cv2.imread(os.path.join(path, f), cv2.IMREAD_COLOR) for f in files]
+    return [f for f in frames if f is not None]
+
+
+def run(resolutions: List[str], frames: Optional[str], only: List[str],
+        repeat: int, budget: float) -> Dict:
+    log.configure(LoggingConfig(console=False))   # LootModule logs its whitelist
+    backgrounds = _load_backgrounds(frames) if frames else [None]
+    if not backgrounds:
+        sys.exit(f"{frames}: no PNG frames")
+    results: Dict[str, Dict] = {}
+    print(f"  {'case':<32} {'p10':>10}  {'median':>10}  {'p90':>10}  {'runs':>5}")
+    for res in resolutions:
+        width, height = (int(v) for v in res.lower().split("x"))
+        print(f"{width}×{height}")
+        with tempfile.TemporaryDirectory() as tmp:
+            cases: Dict[str, List[np.ndarray]] = {}
+            for i, background in enumerate(backgrounds):
+                # One directory per scene – templates are cached by path
+                scene_dir = os.path.join(tmp, f"scene{i}")
+                os.makedirs(scene_dir)
+                scene = _Scene(width, height, background, scene_dir, np.random.default_rng(i))
+                for name, fn, number in _cases(scene, scene_dir):
+                    if only and not any(fnmatch.fnmatch(name, f"*{o}*") for o in only):
+                        continue
+                    cases.setdefault(name, []).append(
+                        _measure(fn, number, max(1, repeat // len(backgrounds)), budget)
+                    )
+        for name, runs in cases.items():
+            s = np.concatenate(runs)
+            p10, p50, p90 = np.percentile(s, (10, 50, 90)) * 1e3
+            results[f"{name}@{width}x{height}"] = {
+                "median_ms": round(p50, 5), "p10_ms": round(p10, 5),
+                "p90_ms": round(p90, 5), "runs": len(s),
+            }
+            print(f"  {name:<32} {p10:8.3f}ms  {p50:8.3f}ms  {p90:8.3f}ms  {len(s):>5}")
+    log.shutdown()
+    if not ocr_available():
+        print("read_coordinates_ocr skipped – pytesseract not installed")
+    return {
+        "suite": "vision",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": _machine(),
+        "frames": frames or "synthetic",
+        "results": results,
+    }
+
+
+def compare(base: Dict, new: Dict, tolerance: float, min_delta_ms: float) -> int:
+    """Print *new* against *base*; return the number of regressions."""
+    if base.get("machine") != new.get("machine"):
+        print("WARNING: results come from different machines / library versions")
+    print(f"  {'case':<44} {'base':>10}  {'new':>10}  {'change':>7}")
+    regressions = 0
+    for key in sorted(set(base["results"]) | set(new["results"])):
+        b, n = base["results"].get(key), new["results"].get(key)
+        if b is None or n is None:
+            print(f"  {key:<44} {'only in ' + ('new' if b is None else 'base'):>31}")
+            continue
+        runs = min(b.get("runs", 0), n.get("runs", 0))
+        if runs < _MIN_RUNS:
+            print(f"  {key:<44} {f'skipped: {runs} run(s)':>31}")
+            continue
+        old, cur = b["median_ms"], n["median_ms"]
+        change = cur / old - 1 if old else 0.0
+        mark = ""
+        if change > tolerance and cur - old > min_delta_ms:
+            mark = "  REGRESSION"
+            regressions += 1
+        elif change < -tolerance and old - cur > min_delta_ms:
+            mark = "  faster"
+        print(f"  {key:<44} {old:8.3f}ms  {cur:8.3f}ms  {change:+6.0%}{mark}")
+    print(f"{regressions} regression(s) beyond {tolerance:.0%}")
+    return regressions
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Vision hot-path benchmark suite")
+    p.add_argument("--resolutions", nargs="+", default=list(_RESOLUTIONS), metavar="WxH")
+    p.add_argument("--frames", metavar="DIR", help="recorded PNG frames as backgrounds")
+    p.add_argument("--only", nargs="+", default=[], metavar="PATTERN",
+                   help="only cases whose name contains a pattern (fnmatch)")
+    p.add_argument("--repeat", type=int, default=200, help="most runs per case")
+    p.add_argument("--budget", type=float, default=1.0,
+                   help="seconds per case (3 runs minimum, however long they take)")
+    p.add_argument("--json", metavar="FILE", help="write the results to FILE")
+    p.add_argument("--compare", nargs="+", metavar="FILE",
+                   help="BASE: compare this run with it; BASE NEW: compare two saved runs")
+    p.add_argument("--tolerance", type=float, default=0.10,
+                   help="relative slowdown flagged as a regression (default 0.10)")
+    p.add_argument("--min-delta", type=float, default=0.005, metavar="MS",
+                   help="ignore differences below this many ms (timer noise)")
+    args = p.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        p.error("--compare takes BASE or BASE NEW")
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        sys.exit(1 if compare(base, new, args.tolerance, args.min_delta) else 0)
+
+    results = run(args.resolutions, args.frames, args.only, args.repeat, args.budget)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"→ {args.json}")
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        print()
+        sys.exit(1 if compare(base, results, args.tolerance, args.min_delta) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: batched WaypointMatcher vs K separate cv2.matchTemplate calls.
+
+Matches K waypoint templates against one minimap-sized frame, the way
+MinimapNavigationModule does every tick with ``lookahead: K``.
+
+Usage
+-----
+    uv run python -m benchmarks.bench_waypoint_matcher
+    uv run python -m benchmarks.bench_waypoint_matcher --lookahead 1 3 5 8
+"""
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from bot.waypoint_matcher import WaypointMatcher
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="WaypointMatcher benchmark")
+    p.add_argument("--width", type=int, default=106, help="minimap width in px")
+    p.add_argument("--height", type=int, default=109, help="minimap height in px")
+    p.add_argument("--template-size", type=int, default=40)
+    p.add_argument("--lookahead", type=int, nargs="+", default=[1, 3, 5, 8])
+    p.add_argument("--repeat", type=int, default=500)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    h, w, ts = args.height, args.width, args.template_size
+    minimap = rng.integers(0, 256, (h, w), dtype=np.uint8)
+    k_max = max(args.lookahead)
+    templates = []
+    for i in range(k_max):
+        y = rng.integers(0, h - ts)
+        x = rng.integers(0, w - ts)
+        templates.append(minimap[y : y + ts, x : x + ts].copy())
+
+    matcher = WaypointMatcher(templates, (h, w))
+    print(f"Minimap {w}×{h}, template {ts}×{ts}, median of {args.repeat} runs")
+    print(f"  {'K':>3}  {'batched':>10}  {'separate':>10}  {'ratio':>6}")
+    for k in args.lookahead:
+        idx = list(range(k))
+        t_batch = _time(lambda: matcher.match(minimap, idx), args.repeat)
+        t_sep = _time(
+            lambda: [
+                cv2.minMaxLoc(cv2.matchTemplate(minimap, templates[i], cv2.TM_CCORR_NORMED))
+                for i in idx
+            ],
+            args.repeat,
+        )
+        print(f"  {k:>3}  {t_batch * 1e3:8.3f}ms  {t_sep * 1e3:8.3f}ms  {t_batch / t_sep:5.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Status-condition reader: the icon strip as a bitmask.
+
+The client shows active conditions (poisoned, burning, paralyzed, haste,
+PZ-locked, hungry…) as a row of small icons at a fixed place in the
+inventory panel.  Running ``find_template`` once per known icon every frame
+would cost one full match per condition; this reader instead slices the
+strip out once per frame, splits it into fixed-size cells and looks every
+cell up in a hash table.
+
+Lookup
+------
+The strip is reshaped to ``(cells, size, size, 3)`` – a view, no copy.
+Each cell is quantised (low bits dropped, so slight colour noise hashes
+the same) and hashed to 64 bits with fixed pseudo-random weights, all cells
+in one numpy expression.  The hash indexes a dict built from the PNGs in
+``images/conditions/``, one per condition, named after it
+(``poisoned.png``, ``haste.png``…).
+
+A hash not in the table (icon drawn over a different background, a
+condition without a template) falls back to the nearest template by mean
+absolute difference; the answer – a condition or "unknown" – is stored
+under that hash, so each new pattern is compared only once.
+
+Cells whose pixels barely vary are empty strip background and skipped.
+
+Bits
+----
+Conditions in :data:`CONDITIONS` keep fixed bits, so masks compare across
+runs; templates with other names get the bits after them, in file-name
+order.  ``ConditionReader.names`` maps bits back to names.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from bot.log import get_logger
+
+log = get_logger("Conditions")
+
+CONDITIONS = (
+    "poisoned", "burning", "electrified", "drunk", "magic_shield",
+    "paralyzed", "haste", "in_battle", "drowning", "freezing", "dazzled",
+    "cursed", "strengthened", "pz_locked", "protection_zone", "bleeding",
+    "hungry",
+)
+
+# Bits dropped per channel before hashing
+_QUANT_SHIFT = 4
+# A cell whose brightest channel spans fewer levels than this is empty
+_EMPTY_SPREAD = 24
+# Nearest-template fallback: largest mean absolute difference accepted
+_MAX_DIFF = 18.0
+# Hashes remembered by the fallback before the memo is reset
+_MEMO_LIMIT = 4096
+_UNKNOWN = -1
+
+
+def _channel_max(bgr: np.ndarray) -> np.ndarray:
+    return np.maximum(np.maximum(bgr[..., 0], bgr[..., 1]), bgr[..., 2])
+
+
+def _cell_weights(size: int) -> np.ndarray:
+    # Fixed pseudo-random odd multipliers, one per cell byte
+    rng = np.random.default_rng(0xC0D1)
+    return rng.integers(1, 2**63, size * size * 3, dtype=np.uint64) | np.uint64(1)
+
+
+class ConditionReader:
+    """Decodes the condition strip at a fixed screen origin.
+
+    Usage::
+
+        reader = ConditionReader(origin=(row, col))   # top-left of cell 0
+        mask = reader.read(frame)
+        if mask & reader.bit("paralyzed"): ...
+    """
+
+    def __init__(
+        self,
+        origin: Tuple[int, int],
+        icon_size: int = 9,
+        pitch: int = 11,
+        max_icons: int = 12,
+        templates_dir: str = "images/conditions",
+    ) -> None:
+        self.origin = origin
+        self.icon_size = icon_size
+        self.pitch = pitch
+        self.max_icons = max_icons
+        self.names: List[str] = list(CONDITIONS)
+        self._weights = _cell_weights(icon_size)
+        # hash → bit index, or _UNKNOWN for patterns matching no template
+        self._table: Dict[int, int] = {}
+        self._memo: Dict[int, int] = {}
+        self._templates = np.empty((0, icon_size, icon_size, 3), dtype=np.int16)
+        self._template_bits = np.empty(0, dtype=np.int64)
+        self.loaded = self._load(templates_dir)
+        # Hashes already reported as unknown
+        self.unknown: Dict[int, int] = {}
+
+    def bit(self, name: str) -> int:
+        """Mask bit of condition *name* (0 if it has none)."""
+        try:
+            return 1 << self.names.index(name)
+        except ValueError:
+            return 0
+
+    def decode(self, mask: int) -> List[str]:
+        """Names of the conditions set in *mask*."""
+        return [n for i, n in enumerate(self.names) if mask >> i & 1]
+
+    # ── templates ────────────────────────────────────────────────────────────
+
+    def _load(self, templates_dir: str) -> int:
+        if not os.path.isdir(templates_dir):
+            return 0
+        icons, bits = [], []
+        s = self.icon_size
+        for fname in sorted(os.listdir(templates_dir)):
+            name, ext = os.path.splitext(fname)
+            if ext.lower() != ".png":
+                continue
+            img = cv2.imread(os.path.join(templates_dir, fname), cv2.IMREAD_COLOR)
+            if img is None or img.shape[0] < s or img.shape[1] < s:
+                log.info(f"Skipping {fname}: not a {s}×{s} image")
+                continue
+            if name not in self.names:
+                self.names.append(name)
+            bit = self.names.index(name)
+            cell = img[:s, :s]
+            self._table[int(self._hash(cell[None])[0])] = bit
+            icons.append(cell)
+            bits.append(bit)
+        if icons:
+            self._templates = np.stack(icons).astype(np.int16)
+            self._template_bits = np.array(bits, dtype=np.int64)
+        return len(icons)
+
+    def _hash(self, cells: np.ndarray) -> np.ndarray:
+        q = (cells >> _QUANT_SHIFT).reshape(len(cells), -1).astype(np.uint64)
+        return (q * self._weights).sum(axis=1, dtype=np.uint64)
+
+    def _nearest(self, key: int, cell: np.ndarray) -> int:
+        bit = self._memo.get(key)
+        if bit is not None:
+            return bit
+        bit = _UNKNOWN
+        if len(self._templates):
+            diff = np.abs(self._templates - cell.astype(np.int16)).mean(axis=(1, 2, 3))
+            best = int(np.argmin(diff))
+            if diff[best] <= _MAX_DIFF:
+                bit = int(self._template_bits[best])
+        if len(self._memo) >= _MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[key] = bit
+        return bit
+
+    # ── reading ──────────────────────────────────────────────────────────────
+
+    def _cells_view(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        row, col = self.origin
+        s, p = self.icon_size, self.pitch
+        n = min(self.max_icons, (frame.shape[1] - col - s) // p + 1)
+        if n <= 0 or row < 0 or col < 0 or row + s > frame.shape[0]:
+            return None
+        strip = frame[row : row + s, col : col + n * p, :3]
+        if strip.shape[1] < n * p:
+            # Last cell flush with the frame edge: no gap after it
+            strip = np.pad(strip, ((0, 0), (0, n * p - strip.shape[1]), (0, 0)))
+        return strip.reshape(s, n, p, 3)[:, :, :s].transpose(1, 0, 2, 3)
+
+    def cells(self, frame: np.ndarray) -> np.ndarray:
+        """The non-empty icon cells of *frame*, ``(n, size, size, 3)`` uint8."""
+        cells = self._cells_view(frame)
+        if cells is None:
+            return np.empty((0, self.icon_size, self.icon_size, 3), dtype=np.uint8)
+        spread = _channel_max(cells).reshape(len(cells), -1)
+        occupied = spread.max(axis=1) - spread.min(axis=1) >= _EMPTY_SPREAD
+        return np.ascontiguousarray(cells[occupied])
+
+    def read(self, frame: np.ndarray) -> int:
+        """Bitmask of the conditions shown in *frame*."""
+        cells = self.cells(frame)
+        if not len(cells):
+            return 0
+        mask = 0
+        for i, key in enumerate(self._hash(cells).tolist()):
+            bit = self._table.get(key)
+            if bit is None:
+                bit = self._nearest(key, cells[i])
+            if bit == _UNKNOWN:
+                self.unknown[key] = self.unknown.get(key, 0) + 1
+                continue
+            mask |= 1 << bit
+        return mask
@@ -8,7 +8,7 @@ minimal config file.
 import json
 import os
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 try:
     import yaml
@@ -51,12 +51,32 @@ class CoordDisplayConfig:
     height: int = 14
 
 
+@dataclass
+class HealRule:
+    """One healing tier: press *key* when HP drops below *below* %."""
+    key: str
+    below: float
+    # Seconds before this key is pressed again – only used when the
+    # cooldowns table does not list the key
+    cooldown: float = 1.0
+
+
 @dataclass
 class HealingConfig:
     hp_threshold: float = 70.0        # press heal_key when HP < this %
     heal_key: str = "f1"
     mana_threshold: float = 30.0      # press mana_key when mana < this %
     mana_key: Optional[str] = None    # set to e.g. "f3"; None = disabled
+    # Heal tiers, strongest (lowest threshold) first when several apply.
+    # Empty = a single tier from heal_key / hp_threshold.
+    heal_rules: List[HealRule] = field(default_factory=list)
+    # Heal on the HP projected input_latency seconds ahead from the trend of
+    # the last hp_trend_window seconds; false = plain threshold on the reading.
+    predictive: bool = True
+    input_latency: float = 0.15
+    hp_trend_window: float = 0.5
+    # Append every HP reading as "t,hp" CSV lines (for evaluate_healing.py).
+    hp_trace_file: Optional[str] = None
 
 
 @dataclass
@@ -64,11 +84,28 @@ class CombatConfig:
     attack_key: str = "space"
     stuck_timeout: float = 3.0        # seconds without position change = stuck
     unreachable_cooldown: float = 30.0  # seconds before retrying that area
+    unreachable_radius: int = 2       # tiles around a blacklisted spot to avoid
     # Row and column offset from the enemy-detection pixel (_battle_pixel) to
     # the top-left corner of the battle list entry.  The red attack border
     # lives there when a monster is selected.  Default (-10, -10) is derived
     # from the standard Tibia client where each battle entry is 20×20 px.
     attack_indicator_offset: Tuple[int, int] = (-10, -10)
+    # Battle-list entry pitch (px) and how many entries to decode per frame.
+    battle_entry_height: int = 22
+    battle_max_entries: int = 10
+    # Pick the target by score and click its battle-list entry instead of
+    # pressing attack_key (see bot/targeting.py).
+    targeting: bool = True
+    # Creature name hash (logged as "[Targeting] New creature 0x…") → priority.
+    target_priorities: Dict[int, float] = field(default_factory=dict)
+    target_hp_weight: float = 1.0       # bonus for a target at 0 % HP
+    target_distance_weight: float = 0.5  # penalty per battle-list slot
+    target_switch_margin: float = 0.5   # score lead needed to switch target
+    target_min_dwell: float = 1.0       # seconds before a target may be dropped
+    # Find creatures in the viewport by their health bars: skips targets on
+    # blacklisted tiles and tells looting which tile the kill was on.
+    creature_detection: bool = True
+    creature_cpu_share: float = 0.05    # fraction of one core the detector may use
 
 
 @dataclass
@@ -81,6 +118,11 @@ class NavigationConfig:
     waypoints: List[Tuple[int, int, int]] = field(default_factory=list)
     waypoint_tolerance: int = 2       # tiles – how close = "arrived"
     move_interval: float = 0.9        # seconds between navigation clicks
+    # Between OCR fixes the position is dead-reckoned from minimap motion and
+    # clicks.  OCR is re-read when the estimate's uncertainty exceeds
+    # ocr_max_uncertainty tiles, or at the latest every ocr_max_interval s.
+    ocr_max_uncertainty: float = 1.5
+    ocr_max_interval: float = 15.0
 
 
 def load_waypoints_json(path: str) -> List[Tuple[int, int, int]]:
@@ -110,8 +152,24 @@ class MinimapConfig:
     move_interval: float = 0.9
     # Seconds without minimap movement before declaring "stuck" and advancing.
     stuck_timeout: float = 5.0
-    # JSON file produced by record_minimap_waypoints.py.
+    # Number of upcoming waypoints matched each tick (enables skipping ahead).
+    lookahead: int = 3
+    # Route bundle (.route) produced by record_minimap_waypoints.py, or a
+    # legacy JSON route.
     waypoints_file: Optional[str] = None
+    # Directory of the stitched minimap atlas; None disables the atlas and
+    # limits routes to waypoints that are visible from each other.
+    atlas_dir: Optional[str] = None
+    # Side length (px) of each per-floor atlas mosaic.
+    atlas_size: int = 2048
+    # Pixels around the predicted position searched when localising.
+    atlas_search_radius: int = 16
+    # Floor the route is on – the minimap alone cannot tell floors apart.
+    floor: int = 7
+    # Plan walks with A* on the minimap colours and click the farthest
+    # on-path tile instead of clicking straight at the target.  Also used by
+    # the OCR navigation module (which then reads this minimap region).
+    pathfinding: bool = True
 
 
 @dataclass
@@ -124,6 +182,131 @@ class LootConfig:
     whitelist: List[str] = field(default_factory=list)
 
 
+@dataclass
+class ActionCooldown:
+    cooldown: float = 1.0             # seconds before this key works again
+    groups: List[str] = field(default_factory=list)   # shared cooldown groups
+
+
+@dataclass
+class CooldownConfig:
+    # Shared cooldown groups (s): using any member starts the group cooldown.
+    groups: Dict[str, float] = field(default_factory=lambda: {
+        "attack": 2.0, "healing": 1.0, "support": 2.0, "potion": 1.0,
+    })
+    # Hotkey → its own cooldown and groups.  Keys not listed here use the
+    # module fallbacks (heal rule cooldown, 1 s for mana_key).
+    actions: Dict[str, ActionCooldown] = field(default_factory=dict)
+
+
+@dataclass
+class RotationSpell:
+    key: str
+    every: float = 0.0                # seconds between casts; 0 = whenever ready
+    when: str = "attacking"           # "attacking", "enemy" or "always"
+    min_mana: float = 0.0             # skip while mana % is below this
+
+
+@dataclass
+class RotationConfig:
+    # Spells / items cast on a schedule; empty = rotation module idle.
+    spells: List[RotationSpell] = field(default_factory=list)
+
+
+@dataclass
+class ConditionsConfig:
+    """Status-condition icon strip (poisoned, paralyzed, haste, hungry…).
+
+    Run ``python calibrate.py --show-conditions`` to check the cells and to
+    save the icons shown as templates for ``templates_dir``.
+    """
+    enabled: bool = False
+    # Top-left pixel of the first icon.  With anchor_template set, the strip
+    # is instead found once at startup at anchor_offset (row, col) from it.
+    x: int = 1770
+    y: int = 300
+    anchor_template: Optional[str] = None
+    anchor_offset: Tuple[int, int] = (0, 0)
+    icon_size: int = 9                # px, icons are square
+    icon_pitch: int = 11              # px from one icon to the next
+    max_icons: int = 12
+    templates_dir: str = "images/conditions"   # <condition name>.png
+    # Condition → key pressed while it is active (e.g. paralyzed → haste);
+    # "!name" presses while it is absent (e.g. "!haste" → haste).
+    actions: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class StateConfig:
+    # Samples kept per position track (absolute positions, odometry).  At the
+    # ~10 Hz update rate 4096 samples hold about 7 minutes in 128 KB.
+    position_history: int = 4096
+
+
+@dataclass
+class LoggingConfig:
+    """Asynchronous log writer (see ``bot/log.py``)."""
+    level: str = "info"               # debug | info | warning | error
+    # Per-logger overrides, e.g. {"Navigation": "debug"}
+    levels: Dict[str, str] = field(default_factory=dict)
+    console: bool = True
+    file: Optional[str] = None        # JSON-lines file, e.g. "logs/bot.jsonl"
+    max_bytes: int = 5_000_000        # rotate the file past this size
+    backups: int = 3                  # rotated files kept (bot.jsonl.1 …)
+    # Per logger: messages/s and burst; warnings and errors are never limited
+    rate_limit: float = 20.0
+    burst: int = 40
+    dedup_window: float = 5.0         # s an identical message is folded for
+    queue_size: int = 10000           # info records; more are dropped and counted
+
+
+@dataclass
+class FlightRecorderConfig:
+    """Always-on recording of the last seconds, dumped on a trigger (see
+    ``bot/flight_recorder.py``; replay a dump with ``replay_flight.py``)."""
+    enabled: bool = True
+    seconds: float = 10.0             # history kept
+    fps: float = 5.0                  # frames recorded per second (at most)
+    max_memory_mb: float = 64.0       # encoded crops kept; oldest go first
+    cpu_share: float = 0.05           # fraction of one core recording may use
+    # Tiles around the character recorded from the viewport, (x, y) radius;
+    # (0, 0) records no viewport.  Bars, battle list, conditions and minimap
+    # are recorded where the modules found them.
+    viewport_tiles: Tuple[int, int] = (4, 3)
+    rois: Dict[str, List[int]] = field(default_factory=dict)  # extra {name: [x, y, w, h]}
+    events: int = 2000                # decisions and input actions kept
+    critical_hp: float = 25.0         # dump when HP drops below this %
+    post_seconds: float = 2.0         # keep recording this long after a trigger
+    trigger_cooldown: float = 60.0    # s between dumps for the same reason
+    output_dir: str = "flights"
+    keep: int = 20                    # dumps kept; the oldest are deleted
+
+
+@dataclass
+class TelemetryConfig:
+    """Session telemetry (see ``bot/telemetry.py``; analyse with
+    ``analyze_telemetry.py``)."""
+    enabled: bool = True
+    dir: str = "telemetry"            # one sub-directory per run
+    interval: float = 0.2             # s between GameState samples
+    flush_rows: int = 1024            # rows buffered per table before appending
+    flush_interval: float = 30.0      # s; append at least this often
+
+
+@dataclass
+class ControlConfig:
+    """Local control socket (see ``bot/control.py``; client: ``botctl.py``)."""
+    enabled: bool = True
+    socket: str = "tibiabot.sock"     # Unix-domain socket path
+
+
+@dataclass
+class ReloadConfig:
+    """Config file hot-reload (see ``bot/config_watcher.py``)."""
+    enabled: bool = True
+    poll_interval: float = 1.0        # s between mtime checks without inotify
+
+
 @dataclass
 class BotConfig:
     screen: ScreenConfig = field(default_factory=ScreenConfig)
@@ -134,6 +317,50 @@ class BotConfig:
     navigation: NavigationConfig = field(default_factory=NavigationConfig)
     minimap: MinimapConfig = field(default_factory=MinimapConfig)
     loot: LootConfig = field(default_factory=LootConfig)
+    cooldowns: CooldownConfig = field(default_factory=CooldownConfig)
+    rotation: RotationConfig = field(default_factory=RotationConfig)
+    conditions: ConditionsConfig = field(default_factory=ConditionsConfig)
+    state: StateConfig = field(default_factory=StateConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    flight_recorder: FlightRecorderConfig = field(default_factory=FlightRecorderConfig)
+    telemetry: TelemetryConfig = field(default_factory=TelemetryConfig)
+    control: ControlConfig = field(default_factory=ControlConfig)
+    reload: ReloadConfig = field(default_factory=ReloadConfig)
+
+
+# ── supervisor ───────────────────────────────────────────────────────────────
+
+@dataclass
+class DisplayConfig:
+    """A screen one capture worker grabs for all instances on it."""
+    width: int = 2560
+    height: int = 1440
+    fps: int = 20
+    x_display: Optional[str] = None   # e.g. ":1" for an Xvfb display; None = this one
+
+
+@dataclass
+class InstanceConfig:
+    """One bot process run by the supervisor (see ``bot/supervisor.py``)."""
+    name: str = "bot"
+    config: str = "bot_config.yaml"   # the instance's bot config
+    display: str = "main"
+    # Part of the display the instance sees as its screen (x, y, w, h);
+    # None = the whole display.  Coordinates in its config are relative to it.
+    region: Optional[Tuple[int, int, int, int]] = None
+    cpu: Optional[int] = None         # core to pin the process to; None = i % cores
+
+
+@dataclass
+class SupervisorConfig:
+    displays: Dict[str, DisplayConfig] = field(
+        default_factory=lambda: {"main": DisplayConfig()}
+    )
+    instances: List[InstanceConfig] = field(default_factory=list)
+    restart_delay: float = 2.0        # s before restarting a crashed instance
+    max_restart_delay: float = 60.0   # doubled per crash in a row up to this
+    stats_interval: float = 30.0      # s between aggregated stats
+    stats_file: Optional[str] = "supervisor_stats.json"
 
 
 # ── loader ───────────────────────────────────────────────────────────────────
@@ -192,16 +419,41 @@ def load_config(path: str = "bot_config.yaml") -> BotConfig:
         heal_key=h.get("heal_key", cfg.healing.heal_key),
         mana_threshold=h.get("mana_threshold", cfg.healing.mana_threshold),
         mana_key=h.get("mana_key", cfg.healing.mana_key),
+        heal_rules=[
+            HealRule(
+                key=r["key"],
+                below=float(r["below"]),
+                cooldown=float(r.get("cooldown", 1.0)),
+            )
+            for r in h.get("heal_rules") or []
+        ],
+        predictive=h.get("predictive", cfg.healing.predictive),
+        input_latency=h.get("input_latency", cfg.healing.input_latency),
+        hp_trend_window=h.get("hp_trend_window", cfg.healing.hp_trend_window),
+        hp_trace_file=h.get("hp_trace_file", cfg.healing.hp_trace_file),
     )
 
     c = raw.get("combat", {})
+    raw_prio = c.get("target_priorities") or {}
+    priorities = {int(str(k), 0): float(v) for k, v in raw_prio.items()}
     raw_offset = c.get("attack_indicator_offset", None)
     attack_offset = tuple(raw_offset) if raw_offset else cfg.combat.attack_indicator_offset
     cfg.combat = CombatConfig(
         attack_key=c.get("attack_key", cfg.combat.attack_key),
         stuck_timeout=c.get("stuck_timeout", cfg.combat.stuck_timeout),
         unreachable_cooldown=c.get("unreachable_cooldown", cfg.combat.unreachable_cooldown),
+        unreachable_radius=c.get("unreachable_radius", cfg.combat.unreachable_radius),
         attack_indicator_offset=attack_offset,
+        battle_entry_height=c.get("battle_entry_height", cfg.combat.battle_entry_height),
+        battle_max_entries=c.get("battle_max_entries", cfg.combat.battle_max_entries),
+        targeting=c.get("targeting", cfg.combat.targeting),
+        target_priorities=priorities,
+        target_hp_weight=c.get("target_hp_weight", cfg.combat.target_hp_weight),
+        target_distance_weight=c.get("target_distance_weight", cfg.combat.target_distance_weight),
+        target_switch_margin=c.get("target_switch_margin", cfg.combat.target_switch_margin),
+        target_min_dwell=c.get("target_min_dwell", cfg.combat.target_min_dwell),
+        creature_detection=c.get("creature_detection", cfg.combat.creature_detection),
+        creature_cpu_share=c.get("creature_cpu_share", cfg.combat.creature_cpu_share),
     )
 
     n = raw.get("navigation", {})
@@ -223,6 +475,8 @@ def load_config(path: str = "bot_config.yaml") -> BotConfig:
         waypoints=waypoints,
         waypoint_tolerance=n.get("waypoint_tolerance", cfg.navigation.waypoint_tolerance),
         move_interval=n.get("move_interval", cfg.navigation.move_interval),
+        ocr_max_uncertainty=n.get("ocr_max_uncertainty", cfg.navigation.ocr_max_uncertainty),
+        ocr_max_interval=n.get("ocr_max_interval", cfg.navigation.ocr_max_interval),
     )
 
     mm = raw.get("minimap", {})
@@ -236,7 +490,13 @@ def load_config(path: str = "bot_config.yaml") -> BotConfig:
         arrival_px=mm.get("arrival_px", cfg.minimap.arrival_px),
         move_interval=mm.get("move_interval", cfg.minimap.move_interval),
         stuck_timeout=mm.get("stuck_timeout", cfg.minimap.stuck_timeout),
+        lookahead=mm.get("lookahead", cfg.minimap.lookahead),
         waypoints_file=mm.get("waypoints_file", cfg.minimap.waypoints_file),
+        atlas_dir=mm.get("atlas_dir", cfg.minimap.atlas_dir),
+        atlas_size=mm.get("atlas_size", cfg.minimap.atlas_size),
+        atlas_search_radius=mm.get("atlas_search_radius", cfg.minimap.atlas_search_radius),
+        floor=mm.get("floor", cfg.minimap.floor),
+        pathfinding=mm.get("pathfinding", cfg.minimap.pathfinding),
     )
 
     lo = raw.get("loot", {})
@@ -247,4 +507,137 @@ def load_config(path: str = "bot_config.yaml") -> BotConfig:
         whitelist=lo.get("whitelist", cfg.loot.whitelist),
     )
 
+    cd = raw.get("cooldowns", {})
+    cfg.cooldowns = CooldownConfig(
+        groups={**cfg.cooldowns.groups, **(cd.get("groups") or {})},
+        actions={
+            str(key): ActionCooldown(
+                cooldown=float(a.get("cooldown", 1.0)),
+                groups=list(a.get("groups", [])),
+            )
+            for key, a in (cd.get("actions") or {}).items()
+        },
+    )
+
+    ro = raw.get("rotation", {})
+    cfg.rotation = RotationConfig(
+        spells=[
+            RotationSpell(
+                key=sp["key"],
+                every=float(sp.get("every", 0.0)),
+                when=sp.get("when", "attacking"),
+                min_mana=float(sp.get("min_mana", 0.0)),
+            )
+            for sp in ro.get("spells") or []
+        ],
+    )
+
+    co = raw.get("conditions", {})
+    raw_anchor = co.get("anchor_offset", None)
+    cfg.conditions = ConditionsConfig(
+        enabled=co.get("enabled", cfg.conditions.enabled),
+        x=co.get("x", cfg.conditions.x),
+        y=co.get("y", cfg.conditions.y),
+        anchor_template=co.get("anchor_template", cfg.conditions.anchor_template),
+        anchor_offset=tuple(raw_anchor) if raw_anchor else cfg.conditions.anchor_offset,
+        icon_size=co.get("icon_size", cfg.conditions.icon_size),
+        icon_pitch=co.get("icon_pitch", cfg.conditions.icon_pitch),
+        max_icons=co.get("max_icons", cfg.conditions.max_icons),
+        templates_dir=co.get("templates_dir", cfg.conditions.templates_dir),
+        actions={str(k): str(v) for k, v in (co.get("actions") or {}).items()},
+    )
+
+    st = raw.get("state", {})
+    cfg.state = StateConfig(
+        position_history=st.get("position_history", cfg.state.position_history),
+    )
+
+    lg = raw.get("logging", {})
+    cfg.logging = LoggingConfig(
+        level=lg.get("level", cfg.logging.level),
+        levels={str(k): str(v) for k, v in (lg.get("levels") or {}).items()},
+        console=lg.get("console", cfg.logging.console),
+        file=lg.get("file", cfg.logging.file),
+        max_bytes=lg.get("max_bytes", cfg.logging.max_bytes),
+        backups=lg.get("backups", cfg.logging.backups),
+        rate_limit=float(lg.get("rate_limit", cfg.logging.rate_limit)),
+        burst=lg.get("burst", cfg.logging.burst),
+        dedup_window=float(lg.get("dedup_window", cfg.logging.dedup_window)),
+        queue_size=lg.get("queue_size", cfg.logging.queue_size),
+    )
+
+    fr = raw.get("flight_recorder", {})
+    raw_tiles = fr.get("viewport_tiles", None)
+    cfg.flight_recorder = FlightRecorderConfig(
+        enabled=fr.get("enabled", cfg.flight_recorder.enabled),
+        seconds=float(fr.get("seconds", cfg.flight_recorder.seconds)),
+        fps=float(fr.get("fps", cfg.flight_recorder.fps)),
+        max_memory_mb=float(fr.get("max_memory_mb", cfg.flight_recorder.max_memory_mb)),
+        cpu_share=float(fr.get("cpu_share", cfg.flight_recorder.cpu_share)),
+        viewport_tiles=tuple(raw_tiles) if raw_tiles else cfg.flight_recorder.viewport_tiles,
+        rois={str(k): [int(v) for v in r] for k, r in (fr.get("rois") or {}).items()},
+        events=fr.get("events", cfg.flight_recorder.events),
+        critical_hp=float(fr.get("critical_hp", cfg.flight_recorder.critical_hp)),
+        post_seconds=float(fr.get("post_seconds", cfg.flight_recorder.post_seconds)),
+        trigger_cooldown=float(fr.get("trigger_cooldown", cfg.flight_recorder.trigger_cooldown)),
+        output_dir=fr.get("output_dir", cfg.flight_recorder.output_dir),
+        keep=fr.get("keep", cfg.flight_recorder.keep),
+    )
+
+    te = raw.get("telemetry", {})
+    cfg.telemetry = TelemetryConfig(
+        enabled=te.get("enabled", cfg.telemetry.enabled),
+        dir=te.get("dir", cfg.telemetry.dir),
+        interval=float(te.get("interval", cfg.telemetry.interval)),
+        flush_rows=te.get("flush_rows", cfg.telemetry.flush_rows),
+        flush_interval=float(te.get("flush_interval", cfg.telemetry.flush_interval)),
+    )
+
+    ct = raw.get("control", {})
+    cfg.control = ControlConfig(
+        enabled=ct.get("enabled", cfg.control.enabled),
+        socket=ct.get("socket", cfg.control.socket),
+    )
+
+    rl = raw.get("reload", {})
+    cfg.reload = ReloadConfig(
+        enabled=rl.get("enabled", cfg.reload.enabled),
+        poll_interval=float(rl.get("poll_interval", cfg.reload.poll_interval)),
+    )
+
+    return cfg
+
+
+def load_supervisor_config(path: str) -> SupervisorConfig:
+    """Load a supervisor config (displays + instances) from *path*."""
+    cfg = SupervisorConfig()
+    if not _YAML_AVAILABLE:
+        raise RuntimeError("PyYAML is required for the supervisor config")
+    with open(path) as f:
+        raw = yaml.safe_load(f) or {}
+
+    displays = raw.get("displays")
+    if displays:
+        cfg.displays = {
+            str(name): DisplayConfig(
+                width=d.get("width", DisplayConfig.width),
+                height=d.get("height", DisplayConfig.height),
+                fps=d.get("fps", DisplayConfig.fps),
+                x_display=d.get("x_display", DisplayConfig.x_display),
+            )
+            for name, d in displays.items()
+        }
+    for i, inst in enumerate(raw.get("instances") or []):
+        region = inst.get("region")
+        cfg.instances.append(InstanceConfig(
+            name=str(inst.get("name", f"bot{i + 1}")),
+            config=inst.get("config", InstanceConfig.config),
+            display=str(inst.get("display", next(iter(cfg.displays)))),
+            region=tuple(int(v) for v in region) if region else None,
+            cpu=inst.get("cpu", InstanceConfig.cpu),
+        ))
+    cfg.restart_delay = float(raw.get("restart_delay", cfg.restart_delay))
+    cfg.max_restart_delay = float(raw.get("max_restart_delay", cfg.max_restart_delay))
+    cfg.stats_interval = float(raw.get("stats_interval", cfg.stats_interval))
+    cfg.stats_file = raw.get("stats_file", cfg.stats_file)
     return cfg
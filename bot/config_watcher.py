@@ -0,0 +1,271 @@
+"""Config file hot-reload: edits to the YAML reach the running modules.
+
+``bot.main`` runs a :class:`ConfigWatcher` on the config file.  It waits
+for the file to change – inotify on Linux (the directory is watched, so
+editors that write a new file and rename it over the old one are seen too),
+an mtime / size check every ``reload.poll_interval`` seconds elsewhere – and
+then reloads it.
+
+Reloading
+---------
+1. The file is parsed with :func:`bot.config.load_config` in a worker
+   thread.  A file that does not parse is reported and the running config
+   kept.
+2. It is compared, field by field, with the previous load of the file – not
+   with the live config – so values changed at runtime (``botctl.py set``,
+   the supervisor's per-instance paths) survive unless the file changes
+   that very field.
+3. Every module holding a changed section gets ``prepare_config`` in a worker
+   thread: loot templates are decoded, a new route file is read.  If any
+   module raises, nothing is applied.
+4. On the event loop, with no await in between, the changed fields are
+   written into the live sections and every module gets ``apply_config``
+   to swap in what it prepared.  Modules see either the old config or the
+   new one, never a mix, and no tick waits on a file.
+
+Sections only read at startup – ``screen``, ``state``, ``cooldowns``,
+``control``, ``telemetry``, ``flight_recorder``, ``reload`` – are not
+applied, nor is a change to which modules run (``enabled``, an empty
+``mana_key``, …); both are logged as needing a restart.
+
+Usage::
+
+    watcher = ConfigWatcher("bot_config.yaml", cfg, modules, modules_for)
+    task = asyncio.create_task(watcher.run())
+"""
+
+import asyncio
+import copy
+import ctypes
+import ctypes.util
+import dataclasses
+import os
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bot import log
+from bot.config import BotConfig, load_config
+from bot.modules.base import BaseModule
+
+logger = log.get_logger("Reload")
+
+# Seconds to wait after a change for the rest of the write to land
+_DEBOUNCE = 0.2
+# Sections built into long-lived objects at startup
+_RESTART_ONLY = ("screen", "state", "cooldowns", "control", "telemetry",
+                 "flight_recorder", "reload")
+
+# ── inotify ───────────────────────────────────────────────────────────────────
+
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_EVENT = struct.Struct("iIII")     # wd, mask, cookie, len – then the name
+
+
+def _inotify(directory: str) -> Optional[int]:
+    """A non-blocking inotify descriptor watching *directory*, or None
+    where inotify is unavailable."""
+    name = ctypes.util.find_library("c")
+    if not name or not hasattr(os, "O_NONBLOCK"):
+        return None
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+        init, add = libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    fd = init(_IN_NONBLOCK | _IN_CLOEXEC)
+    if fd < 0:
+        return None
+    mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+    if add(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _names(buf: bytes) -> List[str]:
+    """File names of the inotify events in *buf*."""
+    names, i = [], 0
+    while i + _EVENT.size <= len(buf):
+        _, _, _, length = _EVENT.unpack_from(buf, i)
+        i += _EVENT.size
+        names.append(os.fsdecode(buf[i : i + length].rstrip(b"\0")))
+        i += length
+    return names
+
+
+# ── diffing ───────────────────────────────────────────────────────────────────
+
+def _diff(old: BotConfig, new: BotConfig) -> Dict[str, Dict[str, Any]]:
+    """{section: {field: new value}} for every field that differs."""
+    changed: Dict[str, Dict[str, Any]] = {}
+    for sec in dataclasses.fields(BotConfig):
+        a, b = getattr(old, sec.name), getattr(new, sec.name)
+        fields = {
+            f.name: getattr(b, f.name)
+            for f in dataclasses.fields(a)
+            if getattr(a, f.name) != getattr(b, f.name)
+        }
+        if fields:
+            changed[sec.name] = fields
+    return changed
+
+
+class ConfigWatcher:
+    """Reloads *path* into *cfg* (the live config) when the file changes.
+
+    *modules_for* names the modules a config starts (``bot.main``); when it
+    differs between two loads a restart is needed to follow.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        cfg: BotConfig,
+        modules: List[BaseModule],
+        modules_for: Callable[[BotConfig], Any],
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.cfg = cfg
+        self.modules = modules
+        self.modules_for = modules_for
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self._file: Optional[BotConfig] = None   # the last successful load
+        self._changed = asyncio.Event()
+
+    # ── watching ─────────────────────────────────────────────────────────────
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def _poll(self) -> None:
+        seen = self._signature()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            sig = self._signature()
+            if sig != seen:
+                seen = sig
+                self._changed.set()
+
+    async def run(self) -> None:
+        self._file = await asyncio.to_thread(load_config, self.path)
+        loop = asyncio.get_running_loop()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        base = os.path.basename(self.path)
+        fd = _inotify(directory)
+        poller = None
+        if fd is not None:
+            def _on_event() -> None:
+                try:
+                    buf = os.read(fd, 4096)
+                except BlockingIOError:
+                    return
+                if base in _names(buf):
+                    self._changed.set()
+            loop.add_reader(fd, _on_event)
+            logger.info(f"Watching {self.path} (inotify)")
+        else:
+            poller = asyncio.create_task(self._poll(), name="ConfigPoll")
+            logger.info(f"Watching {self.path} (every {self.poll_interval:g}s)")
+
+        try:
+            while True:
+                await self._changed.wait()
+                # Let the editor finish writing (several events per save)
+                await asyncio.sleep(_DEBOUNCE)
+                self._changed.clear()
+                await self.reload()
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+                os.close(fd)
+            if poller:
+                poller.cancel()
+
+    # ── reloading ────────────────────────────────────────────────────────────
+
+    def _module_changes(self, merged: Dict[str, Any]) -> List[Tuple[BaseModule, Dict[str, Any]]]:
+        """(module, {attribute: merged section}) for the modules holding a
+        changed section."""
+        live = {id(getattr(self.cfg, name)): name for name in merged}
+        out = []
+        for m in self.modules:
+            changes = {
+                attr: merged[live[id(value)]]
+                for attr, value in vars(m).items() if id(value) in live
+            }
+            if changes:
+                out.append((m, changes))
+        return out
+
+    async def reload(self) -> bool:
+        """Load the file and apply what changed; False if nothing was."""
+        if not os.path.exists(self.path):
+            return False      # mid-rename; the new file raises another event
+        try:
+            new = await asyncio.to_thread(load_config, self.path)
+        except Exception as e:
+            reason = " ".join(str(e).split())     # YAML errors span lines
+            logger.error(f"{self.path} not reloaded: {type(e).__name__}: {reason}")
+            return False
+        old = self._file
+        changed = _diff(old, new)
+        if not changed:
+            return False
+
+        if self.modules_for(new) != self.modules_for(old):
+            logger.warning("Modules enabled / disabled – restart the bot to follow")
+        for name in _RESTART_ONLY:
+            if changed.pop(name, None):
+                logger.warning(f"{name} changed – restart the bot to apply it")
+        if not changed:
+            self._file = new
+            return False
+
+        # The live sections as they will be: runtime values kept where the
+        # file did not change them
+        merged = {}
+        for name, fields in changed.items():
+            merged[name] = copy.copy(getattr(self.cfg, name))
+            for field, value in fields.items():
+                setattr(merged[name], field, value)
+        targets = self._module_changes(merged)
+
+        def _prepare() -> List[Any]:
+            return [m.prepare_config(changes) for m, changes in targets]
+        try:
+            prepared = await asyncio.to_thread(_prepare)
+        except Exception as e:
+            logger.error(f"{self.path} not reloaded: {e}")
+            return False
+
+        # The swap: no await from here on
+        for name, fields in changed.items():
+            section = getattr(self.cfg, name)
+            for field, value in fields.items():
+                setattr(section, field, value)
+        for (m, changes), p in zip(targets, prepared):
+            try:
+                m.apply_config(changes, p)
+            except Exception as e:
+                logger.error(f"{type(m).__name__} failed to apply the new config: {e!r}")
+        self._file = new
+        self.reloads += 1
+
+        if "logging" in changed:
+            await asyncio.to_thread(log.configure, self.cfg.logging)
+        summary = ", ".join(
+            f"{name}.{field}" for name, fields in changed.items() for field in fields
+        )
+        logger.info(f"Reloaded {summary}")
+        return True
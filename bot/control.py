@@ -0,0 +1,334 @@
+"""Local control socket: status snapshots and commands for a running bot.
+
+``bot.main`` serves newline-delimited JSON on a Unix-domain socket
+(``control.socket``, readable by the owner only).  Every request line is an
+object with a ``cmd``; every one gets one response line, ``{"ok": true,
+…}`` or ``{"ok": false, "error": "…"}``.  ``botctl.py`` is the client.
+
+Commands
+--------
+* ``status`` – game state, per-module timing (the last ``window`` seconds,
+  default 10), loop lag, capture and flight-recorder stats.
+* ``pause`` / ``resume`` – ``{"module": "combat"}``: the module stops at
+  the top of its next tick, and carries on from there.
+* ``set`` – ``{"key": "healing.hp_threshold", "value": 60}``: changes a
+  number, string or boolean of the live config (``null`` only where the
+  field is optional).  Modules read most values every tick; the ones
+  holding the section get ``config_changed()``, and if one of them rejects
+  the value the old one is put back.  Values only read at startup (screen
+  size, paths) need a restart.  The value lasts until the config file
+  changes that same field (see ``bot/config_watcher.py``).
+* ``skip_waypoint`` – the navigation module gives up its current waypoint.
+* ``dump`` – ``{"detail": "…"}``: the flight recorder dumps its buffer.
+* ``help`` – the commands.
+
+Snapshots
+---------
+Requests are answered on the event loop, between two module ticks, so a
+command never races a module.  The game state is copied under its lock by
+reference only and converted after (:meth:`GameState.snapshot`); module
+timings come from the profiler's ring buffers.  A ``status`` request with
+the default window takes about half a millisecond of loop time; the state
+lock is held for a few dozen attribute reads.
+
+Usage
+-----
+    python botctl.py status
+    python botctl.py pause combat
+"""
+
+import asyncio
+import dataclasses
+import json
+import os
+import socket
+import time
+import typing
+from typing import Any, Callable, Dict, List, Optional
+
+from bot.config import BotConfig
+from bot.log import get_logger
+from bot.modules.base import BaseModule
+from bot.screen import ScreenCapture
+from bot.state import GameState
+
+log = get_logger("Control")
+
+# Seconds of module timings a status request reports by default
+_WINDOW = 10.0
+# Longest request line accepted
+_MAX_REQUEST = 64 * 1024
+
+_TRUE = {"true", "yes", "on", "1"}
+_FALSE = {"false", "no", "off", "0"}
+
+
+class CommandError(Exception):
+    """A request that cannot be carried out; its message is the reply."""
+
+
+def _optional(section: Any, name: str) -> bool:
+    """True if field *name* of the dataclass *section* may be None."""
+    hint = typing.get_type_hints(type(section)).get(name)
+    return type(None) in typing.get_args(hint)
+
+
+def _coerce(value: Any, current: Any, optional: bool = False) -> Any:
+    """*value* converted to the type of the config value it replaces; None
+    only where the field is Optional."""
+    if value is None:
+        if optional:
+            return None             # clears optional values (keys, paths)
+        raise CommandError("expected a value, got null")
+    if isinstance(current, bool):
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in _TRUE or text in _FALSE:
+            return text in _TRUE
+        raise CommandError(f"expected true or false, got {value!r}")
+    try:
+        if isinstance(current, int):
+            number = float(value)
+            if not number.is_integer():
+                raise CommandError(f"expected a whole number, got {value!r}")
+            return int(number)
+        if isinstance(current, float):
+            return float(value)
+    except (TypeError, ValueError):
+        raise CommandError(f"expected a number, got {value!r}") from None
+    if isinstance(value, str):
+        return value
+    if not isinstance(value, (int, float)):
+        raise CommandError(f"expected a string, got {value!r}")
+    return str(value) if isinstance(current, str) else value
+
+
+class ControlServer:
+    """Answers control requests for one running bot.
+
+    Usage::
+
+        server = ControlServer(cfg, state, screen, tasks, modules,
+                               profiler=profiler, recorder=recorder)
+        await server.start()          # False where Unix sockets are missing
+        ...
+        await server.close()
+    """
+
+    def __init__(
+        self,
+        cfg: BotConfig,
+        state: GameState,
+        screen: ScreenCapture,
+        tasks: Dict[str, asyncio.Task],
+        modules: List[BaseModule],
+        profiler: Any = None,
+        recorder: Any = None,
+    ) -> None:
+        self.cfg = cfg
+        self.path = cfg.control.socket
+        self.state = state
+        self.screen = screen
+        self.tasks = tasks
+        self.modules = modules
+        self.profiler = profiler
+        self.recorder = recorder
+        self.started_at = time.monotonic()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: set = set()
+        self._commands: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "status": self._status,
+            "pause": self._pause,
+            "resume": self._resume,
+            "set": self._set,
+            "skip_waypoint": self._skip_waypoint,
+            "dump": self._dump,
+            "help": self._help,
+        }
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+
+    async def start(self) -> bool:
+        if not hasattr(asyncio, "start_unix_server"):
+            log.warning("Unix-domain sockets not supported here – control socket disabled")
+            return False
+        if os.path.exists(self.path):
+            if _in_use(self.path):
+                log.warning(f"{self.path} is in use by another bot – control socket disabled")
+                return False
+            os.unlink(self.path)    # left behind by a bot that was killed
+        self._server = await asyncio.start_unix_server(
+            self._serve, path=self.path, limit=_MAX_REQUEST
+        )
+        os.chmod(self.path, 0o600)
+        log.info(f"Control socket: {self.path}")
+        return True
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._clients):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = self.handle(line)
+                writer.write(json.dumps(reply, default=str).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass    # client went away, or sent a line over the limit
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    # ── requests ─────────────────────────────────────────────────────────────
+
+    def handle(self, line: bytes) -> Dict[str, Any]:
+        """The reply to one request line."""
+        try:
+            req = json.loads(line)
+        except ValueError as e:
+            return {"ok": False, "error": f"not JSON: {e}"}
+        if not isinstance(req, dict):
+            return {"ok": False, "error": "a request is a JSON object with a 'cmd'"}
+        command = self._commands.get(req.get("cmd"))
+        if command is None:
+            return {"ok": False, "error": f"unknown command {req.get('cmd')!r} – see 'help'"}
+        try:
+            return {"ok": True, **command(req)}
+        except CommandError as e:
+            return {"ok": False, "error": str(e)}
+
+    def _module(self, req: Dict[str, Any]) -> BaseModule:
+        name = str(req.get("module", "")).lower()
+        for m in self.modules:
+            cls = type(m).__name__.lower()
+            if name in (cls, cls.removesuffix("module")):
+                return m
+        names = ", ".join(type(m).__name__.removesuffix("Module").lower() for m in self.modules)
+        raise CommandError(f"no module {req.get('module')!r} running (running: {names})")
+
+    def _status(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """Game state, module timings, loop lag, capture and recorder stats."""
+        try:
+            window = float(req.get("window", _WINDOW))
+        except (TypeError, ValueError):
+            raise CommandError(f"window: expected seconds, got {req['window']!r}") from None
+        timings: Dict[str, Any] = {}
+        out: Dict[str, Any] = {"uptime_s": round(time.monotonic() - self.started_at, 1)}
+        if self.profiler is not None:
+            summary = self.profiler.summary(since=time.monotonic() - window)
+            timings = summary["modules"]
+            out.update(window_s=summary["window_s"], loop_lag=summary["loop_lag"],
+                       calls=summary["calls"])
+        modules = {}
+        for m in self.modules:
+            name = type(m).__name__
+            task = self.tasks.get(name)
+            if task is None or not task.done():
+                status = "paused" if m.paused else "running"
+            elif task.cancelled() or task.exception() is None:
+                status = "stopped"
+            else:
+                status = f"crashed: {task.exception()!r}"
+            modules[name] = {"status": status, **timings.get(name, {})}
+        out["modules"] = modules
+        out["capture"] = self.screen.stats()
+        if self.recorder is not None:
+            out["flight_recorder"] = self.recorder.stats()
+        out["state"] = self.state.snapshot()
+        return out
+
+    def _pause(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """Stop a module at its next tick: {"module": name}."""
+        m = self._module(req)
+        m.pause()
+        log.info(f"{type(m).__name__} paused")
+        return {"module": type(m).__name__, "paused": True}
+
+    def _resume(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """Let a paused module carry on: {"module": name}."""
+        m = self._module(req)
+        m.resume()
+        log.info(f"{type(m).__name__} resumed")
+        return {"module": type(m).__name__, "paused": False}
+
+    def _set(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """Change a config value: {"key": "section.name", "value": v}."""
+        key = str(req.get("key", ""))
+        section_name, _, name = key.partition(".")
+        section = getattr(self.cfg, section_name, None)
+        if not dataclasses.is_dataclass(section) or name not in {
+            f.name for f in dataclasses.fields(section)
+        }:
+            raise CommandError(f"no config value {key!r} (expected section.name)")
+        if "value" not in req:
+            raise CommandError("no value given")
+        old = getattr(section, name)
+        if old is not None and not isinstance(old, (bool, int, float, str)):
+            raise CommandError(f"{key} is not a single value – edit the config file")
+        new = _coerce(req["value"], old, _optional(section, name))
+        setattr(section, name, new)
+        notified = []
+        try:
+            for m in self.modules:
+                if any(v is section for v in vars(m).values()):
+                    notified.append(type(m).__name__)
+                    m.config_changed()
+        except Exception as e:
+            setattr(section, name, old)
+            for m in self.modules:
+                if type(m).__name__ in notified[:-1]:
+                    m.config_changed()
+            log.error(f"{key}: {notified[-1]} rejected {new!r}: {e!r}")
+            raise CommandError(f"{notified[-1]} rejected {new!r}: {e} – {key} left at {old!r}")
+        log.info(f"{key}: {old!r} → {new!r}")
+        return {"key": key, "old": old, "new": new, "modules": notified}
+
+    def _skip_waypoint(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """Give up the current waypoint."""
+        for m in self.modules:
+            skip = getattr(m, "skip_waypoint", None)
+            task = self.tasks.get(type(m).__name__)
+            if skip is not None and task is not None and not task.done():
+                return {"module": type(m).__name__, "waypoint": skip()}
+        raise CommandError("no navigation module running")
+
+    def _dump(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """Dump the flight recorder: {"detail": text}."""
+        if self.recorder is None:
+            raise CommandError("flight recorder disabled")
+        if not self.recorder.trigger("manual", str(req.get("detail", ""))):
+            raise CommandError(
+                "a dump is pending or 'manual' dumped less than "
+                f"{self.cfg.flight_recorder.trigger_cooldown:g}s ago"
+            )
+        return {"in_s": self.cfg.flight_recorder.post_seconds,
+                "dir": self.cfg.flight_recorder.output_dir}
+
+    def _help(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """The commands."""
+        return {"commands": {name: fn.__doc__ for name, fn in self._commands.items()}}
+
+
+def _in_use(path: str) -> bool:
+    """True if something accepts connections on the socket at *path*."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(path)
+        except OSError:
+            return False
+    return True
@@ -0,0 +1,182 @@
+"""Action cooldowns with Tibia's shared cooldown groups, and a timing wheel.
+
+Every hotkey the bot presses is an *action*.  An action has its own
+cooldown and belongs to zero or more *groups* (healing spells, attack
+spells, support spells, potions…); using it starts its own cooldown and the
+cooldown of each of its groups, and it is ready only when all of them have
+passed.  Pressing a key while it is cooling down is ignored by the client,
+so modules check :meth:`CooldownManager.ready` first and report every key
+they actually send with :meth:`CooldownManager.use`.
+
+``ready`` is O(1): each action caches the latest expiry of its own and its
+groups' cooldowns, refreshed whenever a use could change it.
+
+:class:`TimingWheel` schedules recurring work (spell rotations) at a fixed
+tick: insertion is O(1) and each tick only looks at the items hashed to its
+own slot, however many are waiting elsewhere.
+"""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Generic, List, Optional, Sequence, TypeVar
+
+from bot.config import CooldownConfig
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Action:
+    cooldown: float
+    groups: List[str] = field(default_factory=list)
+    used_at: float = -math.inf
+    # max(own expiry, expiry of every group), kept current by use()
+    ready_at: float = -math.inf
+
+
+class CooldownManager:
+    """Per-action and group cooldowns, fed by the keys actually sent.
+
+    Usage::
+
+        cd = CooldownManager({"healing": 1.0, "potion": 1.0})
+        cd.register("f1", cooldown=1.0, groups=["healing"])
+        if cd.ready("f1"):
+            inputs.press("f1")
+            cd.use("f1")
+        await cd.next_ready("f1")
+    """
+
+    def __init__(self, groups: Optional[Dict[str, float]] = None) -> None:
+        self._group_cooldown: Dict[str, float] = dict(groups or {})
+        self._group_ready_at: Dict[str, float] = {}
+        self._actions: Dict[str, _Action] = {}
+        # Actions per group, to refresh their cached ready_at on a use
+        self._members: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_config(cls, config: CooldownConfig) -> "CooldownManager":
+        manager = cls(config.groups)
+        for key, action in config.actions.items():
+            manager.register(key, action.cooldown, action.groups)
+        return manager
+
+    def register(
+        self, key: str, cooldown: float, groups: Sequence[str] = (), replace: bool = True
+    ) -> None:
+        """Declare *key*; with ``replace=False`` an existing entry is kept
+        (modules register their fallback cooldowns this way)."""
+        if key in self._actions and not replace:
+            return
+        old = self._actions.get(key)
+        for g in old.groups if old else ():
+            self._members[g].remove(key)
+        action = _Action(cooldown, list(groups))
+        if old is not None:
+            action.used_at = old.used_at
+        self._actions[key] = action
+        for g in action.groups:
+            self._members.setdefault(g, []).append(key)
+        self._refresh(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._actions
+
+    def _refresh(self, key: str) -> None:
+        a = self._actions[key]
+        a.ready_at = max(
+            [a.used_at + a.cooldown] + [self._group_ready_at.get(g, -math.inf) for g in a.groups]
+        )
+
+    # ── updates ──────────────────────────────────────────────────────────────
+
+    def use(self, key: str, now: Optional[float] = None) -> None:
+        """Record that *key* was sent.  Unknown keys are ignored."""
+        a = self._actions.get(key)
+        if a is None:
+            return
+        now = time.monotonic() if now is None else now
+        a.used_at = now
+        a.ready_at = max(a.ready_at, now + a.cooldown)
+        for g in a.groups:
+            until = now + self._group_cooldown.get(g, 0.0)
+            if until > self._group_ready_at.get(g, -math.inf):
+                self._group_ready_at[g] = until
+                for member in self._members[g]:
+                    m = self._actions[member]
+                    m.ready_at = max(m.ready_at, until)
+
+    # ── queries ──────────────────────────────────────────────────────────────
+
+    def ready(self, key: str, now: Optional[float] = None) -> bool:
+        """True if *key* can be used now (unknown keys always can)."""
+        a = self._actions.get(key)
+        if a is None:
+            return True
+        return (time.monotonic() if now is None else now) >= a.ready_at
+
+    def remaining(self, key: str, now: Optional[float] = None) -> float:
+        """Seconds until *key* is ready (0.0 when it is)."""
+        a = self._actions.get(key)
+        if a is None:
+            return 0.0
+        return max(0.0, a.ready_at - (time.monotonic() if now is None else now))
+
+    async def next_ready(self, key: str) -> None:
+        """Sleep until *key* is ready, following cooldowns extended meanwhile."""
+        while (wait := self.remaining(key)) > 0.0:
+            await asyncio.sleep(wait)
+
+
+class TimingWheel(Generic[T]):
+    """Hashed timing wheel: items become due at a ``tick`` resolution.
+
+    Usage::
+
+        wheel = TimingWheel(tick=0.05, slots=64)
+        wheel.schedule(item, at=time.monotonic() + 2.0)
+        for item in wheel.advance(time.monotonic()):   # every tick
+            ...
+
+    An item due further away than one revolution (``tick * slots``) waits
+    in its slot for the remaining whole revolutions.  Items are returned no
+    earlier than their due tick and at most one tick late.
+    """
+
+    def __init__(self, tick: float = 0.05, slots: int = 64, start: Optional[float] = None) -> None:
+        self.tick = tick
+        self._slots: List[List[List]] = [[] for _ in range(slots)]   # [rounds, item]
+        self._now_tick = int((time.monotonic() if start is None else start) // tick)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, item: T, at: float) -> None:
+        due = max(self._now_tick + 1, math.ceil(at / self.tick))
+        ahead = due - self._now_tick
+        n = len(self._slots)
+        self._slots[due % n].append([(ahead - 1) // n, item])
+        self._count += 1
+
+    def advance(self, now: float) -> List[T]:
+        """Move the wheel to *now*; returns the items that became due."""
+        target = int(now // self.tick)
+        due: List[T] = []
+        n = len(self._slots)
+        # One slot per elapsed tick, so a stalled caller catches up in order
+        while self._now_tick < target:
+            self._now_tick += 1
+            slot = self._slots[self._now_tick % n]
+            keep = []
+            for entry in slot:
+                if entry[0] <= 0:
+                    due.append(entry[1])
+                else:
+                    entry[0] -= 1
+                    keep.append(entry)
+            self._slots[self._now_tick % n] = keep
+        self._count -= len(due)
+        return due
@@ -0,0 +1,206 @@
+"""Creature detection in the game viewport by health-bar segmentation.
+
+Every creature on screen has a health bar drawn above it: a 1-px black
+frame around a 25 × 2 px fill whose colour goes from green to red with
+health.  Finding those bars locates every visible creature without any
+per-monster images.
+
+Pipeline (viewport ROI only)
+----------------------------
+1. **Row decimation** – only every second row is tested for fill.  The
+   fill is two rows tall, so each bar is still hit exactly once.
+2. **Colour mask** – bright, saturated pixels (green, yellow, red fills)
+   with a black frame pixel directly above or below.  Grass is saturated
+   too, but almost never borders black, so the mask ends up sparse.  The
+   coarse mask also skips every second column.
+3. **Connected components** – a bar fill is one decimated row tall and at
+   most 25 px wide, so its components are horizontal runs; longer runs are
+   discarded.  Runs are labelled straight from the set pixels of the sparse
+   mask.
+4. **Frame check** – at full resolution the candidates must have black
+   pixels directly above and below the fill, left of it, and 25 px to the
+   right of its left edge (the right border).  The fill width is measured
+   at full resolution too.  All vectorised over the candidates.
+
+The fill width gives the HP percentage; the bar position maps to the
+creature's tile offset from the character (``center_x / center_y``,
+``tile_size``).  A fill of a single pixel (HP under 4 %) that starts on a
+skipped column is missed.
+
+CPU budget
+----------
+:meth:`CreatureDetector.detect` times itself.  After a scan that took *d*
+seconds the next scan runs no sooner than ``d / cpu_share`` later; frames in
+between get the previous result.  At the default 5 % share a 5 ms scan runs
+at most every 100 ms.
+"""
+
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from bot.config import ViewportConfig
+
+_FILL_WIDTH = 25
+_FILL_HEIGHT = 2
+# Fill pixels: bright and saturated (every bar colour is)
+_MIN_VALUE = 90
+_MIN_SATURATION = 80
+# Frame pixels: near black
+_FRAME_MAX = 40
+# Pixels between the bottom of the bar frame and the top of the creature's
+# tile.  Positions are rounded to whole tiles, so this only has to be close.
+_BAR_GAP = 6
+
+CREATURE_DTYPE = np.dtype([
+    ("dx", np.int16),           # tiles from the character, + = east
+    ("dy", np.int16),           # + = south
+    ("hp", np.float32),         # 0–100 %
+    ("x", np.int16),            # screen position of the bar centre
+    ("y", np.int16),
+])
+
+
+def _channel_max(bgr: np.ndarray) -> np.ndarray:
+    return np.maximum(np.maximum(bgr[..., 0], bgr[..., 1]), bgr[..., 2])
+
+
+def _channel_min(bgr: np.ndarray) -> np.ndarray:
+    return np.minimum(np.minimum(bgr[..., 0], bgr[..., 1]), bgr[..., 2])
+
+
+def _is_fill(px: np.ndarray) -> np.ndarray:
+    hi, lo = _channel_max(px), _channel_min(px)
+    return (hi >= _MIN_VALUE) & (hi - lo >= _MIN_SATURATION)
+
+
+def _is_frame(px: np.ndarray) -> np.ndarray:
+    return _channel_max(px) <= _FRAME_MAX
+
+
+class CreatureDetector:
+    """Finds creature health bars in the viewport.
+
+    Usage::
+
+        detector = CreatureDetector(cfg.viewport)
+        creatures = detector.detect(frame)        # CREATURE_DTYPE array
+        for c in creatures:
+            print(c["dx"], c["dy"], c["hp"])
+    """
+
+    def __init__(
+        self,
+        viewport: ViewportConfig,
+        cpu_share: float = 0.05,
+        include_self: bool = False,
+    ) -> None:
+        self.viewport = viewport
+        self.cpu_share = cpu_share
+        self.include_self = include_self
+        self.last_ms: float = 0.0
+        self._next_at: float = 0.0
+        self._last = np.empty(0, dtype=CREATURE_DTYPE)
+
+    def detect(self, frame: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """Creatures in *frame*, or the previous result while over budget."""
+        now = time.monotonic() if now is None else now
+        if now < self._next_at:
+            return self._last
+        t0 = time.perf_counter()
+        self._last = self.scan(frame)
+        elapsed = time.perf_counter() - t0
+        self.last_ms = elapsed * 1e3
+        if self.cpu_share > 0.0:
+            self._next_at = now + elapsed / self.cpu_share
+        return self._last
+
+    def scan(self, frame: np.ndarray) -> np.ndarray:
+        """Run the full pipeline on *frame* (no budget)."""
+        vp = self.viewport
+        top, left = max(0, vp.top), max(0, vp.left)
+        roi = frame[top : vp.top + vp.height, left : vp.left + vp.width, :3]
+        h, w = roi.shape[:2]
+        if h < 8 or w < _FILL_WIDTH + 2:
+            return np.empty(0, dtype=CREATURE_DTYPE)
+
+        # Coarse pass on every second row and column: fill pixels on even
+        # rows with a frame pixel directly above or below
+        fill = _is_fill(roi[0::2, 0::2])
+        dark = _is_frame(roi[1::2, 0::2])
+        near_frame = np.zeros_like(fill)
+        near_frame[: len(dark)] |= dark
+        near_frame[1 : len(dark) + 1] |= dark[: len(fill) - 1]
+        ys, xs = _runs(fill & near_frame)
+        ys, xs = ys * 2, xs * 2
+
+        # Full resolution from here on, candidates only.  Room for the frame:
+        inside = (ys >= 2) & (ys < h - 3) & (xs >= 2) & (xs + _FILL_WIDTH < w)
+        ys, xs = ys[inside], xs[inside]
+        # The fill may start one (skipped) column earlier, and the sampled
+        # row is either the first or the second fill row
+        xs = xs - _is_fill(roi[ys, xs - 1])
+        ys = ys - _is_fill(roi[ys - 1, xs])
+        ok = (
+            _is_fill(roi[ys + 1, xs])
+            & _is_frame(roi[ys - 1, xs])
+            & _is_frame(roi[ys + _FILL_HEIGHT, xs])
+            & _is_frame(roi[ys, xs - 1])
+            & _is_frame(roi[ys, xs + _FILL_WIDTH])
+        )
+        ys, xs = ys[ok], xs[ok]
+        row = _is_fill(roi[ys[:, None], xs[:, None] + np.arange(_FILL_WIDTH)])
+        widths = np.where(row.all(axis=1), _FILL_WIDTH, np.argmin(row, axis=1))
+
+        cx = left + xs + _FILL_WIDTH // 2
+        tile_cy = top + ys + _FILL_HEIGHT + 1 + _BAR_GAP + vp.tile_size // 2
+        out = np.empty(len(xs), dtype=CREATURE_DTYPE)
+        out["dx"] = np.rint((cx - vp.center_x) / vp.tile_size)
+        out["dy"] = np.rint((tile_cy - vp.center_y) / vp.tile_size)
+        out["hp"] = widths * (100.0 / _FILL_WIDTH)
+        out["x"] = cx
+        out["y"] = top + ys
+        if not self.include_self:
+            out = out[(out["dx"] != 0) | (out["dy"] != 0)]
+        return out
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(row, col) of the first pixel of every horizontal run in *mask* that
+    is no longer than a bar fill.
+
+    Every component a bar fill can produce is such a run.  The mask is
+    sparse, so labelling runs from its set pixels is far cheaper than a
+    full-image ``cv2.connectedComponentsWithStats``.
+    """
+    w = mask.shape[1]
+    idx = np.flatnonzero(mask)
+    if not len(idx):
+        return idx, idx
+    breaks = np.flatnonzero((np.diff(idx) != 1) | (idx[1:] % w == 0)) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(idx)]))
+    first = idx[starts]
+    keep = ends - starts <= (_FILL_WIDTH + 1) // 2
+    return first[keep] // w, first[keep] % w
+
+
+def vanished(before: np.ndarray, after: np.ndarray) -> Optional[Tuple[int, int]]:
+    """Tile offset of a creature in *before* with none left near it in *after*.
+
+    Creatures are matched within one tile (either may have stepped).  When
+    several vanished, the one with the least HP is the likeliest kill.
+    """
+    if not len(before):
+        return None
+    if len(after):
+        ddx = np.abs(before["dx"][:, None].astype(np.int32) - after["dx"][None, :])
+        ddy = np.abs(before["dy"][:, None].astype(np.int32) - after["dy"][None, :])
+        gone = before[~((ddx <= 1) & (ddy <= 1)).any(axis=1)]
+    else:
+        gone = before
+    if not len(gone):
+        return None
+    c = gone[int(np.argmin(gone["hp"]))]
+    return int(c["dx"]), int(c["dy"])
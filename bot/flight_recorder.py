@@ -0,0 +1,478 @@
+"""Flight recorder: the last seconds before a death, a stuck spot or a crash.
+
+Recording
+---------
+A background thread samples the latest captured frame at up to ``fps``.
+Full frames are not kept: each sample is cut into the regions the bot
+actually reads – ``GameState.ui_regions`` (bars, battle list, follow
+button, condition strip, published by the modules once they located them),
+the minimap, the viewport around the character and any extra ``rois`` –
+and each crop is PNG-encoded (lossless: the bot's colour tests must see
+the same pixels on replay).  A snapshot of the game state goes with it.
+
+Samples older than ``seconds`` are evicted, and so are the oldest ones
+while the encoded crops exceed ``max_memory_mb``.  The per-frame overhead
+is bounded like the creature detector's: a sample that took *d* seconds to
+crop and encode is followed by the next no sooner than ``d / cpu_share``
+later, so recording never uses more than ``cpu_share`` of a core – on a
+slow box it records fewer frames rather than slowing the bot.  The work
+runs off the event loop, and cv2 encodes without the GIL.
+
+Events
+------
+Module decisions (every log record, through a ``bot.log`` sink) and input
+actions (through a wrapper around the input backend) are kept in a ring of
+``events`` entries alongside the frames.
+
+Triggers
+--------
+* ``death`` – the HP bar reads 0 %,
+* ``critical_hp`` – the HP bar reads below ``critical_hp``,
+* ``stuck`` – the modules call :func:`trigger` at their stuck timeouts,
+* ``exception`` – a module task died with an exception (``bot.main``),
+* ``manual`` – asked for over the control socket (``botctl.py dump``).
+
+The dump is written ``post_seconds`` after the trigger, so the outcome is
+in it, and a reason that already dumped waits ``trigger_cooldown``.
+
+Dump format
+-----------
+::
+
+    flights/<YYYYmmdd-HHMMSS>_<reason>/
+        flight.json           reason, detail, trigger time, screen size and
+                              per frame: t, state, crops {name: [x, y, w, h]}
+        events.jsonl          {"t", "kind": log | input | trigger, …} per line
+        frames/<i>_<name>.png one crop
+
+:class:`FlightReplaySource` pastes the crops back into full-size frames and
+plays them to a ``ScreenCapture`` in real time, so the dump runs through
+the real modules offline (``replay_flight.py``).
+"""
+
+import bisect
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from bot.config import FlightRecorderConfig, MinimapConfig, ViewportConfig
+from bot.inputs import InputBackend
+from bot.log import add_sink, get_logger, level_name, remove_sink
+from bot.screen import FrameSource, ScreenCapture
+from bot.state import GameState
+
+log = get_logger("Flight")
+
+Rect = Tuple[int, int, int, int]
+
+_PNG_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+# Seconds between HP / pending-dump checks (independent of the frame rate)
+_POLL = 0.05
+# Weight of the newest sample in the reported running mean of the cost
+_COST_ALPHA = 0.2
+_FLIGHT_FILE = "flight.json"
+_EVENTS_FILE = "events.jsonl"
+
+_active: Optional["FlightRecorder"] = None
+
+
+def trigger(reason: str, detail: str = "") -> None:
+    """Dump the active flight recorder's buffer (no-op without one)."""
+    recorder = _active
+    if recorder is not None:
+        recorder.trigger(reason, detail)
+
+
+class _Frame:
+    __slots__ = ("t", "crops", "state", "nbytes")
+
+    def __init__(self, t: float, crops: Dict[str, Tuple[Rect, bytes]], state: Dict[str, Any]):
+        self.t = t
+        self.crops = crops
+        self.state = state
+        self.nbytes = sum(len(data) for _, data in crops.values())
+
+
+class _InputTap(InputBackend):
+    """Forwards input to *inner* and records it as an event."""
+
+    def __init__(self, inner: InputBackend, recorder: "FlightRecorder") -> None:
+        self.inner = inner
+        self._recorder = recorder
+
+    def press(self, key: str) -> None:
+        self._recorder.event("input", action="press", key=key)
+        self.inner.press(key)
+
+    def click(self, x: int, y: int, button: str = "left") -> None:
+        self._recorder.event("input", action="click", x=int(x), y=int(y), button=button)
+        self.inner.click(x, y, button)
+
+    def key_down(self, key: str) -> None:
+        self._recorder.event("input", action="key_down", key=key)
+        self.inner.key_down(key)
+
+    def key_up(self, key: str) -> None:
+        self._recorder.event("input", action="key_up", key=key)
+        self.inner.key_up(key)
+
+
+class _LogTap:
+    """``bot.log`` sink turning log records into events."""
+
+    def __init__(self, recorder: "FlightRecorder") -> None:
+        self._recorder = recorder
+
+    def write(self, rec: Tuple) -> None:
+        t, level, name, msg, fields = rec
+        ev = {"t": t, "kind": "log", "level": level_name(level), "logger": name, "msg": msg}
+        if fields:
+            ev["fields"] = fields
+        self._recorder.events.append(ev)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FlightRecorder:
+    """Keeps the last seconds of ROI crops and events; dumps them on a trigger.
+
+    Usage::
+
+        recorder = FlightRecorder(cfg.flight_recorder, screen, state,
+                                  cfg.viewport, cfg.minimap)
+        inputs.set_backend(recorder.wrap_input(inputs.backend()))
+        recorder.start()
+        ...
+        flight_recorder.trigger("stuck", "no progress for 3 s")
+        ...
+        recorder.stop()          # writes a pending dump
+    """
+
+    def __init__(
+        self,
+        config: FlightRecorderConfig,
+        screen: ScreenCapture,
+        state: GameState,
+        viewport: Optional[ViewportConfig] = None,
+        minimap: Optional[MinimapConfig] = None,
+    ) -> None:
+        self.config = config
+        self.screen = screen
+        self.state = state
+        self._static: Dict[str, Rect] = {}
+        if minimap is not None:
+            self._static["minimap"] = (minimap.x, minimap.y, minimap.width, minimap.height)
+        rx, ry = config.viewport_tiles
+        if viewport is not None and (rx or ry):
+            ts = viewport.tile_size
+            self._static["viewport"] = (
+                viewport.center_x - ts * (2 * rx + 1) // 2,
+                viewport.center_y - ts * (2 * ry + 1) // 2,
+                ts * (2 * rx + 1),
+                ts * (2 * ry + 1),
+            )
+        for name, (x, y, w, h) in config.rois.items():
+            self._static[name] = (x, y, w, h)
+
+        self.frames: Deque[_Frame] = deque()
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=config.events)
+        self.nbytes = 0
+        self.cost_ms = 0.0                  # running mean crop + encode time
+        self.recorded = 0
+        self.dumps: List[str] = []
+        self._min_interval = 1.0 / max(config.fps, 1e-3)
+        self.interval = self._min_interval   # current time between samples
+        self._max_bytes = int(config.max_memory_mb * 1024 * 1024)
+        self._last_frame: Optional[np.ndarray] = None
+        self._screen_size: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[str, str, float]] = None   # reason, detail, t
+        self._dumped_at: Dict[str, float] = {}
+        self._hp_low = False
+        self._dead = False
+        self._log_tap = _LogTap(self)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        global _active
+        _active = self
+        add_sink(self._log_tap)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="FlightRecorder")
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop recording; a pending dump is written first."""
+        global _active
+        if _active is self:
+            _active = None
+        remove_sink(self._log_tap)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10.0)
+
+    def wrap_input(self, backend: InputBackend) -> InputBackend:
+        """*backend*, with every action also recorded as an event."""
+        return _InputTap(backend, self)
+
+    # ── events and triggers ──────────────────────────────────────────────────
+
+    def event(self, kind: str, **fields: Any) -> None:
+        self.events.append({"t": time.time(), "kind": kind, **fields})
+
+    def trigger(self, reason: str, detail: str = "") -> bool:
+        """Dump the buffer ``post_seconds`` from now, unless *reason* dumped
+        within ``trigger_cooldown`` or another dump is already pending.
+        True if a dump was scheduled."""
+        now = time.time()
+        self.event("trigger", reason=reason, detail=detail)
+        with self._lock:
+            if self._pending is not None:
+                return False
+            if now - self._dumped_at.get(reason, -1e12) < self.config.trigger_cooldown:
+                return False
+            self._pending = (reason, detail, now)
+        what = f"{reason} ({detail})" if detail else reason
+        log.warning(f"{what} – dumping in {self.config.post_seconds:g}s")
+        return True
+
+    def _check_hp(self) -> None:
+        if "health" not in self.state.ui_regions:
+            return                          # bar not located yet: 100 % is a default
+        hp = self.state.hp_percent
+        if hp <= 0.0:
+            if not self._dead:
+                self._dead = True
+                self.trigger("death", "HP bar reads 0%")
+        elif hp < self.config.critical_hp:
+            self._dead = False
+            if not self._hp_low:
+                self._hp_low = True
+                self.trigger("critical_hp", f"HP {hp:.0f}%")
+        else:
+            self._dead = self._hp_low = False
+
+    # ── recording ────────────────────────────────────────────────────────────
+
+    def _snapshot(self) -> Dict[str, Any]:
+        s = self.state
+        pos = s.position
+        return {
+            "hp": round(s.hp_percent, 1),
+            "mana": round(s.mana_percent, 1),
+            "position": [pos.x, pos.y, pos.z],
+            "enemies": int(len(s.battle_entries)),
+            "attacking": s.currently_attacking,
+            "looting": s.looting_active,
+            "conditions": int(s.conditions),
+            "waypoint": s.waypoint_index,
+        }
+
+    def _crop(self, frame: np.ndarray, rect: Rect) -> Optional[Tuple[Rect, bytes]]:
+        x, y, w, h = rect
+        fh, fw = frame.shape[:2]
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(fw, x + w), min(fh, y + h)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        ok, buf = cv2.imencode(".png", np.ascontiguousarray(frame[y0:y1, x0:x1, :3]), _PNG_PARAMS)
+        return ((x0, y0, x1 - x0, y1 - y0), buf.tobytes()) if ok else None
+
+    def record(self, frame: np.ndarray) -> None:
+        """Add one sample of *frame* to the buffer and evict old ones."""
+        t0 = time.perf_counter()
+        self._screen_size = (frame.shape[1], frame.shape[0])
+        crops = {}
+        for name, rect in {**self._static, **self.state.ui_regions}.items():
+            crop = self._crop(frame, rect)
+            if crop is not None:
+                crops[name] = crop
+        sample = _Frame(time.time(), crops, self._snapshot())
+        self.frames.append(sample)
+        self.nbytes += sample.nbytes
+        self.recorded += 1
+        horizon = sample.t - self.config.seconds
+        while len(self.frames) > 1 and (
+            self.frames[0].t < horizon or self.nbytes > self._max_bytes
+        ):
+            self.nbytes -= self.frames.popleft().nbytes
+
+        elapsed = time.perf_counter() - t0
+        self.cost_ms += _COST_ALPHA * (elapsed * 1e3 - self.cost_ms)
+        share = self.config.cpu_share
+        self.interval = max(self._min_interval, elapsed / share if share > 0 else 0.0)
+
+    def _run(self) -> None:
+        next_at = 0.0
+        while not self._stop.wait(_POLL):
+            now = time.perf_counter()
+            if now >= next_at:
+                frame = self.screen.get_frame()
+                if frame is not None and frame is not self._last_frame:
+                    self._last_frame = frame
+                    self.record(frame)
+                    next_at = now + self.interval
+            self._check_hp()
+            pending = self._pending
+            if pending is not None and time.time() - pending[2] >= self.config.post_seconds:
+                self._dump_pending()
+        if self._pending is not None:
+            self._dump_pending()
+
+    # ── dumping ──────────────────────────────────────────────────────────────
+
+    def _dump_pending(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        reason, detail, t = pending
+        self._dumped_at[reason] = time.time()
+        try:
+            path = self.dump(reason, detail, t)
+        except OSError as e:
+            log.error(f"dump failed: {e}")
+            return
+        self.dumps.append(path)
+        log.info(f"{len(self.frames)} frames, {len(self.events)} events → {path}")
+
+    def dump(self, reason: str, detail: str = "", t: Optional[float] = None) -> str:
+        """Write the buffer to a new directory under ``output_dir``."""
+        t = time.time() if t is None else t
+        frames = list(self.frames)
+        events = list(self.events)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(t))
+        path = os.path.join(self.config.output_dir, f"{stamp}_{reason}")
+        tmp = f"{path}.tmp"
+        os.makedirs(os.path.join(tmp, "frames"), exist_ok=True)
+
+        meta_frames = []
+        for i, f in enumerate(frames):
+            crops = {}
+            for name, (rect, data) in f.crops.items():
+                with open(os.path.join(tmp, "frames", f"{i:05d}_{name}.png"), "wb") as out:
+                    out.write(data)
+                crops[name] = list(rect)
+            meta_frames.append({"t": round(f.t, 4), "state": f.state, "crops": crops})
+        meta = {
+            "reason": reason,
+            "detail": detail,
+            "t": round(t, 4),
+            "screen": list(self._screen_size or (0, 0)),
+            "frames": meta_frames,
+        }
+        with open(os.path.join(tmp, _FLIGHT_FILE), "w") as out:
+            json.dump(meta, out)
+        with open(os.path.join(tmp, _EVENTS_FILE), "w") as out:
+            for ev in events:
+                out.write(json.dumps(ev, default=str) + "\n")
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+        self._prune()
+        return path
+
+    def _prune(self) -> None:
+        root = self.config.output_dir
+        dumps = sorted(
+            d for d in os.listdir(root)
+            if os.path.isfile(os.path.join(root, d, _FLIGHT_FILE))
+        )
+        for d in dumps[: max(0, len(dumps) - self.config.keep)]:
+            shutil.rmtree(os.path.join(root, d), ignore_errors=True)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "frames": len(self.frames),
+            "recorded": self.recorded,
+            "memory_mb": round(self.nbytes / (1024 * 1024), 2),
+            "cost_ms": round(self.cost_ms, 2),
+            "fps": round(1.0 / self.interval, 2),
+            "dumps": len(self.dumps),
+        }
+
+
+# ── replay ───────────────────────────────────────────────────────────────────
+
+def load_flight(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """The ``flight.json`` metadata and the events of dump *path*."""
+    with open(os.path.join(path, _FLIGHT_FILE)) as f:
+        meta = json.load(f)
+    events = []
+    with open(os.path.join(path, _EVENTS_FILE)) as f:
+        for line in f:
+            if line.strip():
+                events.append(json.loads(line))
+    return meta, events
+
+
+class FlightReplaySource(FrameSource):
+    """Plays a dump back as full-size frames, in real time × *speed*.
+
+    Every frame starts from the previous one with its crops pasted over it,
+    so regions missing from a sample keep their last content; everything
+    never recorded is black.
+
+    Usage::
+
+        source = FlightReplaySource("flights/20240101-120000_death")
+        screen = ScreenCapture(*source.size, fps=20, source=source)
+    """
+
+    def __init__(self, path: str, speed: float = 1.0) -> None:
+        self.path = path
+        self.speed = speed
+        self.meta, self.events = load_flight(path)
+        self.frames = self.meta["frames"]
+        self.size: Tuple[int, int] = tuple(self.meta["screen"])   # type: ignore[assignment]
+        self._times = [f["t"] for f in self.frames]
+        self._index = -1
+        self._frame = np.zeros((self.size[1], self.size[0], 4), dtype=np.uint8)
+        self._started = 0.0
+        self.finished = not self.frames
+
+    @property
+    def start_time(self) -> float:
+        return self._times[0] if self._times else self.meta["t"]
+
+    def recorded_time(self, monotonic: float) -> float:
+        """The recording's ``time.time()`` shown at replay time *monotonic*."""
+        return self.start_time + (monotonic - self._started) * self.speed
+
+    def frame(self, i: int) -> np.ndarray:
+        """Frame *i*, built on the current frame (call in order)."""
+        frame = self._frame.copy()
+        for name, (x, y, w, h) in self.frames[i]["crops"].items():
+            crop = cv2.imread(os.path.join(self.path, "frames", f"{i:05d}_{name}.png"),
+                              cv2.IMREAD_COLOR)
+            if crop is not None:
+                frame[y : y + h, x : x + w, :3] = crop[:h, :w]
+                frame[y : y + h, x : x + w, 3] = 255
+        self._frame = frame
+        return frame
+
+    def open(self) -> None:
+        self._started = time.monotonic()
+
+    def grab(self) -> np.ndarray:
+        t = self.recorded_time(time.monotonic())
+        i = max(0, bisect.bisect_right(self._times, t) - 1)
+        while self._index < i:
+            self._index += 1
+            self.frame(self._index)
+        if self._times and t >= self._times[-1]:
+            self.finished = True
+        return self._frame
@@ -0,0 +1,153 @@
+"""HP trend estimation and predictive, multi-tier heal decisions.
+
+Healing at "HP below threshold" reacts one or two frames after burst
+damage has already landed, and the heal itself takes the input latency to
+arrive.  :class:`HpTrend` fits the recent HP samples instead and
+:class:`HealPolicy` heals on the HP *projected* at ``now + latency``.
+
+Trend
+-----
+A weighted least-squares line through the samples of the last ``window``
+seconds (kept in a :class:`bot.ring_buffer.RingBuffer`), with weights
+decaying exponentially into the past (time constant ``window / 2``).  The
+fit gives a smoothed HP at *now* and a rate of change in %/s; the
+projection is ``smoothed + rate * latency``.  The decision value is the
+lower of the projection and the latest reading, so recovering HP never
+delays a heal the plain threshold would have cast.
+
+Rules
+-----
+Rules are tried from the lowest threshold up: the strongest heal whose
+threshold lies above the decision value and whose key is ready in the
+:class:`bot.cooldowns.CooldownManager` fires.  When the strong heal is
+cooling down, a weaker one still fires.  A rule's own ``cooldown`` is only
+the fallback for keys the cooldown table does not list.
+
+The same policy runs live in ``HealthModule`` and offline in
+``evaluate_healing.py`` against recorded HP traces.
+"""
+
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bot.config import HealingConfig, HealRule
+from bot.cooldowns import CooldownManager
+from bot.ring_buffer import RingBuffer
+
+# Fewest samples in the window before a rate is trusted
+_MIN_SAMPLES = 3
+# Cooldown of the single tier built from heal_key / hp_threshold
+_DEFAULT_COOLDOWN = 0.8
+
+
+def heal_rules(config: HealingConfig) -> List[HealRule]:
+    """The configured tiers, or the single legacy heal_key / hp_threshold tier."""
+    if config.heal_rules:
+        return list(config.heal_rules)
+    return [HealRule(config.heal_key, config.hp_threshold, _DEFAULT_COOLDOWN)]
+
+
+class HpTrend:
+    """Smoothed HP and rate of change from recent ``(t, hp)`` samples.
+
+    Usage::
+
+        trend = HpTrend(window=0.5)
+        trend.add(hp)                         # every tick
+        hp_soon = trend.project(0.15)         # HP expected in 150 ms
+    """
+
+    def __init__(self, window: float = 0.5, capacity: int = 256) -> None:
+        self.window = window
+        self._samples = RingBuffer(capacity, columns=2)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, hp: float, t: Optional[float] = None) -> None:
+        self._samples.append(time.monotonic() if t is None else t, hp)
+
+    def latest(self) -> Optional[float]:
+        row = self._samples.last()
+        return None if row is None else float(row[1])
+
+    def fit(self, now: Optional[float] = None) -> Tuple[float, float]:
+        """``(smoothed hp at now, rate in %/s)``; rate 0 on too few samples."""
+        now = time.monotonic() if now is None else now
+        rows = self._samples.since(now - self.window)
+        if not len(rows):
+            last = self.latest()
+            return (100.0 if last is None else last), 0.0
+        if len(rows) < _MIN_SAMPLES:
+            return float(rows[-1, 1]), 0.0
+        t = rows[:, 0] - now
+        y = rows[:, 1]
+        w = np.exp(t / (self.window / 2.0))
+        sw, swt, swy = w.sum(), (w * t).sum(), (w * y).sum()
+        swtt, swty = (w * t * t).sum(), (w * t * y).sum()
+        den = sw * swtt - swt * swt
+        if den <= 1e-12:
+            return float(y[-1]), 0.0
+        rate = (sw * swty - swt * swy) / den
+        return float((swy - rate * swt) / sw), float(rate)
+
+    def project(self, horizon: float, now: Optional[float] = None) -> float:
+        """HP expected *horizon* seconds from now, clamped to 0–100."""
+        smoothed, rate = self.fit(now)
+        return min(100.0, max(0.0, smoothed + rate * horizon))
+
+
+class HealPolicy:
+    """Chooses which heal, if any, to cast for the current HP.
+
+    Usage::
+
+        policy = HealPolicy(rules, latency=0.15)
+        rule = policy.update(hp)              # every tick
+        if rule is not None:
+            inputs.press(rule.key)
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[HealRule],
+        latency: float = 0.15,
+        window: float = 0.5,
+        predictive: bool = True,
+        cooldowns: Optional[CooldownManager] = None,
+    ) -> None:
+        self.rules: List[HealRule] = sorted(rules, key=lambda r: r.below)
+        self.latency = latency
+        self.predictive = predictive
+        self.trend = HpTrend(window)
+        self.cooldowns = cooldowns or CooldownManager()
+        for rule in self.rules:
+            self.cooldowns.register(rule.key, rule.cooldown, replace=False)
+        # Values behind the last decision, for logging
+        self.projected: float = 100.0
+        self.rate: float = 0.0
+
+    def update(self, hp: float, now: Optional[float] = None) -> Optional[HealRule]:
+        """Feed one HP reading; returns the rule to fire now, if any.
+
+        The returned rule is assumed cast: its use is recorded now.
+        """
+        now = time.monotonic() if now is None else now
+        self.trend.add(hp, now)
+        value = hp
+        if self.predictive:
+            smoothed, self.rate = self.trend.fit(now)
+            projection = min(100.0, max(0.0, smoothed + self.rate * self.latency))
+            value = min(hp, projection)
+        self.projected = value
+
+        for rule in self.rules:
+            if value >= rule.below:
+                continue
+            if not self.cooldowns.ready(rule.key, now):
+                continue
+            self.cooldowns.use(rule.key, now)
+            return rule
+        return None
@@ -0,0 +1,91 @@
+"""Keyboard and mouse output.
+
+Every key press and click the modules send goes through the functions here
+instead of calling pyautogui directly, so the backend can be swapped: the
+default drives the real client through pyautogui, while ``bot.sim`` installs
+a backend that records the events and applies them to a simulated game.
+
+pyautogui is imported only when the default backend is first used, so the
+bot's modules can run on a headless box as long as another backend is set.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from bot.profiler import timed
+
+
+class InputBackend(ABC):
+    """Where key presses and clicks go."""
+
+    @abstractmethod
+    def press(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def click(self, x: int, y: int, button: str = "left") -> None:
+        ...
+
+    @abstractmethod
+    def key_down(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def key_up(self, key: str) -> None:
+        ...
+
+
+class PyAutoGuiInput(InputBackend):
+    """Real keyboard and mouse input via pyautogui."""
+
+    def __init__(self) -> None:
+        import pyautogui
+        self._gui = pyautogui
+
+    def press(self, key: str) -> None:
+        self._gui.press(key)
+
+    def click(self, x: int, y: int, button: str = "left") -> None:
+        self._gui.click(x, y, button=button)
+
+    def key_down(self, key: str) -> None:
+        self._gui.keyDown(key)
+
+    def key_up(self, key: str) -> None:
+        self._gui.keyUp(key)
+
+
+_backend: Optional[InputBackend] = None
+
+
+def set_backend(backend: Optional[InputBackend]) -> None:
+    """Send all further input to *backend* (None = back to pyautogui)."""
+    global _backend
+    _backend = backend
+
+
+def backend() -> InputBackend:
+    global _backend
+    if _backend is None:
+        _backend = PyAutoGuiInput()
+    return _backend
+
+
+@timed("input")
+def press(key: str) -> None:
+    backend().press(key)
+
+
+@timed("input")
+def click(x: int, y: int, button: str = "left") -> None:
+    backend().click(x, y, button)
+
+
+@timed("input")
+def key_down(key: str) -> None:
+    backend().key_down(key)
+
+
+@timed("input")
+def key_up(key: str) -> None:
+    backend().key_up(key)
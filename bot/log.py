@@ -0,0 +1,473 @@
+"""Asynchronous structured logging.
+
+Modules used to ``print()`` from their loops; a slow terminal then stalled
+the whole event loop.  A log call now only checks the logger's level and
+rate limit and appends a record tuple to an in-memory deque – no lock, no
+I/O – and a background thread drains the deque into the sinks.
+
+Hot path
+--------
+``log.info(msg, **fields)`` costs a level comparison, a ``time.time()``, the
+logger's rate limit and one ``deque.append`` (atomic under the GIL, so
+producers on the loop and the capture thread never lock):
+
+* **rate limit** – a token bucket of ``rate_limit`` messages/s (``burst``
+  deep) per logger, applied before queueing so a burst the limit discards
+  never takes queue space.  Suppressed messages are counted and reported
+  once tokens return.  A message identical to the logger's previous one
+  spends no token (the writer folds it, below).
+* **bounded queue** – info and debug records beyond ``queue_size`` are
+  dropped and counted rather than growing memory.  Warnings and errors are
+  never limited or dropped: they go to a queue of their own, taking the
+  place of the oldest info record when the queue is full.  Past three
+  quarters full the writer is woken early.
+
+``benchmarks/bench_log.py`` measures the per-call cost.
+
+Writer
+------
+Every ``_FLUSH_INTERVAL`` seconds (or on :func:`flush`) the writer takes all
+queued records, in time order, and **deduplicates** them per logger – a
+message identical to the previous one within ``dedup_window`` seconds is
+folded into a "repeated N×" line.  It writes them to the console as
+``[Name] message`` and, with ``file`` set, as JSON lines (``t``, ``level``,
+``logger``, ``msg`` plus the keyword fields), rotating the file at
+``max_bytes`` with ``backups`` old copies.
+
+Usage::
+
+    from bot.log import get_logger
+    log = get_logger("Combat")
+    log.info("Enemy detected – attacking")
+    log.debug("click", x=120, y=340)          # fields go to the JSON sink
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import IO, Any, Deque, Dict, List, Optional, Tuple
+
+from bot.config import LoggingConfig
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+_LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+_NAMES = {v: k for k, v in _LEVELS.items()}
+# Console prefixes, so warnings and errors read as they did before
+_PREFIX = {WARNING: "WARNING: ", ERROR: "ERROR: "}
+
+_FLUSH_INTERVAL = 0.05
+# Fraction of queue_size at which the writer is woken before its interval
+_HIGH_WATER = 0.75
+
+# (t, level, logger name, message, fields)
+Record = Tuple[float, int, str, str, Optional[Dict[str, Any]]]
+
+
+def _level(name: str) -> int:
+    return _LEVELS.get(str(name).lower(), INFO)
+
+
+def level_name(level: int) -> str:
+    return _NAMES.get(level, str(level))
+
+
+class Logger:
+    """A named logger; get one with :func:`get_logger`."""
+
+    __slots__ = ("name", "level")
+
+    def __init__(self, name: str, level: int = INFO) -> None:
+        self.name = name
+        self.level = level
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    def log(self, level: int, msg: str, **fields: Any) -> None:
+        if level >= self.level:
+            _hub.put((time.time(), level, self.name, msg, fields or None))
+
+    def debug(self, msg: str, **fields: Any) -> None:
+        if DEBUG >= self.level:
+            _hub.put((time.time(), DEBUG, self.name, msg, fields or None))
+
+    def info(self, msg: str, **fields: Any) -> None:
+        if INFO >= self.level:
+            _hub.put((time.time(), INFO, self.name, msg, fields or None))
+
+    def warning(self, msg: str, **fields: Any) -> None:
+        if WARNING >= self.level:
+            _hub.put((time.time(), WARNING, self.name, msg, fields or None))
+
+    def error(self, msg: str, **fields: Any) -> None:
+        if ERROR >= self.level:
+            _hub.put((time.time(), ERROR, self.name, msg, fields or None))
+
+
+# ── sinks ────────────────────────────────────────────────────────────────────
+
+class _ConsoleSink:
+    def write(self, rec: Record) -> None:
+        _, level, name, msg, fields = rec
+        line = f"[{name}] {_PREFIX.get(level, '')}{msg}"
+        if fields:
+            line += "  " + " ".join(f"{k}={v}" for k, v in fields.items())
+        # Looked up per write so redirect_stdout applies
+        sys.stdout.write(line + "\n")
+
+    def flush(self) -> None:
+        sys.stdout.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+
+class _JsonLinesSink:
+    """JSON-lines file, rotated to ``path.1 … path.<backups>`` at *max_bytes*."""
+
+    def __init__(self, path: str, max_bytes: int, backups: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Open for the sink's lifetime; close() closes it
+        self._f: IO[str] = open(path, "a", encoding="utf-8")  # noqa: SIM115
+        self._size = self._f.tell()
+
+    def _rotate(self) -> None:
+        self._f.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        self._f = open(self.path, "w", encoding="utf-8")  # noqa: SIM115
+        self._size = 0
+
+    def write(self, rec: Record) -> None:
+        t, level, name, msg, fields = rec
+        obj = {"t": round(t, 3), "level": level_name(level), "logger": name, "msg": msg}
+        if fields:
+            obj.update(fields)
+        line = json.dumps(obj, ensure_ascii=False, default=str) + "\n"
+        if self._size and self._size + len(line) > self.max_bytes:
+            self._rotate()
+        self._f.write(line)
+        self._size += len(line)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+# ── queue + writer ───────────────────────────────────────────────────────────
+
+def _suppressed(n: int) -> str:
+    return f"{n} messages suppressed (rate limit)"
+
+
+class _Bucket:
+    """Rate-limit state of one logger (producers) plus its deduplication
+    state (writer)."""
+
+    __slots__ = ("tokens", "at", "limited", "seen", "seen_at",
+                 "last", "last_at", "repeats")
+
+    def __init__(self, burst: float, t: float) -> None:
+        self.tokens = float(burst)
+        self.at = t
+        self.limited = 0
+        self.seen: Optional[Tuple[int, str]] = None     # last message put
+        self.seen_at = 0.0
+        self.last: Optional[Tuple[int, str]] = None     # last message written
+        self.last_at = 0.0
+        self.repeats = 0
+
+
+class _Hub:
+    def __init__(self) -> None:
+        self.config = LoggingConfig()
+        self._queue: Deque[Record] = deque()      # info and debug
+        self._urgent: Deque[Record] = deque()     # warnings and errors
+        self._max = self.config.queue_size
+        self._high = int(self._max * _HIGH_WATER)
+        self._loggers: Dict[str, Logger] = {}
+        self._sinks: List[Any] = [_ConsoleSink()]
+        # Sinks added with add_sink(); kept across configure()
+        self._extra: List[Any] = []
+        self._buckets: Dict[str, _Bucket] = {}
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+        self._sink_lock = threading.Lock()
+        # Counters
+        self.queued = 0
+        self.dropped = 0
+        self.written = 0
+        self.deduplicated = 0
+        self.rate_limited = 0
+        self.max_depth = 0
+
+    # producer side ----------------------------------------------------------
+
+    def put(self, rec: Record) -> None:
+        q = self._queue
+        if rec[1] >= WARNING:
+            if len(q) + len(self._urgent) >= self._max:
+                try:
+                    q.popleft()
+                    self.dropped += 1
+                except IndexError:
+                    pass        # all warnings: kept past the bound
+            self._urgent.append(rec)
+            self._wake.set()
+        else:
+            if self.config.rate_limit > 0 and not self._admit(rec):
+                return
+            if len(q) >= self._max:
+                self.dropped += 1
+                return
+            q.append(rec)
+            if len(q) >= self._high and not self._wake.is_set():
+                self._wake.set()
+        if self._thread is None:
+            self.start()
+
+    def _admit(self, rec: Record) -> bool:
+        """Spend a token of the logger's bucket on *rec*; False when none is
+        left.  Unlocked: concurrent producers may miscount a message."""
+        t, level, name, msg, _ = rec
+        cfg = self.config
+        b = self._buckets.get(name)
+        if b is None:
+            b = self._buckets.setdefault(name, _Bucket(cfg.burst, t))
+        key = (level, msg)
+        if b.seen == key and t - b.seen_at <= cfg.dedup_window:
+            b.seen_at = t
+            return True         # folded by the writer, costs no token
+        b.seen, b.seen_at = key, t
+        b.tokens = min(float(cfg.burst), b.tokens + (t - b.at) * cfg.rate_limit)
+        b.at = t
+        if b.tokens < 1.0:
+            b.limited += 1
+            self.rate_limited += 1
+            return False
+        b.tokens -= 1.0
+        if b.limited:
+            self._queue.append((t, WARNING, name, _suppressed(b.limited), None))
+            b.limited = 0
+        return True
+
+    def logger(self, name: str) -> Logger:
+        lg = self._loggers.get(name)
+        if lg is None:
+            lg = self._loggers[name] = Logger(name, self._level_for(name))
+        return lg
+
+    def _level_for(self, name: str) -> int:
+        levels = self.config.levels
+        return _level(levels[name]) if name in levels else _level(self.config.level)
+
+    # configuration ----------------------------------------------------------
+
+    def configure(self, config: LoggingConfig) -> None:
+        self.flush()
+        with self._sink_lock:
+            for sink in self._sinks:
+                if sink not in self._extra:
+                    sink.close()
+            self.config = config
+            self._max = config.queue_size
+            self._high = int(self._max * _HIGH_WATER)
+            self._sinks = []
+            if config.console:
+                self._sinks.append(_ConsoleSink())
+            if config.file:
+                self._sinks.append(_JsonLinesSink(config.file, config.max_bytes, config.backups))
+            self._sinks.extend(self._extra)
+            self._buckets.clear()
+        for name, lg in self._loggers.items():
+            lg.level = self._level_for(name)
+
+    def add_sink(self, sink: Any) -> None:
+        with self._sink_lock:
+            self._extra.append(sink)
+            self._sinks.append(sink)
+
+    def remove_sink(self, sink: Any) -> None:
+        with self._sink_lock:
+            for sinks in (self._extra, self._sinks):
+                if sink in sinks:
+                    sinks.remove(sink)
+
+    def start(self) -> None:
+        with self._sink_lock:
+            if self._thread is not None:
+                return
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, daemon=True, name="LogWriter")
+            self._thread.start()
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Block until everything queued so far is written."""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        while ((self._queue or self._urgent or not self._idle.is_set())
+               and time.monotonic() < deadline):
+            self._idle.clear()
+            self._wake.set()
+            self._idle.wait(0.05)
+
+    def shutdown(self) -> None:
+        self.flush()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop = True
+            self._wake.set()
+            thread.join(timeout=2.0)
+        with self._sink_lock:
+            for sink in self._sinks:
+                sink.flush()
+
+    def after_fork(self) -> None:
+        """In a forked child: only the forking thread survives, so start
+        over with no writer and nothing queued."""
+        self._queue.clear()
+        self._urgent.clear()
+        self._thread = None
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._sink_lock = threading.Lock()
+
+    # writer side ------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(_FLUSH_INTERVAL)
+            self._wake.clear()
+            self._drain()
+            self._idle.set()
+            if self._stop:
+                self._drain(final=True)
+                return
+
+    def _drain(self, final: bool = False) -> None:
+        q, urgent = self._queue, self._urgent
+        self.max_depth = max(self.max_depth, len(q) + len(urgent))
+        with self._sink_lock:
+            records: List[Record] = []
+            for queue in (q, urgent):
+                while queue:
+                    records.append(queue.popleft())
+            # Both queues are in time order; merge them
+            records.sort(key=lambda r: r[0])
+            self.queued += len(records)
+            out: List[Record] = []
+            for rec in records:
+                self._filter(rec, out)
+            self._expire(time.time(), out, final)
+            for rec in out:
+                for sink in self._sinks:
+                    sink.write(rec)
+            if out:
+                self.written += len(out)
+                for sink in self._sinks:
+                    sink.flush()
+
+    def _filter(self, rec: Record, out: List[Record]) -> None:
+        t, level, name, msg, _ = rec
+        b = self._buckets.get(name)
+        if b is None:
+            b = self._buckets.setdefault(name, _Bucket(self.config.burst, t))
+
+        key = (level, msg)
+        if b.last == key and t - b.last_at <= self.config.dedup_window:
+            b.repeats += 1
+            self.deduplicated += 1
+            return
+        self._close_repeats(b, name, t, out)
+        b.last, b.last_at = key, t
+        out.append(rec)
+
+    def _close_repeats(self, b: _Bucket, name: str, t: float, out: List[Record]) -> None:
+        if b.repeats and b.last is not None:
+            level, msg = b.last
+            out.append((t, level, name, f"{msg}  (repeated {b.repeats}×)", None))
+            b.repeats = 0
+
+    def _expire(self, now: float, out: List[Record], final: bool = False) -> None:
+        """Report folded repeats whose window has passed and suppressed
+        counts of loggers that have gone quiet (everything when *final*)."""
+        cfg = self.config
+        for name, b in self._buckets.items():
+            if b.repeats and (final or now - b.last_at > cfg.dedup_window):
+                self._close_repeats(b, name, now, out)
+                b.last = None
+            # A logger gone quiet has no producer touching its bucket
+            if b.limited and (final or now - b.at > cfg.burst / max(cfg.rate_limit, 1e-9)):
+                out.append((now, WARNING, name, _suppressed(b.limited), None))
+                b.limited = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "written": self.written,
+            "deduplicated": self.deduplicated,
+            "rate_limited": self.rate_limited,
+            "max_depth": self.max_depth,
+            "pending": len(self._queue) + len(self._urgent),
+        }
+
+
+_hub = _Hub()
+# Scripts exit without calling shutdown(); don't lose their last lines
+atexit.register(_hub.shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_hub.after_fork)
+
+
+def get_logger(name: str) -> Logger:
+    """The logger *name* (console prefix ``[name]``); levels follow the
+    current configuration, also for loggers created before it."""
+    return _hub.logger(name)
+
+
+def configure(config: LoggingConfig) -> None:
+    """Apply levels, sinks and limits from *config*."""
+    _hub.configure(config)
+
+
+def add_sink(sink: Any) -> None:
+    """Also hand every written record to *sink* (``write(record)``,
+    ``flush()``, ``close()``; called from the writer thread)."""
+    _hub.add_sink(sink)
+
+
+def remove_sink(sink: Any) -> None:
+    _hub.remove_sink(sink)
+
+
+def flush(timeout: float = 2.0) -> None:
+    _hub.flush(timeout)
+
+
+def shutdown() -> None:
+    """Write everything still queued and stop the writer thread."""
+    _hub.shutdown()
+
+
+def stats() -> Dict[str, int]:
+    """Counters: records queued, dropped (queue full), written, folded as
+    repeats, suppressed by the rate limit; the deepest the queue got."""
+    return _hub.stats()
@@ -4,74 +4,228 @@ Usage::
 
     python -m bot.main                      # run with bot_config.yaml
     python -m bot.main --config my.yaml     # custom config file
+    python -m bot.main --profile            # per-module timing, see bot/profiler.py
+    python -m bot.main --startup-report     # launch → heal-ready timing, see bot/startup.py
+
+Modules, the flight recorder and telemetry are imported only when enabled
+in the config, so a bot without navigation never loads the minimap / OCR
+code.
+
+While it runs, ``python botctl.py status`` (see bot/control.py) shows its
+state and module timings, and pauses modules or changes settings.  Edits to
+the config file are applied without a restart (see bot/config_watcher.py).
 """
 
+from bot import startup  # first: the startup clock starts when it is imported
+
 import argparse
 import asyncio
 import signal
 import sys
+from typing import List, Optional, Tuple
 
-from bot.config import load_config
-from bot.modules.combat import CombatModule
-from bot.modules.health import HealthModule
-from bot.modules.loot import LootModule
-from bot.modules.mana import ManaModule
-from bot.modules.navigation import NavigationModule
-from bot.modules.minimap_navigation import MinimapNavigationModule
-from bot.screen import ScreenCapture
+from bot import inputs, log
+from bot.config import BotConfig, load_config
+from bot.cooldowns import CooldownManager
+from bot.modules.base import BaseModule
+from bot.screen import FrameSource, ScreenCapture
 from bot.state import GameState
 
+# Seconds the startup report waits for the health module
+_STARTUP_REPORT_TIMEOUT = 60.0
+
 
-def _parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     p = argparse.ArgumentParser(description="TibiaBot v2")
     p.add_argument("--config", default="bot_config.yaml", help="Path to config file")
-    return p.parse_args()
+    p.add_argument(
+        "--profile", nargs="?", const="profile_stats.json", metavar="STATS_FILE",
+        help="Time every module's work between awaits and the loop lag; print a "
+             "summary periodically and write it as JSON (default profile_stats.json)",
+    )
+    p.add_argument("--profile-interval", type=float, default=30.0,
+                   help="Seconds between profile summaries")
+    p.add_argument("--startup-report", action="store_true",
+                   help="Print import and startup times once the health module can heal")
+    return p.parse_args(argv)
+
+
+def _module_specs(cfg: BotConfig) -> List[Tuple[bool, str, str, tuple]]:
+    """(enabled, module, class, config arguments) of every module."""
+    return [
+        (True, "bot.modules.health", "HealthModule", (cfg.healing,)),
+        (bool(cfg.healing.mana_key), "bot.modules.mana", "ManaModule", (cfg.healing,)),
+        (True, "bot.modules.combat", "CombatModule", (cfg.combat, cfg.viewport)),
+        (cfg.loot.enabled and bool(cfg.loot.whitelist),
+         "bot.modules.loot", "LootModule", (cfg.loot, cfg.viewport)),
+        (bool(cfg.rotation.spells), "bot.modules.rotation", "RotationModule", (cfg.rotation,)),
+        (cfg.conditions.enabled,
+         "bot.modules.conditions", "ConditionsModule", (cfg.conditions,)),
+        (cfg.minimap.enabled, "bot.modules.minimap_navigation", "MinimapNavigationModule",
+         (cfg.minimap, cfg.viewport)),
+        (not cfg.minimap.enabled and cfg.navigation.enabled,
+         "bot.modules.navigation", "NavigationModule",
+         (cfg.navigation, cfg.viewport, cfg.coord_display, cfg.minimap)),
+    ]
+
+
+def _enabled_modules(cfg: BotConfig) -> List[str]:
+    """Classes of the modules *cfg* starts."""
+    return [cls for enabled, _, cls, _ in _module_specs(cfg) if enabled]
+
+
+def _build_modules(cfg: BotConfig, screen: ScreenCapture, state: GameState) -> List[BaseModule]:
+    """Construct the enabled modules, importing each one's code only then."""
+    return [
+        startup.load(module, cls)(screen, state, *config)
+        for enabled, module, cls, config in _module_specs(cfg) if enabled
+    ]
 
 
-async def _run(cfg, stop_event: asyncio.Event) -> None:
+async def run(cfg, stop_event: asyncio.Event, args: argparse.Namespace,
+              source: Optional[FrameSource] = None) -> None:
+    """Run the bot until *stop_event* is set; frames from *source* (default
+    the screen)."""
+    report: Optional[startup.StartupReport] = None
+    if args.startup_report:
+        report = startup.StartupReport()
+        report.start()
+        report.mark("imports + config")
+
     screen = ScreenCapture(
         width=cfg.screen.width,
         height=cfg.screen.height,
         fps=cfg.screen.capture_fps,
+        source=source,
+    )
+    state = GameState(
+        history_capacity=cfg.state.position_history,
+        cooldowns=CooldownManager.from_config(cfg.cooldowns),
     )
-    state = GameState()
-
-    modules = [
-        HealthModule(screen, state, cfg.healing),
-        ManaModule(screen, state, cfg.healing),
-        CombatModule(screen, state, cfg.combat),
-        LootModule(screen, state, cfg.loot, cfg.viewport),
-    ]
-    if cfg.minimap.enabled:
-        modules.append(MinimapNavigationModule(screen, state, cfg.minimap, cfg.viewport))
-    elif cfg.navigation.enabled:
-        modules.append(NavigationModule(screen, state, cfg.navigation, cfg.viewport, cfg.coord_display))
 
+    # Capture starts first: the modules are imported and built, and the
+    # input backend loaded (rather than on the first heal), while the first
+    # frame is grabbed
     screen.start()
     print("Screen capture started – waiting for first frame…")
+    modules = _build_modules(cfg, screen, state)
+    startup.mark("modules built")
+    print(f"Modules: {', '.join(type(m).__name__ for m in modules)}")
+    inputs.backend()
+    startup.mark("input backend")
 
     if not screen.wait_for_frame(timeout=5.0):
         print("ERROR: No frame received in 5 s. Is Tibia running in the foreground?")
         sys.exit(1)
+    startup.mark("first frame")
 
     print("First frame OK. Starting modules…\n")
 
-    tasks = [asyncio.create_task(m.run(), name=type(m).__name__) for m in modules]
+    recorder = None
+    if cfg.flight_recorder.enabled:
+        recorder = startup.load("bot.flight_recorder", "FlightRecorder")(
+            cfg.flight_recorder, screen, state, cfg.viewport, cfg.minimap
+        )
+        inputs.set_backend(recorder.wrap_input(inputs.backend()))
+        recorder.start()
+
+    telemetry = None
+    if cfg.telemetry.enabled:
+        telemetry = startup.load("bot.telemetry", "Telemetry")(cfg.telemetry, state)
+        telemetry.start()
+
+    def _on_task_done(task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+        exc = task.exception()
+        log.get_logger("Main").error(f"{task.get_name()} crashed: {exc!r}")
+        if recorder:
+            recorder.trigger("exception", f"{task.get_name()}: {exc!r}")
+
+    # The control socket reports module timings, so it runs the profiler too
+    # (without its periodic summaries)
+    profiler = None
+    if args.profile or cfg.control.enabled:
+        profiler = startup.load("bot.profiler", "Profiler")()
+        profiler.install()
+    if args.profile:
+        print(f"Profiling – summary every {args.profile_interval:g}s → {args.profile}\n")
+
+    tasks = []
+    for m in modules:
+        name = type(m).__name__
+        coro = profiler.wrap(name, m.run()) if profiler else m.run()
+        tasks.append(asyncio.create_task(coro, name=name))
+        tasks[-1].add_done_callback(_on_task_done)
+    module_tasks = {t.get_name(): t for t in tasks}
+    if telemetry:
+        coro = profiler.wrap("Telemetry", telemetry.run()) if profiler else telemetry.run()
+        tasks.append(asyncio.create_task(coro, name="Telemetry"))
+    if profiler:
+        tasks.append(asyncio.create_task(profiler.lag_probe(), name="LagProbe"))
+    if args.profile:
+        tasks.append(asyncio.create_task(
+            profiler.report(args.profile_interval, args.profile), name="ProfileReport"
+        ))
+    startup.mark("modules started")
+    control = None
+    if cfg.control.enabled:
+        control = startup.load("bot.control", "ControlServer")(
+            cfg, state, screen, module_tasks, modules, profiler=profiler, recorder=recorder
+        )
+        if not await control.start():
+            control = None
+    if cfg.reload.enabled:
+        watcher = startup.load("bot.config_watcher", "ConfigWatcher")(
+            args.config, cfg, modules, _enabled_modules, cfg.reload.poll_interval
+        )
+        tasks.append(asyncio.create_task(watcher.run(), name="ConfigWatcher"))
+    if report:
+        tasks.append(asyncio.create_task(_startup_report(report), name="StartupReport"))
 
     try:
         await stop_event.wait()
     finally:
         print("\nShutting down…")
+        if control:
+            await control.close()
         state.running = False
         screen.stop()
         for t in tasks:
             t.cancel()
         await asyncio.gather(*tasks, return_exceptions=True)
+        if telemetry:
+            await telemetry.close()
+            print(f"Telemetry → {telemetry.path}")
+        if recorder:
+            recorder.stop()
+            for path in recorder.dumps:
+                print(f"Flight recording → {path}")
+        log.shutdown()
+        counts = log.stats()
+        if counts["dropped"] or counts["rate_limited"]:
+            print(f"Log: {counts['dropped']} records dropped (queue full), "
+                  f"{counts['rate_limited']} rate-limited")
+        if profiler:
+            profiler.uninstall()
+        if args.profile:
+            stats = profiler.summary()
+            print(profiler.format(stats))
+            profiler.write(args.profile, stats)
+            print(f"Profile stats → {args.profile}")
+
+
+async def _startup_report(report: startup.StartupReport) -> None:
+    if not await report.wait(startup.HEAL_READY, _STARTUP_REPORT_TIMEOUT):
+        print(f"[Startup] HP bar not found within {_STARTUP_REPORT_TIMEOUT:g}s")
+    report.stop()
+    print(report.format())
 
 
 def main() -> None:
-    args = _parse_args()
+    args = parse_args()
     cfg = load_config(args.config)
+    log.configure(cfg.logging)
 
     print("=== TibiaBot v2 ===")
     print(f"  Config        : {args.config}")
@@ -103,7 +257,7 @@ def main() -> None:
                 # Windows does not support add_signal_handler
                 signal.signal(sig, lambda *_: stop_event.set())
 
-        await _run(cfg, stop_event)
+        await run(cfg, stop_event, args)
 
     asyncio.run(_entry())
 
@@ -0,0 +1,281 @@
+"""Stitched minimap atlas for absolute localisation.
+
+The live minimap only shows ~50 tiles around the player, so template-matching
+waypoint snapshots against it limits a route to what fits in one view.  The
+atlas removes that limit: every minimap frame is pasted into a large per-floor
+world mosaic at the offset where it was measured to fit, and the player is
+localised by matching the current minimap into a *small window* of that
+mosaic around the predicted position.
+
+Storage
+-------
+Each floor is one raw ``size × size × 3`` BGR file (``floor_07.bgr``) opened
+as a ``numpy.memmap``.  Files are created sparse, so unexplored area costs no
+disk space, and the OS pages in only the windows that are actually touched.
+Black (0, 0, 0) is Tibia's own "unexplored" minimap colour and doubles as the
+"unknown" marker here.  ``atlas.json`` next to the floor files keeps the
+covered bounding box and last known position per floor.
+
+Coordinates
+-----------
+Atlas coordinates are ``(x, y)`` pixels in the floor mosaic; at the default
+minimap zoom one pixel is one game tile.  The first frame ever seen on a floor
+is placed at the mosaic centre, everything else is relative to it.
+
+Cost
+----
+Localisation matches the inner part of the minimap against a window only
+``2·r`` pixels larger than it, where ``r`` is ``search_radius``, so the
+per-frame cost is constant no matter how large the explored area grows.
+A full search of the covered bounding box is only done when the prediction is
+lost (teleport, first frame after start-up).
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from bot.log import get_logger
+
+log = get_logger("Atlas")
+
+# Zero-mean correlation a match must reach to count as a localisation fix
+_MIN_CONFIDENCE = 0.80
+# Radius of the player-dot area that is never written into the atlas (pixels)
+_DOT_RADIUS = 4
+# Seconds between memmap flushes / metadata writes
+_FLUSH_INTERVAL = 30.0
+# Minimum seconds between full-area searches after the prediction is lost
+_FULL_SEARCH_INTERVAL = 2.0
+# Fraction of the minimap trimmed from each side before localisation matching
+_PROBE_MARGIN = 0.2
+_META_FILE = "atlas.json"
+
+
+class MinimapAtlas:
+    """Per-floor stitched minimap mosaic backed by memory-mapped files.
+
+    Usage::
+
+        atlas = MinimapAtlas("waypoints/atlas")
+        fix = atlas.localize(minimap_bgr, z=7)       # (x, y, confidence) or None
+        if fix:
+            atlas.integrate(minimap_bgr, 7, fix[0], fix[1])
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        size: int = 2048,
+        search_radius: int = 16,
+    ) -> None:
+        self.directory = directory
+        self.size = size
+        self.search_radius = search_radius
+        self._floors: Dict[int, np.memmap] = {}
+        # floor → [x0, y0, x1, y1] of written area (exclusive upper bounds)
+        self._bbox: Dict[int, List[int]] = {}
+        # floor → (x, y) of the last localisation fix
+        self._last: Dict[int, Tuple[int, int]] = {}
+        self._last_flush_at: float = time.monotonic()
+        self._last_full_search_at: float = 0.0
+        self._dot_mask: Optional[np.ndarray] = None
+        os.makedirs(directory, exist_ok=True)
+        self._load_meta()
+
+    # ── storage ──────────────────────────────────────────────────────────────
+
+    def _floor(self, z: int) -> np.memmap:
+        mm = self._floors.get(z)
+        if mm is None:
+            path = os.path.join(self.directory, f"floor_{z:02d}.bgr")
+            mode = "r+" if os.path.exists(path) else "w+"
+            mm = np.memmap(path, dtype=np.uint8, mode=mode, shape=(self.size, self.size, 3))
+            self._floors[z] = mm
+        return mm
+
+    def _load_meta(self) -> None:
+        path = os.path.join(self.directory, _META_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            meta = json.load(f)
+        if meta.get("size", self.size) != self.size:
+            log.warning(f"{path} was built with size={meta['size']}, "
+                        f"using that instead of {self.size}")
+            self.size = int(meta["size"])
+        for key, floor in meta.get("floors", {}).items():
+            z = int(key)
+            if "bbox" in floor:
+                self._bbox[z] = [int(v) for v in floor["bbox"]]
+            if "last" in floor:
+                self._last[z] = (int(floor["last"][0]), int(floor["last"][1]))
+
+    def flush(self) -> None:
+        """Write dirty mosaic pages and metadata to disk."""
+        for mm in self._floors.values():
+            mm.flush()
+        floors = {}
+        for z in set(self._bbox) | set(self._last):
+            entry = {}
+            if z in self._bbox:
+                entry["bbox"] = self._bbox[z]
+            if z in self._last:
+                entry["last"] = list(self._last[z])
+            floors[str(z)] = entry
+        path = os.path.join(self.directory, _META_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"size": self.size, "floors": floors}, f, indent=2)
+        os.replace(tmp, path)
+        self._last_flush_at = time.monotonic()
+
+    # ── queries ──────────────────────────────────────────────────────────────
+
+    def last_position(self, z: int) -> Optional[Tuple[int, int]]:
+        return self._last.get(z)
+
+    def covered(self, z: int) -> bool:
+        return z in self._bbox
+
+    def region(self, z: int) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+        """Covered part of floor *z* as ``(BGR view, (x0, y0))``, or None."""
+        bbox = self._bbox.get(z)
+        if bbox is None:
+            return None
+        x0, y0, x1, y1 = bbox
+        return self._floor(z)[y0:y1, x0:x1], (x0, y0)
+
+    # ── localisation ─────────────────────────────────────────────────────────
+
+    def localize(
+        self,
+        minimap: np.ndarray,
+        z: int,
+        predicted: Optional[Tuple[int, int]] = None,
+    ) -> Optional[Tuple[int, int, float]]:
+        """Return ``(x, y, confidence)`` of the player in atlas coordinates.
+
+        *minimap* is the live BGR minimap.  The search window is centred on
+        *predicted* (default: the last fix on this floor).  If the floor is
+        still empty the frame is anchored at the mosaic centre.  Returns None
+        when no confident match is found.
+        """
+        if not self.covered(z):
+            c = self.size // 2
+            return c, c, 1.0
+
+        # Match only the inner part of the minimap: the border is where new,
+        # not-yet-stitched terrain scrolls in, and black unknown atlas pixels
+        # there would drag the correlation down.
+        gray = cv2.cvtColor(minimap, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape[:2]
+        my, mx = int(h * _PROBE_MARGIN), int(w * _PROBE_MARGIN)
+        probe = gray[my : h - my, mx : w - mx]
+        # Offset from the probe's top-left corner to the player (minimap centre)
+        off_x, off_y = w // 2 - mx, h // 2 - my
+
+        if predicted is None:
+            predicted = self._last.get(z)
+
+        hit = None
+        if predicted is not None:
+            hit = self._match_window(
+                probe, z, (predicted[0] - off_x, predicted[1] - off_y), self.search_radius
+            )
+        now = time.monotonic()
+        if hit is None and now - self._last_full_search_at >= _FULL_SEARCH_INTERVAL:
+            # Prediction lost – fall back to the whole covered area
+            self._last_full_search_at = now
+            x0, y0, x1, y1 = self._bbox[z]
+            radius = max(x1 - x0, y1 - y0)
+            hit = self._match_window(probe, z, (x0, y0), radius)
+        if hit is None:
+            return None
+        x, y, conf = hit[0] + off_x, hit[1] + off_y, hit[2]
+        self._last[z] = (x, y)
+        return x, y, conf
+
+    def locate_template(
+        self, template: np.ndarray, z: int
+    ) -> Optional[Tuple[int, int, float]]:
+        """Find a greyscale waypoint snapshot anywhere in the covered area.
+
+        Returns the atlas ``(x, y, confidence)`` of the template centre.
+        Used once per waypoint to turn PNG snapshots into atlas coordinates.
+        """
+        if not self.covered(z):
+            return None
+        x0, y0, x1, y1 = self._bbox[z]
+        th, tw = template.shape[:2]
+        radius = max(x1 - x0, y1 - y0)
+        hit = self._match_window(template, z, (x0, y0), radius)
+        if hit is None:
+            return None
+        return hit[0] + tw // 2, hit[1] + th // 2, hit[2]
+
+    def _match_window(
+        self, probe: np.ndarray, z: int, corner: Tuple[int, int], radius: int
+    ) -> Optional[Tuple[int, int, float]]:
+        """Match *probe* with its top-left corner within *radius* of *corner*.
+
+        Returns the atlas ``(x, y)`` of the best top-left corner and its score.
+        """
+        h, w = probe.shape[:2]
+        x0 = max(0, corner[0] - radius)
+        y0 = max(0, corner[1] - radius)
+        x1 = min(self.size, corner[0] + w + radius)
+        y1 = min(self.size, corner[1] + h + radius)
+        if x1 - x0 < w or y1 - y0 < h:
+            return None
+
+        window = cv2.cvtColor(np.asarray(self._floor(z)[y0:y1, x0:x1]), cv2.COLOR_BGR2GRAY)
+        result = cv2.matchTemplate(window, probe, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < _MIN_CONFIDENCE:
+            return None
+        return x0 + max_loc[0], y0 + max_loc[1], float(max_val)
+
+    # ── stitching ────────────────────────────────────────────────────────────
+
+    def integrate(self, minimap: np.ndarray, z: int, x: int, y: int) -> None:
+        """Paste *minimap* into the floor mosaic with its centre at (x, y).
+
+        Only still-unknown atlas pixels are written (first observation wins),
+        and the player dot is never written, so repeated passes over the same
+        area cost a masked copy and nothing else.
+        """
+        h, w = minimap.shape[:2]
+        x0, y0 = x - w // 2, y - h // 2
+        if x0 < 0 or y0 < 0 or x0 + w > self.size or y0 + h > self.size:
+            log.info(f"Position ({x},{y}) too close to the atlas edge – "
+                     f"increase atlas_size")
+            return
+
+        region = self._floor(z)[y0 : y0 + h, x0 : x0 + w]
+        write = ~region.any(axis=2) & self._frame_mask(h, w) & minimap.any(axis=2)
+        if write.any():
+            np.copyto(region, minimap, where=write[:, :, None])
+            bbox = self._bbox.get(z)
+            if bbox is None:
+                self._bbox[z] = [x0, y0, x0 + w, y0 + h]
+            else:
+                bbox[0], bbox[1] = min(bbox[0], x0), min(bbox[1], y0)
+                bbox[2], bbox[3] = max(bbox[2], x0 + w), max(bbox[3], y0 + h)
+        self._last[z] = (x, y)
+
+        if time.monotonic() - self._last_flush_at > _FLUSH_INTERVAL:
+            self.flush()
+
+    def _frame_mask(self, h: int, w: int) -> np.ndarray:
+        mask = self._dot_mask
+        if mask is None or mask.shape != (h, w):
+            mask = np.ones((h, w), dtype=np.uint8)
+            cv2.circle(mask, (w // 2, h // 2), _DOT_RADIUS, 0, -1)
+            mask = mask.astype(bool)
+            self._dot_mask = mask
+        return mask
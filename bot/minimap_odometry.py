@@ -0,0 +1,115 @@
+"""Phase-correlation odometry on the live minimap.
+
+The minimap scrolls under the fixed player dot as the character walks, so
+the shift between two consecutive minimap frames *is* the player's motion
+(one minimap pixel ≈ one tile at the default zoom).  Phase correlation
+recovers that shift – direction and magnitude, with sub-pixel precision –
+from a single peak in the inverse FFT of the normalised cross-power spectrum.
+
+Cost per frame
+--------------
+* The Hanning window and the padded DFT size are computed once.
+* The previous frame's spectrum is kept, so each update needs exactly one
+  forward and one inverse DFT of a ~110 × 120 array.
+* All working arrays are allocated once and reused; nothing is copied from
+  the screen frame except the greyscale conversion.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Correlation peak height below which a shift estimate is not trusted
+# (e.g. the minimap was redrawn after a floor change or was covered)
+_MIN_RESPONSE = 0.15
+_EPS = 1e-6
+
+
+class MinimapOdometry:
+    """Estimates per-frame player motion from successive greyscale minimaps.
+
+    Usage::
+
+        odo = MinimapOdometry()
+        step = odo.update(minimap_gray)   # (dx, dy, response) or None
+    """
+
+    def __init__(self) -> None:
+        self._shape: Optional[Tuple[int, int]] = None
+        self._window: Optional[np.ndarray] = None
+        self._buf: Optional[np.ndarray] = None
+        self._spec: Optional[np.ndarray] = None
+        self._prev_spec: Optional[np.ndarray] = None
+        self._has_prev: bool = False
+
+    def _allocate(self, h: int, w: int) -> None:
+        ph, pw = cv2.getOptimalDFTSize(h), cv2.getOptimalDFTSize(w)
+        self._shape = (h, w)
+        self._window = cv2.createHanningWindow((w, h), cv2.CV_32F)
+        self._buf = np.zeros((ph, pw), dtype=np.float32)
+        self._spec = np.empty((ph, pw, 2), dtype=np.float32)
+        self._prev_spec = np.empty((ph, pw, 2), dtype=np.float32)
+        self._has_prev = False
+
+    def reset(self) -> None:
+        """Forget the reference frame (next update only primes the filter)."""
+        self._has_prev = False
+
+    def update(self, gray: np.ndarray) -> Optional[Tuple[float, float, float]]:
+        """Feed the next greyscale minimap.
+
+        Returns ``(dx, dy, response)`` – the player's motion in minimap pixels
+        since the previous frame and the correlation peak height – or None for
+        the first frame and for frames whose shift could not be trusted.
+        """
+        h, w = gray.shape[:2]
+        if self._shape != (h, w):
+            self._allocate(h, w)
+
+        # Windowed, zero-mean input written into the padded reusable buffer
+        view = self._buf[:h, :w]
+        np.subtract(gray, float(gray.mean()), out=view, casting="unsafe")
+        view *= self._window
+        cv2.dft(self._buf, self._spec, flags=cv2.DFT_COMPLEX_OUTPUT)
+
+        step = None
+        if self._has_prev:
+            step = self._shift()
+
+        # The current spectrum becomes the reference for the next frame
+        self._spec, self._prev_spec = self._prev_spec, self._spec
+        self._has_prev = True
+        return step
+
+    def _shift(self) -> Optional[Tuple[float, float, float]]:
+        cross = cv2.mulSpectrums(self._spec, self._prev_spec, 0, conjB=True)
+        mag = cv2.magnitude(cross[:, :, 0], cross[:, :, 1])
+        mag += _EPS
+        cross /= mag[:, :, None]
+        corr = cv2.idft(cross, flags=cv2.DFT_REAL_OUTPUT | cv2.DFT_SCALE)
+
+        _, response, _, (px, py) = cv2.minMaxLoc(corr)
+        if response < _MIN_RESPONSE:
+            return None
+
+        # Sub-pixel refinement: weighted centroid of the 3×3 neighbourhood,
+        # wrapping around the (periodic) correlation surface.
+        ph, pw = corr.shape
+        rows = np.array([(py - 1) % ph, py, (py + 1) % ph])
+        cols = np.array([(px - 1) % pw, px, (px + 1) % pw])
+        patch = corr[np.ix_(rows, cols)]
+        total = float(patch.sum())
+        sx, sy = float(px), float(py)
+        if total > _EPS:
+            sx += float((patch.sum(axis=0) * (-1, 0, 1)).sum()) / total
+            sy += float((patch.sum(axis=1) * (-1, 0, 1)).sum()) / total
+
+        # Peaks past the half-way point are negative shifts
+        if sx > pw / 2:
+            sx -= pw
+        if sy > ph / 2:
+            sy -= ph
+
+        # The terrain moves opposite to the player
+        return -sx, -sy, float(response)
@@ -2,9 +2,11 @@
 
 import asyncio
 from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
 
 from bot.screen import ScreenCapture
 from bot.state import GameState
+from bot.vision import find_template
 
 
 class BaseModule(ABC):
@@ -12,12 +14,53 @@ class BaseModule(ABC):
 
     Subclasses implement ``run()`` as an infinite asyncio coroutine.
     They should ``await asyncio.sleep(...)`` frequently so the event loop
-    can serve other modules.
+    can serve other modules, and ``await self._pause_point()`` at the top
+    of their main loop so ``pause()`` stops them between two ticks.
     """
 
     def __init__(self, screen: ScreenCapture, state: GameState) -> None:
         self.screen = screen
         self.state = state
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+
+    # ── control (see bot/control.py) ─────────────────────────────────────────
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def pause(self) -> None:
+        """Stop at the next ``_pause_point()`` until ``resume()``."""
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        self._resumed.set()
+
+    def config_changed(self) -> None:
+        """Called after a value of one of the module's config sections was
+        changed at runtime.  Modules that derive state from their config at
+        construction rebuild it here; the others read it every tick."""
+
+    def prepare_config(self, changes: Dict[str, Any]) -> Any:
+        """First half of a config reload (see bot/config_watcher.py), run in
+        a worker thread.
+
+        *changes* maps each attribute of the module holding a changed config
+        section to that section as it will be; the live one is unchanged yet.
+        Returns what ``apply_config`` needs that is slow to build – loaded
+        templates, a parsed route.  Raising aborts the whole reload.
+        """
+        return None
+
+    def apply_config(self, changes: Dict[str, Any], prepared: Any) -> None:
+        """Second half of a config reload, on the event loop between two
+        ticks: the sections now hold the new values; swap in *prepared*."""
+        self.config_changed()
+
+    async def _pause_point(self) -> None:
+        if not self._resumed.is_set():
+            await self._resumed.wait()
 
     @abstractmethod
     async def run(self) -> None:
@@ -27,3 +70,17 @@ class BaseModule(ABC):
         """Yield until the screen capture produces its first frame."""
         while self.screen.get_frame() is None:
             await asyncio.sleep(0.05)
+
+    async def _find_anchors(self, *template_paths: str) -> List[Optional[Tuple[int, int]]]:
+        """``find_template`` of each path on the current frame, off the loop.
+
+        A full-frame search takes tens of milliseconds.  Run in worker
+        threads (OpenCV releases the GIL), the startup searches of all
+        modules overlap, and modules already running keep ticking.
+        """
+        frame = self.screen.get_frame()
+        if frame is None:
+            return [None] * len(template_paths)
+        return list(await asyncio.gather(*(
+            asyncio.to_thread(find_template, frame, path) for path in template_paths
+        )))
@@ -5,7 +5,9 @@ Attack detection without per-monster screenshots
 Tibia draws a pure-red (R=255 G=0 B=0) 1-px border around the battle-list
 entry of the currently selected monster.  Checking a small pixel region at
 the corner of that entry is all we need to know whether we are attacking,
-regardless of monster type.
+regardless of monster type.  ``bot.battle_list`` does that – plus presence,
+HP and a name hash – for every visible entry in one vectorised pass, and the
+result is published as ``GameState.battle_entries``.
 
 ``attack_indicator_offset`` in config controls where that corner is relative
 to the enemy-detection pixel (_battle_pixel).  The default (-10, -10) is
@@ -15,9 +17,31 @@ so the red corner is 10 rows above and 10 columns to the left.
 
 Reachability logic
 ------------------
-If the character's position has not changed for ``stuck_timeout`` seconds
-while an attack is in progress, the area is flagged as temporarily
-unreachable and the attack is cancelled so navigation can resume.
+If the character has not moved more than a tile for ``stuck_timeout``
+seconds while an attack is in progress, the area is flagged as temporarily
+unreachable and the attack is cancelled so navigation can resume.  Movement
+comes from ``GameState.stationary_seconds``, which queries the position
+history fed by OCR / atlas positions and by minimap odometry.  While the
+character is within ``unreachable_radius`` tiles of a blacklisted tile, new
+enemies are ignored so navigation can walk away instead of re-targeting the
+same creature (only when an absolute position source is running).
+
+Target selection
+----------------
+With ``targeting`` enabled, ``bot.targeting.Targeter`` scores the entries
+(per-creature priority, HP, slot) and the chosen entry is clicked directly;
+otherwise ``attack_key`` leaves the choice to the client.  Either way a
+``KillTimer`` logs the time-to-kill of every kill.
+
+Creatures in the viewport
+-------------------------
+With ``creature_detection`` enabled and a viewport configured,
+``bot.creature_detector`` finds the health bars on screen each frame (within
+``creature_cpu_share`` of a core).  With a fresh absolute position, enemies
+are ignored while every visible creature stands on a blacklisted tile, and a
+stuck attack with a single creature on screen blacklists that creature's
+tile too.  When a kill happens, the creature whose bar vanished gives
+``GameState.kill_offset`` for looting.
 """
 
 import asyncio
@@ -26,21 +50,37 @@ import time
 from typing import Optional, Tuple
 
 import numpy as np
-import pyautogui
 
-from bot.config import CombatConfig
+from bot import flight_recorder, inputs, telemetry
+from bot.battle_list import BattleListReader
+from bot.config import CombatConfig, ViewportConfig
+from bot.creature_detector import CreatureDetector, vanished
+from bot.log import get_logger
 from bot.modules.base import BaseModule
 from bot.screen import ScreenCapture
 from bot.state import GameState, Position
-from bot.vision import find_template, pixel_rgb
+from bot.targeting import KillTimer, Targeter
 
-_NO_ENEMY_RGB = (70, 70, 70)  # colour of an empty battle-list slot
+log = get_logger("Combat")
+
+# Tiles the character must move to count as "not stuck"
+_STUCK_DISTANCE = 1.0
+# Seconds before attack_key is pressed again while no target is confirmed,
+# unless the cooldown table lists the key
+_ATTACK_RETRY = 0.3
+# Size of the box kept around an anchor template match (px, the templates
+# are at most this large)
+_ANCHOR_BOX = 20
 
 
 class CombatModule(BaseModule):
 
     def __init__(
-        self, screen: ScreenCapture, state: GameState, config: CombatConfig
+        self,
+        screen: ScreenCapture,
+        state: GameState,
+        config: CombatConfig,
+        viewport: Optional[ViewportConfig] = None,
     ) -> None:
         super().__init__(screen, state)
         self.config = config
@@ -50,9 +90,36 @@ class CombatModule(BaseModule):
         self._battle_pixel: Optional[Tuple[int, int]] = None   # (row, col)
         self._attack_indicator: Optional[Tuple[int, int]] = None  # (row, col)
         self._follow_pos: Optional[Tuple[int, int]] = None
+        self._reader: Optional[BattleListReader] = None
+        self._targeter: Optional[Targeter] = self._make_targeter()
+        self._kills = KillTimer()
+        state.cooldowns.register(config.attack_key, _ATTACK_RETRY, replace=False)
+        self._detector: Optional[CreatureDetector] = None
+        if config.creature_detection and viewport is not None:
+            self._detector = CreatureDetector(viewport, config.creature_cpu_share)
 
         self._attack_started_at: Optional[float] = None
         self._pos_at_attack_start: Optional[Position] = None
+        self._avoiding: bool = False
+
+    def _make_targeter(self) -> Optional[Targeter]:
+        cfg = self.config
+        if not cfg.targeting:
+            return None
+        return Targeter(
+            cfg.target_priorities,
+            hp_weight=cfg.target_hp_weight,
+            distance_weight=cfg.target_distance_weight,
+            switch_margin=cfg.target_switch_margin,
+            min_dwell=cfg.target_min_dwell,
+        )
+
+    def config_changed(self) -> None:
+        # A new targeter picks afresh; the kill timer is kept
+        self._targeter = self._make_targeter()
+        self.state.cooldowns.register(self.config.attack_key, _ATTACK_RETRY, replace=False)
+        if self._detector is not None:
+            self._detector.cpu_share = self.config.creature_cpu_share
 
     # ── startup ──────────────────────────────────────────────────────────────
 
@@ -63,79 +130,62 @@ class CombatModule(BaseModule):
 
         for path in (battle_path, follow_path):
             if not os.path.exists(path):
-                print(f"[Combat] ERROR: {path} is missing")
+                log.error(f"{path} is missing")
 
         while self._battle_pixel is None or self._follow_pos is None:
-            frame = self.screen.get_frame()
-            if frame is not None:
-                if self._battle_pixel is None:
-                    bp = find_template(frame, battle_path)
-                    if bp:
-                        self._battle_pixel = (bp[0] + 20, bp[1] + 6)
-                        r_off, c_off = self.config.attack_indicator_offset
-                        self._attack_indicator = (
-                            self._battle_pixel[0] + r_off,
-                            self._battle_pixel[1] + c_off,
-                        )
-                        print(
-                            f"[Combat] Battle list found – "
-                            f"enemy pixel=({self._battle_pixel[1]},{self._battle_pixel[0]})  "
-                            f"attack indicator=({self._attack_indicator[1]},{self._attack_indicator[0]})"
-                        )
-
-                if self._follow_pos is None:
-                    fp = find_template(frame, follow_path)
-                    if fp:
-                        self._follow_pos = fp
-                        print(f"[Combat] Follow button at row={fp[0]} col={fp[1]}")
+            bp, fp = await self._find_anchors(battle_path, follow_path)
+            if self._battle_pixel is None and bp:
+                self._battle_pixel = (bp[0] + 20, bp[1] + 6)
+                r_off, c_off = self.config.attack_indicator_offset
+                self._attack_indicator = (
+                    self._battle_pixel[0] + r_off,
+                    self._battle_pixel[1] + c_off,
+                )
+                # The attack-indicator corner is slot 0's top-left
+                self._reader = BattleListReader(
+                    self._attack_indicator,
+                    self.config.battle_entry_height,
+                    self.config.battle_max_entries,
+                )
+                x, y, w, h = self._reader.bounds
+                x0, y0 = min(x, bp[1]), min(y, bp[0])
+                self.state.set_region(
+                    "battle", x0, y0,
+                    max(x + w, bp[1] + _ANCHOR_BOX) - x0,
+                    max(y + h, bp[0] + _ANCHOR_BOX) - y0,
+                )
+                log.info(
+                    f"Battle list found – "
+                    f"enemy pixel=({self._battle_pixel[1]},{self._battle_pixel[0]})  "
+                    f"attack indicator=({self._attack_indicator[1]},{self._attack_indicator[0]})"
+                )
+
+            if self._follow_pos is None and fp:
+                self._follow_pos = fp
+                self.state.set_region("follow", fp[1], fp[0], _ANCHOR_BOX, _ANCHOR_BOX)
+                log.info(f"Follow button at row={fp[0]} col={fp[1]}")
 
             if self._battle_pixel is None or self._follow_pos is None:
                 await asyncio.sleep(1.0)
 
-    # ── detection ────────────────────────────────────────────────────────────
-
-    def _enemy_present(self, frame) -> bool:
-        """Single-pixel check: is there any enemy in the battle list?"""
-        if self._battle_pixel is None:
-            return False
-        r, c = self._battle_pixel
-        return pixel_rgb(frame, x=c, y=r) != _NO_ENEMY_RGB
-
-    def _is_attacking(self, frame) -> bool:
-        """Check for the red attack-indicator border on the selected entry.
-
-        Samples a 3×3 pixel region at the top-left corner of the first
-        battle-list slot.  If ≥ 3 pixels are pure red (R>200, G<50, B<50)
-        the character is actively attacking.
-
-        No per-monster screenshots required — works for any enemy type.
-        """
-        if self._attack_indicator is None:
-            return False
-        row, col = self._attack_indicator
-        region = frame[row : row + 3, col : col + 3, :3]
-        if region.size == 0:
-            return False
-        red = np.sum(
-            (region[:, :, 2] > 200) &   # R (index 2 in BGR)
-            (region[:, :, 1] < 50) &    # G
-            (region[:, :, 0] < 50)      # B
-        )
-        return int(red) >= 3
-
     # ── actions ──────────────────────────────────────────────────────────────
 
-    def _start_attack(self) -> None:
+    def _start_attack(self, target=None) -> None:
+        """Attack *target* (a battle-list entry), or the client's pick."""
         if self._follow_pos:
             row, col = self._follow_pos
-            pyautogui.click(col, row)
-        pyautogui.press(self.config.attack_key)
+            inputs.click(col, row)
+        if target is not None:
+            inputs.click(int(target["x"]), int(target["y"]))
+        else:
+            inputs.press(self.config.attack_key)
+            self.state.cooldowns.use(self.config.attack_key)
         self._attack_started_at = time.monotonic()
         self._pos_at_attack_start = self.state.position
         self.state.loot_pending = False
 
     def _cancel_attack(self) -> None:
-        pyautogui.press("escape")
+        inputs.press("escape")
         self._attack_started_at = None
         self._pos_at_attack_start = None
         self.state.currently_attacking = False
@@ -145,10 +195,47 @@ class CombatModule(BaseModule):
     def _stuck_seconds(self) -> float:
         if self._attack_started_at is None:
             return 0.0
-        if self.state.seconds_since_last_move() < 0.5:
-            self._attack_started_at = time.monotonic()
-            return 0.0
-        return time.monotonic() - self._attack_started_at
+        return min(
+            time.monotonic() - self._attack_started_at,
+            self.state.stationary_seconds(_STUCK_DISTANCE),
+        )
+
+    def _in_unreachable_area(self) -> bool:
+        # Without a fresh absolute position every mark lands on (0, 0, 0)
+        if self.state.position_stale(max_age=3.0):
+            return False
+        return self.state.is_unreachable(self.state.position, self.config.unreachable_radius)
+
+    def _creature_position(self, creature: np.void) -> Position:
+        pos = self.state.position
+        return Position(pos.x + int(creature["dx"]), pos.y + int(creature["dy"]), pos.z)
+
+    def _targets_unreachable(self, creatures: np.ndarray) -> bool:
+        """True if creatures are visible and all stand on blacklisted tiles."""
+        if not len(creatures) or self.state.position_stale(max_age=3.0):
+            return False
+        return all(
+            self.state.is_unreachable(self._creature_position(c)) for c in creatures
+        )
+
+    # ── creatures ────────────────────────────────────────────────────────────
+
+    def _detect_creatures(self, frame: np.ndarray, entries: np.ndarray, killed: bool) -> np.ndarray:
+        before = self.state.creatures
+        if self._detector is None or (not len(entries) and not killed):
+            # An empty battle list means nothing is on screen
+            if len(before):
+                self.state.update_creatures(before[:0])
+            return before[:0]
+        # A kill needs this very frame, whatever the budget says
+        creatures = self._detector.scan(frame) if killed else self._detector.detect(frame)
+        self.state.update_creatures(creatures)
+        if killed:
+            self.state.kill_offset = vanished(before, creatures)
+            if self.state.kill_offset is not None:
+                dx, dy = self.state.kill_offset
+                log.info(f"Kill at tile offset ({dx:+d},{dy:+d})")
+        return creatures
 
     # ── main loop ────────────────────────────────────────────────────────────
 
@@ -157,36 +244,72 @@ class CombatModule(BaseModule):
         await self._setup()
 
         while self.state.running:
+            await self._pause_point()
             frame = self.screen.get_frame()
             if frame is None:
                 await asyncio.sleep(0.05)
                 continue
 
-            enemy = self._enemy_present(frame)
+            entries = self._reader.read(frame)
+            self.state.update_battle_list(entries)
+            ttk = self._kills.update(entries)
+            if ttk is not None:
+                log.info(f"Kill #{self._kills.kills} in {ttk:.1f}s ({self._kills.summary()})")
+                telemetry.event("kill", ttk)
+            creatures = self._detect_creatures(frame, entries, killed=ttk is not None)
+
+            enemy = len(entries) > 0
+            if enemy and not self.state.currently_attacking and (
+                self._in_unreachable_area() or self._targets_unreachable(creatures)
+            ):
+                if not self._avoiding:
+                    log.info("Enemy near a blacklisted area – ignoring it")
+                    self._avoiding = True
+                enemy = False
+            elif enemy:
+                self._avoiding = False
             self.state.enemy_in_battle_list = enemy
 
             if enemy:
-                attacking = self._is_attacking(frame)
+                attacking = bool(entries["targeted"].any())
                 self.state.currently_attacking = attacking
+                target = self._targeter.choose(entries) if self._targeter else None
 
                 if not attacking:
-                    print("[Combat] Enemy detected – attacking")
-                    self._start_attack()
+                    if target is not None:
+                        log.info(f"Enemy detected – attacking slot {target['slot']}")
+                        self._start_attack(target)
+                    elif (self._targeter is None
+                          and self.state.cooldowns.ready(self.config.attack_key)):
+                        log.info("Enemy detected – attacking")
+                        self._start_attack()
+                elif target is not None:
+                    log.info(f"Switching to slot {target['slot']}")
+                    self._start_attack(target)
                 else:
                     stuck = self._stuck_seconds()
                     if stuck > self.config.stuck_timeout:
                         pos = self.state.position
-                        print(
-                            f"[Combat] Stuck {stuck:.1f}s at ({pos.x},{pos.y}) – "
+                        log.info(
+                            f"Stuck {stuck:.1f}s at ({pos.x},{pos.y}) – "
                             f"marking unreachable for {self.config.unreachable_cooldown}s"
                         )
+                        flight_recorder.trigger("stuck", f"attacking for {stuck:.1f}s")
+                        telemetry.event("stuck", stuck)
                         self.state.mark_unreachable(pos, self.config.unreachable_cooldown)
+                        if len(creatures) == 1:
+                            self.state.mark_unreachable(
+                                self._creature_position(creatures[0]),
+                                self.config.unreachable_cooldown,
+                            )
                         self._cancel_attack()
                         self.state.loot_pending = True
             else:
+                if self._targeter:
+                    self._targeter.reset()
                 if self.state.currently_attacking:
-                    print("[Combat] Enemy defeated – switching to loot")
-                    pyautogui.keyUp(self.config.attack_key)
+                    log.info("Enemy defeated – switching to loot")
+                    inputs.key_up(self.config.attack_key)
                     self.state.currently_attacking = False
                     self._attack_started_at = None
                     self.state.loot_pending = True
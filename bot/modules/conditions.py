@@ -0,0 +1,142 @@
+"""Status-condition monitoring.
+
+Locates the condition icon strip once (at the configured ``x`` / ``y``, or
+relative to ``anchor_template``), then decodes it every tick with
+``bot.conditions.ConditionReader`` and publishes the active set as
+``GameState.conditions``.  Changes are logged, and icons matching no
+template are reported once each.
+
+``actions`` maps a condition to a key pressed while it is shown – cure
+poison, haste out of paralysis, eat when hungry – or, written ``!name``,
+while it is not (recast haste).  Keys go through ``GameState.cooldowns``.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot import inputs
+from bot.conditions import ConditionReader
+from bot.config import ConditionsConfig
+from bot.log import get_logger
+from bot.modules.base import BaseModule
+from bot.screen import ScreenCapture
+from bot.state import GameState
+
+log = get_logger("Conditions")
+
+_TICK = 0.1
+# Cooldown of an action key unless the cooldown table lists it
+_FALLBACK_COOLDOWN = 2.0
+# Box kept around the anchor template match for the flight recorder (px)
+_ANCHOR_BOX = 32
+
+
+class ConditionsModule(BaseModule):
+
+    def __init__(
+        self, screen: ScreenCapture, state: GameState, config: ConditionsConfig
+    ) -> None:
+        super().__init__(screen, state)
+        self.config = config
+        self._reader: Optional[ConditionReader] = None
+        self._actions: List[Tuple[str, bool, str]] = []   # (name, wanted, key)
+        self.config_changed()
+
+    def config_changed(self) -> None:
+        self._actions = []
+        for cond, key in self.config.actions.items():
+            wanted = not cond.startswith("!")
+            self._actions.append((cond.lstrip("!"), wanted, key))
+            self.state.cooldowns.register(key, _FALLBACK_COOLDOWN, replace=False)
+
+    def prepare_config(self, changes: Dict[str, Any]) -> Any:
+        new, old = changes.get("config"), self.config
+        if new is None or self._reader is None or all(
+            getattr(new, k) == getattr(old, k)
+            for k in ("x", "y", "icon_size", "icon_pitch", "max_icons", "templates_dir")
+        ):
+            return None
+        # The anchor is not looked for again: a strip found through it stays put
+        origin = self._reader.origin if old.anchor_template else (new.y, new.x)
+        return ConditionReader(
+            origin, new.icon_size, new.icon_pitch, new.max_icons, new.templates_dir
+        )
+
+    def apply_config(self, changes: Dict[str, Any], prepared: Any) -> None:
+        self.config_changed()
+        if prepared is None:
+            return
+        cfg, self._reader = self.config, prepared
+        origin = prepared.origin
+        self.state.set_region(
+            "conditions", origin[1], origin[0], cfg.max_icons * cfg.icon_pitch, cfg.icon_size
+        )
+        log.info(f"Strip at x={origin[1]} y={origin[0]} – "
+                 f"{prepared.loaded} icon templates from {cfg.templates_dir}")
+
+    async def _locate(self) -> Tuple[int, int]:
+        """Strip origin (row, col); waits for the anchor when one is set."""
+        cfg = self.config
+        if not cfg.anchor_template:
+            return cfg.y, cfg.x
+        while True:
+            (pos,) = await self._find_anchors(cfg.anchor_template)
+            if pos is not None:
+                self.state.set_region("conditions_anchor", pos[1], pos[0], _ANCHOR_BOX, _ANCHOR_BOX)
+                return pos[0] + cfg.anchor_offset[0], pos[1] + cfg.anchor_offset[1]
+            log.info(f"Waiting for {cfg.anchor_template}...")
+            await asyncio.sleep(1.0)
+
+    def _act(self, now: float) -> None:
+        if self.state.looting_active:
+            return
+        cooldowns = self.state.cooldowns
+        for name, wanted, key in self._actions:
+            if self.state.has_condition(name) != wanted or not cooldowns.ready(key, now):
+                continue
+            log.info(f"{'' if wanted else 'not '}{name} → {key}")
+            inputs.press(key)
+            cooldowns.use(key, now)
+
+    async def run(self) -> None:
+        cfg = self.config
+        if not cfg.enabled:
+            return
+
+        await self._wait_for_frame()
+        origin = await self._locate()
+        self._reader = ConditionReader(
+            origin, cfg.icon_size, cfg.icon_pitch, cfg.max_icons, cfg.templates_dir
+        )
+        self.state.set_region(
+            "conditions", origin[1], origin[0], cfg.max_icons * cfg.icon_pitch, cfg.icon_size
+        )
+        log.info(f"Strip at x={origin[1]} y={origin[0]} – "
+                 f"{self._reader.loaded} icon templates from {cfg.templates_dir}")
+        if not self._reader.loaded:
+            log.info("No templates – save some with calibrate.py --show-conditions")
+
+        mask, reported = 0, 0
+        while self.state.running:
+            await self._pause_point()
+            frame = self.screen.get_frame()
+            if frame is None:
+                await asyncio.sleep(_TICK)
+                continue
+
+            new = self._reader.read(frame)
+            self.state.update_conditions(new, self._reader.names)
+            if new != mask:
+                changes = [f"+{n}" for n in self._reader.decode(new & ~mask)]
+                changes += [f"-{n}" for n in self._reader.decode(mask & ~new)]
+                log.info(" ".join(changes))
+                mask = new
+            if len(self._reader.unknown) > reported:
+                reported = len(self._reader.unknown)
+                log.info(f"Unknown icon ({reported} so far) – "
+                         f"save it with calibrate.py --show-conditions")
+
+            if self._reader.loaded:
+                self._act(time.monotonic())
+            await asyncio.sleep(_TICK)
@@ -1,26 +1,41 @@
-"""HP monitoring and automatic healing."""
+"""HP monitoring and automatic healing.
+
+Heals are chosen by ``bot.hp_trend.HealPolicy``: one or more tiers
+(``heal_rules``), fired on the HP projected ``input_latency`` seconds ahead
+from the recent trend, so burst damage is healed before the threshold is
+crossed rather than a frame or two after.  With ``hp_trace_file`` set, every
+reading is appended as a ``t,hp`` line for ``evaluate_healing.py``.
+"""
 
 import asyncio
 import time
-from typing import Optional
-
-import pyautogui
+from typing import Optional, TextIO
 
+from bot import inputs, startup, telemetry
 from bot.config import HealingConfig
+from bot.hp_trend import HealPolicy, heal_rules
+from bot.log import get_logger
 from bot.modules.base import BaseModule
 from bot.screen import ScreenCapture
 from bot.state import GameState
-from bot.vision import find_template, read_bar_percent
+from bot.vision import read_bar_percent
+
+log = get_logger("Health")
 
 _HP_COLOR_RGB = (255, 113, 113)
 _TEMPLATE = "images/health.png"
 _OFFSET_X = 5   # relative to template match position
 _OFFSET_Y = 7
 _BAR_WIDTH = 92  # pixel width of the HP bar at 100 %
+# Rows from the template match the flight recorder keeps (icon + bar)
+_REGION_HEIGHT = 12
+# Trace lines buffered before a flush
+_TRACE_FLUSH_LINES = 100
 
 
 class HealthModule(BaseModule):
-    """Reads the HP bar each tick and presses *heal_key* when HP is low."""
+    """Reads the HP bar each tick and presses a heal key when HP is (about
+    to be) low."""
 
     def __init__(
         self, screen: ScreenCapture, state: GameState, config: HealingConfig
@@ -29,30 +44,65 @@ class HealthModule(BaseModule):
         self.config = config
         self._bar_x: Optional[int] = None
         self._bar_y: Optional[int] = None
-        self._last_heal_at: float = 0.0
-        self._heal_cooldown: float = 0.8  # minimum seconds between heals
+        self._policy = HealPolicy(
+            heal_rules(config),
+            latency=config.input_latency,
+            window=config.hp_trend_window,
+            predictive=config.predictive,
+            cooldowns=state.cooldowns,
+        )
+        self._trace: Optional[TextIO] = None
+        self._trace_lines: int = 0
+
+    def config_changed(self) -> None:
+        # Tiers and timing are copied into the policy; its HP trend is kept
+        self._policy.rules = sorted(heal_rules(self.config), key=lambda r: r.below)
+        for rule in self._policy.rules:
+            self.state.cooldowns.register(rule.key, rule.cooldown, replace=False)
+        self._policy.latency = self.config.input_latency
+        self._policy.predictive = self.config.predictive
+        self._policy.trend.window = self.config.hp_trend_window
 
-    def _locate_bar(self, frame) -> bool:
-        pos = find_template(frame, _TEMPLATE)
+    async def _locate_bar(self) -> bool:
+        (pos,) = await self._find_anchors(_TEMPLATE)
         if pos is None:
             return False
         self._bar_y = pos[0] + _OFFSET_Y
         self._bar_x = pos[1] + _OFFSET_X
+        self.state.set_region("health", pos[1], pos[0], _OFFSET_X + _BAR_WIDTH, _REGION_HEIGHT)
         return True
 
+    def _record(self, now: float, hp: float) -> None:
+        if self._trace is None:
+            return
+        self._trace.write(f"{now:.3f},{hp:.1f}\n")
+        self._trace_lines += 1
+        if self._trace_lines % _TRACE_FLUSH_LINES == 0:
+            self._trace.flush()
+
     async def run(self) -> None:
+        if self.config.hp_trace_file:
+            self._trace = await asyncio.to_thread(open, self.config.hp_trace_file, "a")
+            log.info(f"Recording HP trace to {self.config.hp_trace_file}")
+        try:
+            await self._run()
+        finally:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+    async def _run(self) -> None:
         await self._wait_for_frame()
 
         # Locate bar once at startup
-        while self._bar_x is None:
-            frame = self.screen.get_frame()
-            if frame is not None and self._locate_bar(frame):
-                print(f"[Health] Bar located at x={self._bar_x} y={self._bar_y}")
-            else:
-                print("[Health] Waiting for HP bar...")
+        while not await self._locate_bar():
+            log.info("Waiting for HP bar...")
             await asyncio.sleep(1.0)
+        log.info(f"Bar located at x={self._bar_x} y={self._bar_y}")
+        startup.mark(startup.HEAL_READY)
 
         while self.state.running:
+            await self._pause_point()
             frame = self.screen.get_frame()
             if frame is None:
                 await asyncio.sleep(0.05)
@@ -62,12 +112,14 @@ class HealthModule(BaseModule):
             self.state.hp_percent = hp
 
             now = time.monotonic()
-            if (
-                hp < self.config.hp_threshold
-                and (now - self._last_heal_at) >= self._heal_cooldown
-            ):
-                print(f"[Health] HP {hp:.0f}% < {self.config.hp_threshold}% → {self.config.heal_key}")
-                pyautogui.press(self.config.heal_key)
-                self._last_heal_at = now
+            self._record(now, hp)
+            rule = self._policy.update(hp, now)
+            if rule is not None:
+                log.info(
+                    f"HP {hp:.0f}% (projected {self._policy.projected:.0f}%, "
+                    f"{self._policy.rate:+.0f}%/s) < {rule.below:g}% → {rule.key}"
+                )
+                inputs.press(rule.key)
+                telemetry.event("heal", hp)
 
             await asyncio.sleep(0.05)  # 20 Hz
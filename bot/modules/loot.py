@@ -5,7 +5,11 @@ Flow
 1. ``state.loot_pending`` is set by CombatModule when an enemy is defeated.
 2. LootModule waits ``delay_after_kill`` seconds for the corpse to appear.
 3. It shift+right-clicks each of the 8 surrounding tiles to open corpses.
-4. For each opened container it scans item slots against whitelist templates.
+   When ``GameState.kill_offset`` says where the kill happened, that tile
+   is opened first; a kill further away is opened alone (the character
+   walks there) instead of the surrounding tiles.
+4. For each opened container it scans item slots against whitelist templates;
+   every instance of a template is found, not just the best match.
 5. Only matching items are ctrl+clicked into the backpack.
 6. If whitelist = ["*"] the module takes everything (legacy mode).
 7. If whitelist is empty, nothing is taken (safe default – no accidental
@@ -21,15 +25,22 @@ must match the item name in the whitelist, e.g. ``loot/gold_coin.png``.
 import asyncio
 import os
 from random import randint
-from typing import List, Optional, Tuple
-
-import pyautogui
+from typing import Any, Dict, List, Optional, Tuple
 
+from bot import inputs, telemetry
 from bot.config import LootConfig, ViewportConfig
+from bot.log import get_logger
 from bot.modules.base import BaseModule
 from bot.screen import ScreenCapture
 from bot.state import GameState
-from bot.vision import find_template
+from bot.vision import find_all_templates, preload_templates
+
+log = get_logger("Loot")
+
+# Tile offsets of the 8 surrounding tiles, in opening order
+_SURROUNDING = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+# Seconds per tile the character needs to walk to a distant corpse
+_WALK_SECONDS_PER_TILE = 0.4
 
 
 class LootModule(BaseModule):
@@ -45,28 +56,39 @@ class LootModule(BaseModule):
         self.config = config
         self.viewport = viewport
         self._take_all: bool = "*" in config.whitelist
-        self._templates: List[str] = self._resolve_templates()
+        self._templates: List[str] = self._resolve_templates(config)
 
     # ── setup ─────────────────────────────────────────────────────────────────
 
-    def _resolve_templates(self) -> List[str]:
-        if self._take_all:
-            print("[Loot] Take-all mode – every item will be collected")
+    def _resolve_templates(self, config: LootConfig) -> List[str]:
+        if "*" in config.whitelist:
+            log.info("Take-all mode – every item will be collected")
             return []
         resolved = []
-        for name in self.config.whitelist:
-            if name == "*":
-                continue
-            path = os.path.join(self.config.templates_dir, f"{name}.png")
+        for name in config.whitelist:
+            path = os.path.join(config.templates_dir, f"{name}.png")
             if os.path.exists(path):
                 resolved.append(path)
-                print(f"[Loot] Whitelisted: {name}")
+                log.info(f"Whitelisted: {name}")
             else:
-                print(f"[Loot] WARNING: template not found: {path}")
-        if not resolved and not self._take_all:
-            print("[Loot] No valid whitelist templates – loot collection disabled")
+                log.warning(f"template not found: {path}")
+        if not resolved:
+            log.info("No valid whitelist templates – loot collection disabled")
         return resolved
 
+    def prepare_config(self, changes: Dict[str, Any]) -> Any:
+        new = changes.get("config")
+        if new is None or (new.whitelist == self.config.whitelist
+                           and new.templates_dir == self.config.templates_dir):
+            return None
+        templates = self._resolve_templates(new)
+        preload_templates(templates)    # decoded here, not on the first corpse
+        return "*" in new.whitelist, templates
+
+    def apply_config(self, changes: Dict[str, Any], prepared: Any) -> None:
+        if prepared is not None:
+            self._take_all, self._templates = prepared
+
     # ── surrounding tile positions ────────────────────────────────────────────
 
     def _surrounding_positions(self) -> List[Tuple[int, int]]:
@@ -76,74 +98,96 @@ class LootModule(BaseModule):
         ts = self.viewport.tile_size
         # Add a small random jitter to avoid pixel-perfect repeatability
         o = ts + randint(2, 8)
-        return [
-            (cx - o, cy),
-            (cx - o, cy + o),
-            (cx,     cy + o),
-            (cx + o, cy + o),
-            (cx + o, cy),
-            (cx + o, cy - o),
-            (cx,     cy - o),
-            (cx - o, cy - o),
-        ]
+        return [(cx + dx * o, cy + dy * o) for dx, dy in _SURROUNDING]
+
+    def _tile_position(self, dx: int, dy: int) -> Tuple[int, int]:
+        """Screen coordinates of the tile (dx, dy) away from the character."""
+        ts = self.viewport.tile_size
+        return (
+            self.viewport.center_x + dx * ts + randint(-4, 4),
+            self.viewport.center_y + dy * ts + randint(-4, 4),
+        )
+
+    def _loot_positions(self) -> Tuple[List[Tuple[int, int]], float]:
+        """Tiles to open, kill tile first, and the extra wait after opening
+        while the character walks to a distant corpse."""
+        positions = self._surrounding_positions()
+        offset = self.state.kill_offset
+        self.state.kill_offset = None
+        if offset is None or offset == (0, 0):
+            return positions, 0.0
+        dx, dy = offset
+        kill = self._tile_position(dx, dy)
+        distance = max(abs(dx), abs(dy))
+        if distance > 1:
+            return [kill], _WALK_SECONDS_PER_TILE * (distance - 1)
+        # Drop the surrounding tile the kill tile replaces
+        ordered = [p for p, o in zip(positions, _SURROUNDING) if o != offset]
+        return [kill] + ordered, 0.0
 
     # ── actions ──────────────────────────────────────────────────────────────
 
     def _open_tile(self, x: int, y: int) -> None:
         """Shift+right-click a tile to open a corpse or container on it."""
-        pyautogui.keyDown("shift")
-        pyautogui.click(x, y, button="right")
-        pyautogui.keyUp("shift")
+        inputs.key_down("shift")
+        inputs.click(x, y, "right")
+        inputs.key_up("shift")
 
     def _take_item(self, x: int, y: int) -> None:
         """Ctrl+click an item slot to move it to the default container."""
-        pyautogui.keyDown("ctrl")
-        pyautogui.click(x, y)
-        pyautogui.keyUp("ctrl")
+        inputs.key_down("ctrl")
+        inputs.click(x, y)
+        inputs.key_up("ctrl")
 
     def _find_whitelisted_items(self, frame) -> List[Tuple[int, int]]:
-        """Return (x, y) screen positions for all visible whitelisted items."""
+        """Return (x, y) screen positions for all visible whitelisted items.
+
+        Every instance of each template is returned, so a container holding
+        several stacks of the same item is emptied in one pass.  Hits are
+        ordered last slot first: taking an item shifts the slots after it, so
+        working backwards keeps the remaining positions valid.
+        """
         hits: List[Tuple[int, int]] = []
         for path in self._templates:
-            result = find_template(frame, path, threshold=0.90)
-            if result:
-                row, col = result
+            for row, col, _ in find_all_templates(frame, path, threshold=0.90):
                 hits.append((col, row))  # return as (x, y)
+        hits.sort(key=lambda p: (p[1], p[0]), reverse=True)
         return hits
 
     # ── main loop ─────────────────────────────────────────────────────────────
 
     async def run(self) -> None:
         if not self.config.enabled:
-            print("[Loot] Module disabled")
+            log.info("Module disabled")
             return
         if not self._take_all and not self._templates:
-            print("[Loot] Nothing to collect – module idle")
+            log.info("Nothing to collect – module idle")
             return
 
         await self._wait_for_frame()
 
         while self.state.running:
+            await self._pause_point()
             if not self.state.loot_pending:
                 await asyncio.sleep(0.1)
                 continue
 
-            print(f"[Loot] Waiting {self.config.delay_after_kill}s for corpse…")
+            log.info(f"Waiting {self.config.delay_after_kill}s for corpse…")
             self.state.looting_active = True
             await asyncio.sleep(self.config.delay_after_kill)
 
-            positions = self._surrounding_positions()
+            positions, walk = self._loot_positions()
 
             if self._take_all:
                 # Legacy mode: blindly shift+right-click every surrounding tile
                 for x, y in positions:
                     self._open_tile(x, y)
-                    await asyncio.sleep(0.06)
+                    await asyncio.sleep(0.06 + walk)
             else:
                 # Smart mode: open each tile, look for whitelisted items, take only those
                 for x, y in positions:
                     self._open_tile(x, y)
-                    await asyncio.sleep(0.35)  # let container window render
+                    await asyncio.sleep(0.35 + walk)  # let container window render
 
                     frame = self.screen.get_frame()
                     if frame is None:
@@ -151,17 +195,18 @@ class LootModule(BaseModule):
 
                     items = self._find_whitelisted_items(frame)
                     for item_x, item_y in items:
-                        print(f"[Loot] Taking item at ({item_x},{item_y})")
+                        log.info(f"Taking item at ({item_x},{item_y})")
                         self._take_item(item_x, item_y)
+                        telemetry.event("loot_item")
                         await asyncio.sleep(0.12)
 
                     # Close the container before opening the next one so
                     # windows don't stack up and obscure the game view.
-                    pyautogui.press("escape")
+                    inputs.press("escape")
                     await asyncio.sleep(0.1)
 
             self.state.loot_pending = False
             self.state.looting_active = False
-            print("[Loot] Done")
+            log.info("Done")
 
             await asyncio.sleep(0.1)
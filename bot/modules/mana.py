@@ -1,22 +1,27 @@
 """Mana monitoring and automatic recovery."""
 
 import asyncio
-import time
 from typing import Optional
 
-import pyautogui
-
+from bot import inputs, telemetry
 from bot.config import HealingConfig
+from bot.log import get_logger
 from bot.modules.base import BaseModule
 from bot.screen import ScreenCapture
 from bot.state import GameState
-from bot.vision import find_template, read_bar_percent
+from bot.vision import read_bar_percent
+
+log = get_logger("Mana")
 
 _MANA_COLOR_RGB = (101, 98, 240)
 _TEMPLATE = "images/mana.png"
 _OFFSET_X = 5
 _OFFSET_Y = 6
 _BAR_WIDTH = 92
+# Rows from the template match the flight recorder keeps (icon + bar)
+_REGION_HEIGHT = 12
+# Cooldown of mana_key unless the cooldown table lists it
+_FALLBACK_COOLDOWN = 1.0
 
 
 class ManaModule(BaseModule):
@@ -29,33 +34,36 @@ class ManaModule(BaseModule):
         self.config = config
         self._bar_x: Optional[int] = None
         self._bar_y: Optional[int] = None
-        self._last_use_at: float = 0.0
-        self._cooldown: float = 1.0
+        if config.mana_key:
+            state.cooldowns.register(config.mana_key, _FALLBACK_COOLDOWN, replace=False)
 
-    def _locate_bar(self, frame) -> bool:
-        pos = find_template(frame, _TEMPLATE)
+    def config_changed(self) -> None:
+        if self.config.mana_key:
+            self.state.cooldowns.register(self.config.mana_key, _FALLBACK_COOLDOWN, replace=False)
+
+    async def _locate_bar(self) -> bool:
+        (pos,) = await self._find_anchors(_TEMPLATE)
         if pos is None:
             return False
         self._bar_y = pos[0] + _OFFSET_Y
         self._bar_x = pos[1] + _OFFSET_X
+        self.state.set_region("mana", pos[1], pos[0], _OFFSET_X + _BAR_WIDTH, _REGION_HEIGHT)
         return True
 
     async def run(self) -> None:
         if not self.config.mana_key:
-            print("[Mana] No mana_key configured – module disabled")
+            log.info("No mana_key configured – module disabled")
             return
 
         await self._wait_for_frame()
 
-        while self._bar_x is None:
-            frame = self.screen.get_frame()
-            if frame is not None and self._locate_bar(frame):
-                print(f"[Mana] Bar located at x={self._bar_x} y={self._bar_y}")
-            else:
-                print("[Mana] Waiting for mana bar...")
+        while not await self._locate_bar():
+            log.info("Waiting for mana bar...")
             await asyncio.sleep(1.0)
+        log.info(f"Bar located at x={self._bar_x} y={self._bar_y}")
 
         while self.state.running:
+            await self._pause_point()
             frame = self.screen.get_frame()
             if frame is None:
                 await asyncio.sleep(0.05)
@@ -64,13 +72,11 @@ class ManaModule(BaseModule):
             mana = read_bar_percent(frame, self._bar_x, self._bar_y, _BAR_WIDTH, _MANA_COLOR_RGB)
             self.state.mana_percent = mana
 
-            now = time.monotonic()
-            if (
-                mana < self.config.mana_threshold
-                and (now - self._last_use_at) >= self._cooldown
-            ):
-                print(f"[Mana] {mana:.0f}% < {self.config.mana_threshold}% → {self.config.mana_key}")
-                pyautogui.press(self.config.mana_key)
-                self._last_use_at = now
+            key = self.config.mana_key
+            if mana < self.config.mana_threshold and self.state.cooldowns.ready(key):
+                log.info(f"{mana:.0f}% < {self.config.mana_threshold}% → {key}")
+                inputs.press(key)
+                telemetry.event("mana", mana)
+                self.state.cooldowns.use(key)
 
             await asyncio.sleep(0.05)
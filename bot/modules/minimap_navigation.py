@@ -7,26 +7,54 @@ How it works
 ------------
 1. At record time (record_minimap_waypoints.py), the user stands at each
    waypoint and presses INSERT.  A ``template_size × template_size`` greyscale
-   crop of the minimap is saved; the centre pixels (player dot) are blanked so
-   they don't interfere with matching.
-
-2. At run time the module continuously grabs the minimap, matches the *next*
-   waypoint's template inside the full minimap image, and reads the match
-   offset from minimap centre.  That offset tells us which direction to click
-   in the game viewport.
+   crop of the minimap is stored; the centre pixels (player dot) are blanked so
+   they don't interfere with matching.  The whole route is one bundle file
+   (``bot.route_bundle``) that is memory-mapped at start-up; legacy JSON + PNG
+   routes are still accepted and can be converted with
+   ``convert_minimap_route.py``.
+
+2. At run time the module continuously grabs the minimap, matches the next
+   ``lookahead`` waypoints' templates inside the full minimap image in one
+   batched frequency-domain pass (``bot.waypoint_matcher``), and reads the
+   match offset from minimap centre.  That offset tells us which direction to
+   click in the game viewport.  If a later waypoint is already within
+   ``arrival_px`` the ones before it are skipped; if the next waypoint is not
+   visible the module heads for the furthest visible one instead of waiting.
 
 3. Arrival: when the template matches within ``arrival_px`` pixels of minimap
    centre the waypoint is considered reached and the index advances.
 
-4. Stuck detection: if the minimap image does not change over ``stuck_timeout``
-   seconds the module skips the current target waypoint and tries the next one.
+4. Path planning (``minimap.pathfinding``): instead of clicking straight at
+   the target, the minimap colours are classified into a walkability grid
+   and A* (``bot.pathfinding``) plans around walls; each click goes to the
+   farthest on-screen path tile in line of sight.  In atlas mode the grid is
+   cached per floor, so routes can be planned beyond the live minimap.
+
+5. Stuck detection: phase-correlation odometry (``bot.minimap_odometry``)
+   measures how far the minimap scrolled each tick and feeds the motion
+   history in ``GameState``.  If the player stays within one tile for
+   ``stuck_timeout`` seconds the module skips the current target waypoint
+   and tries the next one.  The odometry runs even while combat has priority,
+   which gives the combat module a movement signal without OCR.
 
 Limitations
 -----------
-All waypoints must be within minimap view of each other simultaneously (i.e.
-their separation must be < (minimap_width - template_size) / 2 pixels).  For
-the default 86 × 40 configuration that is 23 minimap pixels ≈ 23 game tiles,
-which is enough for a typical small hunting area.
+Without an atlas, all waypoints must be within minimap view of each other
+simultaneously (i.e. their separation must be < (minimap_width -
+template_size) / 2 pixels).  For the default 86 × 40 configuration that is
+23 minimap pixels ≈ 23 game tiles, which is enough for a typical small
+hunting area.
+
+Atlas mode
+----------
+With ``minimap.atlas_dir`` set, every frame is stitched into a per-floor
+world mosaic (see ``bot.minimap_atlas``) and the player is localised against
+it each tick.  The localised position is published via
+``GameState.update_position``.  Each waypoint's atlas position is learned the
+first time its template is found (in the atlas or in the live minimap), after
+which it can be navigated to from anywhere – the route-length limit above no
+longer applies.  Route files may then also list waypoints directly as atlas
+coordinates, ``[x, y]``, instead of template snapshots.
 """
 
 import asyncio
@@ -34,22 +62,35 @@ import json
 import math
 import os
 import time
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
-import pyautogui
 
+from bot import flight_recorder, inputs, telemetry
 from bot.config import MinimapConfig, ViewportConfig
+from bot.log import get_logger
+from bot.minimap_atlas import MinimapAtlas
+from bot.minimap_odometry import MinimapOdometry
 from bot.modules.base import BaseModule
+from bot.pathfinding import PathPlanner, WalkabilityMap, classify, viewport_reach
+from bot.route_bundle import RouteBundleError, is_bundle, load_bundle
 from bot.screen import ScreenCapture
-from bot.state import GameState
+from bot.state import GameState, Position
+from bot.waypoint_matcher import WaypointMatcher
+
+log = get_logger("MinimapNav")
 
 
 # Confidence below which a template match is considered "not visible"
 _MIN_CONFIDENCE = 0.65
 # Radius of player-dot mask blanked from every template (pixels)
 _DOT_RADIUS = 4
+# Minimap pixels (≈ tiles) the player must move to count as "not stuck"
+_STUCK_DISTANCE = 1.0
+
+# Waypoint templates (None: atlas coordinate), atlas positions, matcher
+Route = Tuple[List[Optional[np.ndarray]], List[Optional[Tuple[int, int]]], WaypointMatcher]
 
 
 class MinimapNavigationModule(BaseModule):
@@ -64,39 +105,157 @@ class MinimapNavigationModule(BaseModule):
         super().__init__(screen, state)
         self.config   = config
         self.viewport = viewport
-        self._templates: List[np.ndarray] = []
+        # One entry per waypoint; None for waypoints given as atlas coordinates
+        self._templates: List[Optional[np.ndarray]] = []
+        # Atlas (x, y) of each waypoint, learned lazily in atlas mode
+        self._wp_atlas: List[Optional[Tuple[int, int]]] = []
+        self._atlas: Optional[MinimapAtlas] = None
+        if config.atlas_dir:
+            self._atlas = MinimapAtlas(
+                config.atlas_dir, config.atlas_size, config.atlas_search_radius
+            )
+        self._atlas_pos: Optional[Tuple[int, int]] = None
+        self._planner: Optional[PathPlanner] = None
+        self._walkable: Optional[WalkabilityMap] = None
+        if config.pathfinding:
+            self._planner = PathPlanner(viewport_reach(viewport))
+            if self._atlas is not None:
+                self._walkable = WalkabilityMap(self._atlas.size, self._atlas)
+        self._matcher: Optional[WaypointMatcher] = None
         self._wp_idx: int = 0
-        self._last_minimap: Optional[np.ndarray] = None
+        self._odometry = MinimapOdometry()
         self._stuck_since: float = 0.0
         self._last_move_at: float = 0.0
 
     # ── template loading ──────────────────────────────────────────────────────
 
     def _load_templates(self) -> bool:
-        path = self.config.waypoints_file
-        if not path:
-            print("[MinimapNav] No waypoints_file configured")
+        route = self._load_route(self.config)
+        if route is None:
             return False
+        self._templates, self._wp_atlas, self._matcher = route
+        log.info(f"Loaded {len(self._templates)} waypoints")
+        if self._atlas is not None:
+            self._resolve_atlas_waypoints()
+        return True
+
+    def _load_route(self, config: MinimapConfig) -> Optional[Route]:
+        """Waypoint templates, atlas positions and matcher of the route in
+        ``config.waypoints_file``; None if there is none."""
+        path = config.waypoints_file
+        if not path:
+            log.info("No waypoints_file configured")
+            return None
         if not os.path.exists(path):
-            print(f"[MinimapNav] waypoints_file not found: {path}")
-            return False
+            log.info(f"waypoints_file not found: {path}")
+            return None
 
+        if is_bundle(path):
+            templates, wp_atlas = self._load_bundle(path, config)
+        else:
+            templates, wp_atlas = self._load_json_route(path)
+
+        if not templates:
+            log.info("No valid templates loaded")
+            return None
+        matcher = WaypointMatcher(templates, (config.height, config.width), _MIN_CONFIDENCE)
+        return templates, wp_atlas, matcher
+
+    def _load_bundle(self, path: str, config: MinimapConfig) -> Tuple[list, list]:
+        """Memory-map a route bundle written by record_minimap_waypoints.py."""
+        templates: List[Optional[np.ndarray]] = []
+        wp_atlas: List[Optional[Tuple[int, int]]] = []
+        try:
+            bundle = load_bundle(path)
+        except RouteBundleError as e:
+            log.error(str(e))
+            return templates, wp_atlas
+        c = config
+        recorded = bundle.minimap
+        live = {"width": c.width, "height": c.height, "template_size": c.template_size}
+        for key, value in live.items():
+            if key in recorded and recorded[key] != value:
+                log.warning(f"route recorded with minimap {key}="
+                            f"{recorded[key]}, config has {value}")
+        for tmpl, atlas_pos in zip(bundle.templates, bundle.atlas):
+            if tmpl is None and self._atlas is None:
+                log.warning(f"coordinate waypoint {list(atlas_pos)} "
+                            f"needs minimap.atlas_dir – skipped")
+                continue
+            templates.append(tmpl)
+            wp_atlas.append(atlas_pos)
+        return templates, wp_atlas
+
+    def _load_json_route(self, path: str) -> Tuple[list, list]:
+        """Load a legacy JSON route (one PNG per waypoint)."""
+        templates: List[Optional[np.ndarray]] = []
+        wp_atlas: List[Optional[Tuple[int, int]]] = []
         with open(path) as f:
             data = json.load(f)
 
-        for img_path in data.get("waypoints", []):
-            tmpl = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+        for entry in data.get("waypoints", []):
+            if isinstance(entry, (list, tuple)):
+                # Atlas coordinate waypoint: [x, y] or [x, y, z]
+                if self._atlas is None:
+                    log.warning(f"coordinate waypoint {entry} "
+                                f"needs minimap.atlas_dir – skipped")
+                    continue
+                templates.append(None)
+                wp_atlas.append((int(entry[0]), int(entry[1])))
+                continue
+            tmpl = cv2.imread(entry, cv2.IMREAD_GRAYSCALE)
             if tmpl is None:
-                print(f"[MinimapNav] WARNING: could not load template {img_path}")
+                log.warning(f"could not load template {entry}")
                 continue
-            self._templates.append(tmpl)
-
-        if not self._templates:
-            print("[MinimapNav] No valid templates loaded")
-            return False
-
-        print(f"[MinimapNav] Loaded {len(self._templates)} waypoint templates")
-        return True
+            templates.append(tmpl)
+            wp_atlas.append(None)
+        return templates, wp_atlas
+
+    def _resolve_atlas_waypoints(self) -> None:
+        """Look up every template waypoint in the stored atlas once."""
+        found = 0
+        for i, tmpl in enumerate(self._templates):
+            if tmpl is None or self._wp_atlas[i] is not None:
+                continue
+            hit = self._atlas.locate_template(tmpl, self.config.floor)
+            if hit is not None:
+                self._wp_atlas[i] = (hit[0], hit[1])
+                found += 1
+        known = sum(p is not None for p in self._wp_atlas)
+        log.info(f"Atlas: {known}/{len(self._wp_atlas)} waypoints "
+                 f"located ({found} from stored mosaic)")
+
+    # ── config reload ─────────────────────────────────────────────────────────
+
+    def prepare_config(self, changes: Dict[str, Any]) -> Any:
+        new = changes.get("config")
+        if new is None:
+            return None
+        old = self.config
+        if all(getattr(new, k) == getattr(old, k)
+               for k in ("waypoints_file", "width", "height", "template_size")):
+            return None
+        route = self._load_route(new)
+        if route is None:
+            raise ValueError(f"minimap route {new.waypoints_file!r} could not be loaded")
+        # Same route file: carry on from the waypoint reached
+        return route, new.waypoints_file == old.waypoints_file
+
+    def apply_config(self, changes: Dict[str, Any], prepared: Any) -> None:
+        if prepared is None:
+            return
+        route, same_route = prepared
+        templates, wp_atlas, matcher = route
+        if same_route and len(wp_atlas) == len(self._wp_atlas):
+            # Keep the atlas positions learned so far
+            wp_atlas = [new or old for new, old in zip(wp_atlas, self._wp_atlas)]
+        # Otherwise atlas positions of template waypoints are learned again as
+        # they are seen (looking them up in the mosaic here would block the loop)
+        self._templates, self._wp_atlas, self._matcher = templates, wp_atlas, matcher
+        self._wp_idx = self._wp_idx % len(templates) if same_route else 0
+        self._stuck_since = time.monotonic()
+        log.info(f"Route reloaded – {len(self._templates)} waypoints, "
+                 f"last reached {self._wp_idx}")
 
     # ── minimap capture ───────────────────────────────────────────────────────
 
@@ -105,104 +264,222 @@ class MinimapNavigationModule(BaseModule):
         roi = frame[c.y : c.y + c.height, c.x : c.x + c.width]
         if roi.shape[0] < 10 or roi.shape[1] < 10:
             return None
-        gray = cv2.cvtColor(roi[:, :, :3], cv2.COLOR_BGR2GRAY)
-        return gray
-
-    # ── template matching ─────────────────────────────────────────────────────
-
-    def _find_template(
-        self, minimap: np.ndarray, template: np.ndarray
-    ) -> Optional[Tuple[int, int, float]]:
-        """Match *template* in *minimap*.
-
-        Returns ``(dx, dy, confidence)`` where ``(dx, dy)`` is the pixel
-        offset from minimap centre to the matched template centre, or ``None``
-        if the match confidence is below threshold.
-        """
-        th, tw = template.shape[:2]
-        mh, mw = minimap.shape[:2]
-        if mh < th or mw < tw:
-            return None
+        return roi[:, :, :3]
 
-        result = cv2.matchTemplate(minimap, template, cv2.TM_CCORR_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    # ── atlas localisation ────────────────────────────────────────────────────
 
-        if max_val < _MIN_CONFIDENCE:
+    def _localize(self, minimap_bgr: np.ndarray) -> None:
+        """Localise against the atlas, stitch the frame in, publish position."""
+        z = self.config.floor
+        fix = self._atlas.localize(minimap_bgr, z, self._atlas_pos)
+        if fix is None:
+            self._atlas_pos = None
+            return
+        x, y, conf = fix
+        self._atlas.integrate(minimap_bgr, z, x, y)
+        if self._walkable is not None:
+            self._walkable.integrate(minimap_bgr, z, x, y)
+        self._atlas_pos = (x, y)
+        self.state.update_position(Position(x=x, y=y, z=z), conf)
+
+    def _learn_atlas_position(self, idx: int, match: Tuple[int, int, float]) -> None:
+        """Record waypoint *idx*'s atlas position from a live minimap match."""
+        if self._atlas_pos is None or self._wp_atlas[idx] is not None:
+            return
+        dx, dy, _ = match
+        self._wp_atlas[idx] = (self._atlas_pos[0] + dx, self._atlas_pos[1] + dy)
+        log.info(f"Waypoint {idx} located in atlas at {self._wp_atlas[idx]}")
+
+    def _atlas_offset(self, idx: int) -> Optional[Tuple[int, int, float]]:
+        """Offset to waypoint *idx* from its learned atlas position, if known."""
+        wp = self._wp_atlas[idx]
+        if wp is None or self._atlas_pos is None:
             return None
+        return wp[0] - self._atlas_pos[0], wp[1] - self._atlas_pos[1], 1.0
 
-        # Centre of the matched region
-        match_cx = max_loc[0] + tw // 2
-        match_cy = max_loc[1] + th // 2
+    # ── template matching ─────────────────────────────────────────────────────
 
-        # Player is at minimap centre
-        player_cx = mw // 2
-        player_cy = mh // 2
+    def _match_lookahead(
+        self, minimap: np.ndarray
+    ) -> List[Tuple[int, Optional[Tuple[int, int, float]]]]:
+        """Match the next ``lookahead`` waypoints in one batched pass.
 
-        return match_cx - player_cx, match_cy - player_cy, max_val
+        Returns ``(waypoint index, (dx, dy, confidence) or None)`` in route
+        order, where ``(dx, dy)`` is the pixel offset from minimap centre to
+        the matched template centre.
+        """
+        n = len(self._templates)
+        k = max(1, min(self.config.lookahead, n - 1))
+        indices = [(self._wp_idx + 1 + i) % n for i in range(k)]
+        matches = self._matcher.match(minimap, indices)
+        for idx, m in zip(indices, matches):
+            if m is not None:
+                self._learn_atlas_position(idx, m)
+        return list(zip(indices, matches))
+
+    def _beyond_target(
+        self, window: List[Tuple[int, Optional[Tuple[int, int, float]]]]
+    ) -> List[Tuple[int, Optional[Tuple[int, int, float]]]]:
+        """The window past the next waypoint, up to the end of the route.
+
+        Never skip across the end of the route: on a looping route the first
+        waypoints are often right next to the last ones.
+        """
+        ahead = []
+        for idx, m in window[1:]:
+            if idx <= self._wp_idx:
+                break
+            ahead.append((idx, m))
+        return ahead
 
     # ── movement ──────────────────────────────────────────────────────────────
 
-    def _click_toward(self, dx: int, dy: int) -> None:
-        """Click the game viewport 3 tiles in the direction (dx, dy)."""
-        dist = math.hypot(dx, dy)
-        if dist < 1:
-            return
-        nx, ny = dx / dist, dy / dist
-        tiles = 3
-        cx = self.viewport.center_x + int(nx * self.viewport.tile_size * tiles)
-        cy = self.viewport.center_y + int(ny * self.viewport.tile_size * tiles)
+    def _plan_step(
+        self, dx: int, dy: int, minimap_bgr: np.ndarray
+    ) -> Optional[Tuple[int, int]]:
+        """Tile offset of the farthest on-path click toward (dx, dy), if any.
+
+        Plans on the cached atlas floor grid when localised, otherwise on the
+        live minimap alone.  Runs in a worker thread: an A* search can take
+        tens of milliseconds, and the whole expansion budget when the target
+        is unreachable.
+        """
+        if self._planner is None:
+            return None
+        if self._walkable is not None and self._atlas_pos is not None:
+            grid = self._walkable.floor(self.config.floor)
+            sx, sy = self._atlas_pos
+        else:
+            grid = classify(minimap_bgr)
+            sx, sy = grid.shape[1] // 2, grid.shape[0] // 2
+        return self._planner.next_click(grid, (sx, sy), (sx + dx, sy + dy))
+
+    async def _click_toward(self, dx: int, dy: int, minimap_bgr: np.ndarray) -> None:
+        """Click the next on-path tile toward (dx, dy).
+
+        Without a path (planner disabled, or no route found on the minimap)
+        falls back to clicking 3 tiles straight toward the target and leaving
+        the rest to the game's pathfinder.
+        """
+        step = await asyncio.to_thread(self._plan_step, dx, dy, minimap_bgr)
+        if step is not None:
+            cx = self.viewport.center_x + step[0] * self.viewport.tile_size
+            cy = self.viewport.center_y + step[1] * self.viewport.tile_size
+        else:
+            dist = math.hypot(dx, dy)
+            if dist < 1:
+                return
+            nx, ny = dx / dist, dy / dist
+            tiles = 3
+            cx = self.viewport.center_x + int(nx * self.viewport.tile_size * tiles)
+            cy = self.viewport.center_y + int(ny * self.viewport.tile_size * tiles)
         # Clamp to viewport
         cx = max(self.viewport.left + self.viewport.tile_size,
                  min(self.viewport.left + self.viewport.width  - self.viewport.tile_size, cx))
         cy = max(self.viewport.top  + self.viewport.tile_size,
                  min(self.viewport.top  + self.viewport.height - self.viewport.tile_size, cy))
-        pyautogui.click(cx, cy)
+        inputs.click(cx, cy)
 
-    # ── stuck detection ───────────────────────────────────────────────────────
+    def skip_waypoint(self) -> int:
+        """Give up the waypoint being walked to; returns the next one."""
+        self._wp_idx = (self._wp_idx + 1) % max(1, len(self._templates))
+        self._stuck_since = time.monotonic()
+        target = (self._wp_idx + 1) % max(1, len(self._templates))
+        log.info(f"Waypoint {self._wp_idx} skipped – heading to {target}")
+        return target
 
-    def _minimap_moved(self, current: np.ndarray) -> bool:
-        """Return True if the minimap has changed since last check."""
-        if self._last_minimap is None:
-            return True
-        diff = cv2.absdiff(current, self._last_minimap)
-        return float(diff.mean()) > 0.8
+    # ── odometry ──────────────────────────────────────────────────────────────
+
+    def _track_motion(self, minimap: np.ndarray) -> None:
+        """Feed the odometry into the shared motion history."""
+        step = self._odometry.update(minimap)
+        if step is None:
+            return
+        dx, dy, _ = step
+        self.state.update_odometry(dx, dy)
 
     # ── main loop ─────────────────────────────────────────────────────────────
 
     async def run(self) -> None:
         if not self._load_templates():
-            print("[MinimapNav] Module idle – no valid waypoint templates")
+            log.info("Module idle – no valid waypoint templates")
             return
 
         await self._wait_for_frame()
+        if self._walkable is not None:
+            # Classifying a whole floor takes tens of milliseconds
+            await asyncio.to_thread(self._walkable.floor, self.config.floor)
         self._stuck_since = time.monotonic()
-        print(f"[MinimapNav] Started – {len(self._templates)} waypoints, "
-              f"arrival threshold={self.config.arrival_px}px")
+        log.info(f"Started – {len(self._templates)} waypoints, "
+                 f"arrival threshold={self.config.arrival_px}px")
 
-        while self.state.running:
+        try:
+            await self._navigate()
+        finally:
+            if self._atlas is not None:
+                self._atlas.flush()
 
-            # Let combat and looting take priority
-            if self.state.enemy_in_battle_list or self.state.looting_active:
-                await asyncio.sleep(0.15)
-                continue
+    async def _navigate(self) -> None:
+        while self.state.running:
+            await self._pause_point()
 
             frame = self.screen.get_frame()
             if frame is None:
                 await asyncio.sleep(0.1)
                 continue
 
-            minimap = self._get_minimap(frame)
-            if minimap is None:
+            minimap_bgr = self._get_minimap(frame)
+            if minimap_bgr is None:
                 await asyncio.sleep(0.1)
                 continue
 
+            # Keep odometry and position fresh even while combat has priority,
+            # so the combat module's stuck detection sees real movement.
+            minimap = cv2.cvtColor(minimap_bgr, cv2.COLOR_BGR2GRAY)
+            now = time.monotonic()
+            self._track_motion(minimap)
+            if self._atlas is not None:
+                self._localize(minimap_bgr)
+
+            # Let combat and looting take priority
+            if self.state.enemy_in_battle_list or self.state.looting_active:
+                self._stuck_since = now  # standing still to fight is not stuck
+                await asyncio.sleep(0.15)
+                continue
+
             # ── which waypoint are we heading toward? ────────────────────────
-            target_idx = (self._wp_idx + 1) % len(self._templates)
-            template   = self._templates[target_idx]
-            result     = self._find_template(minimap, template)
+            window = self._match_lookahead(minimap)
+
+            # Already standing on a later waypoint → we passed the ones before
+            ahead = self._beyond_target(window)
+            target_match = window[0][1]
+            target_dist = math.hypot(*target_match[:2]) if target_match else math.inf
+            passed = None
+            for idx, m in ahead:
+                if m is None:
+                    continue
+                d = math.hypot(m[0], m[1])
+                if d <= self.config.arrival_px and d < target_dist:
+                    passed = idx
+            if passed is not None:
+                log.info(f"Already at waypoint {passed} – skipping ahead")
+                self._wp_idx      = passed
+                self._stuck_since = now
+                await asyncio.sleep(0.3)
+                continue
+
+            target_idx, result = window[0]
+            if result is None:
+                result = self._atlas_offset(target_idx)
+            if result is None:
+                # Next waypoint not visible: head for the furthest one that is
+                for idx, m in reversed(ahead):
+                    if m is not None:
+                        target_idx, result = idx, m
+                        break
 
             if result is None:
-                # Target not visible in current minimap; wait and retry
+                # No waypoint in the look-ahead window is visible; wait and retry
                 await asyncio.sleep(self.config.move_interval)
                 continue
 
@@ -211,35 +488,34 @@ class MinimapNavigationModule(BaseModule):
 
             # ── arrival check ────────────────────────────────────────────────
             if dist <= self.config.arrival_px:
-                print(f"[MinimapNav] Reached waypoint {target_idx} "
-                      f"(conf={conf:.2f}, dist={dist:.1f}px)")
+                log.info(f"Reached waypoint {target_idx} "
+                         f"(conf={conf:.2f}, dist={dist:.1f}px)")
+                telemetry.event("waypoint", target_idx)
                 self._wp_idx      = target_idx
                 self._stuck_since = time.monotonic()
-                self._last_minimap = None
                 await asyncio.sleep(0.3)
                 continue
 
             # ── stuck detection ──────────────────────────────────────────────
-            now = time.monotonic()
-            if self._minimap_moved(minimap):
-                self._stuck_since = now
-            elif now - self._stuck_since > self.config.stuck_timeout:
-                print(f"[MinimapNav] Stuck for {self.config.stuck_timeout}s "
-                      f"– skipping to waypoint {target_idx}")
+            # _stuck_since only restarts the clock (new target, after combat)
+            stuck = min(now - self._stuck_since,
+                        self.state.stationary_seconds(_STUCK_DISTANCE))
+            if stuck > self.config.stuck_timeout:
+                log.info(f"Stuck for {self.config.stuck_timeout}s "
+                         f"– skipping to waypoint {target_idx}")
+                flight_recorder.trigger("stuck", f"walking to waypoint {target_idx}")
+                telemetry.event("stuck", stuck)
                 self._wp_idx      = target_idx
                 self._stuck_since = now
-                self._last_minimap = None
                 await asyncio.sleep(0.3)
                 continue
 
-            self._last_minimap = minimap.copy()
-
             # ── navigate ─────────────────────────────────────────────────────
             if now - self._last_move_at >= self.config.move_interval:
                 if dist > self.config.arrival_px + 2:
-                    print(f"[MinimapNav] WP {target_idx} "
-                          f"Δ=({dx:+d},{dy:+d}) dist={dist:.0f}px conf={conf:.2f}")
-                self._click_toward(dx, dy)
+                    log.debug(f"WP {target_idx} "
+                              f"Δ=({dx:+d},{dy:+d}) dist={dist:.0f}px conf={conf:.2f}")
+                await self._click_toward(dx, dy, minimap_bgr)
                 self._last_move_at = now
 
             await asyncio.sleep(0.1)
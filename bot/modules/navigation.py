@@ -3,15 +3,22 @@
 Instead of template-matching minimap screenshots (which require a new
 screenshot per location and break on zoom/resolution changes), this module:
 
-1. Reads the current world position (X, Y, Z) from the on-screen coordinate
-   display via OCR.
+1. Tracks the current world position (X, Y, Z) with a position estimator
+   (``bot.position_estimator``): minimap odometry and issued clicks dead-reckon
+   between absolute fixes read from the on-screen coordinate display via
+   OCR.  OCR only runs when the estimate's uncertainty grows, the floor may
+   have changed, a waypoint arrival needs confirming or the last fix is old –
+   a few reads per minute instead of ten per second.
 2. Compares to the next target waypoint (stored as a plain coordinate tuple
    in bot_config.yaml).
 3. Navigates by clicking directly in the game viewport at the screen position
    that corresponds to the target tile.
 
-The game's built-in pathfinder handles obstacles for short distances.
-For longer distances the module clicks repeatedly, moving closer each time.
+With ``minimap.pathfinding`` enabled the click target is planned with A* on
+the live minimap's colours (``bot.pathfinding``), so walls and corners are
+walked around instead of clicked into.  Otherwise the game's built-in
+pathfinder handles obstacles for short distances.  For longer distances the
+module clicks repeatedly, moving closer each time.
 
 Yielding to other modules
 -------------------------
@@ -22,16 +29,33 @@ briefly and retries – combat and looting always take priority.
 
 import asyncio
 import time
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-import pyautogui
+import cv2
+import numpy as np
 
-from bot.config import CoordDisplayConfig, NavigationConfig, ViewportConfig
+from bot import inputs, telemetry
+from bot.config import CoordDisplayConfig, MinimapConfig, NavigationConfig, ViewportConfig
+from bot.log import get_logger
+from bot.minimap_odometry import MinimapOdometry
 from bot.modules.base import BaseModule
+from bot.pathfinding import PathPlanner, classify, viewport_reach
+from bot.position_estimator import PositionEstimator
 from bot.screen import ScreenCapture
 from bot.state import GameState, Position
 from bot.vision import ocr_available, read_coordinates_ocr
 
+log = get_logger("Navigation")
+
+# Estimated arrival only counts once the estimate is at least this certain
+# (tiles); otherwise an OCR fix is requested first
+_ARRIVAL_SIGMA = 1.0
+# Seconds between OCR-rate log lines
+_STATS_INTERVAL = 60.0
+# Waypoints within this many tiles of a blacklisted (unreachable) spot are
+# skipped while the blacklist entry lasts
+_UNREACHABLE_RADIUS = 3
+
 
 class NavigationModule(BaseModule):
 
@@ -42,8 +66,10 @@ class NavigationModule(BaseModule):
         nav_cfg: NavigationConfig,
         viewport: ViewportConfig,
         coord_cfg: CoordDisplayConfig,
+        minimap_cfg: Optional[MinimapConfig] = None,
     ) -> None:
         super().__init__(screen, state)
+        self.config = nav_cfg
         self.waypoints: List[Tuple[int, int, int]] = nav_cfg.waypoints
         self.tolerance: int = nav_cfg.waypoint_tolerance
         self.move_interval: float = nav_cfg.move_interval
@@ -51,10 +77,39 @@ class NavigationModule(BaseModule):
         self.coord_cfg = coord_cfg
         self._last_move_at: float = 0.0
         self._ocr_failures: int = 0
+        self.minimap_cfg = minimap_cfg
+        self._estimator = PositionEstimator(
+            max_sigma=nav_cfg.ocr_max_uncertainty,
+            max_fix_age=nav_cfg.ocr_max_interval,
+        )
+        self._odometry = MinimapOdometry()
+        self._stats_at: float = 0.0
+        self._planner: Optional[PathPlanner] = None
+        if minimap_cfg is not None and minimap_cfg.pathfinding:
+            self._planner = PathPlanner(viewport_reach(viewport))
+
+    def prepare_config(self, changes: Dict[str, Any]) -> Any:
+        new = changes.get("config")
+        if new is not None and self.waypoints and not new.waypoints:
+            raise ValueError("navigation.waypoints can't be emptied while the bot runs")
+        return None
+
+    def config_changed(self) -> None:
+        cfg = self.config
+        if cfg.waypoints != self.waypoints:
+            if self.state.waypoint_index >= len(cfg.waypoints):
+                self.state.waypoint_index = 0
+            log.info(f"{len(cfg.waypoints)} waypoints loaded – "
+                     f"heading to {self.state.waypoint_index + 1}")
+        self.waypoints = cfg.waypoints
+        self.tolerance = cfg.waypoint_tolerance
+        self.move_interval = cfg.move_interval
+        self._estimator.max_sigma = cfg.ocr_max_uncertainty
+        self._estimator.max_fix_age = cfg.ocr_max_interval
 
     # ── position reading ─────────────────────────────────────────────────────
 
-    def _read_position(self) -> Optional[Position]:
+    async def _read_position(self) -> Optional[Position]:
         """OCR the minimap coordinate area and return a Position or None."""
         roi = self.screen.get_roi(
             self.coord_cfg.x,
@@ -64,26 +119,92 @@ class NavigationModule(BaseModule):
         )
         if roi is None:
             return None
-        result = read_coordinates_ocr(roi)
+        # Tesseract takes tens of milliseconds – keep it off the event loop
+        result = await asyncio.to_thread(read_coordinates_ocr, roi)
         if result:
             self._ocr_failures = 0
             return Position(x=result[0], y=result[1], z=result[2])
         self._ocr_failures += 1
         return None
 
+    def _get_minimap(self) -> Optional[np.ndarray]:
+        """BGR minimap region, or None if it is not configured / visible."""
+        mm = self.minimap_cfg
+        if mm is None:
+            return None
+        roi = self.screen.get_roi(mm.x, mm.y, mm.width, mm.height)
+        if roi is None or roi.shape[:2] != (mm.height, mm.width):
+            return None
+        return roi[:, :, :3]
+
+    def _track_motion(self) -> None:
+        """Dead-reckon from minimap odometry (cheap – runs every tick)."""
+        minimap = self._get_minimap()
+        if minimap is None:
+            return
+        step = self._odometry.update(cv2.cvtColor(minimap, cv2.COLOR_BGR2GRAY))
+        if step is None:
+            # First frame, or the minimap was redrawn (floor change, covered)
+            self._estimator.odometry_lost()
+            return
+        dx, dy, _ = step
+        self._estimator.odometry(dx, dy)
+        self.state.update_odometry(dx, dy)
+
+    async def _update_estimate(self) -> Tuple[Optional[Position], float]:
+        """Take an OCR fix if the estimator wants one; return the estimate."""
+        if self._estimator.needs_fix():
+            fix = await self._read_position()
+            if fix is not None:
+                self._estimator.correct(fix)
+            else:
+                self._estimator.fix_failed()
+                if self._ocr_failures % 20 == 1:
+                    log.info(
+                        f"OCR failed {self._ocr_failures}× – "
+                        "check coord_display region in bot_config.yaml"
+                    )
+
+        now = time.monotonic()
+        if now - self._stats_at >= _STATS_INTERVAL:
+            if self._stats_at:
+                est = self._estimator
+                log.info(f"OCR reads last minute: {est.attempts} "
+                         f"({est.fixes} ok), sigma={est.sigma:.2f} tiles")
+                est.attempts = est.fixes = 0
+            self._stats_at = now
+
+        return self._estimator.estimate()
+
     # ── movement ─────────────────────────────────────────────────────────────
 
+    def _plan_step(self, dx: int, dy: int) -> Optional[Tuple[int, int]]:
+        """Farthest on-path tile toward (dx, dy) planned on the live minimap."""
+        if self._planner is None:
+            return None
+        minimap = self._get_minimap()
+        if minimap is None:
+            return None
+        mm = self.minimap_cfg
+        grid = classify(minimap)
+        cx, cy = mm.width // 2, mm.height // 2
+        return self._planner.next_click(grid, (cx, cy), (cx + dx, cy + dy))
+
     def _click_toward(self, current: Position, target: Tuple[int, int, int]) -> None:
         """Click the game viewport at the tile closest to *target*.
 
         The viewport is centred on the character.  One tile = tile_size pixels.
-        Movement is clamped to the visible area so we always click a reachable
-        tile; the game pathfinder bridges the remaining distance on the next
-        click.
+        With path planning the click goes to the farthest on-path tile in line
+        of sight; otherwise movement is clamped to the visible area so we
+        always click a reachable tile, and the game pathfinder bridges the
+        remaining distance on the next click.
         """
         vp = self.viewport
         dx = target[0] - current.x
         dy = target[1] - current.y
+        step = self._plan_step(dx, dy)
+        if step is not None:
+            dx, dy = step
 
         # How many tiles fit from centre to edge (leave 1 tile margin)
         half_x = (vp.width  // vp.tile_size) // 2 - 1
@@ -99,58 +220,80 @@ class NavigationModule(BaseModule):
         click_x = max(vp.left + vp.tile_size, min(vp.left + vp.width  - vp.tile_size, click_x))
         click_y = max(vp.top  + vp.tile_size, min(vp.top  + vp.height - vp.tile_size, click_y))
 
-        pyautogui.click(click_x, click_y)
+        inputs.click(click_x, click_y)
+        self._estimator.click(dx, dy)
+
+    def _blacklisted(self, wp: Tuple[int, int, int]) -> bool:
+        return self.state.is_unreachable(Position(*wp), _UNREACHABLE_RADIUS)
+
+    def skip_waypoint(self) -> int:
+        """Give up the current waypoint; returns the new one (1-based)."""
+        prev = self.state.waypoint_index
+        self.state.waypoint_index = (prev + 1) % max(1, len(self.waypoints))
+        log.info(f"Waypoint {prev + 1} skipped – moving to {self.state.waypoint_index + 1}")
+        return self.state.waypoint_index + 1
 
     # ── main loop ────────────────────────────────────────────────────────────
 
     async def run(self) -> None:
         if not self.waypoints:
-            print("[Navigation] No waypoints configured – module idle")
+            log.info("No waypoints configured – module idle")
             return
 
         if not ocr_available():
-            print(
-                "[Navigation] pytesseract not installed – coordinate reading disabled.\n"
+            log.warning(
+                "pytesseract not installed – coordinate reading disabled.\n"
                 "  Install with: pip install pytesseract  (and Tesseract-OCR)"
             )
             return
 
         await self._wait_for_frame()
-        print(f"[Navigation] {len(self.waypoints)} waypoints loaded")
+        log.info(f"{len(self.waypoints)} waypoints loaded")
 
         while self.state.running:
+            await self._pause_point()
+            # Keep dead reckoning running while other modules have priority
+            self._track_motion()
+
             # ── yield to higher-priority modules ────────────────────────────
             if self.state.enemy_in_battle_list or self.state.looting_active:
                 await asyncio.sleep(0.15)
                 continue
 
-            # ── read current position ────────────────────────────────────────
-            pos = self._read_position()
-            if pos is not None:
-                self.state.update_position(pos)
-            else:
-                if self._ocr_failures % 20 == 1:
-                    print(
-                        f"[Navigation] OCR failed {self._ocr_failures}× – "
-                        "check coord_display region in bot_config.yaml"
-                    )
-                if self.state.position_stale(max_age=5.0):
-                    await asyncio.sleep(0.2)
-                    continue
-                pos = self.state.position  # use last known
+            # ── estimate current position ────────────────────────────────────
+            pos, confidence = await self._update_estimate()
+            if pos is None or self._estimator.sigma > 2 * self._estimator.max_sigma:
+                # No fix yet, or dead reckoning drifted too far to walk on
+                await asyncio.sleep(0.2)
+                continue
+            self.state.update_position(pos, confidence)
 
-            # ── check if target waypoint reached ────────────────────────────
+            # ── skip waypoints next to blacklisted spots ─────────────────────
             target = self.waypoints[self.state.waypoint_index]
+            if self._blacklisted(target) and not all(map(self._blacklisted, self.waypoints)):
+                prev = self.state.waypoint_index
+                self.state.waypoint_index = (prev + 1) % len(self.waypoints)
+                log.info(f"Waypoint {prev + 1} is near an unreachable "
+                         f"area – skipping to {self.state.waypoint_index + 1}")
+                continue
+
+            # ── check if target waypoint reached ────────────────────────────
             dx = abs(pos.x - target[0])
             dy = abs(pos.y - target[1])
 
             if dx <= self.tolerance and dy <= self.tolerance and pos.z == target[2]:
+                if self._estimator.sigma > _ARRIVAL_SIGMA:
+                    # Confirm with OCR before advancing on a drifted estimate
+                    self._estimator.request_fix()
+                    await asyncio.sleep(0.1)
+                    continue
                 prev = self.state.waypoint_index
                 self.state.waypoint_index = (prev + 1) % len(self.waypoints)
-                print(
-                    f"[Navigation] Waypoint {prev + 1}/{len(self.waypoints)} reached "
+                log.info(
+                    f"Waypoint {prev + 1}/{len(self.waypoints)} reached "
                     f"→ moving to {self.state.waypoint_index + 1}"
                 )
+                telemetry.event("waypoint", prev)
                 await asyncio.sleep(0.3)
                 continue
 
@@ -158,8 +301,8 @@ class NavigationModule(BaseModule):
             now = time.monotonic()
             if now - self._last_move_at >= self.move_interval:
                 if dx > 2 or dy > 2:
-                    print(
-                        f"[Navigation] WP {self.state.waypoint_index + 1} "
+                    log.debug(
+                        f"WP {self.state.waypoint_index + 1} "
                         f"({target[0]},{target[1]}) "
                         f"curr=({pos.x},{pos.y}) Δ=({dx},{dy})"
                     )
@@ -0,0 +1,114 @@
+"""Scheduled spell / item rotation.
+
+Each ``rotation.spells`` entry is cast every ``every`` seconds (or whenever
+its key is ready, with ``every: 0``) while its condition holds:
+
+* ``attacking`` – a battle-list entry is targeted (attack spells),
+* ``enemy``     – anything is in the battle list,
+* ``always``    – e.g. haste, magic shield, food.
+
+Entries wait on a :class:`bot.cooldowns.TimingWheel` instead of being
+polled: an entry comes due, is cast or deferred (condition false, too little
+mana, key cooling down – then exactly until it is ready), and is put back on
+the wheel.  Casts go through ``GameState.cooldowns``, so a rotation spell
+sharing a group with a heal delays the heal and vice versa, as in the client.
+Entries that come due together are tried least recently cast first, so
+spells sharing a group take turns instead of the first one starving the rest.
+"""
+
+import asyncio
+import math
+import time
+from typing import Dict
+
+from bot import inputs, telemetry
+from bot.config import RotationConfig, RotationSpell
+from bot.cooldowns import TimingWheel
+from bot.log import get_logger
+from bot.modules.base import BaseModule
+from bot.screen import ScreenCapture
+from bot.state import GameState
+
+log = get_logger("Rotation")
+
+_TICK = 0.05
+# Seconds before an entry whose condition was false is looked at again
+_RECHECK = 0.25
+# Cooldown of a rotation key unless the cooldown table lists it (Tibia's
+# attack / support spell group cooldown)
+_FALLBACK_COOLDOWN = 2.0
+_CONDITIONS = ("attacking", "enemy", "always")
+
+
+class RotationModule(BaseModule):
+
+    def __init__(
+        self, screen: ScreenCapture, state: GameState, config: RotationConfig
+    ) -> None:
+        super().__init__(screen, state)
+        self.config = config
+        self._wheel: TimingWheel[RotationSpell] = TimingWheel(_TICK)
+        self._cast_at: Dict[str, float] = {}
+        self._started = False
+        self._register()
+
+    def _register(self) -> None:
+        for spell in self.config.spells:
+            if spell.when not in _CONDITIONS:
+                log.info(f"Unknown condition {spell.when!r} for {spell.key} – "
+                         f"expected one of {', '.join(_CONDITIONS)}")
+            self.state.cooldowns.register(spell.key, _FALLBACK_COOLDOWN, replace=False)
+
+    def config_changed(self) -> None:
+        self._register()
+        if not self._started:
+            return
+        # Fresh wheel; entries cast before keep their interval
+        self._wheel = TimingWheel(_TICK)
+        now = time.monotonic()
+        for spell in self.config.spells:
+            last = self._cast_at.get(spell.key, -math.inf)
+            self._wheel.schedule(spell, max(now, last + spell.every))
+
+    def _wanted(self, spell: RotationSpell) -> bool:
+        if self.state.looting_active:
+            return False
+        if spell.when == "attacking":
+            return self.state.currently_attacking
+        if spell.when == "enemy":
+            return self.state.enemy_in_battle_list
+        return spell.when == "always"
+
+    def _cast_or_defer(self, spell: RotationSpell, now: float) -> float:
+        """Cast *spell* if it may go now; returns when it is next due."""
+        if not self._wanted(spell) or self.state.mana_percent < spell.min_mana:
+            return now + _RECHECK
+        cooldowns = self.state.cooldowns
+        if not cooldowns.ready(spell.key, now):
+            return now + cooldowns.remaining(spell.key, now)
+        log.info(f"{spell.key} ({spell.when})")
+        inputs.press(spell.key)
+        telemetry.event("spell")
+        cooldowns.use(spell.key, now)
+        self._cast_at[spell.key] = now
+        return now + max(spell.every, cooldowns.remaining(spell.key, now))
+
+    async def run(self) -> None:
+        if not self.config.spells:
+            log.info("No spells configured – module idle")
+            return
+
+        await self._wait_for_frame()
+        self._started = True
+        now = time.monotonic()
+        for spell in self.config.spells:
+            self._wheel.schedule(spell, now)
+
+        while self.state.running:
+            await self._pause_point()
+            now = time.monotonic()
+            due = self._wheel.advance(now)
+            due.sort(key=lambda sp: self._cast_at.get(sp.key, -math.inf))
+            for spell in due:
+                self._wheel.schedule(spell, self._cast_or_defer(spell, now))
+            await asyncio.sleep(_TICK)
@@ -0,0 +1,304 @@
+"""Walkability grid and A* path planning on minimap colours.
+
+Both navigation modules used to click straight toward the target and leave
+the rest to the game's pathfinder, re-clicking every ``move_interval``.  At
+walls and around corners that wastes clicks and trips the stuck timeouts.
+This module plans the route itself:
+
+1. Every minimap pixel is classified by colour into a one-byte grid cell –
+   unknown, walkable, blocked or stairs (floor change).
+2. A* searches that grid from the player to the target.
+3. The click goes to the *farthest* path point that is both on screen and in
+   straight line of sight from the player, so every click walks the longest
+   valid segment of the route.
+
+Colours
+-------
+The Tibia client draws the minimap with a 6 × 6 × 6 colour cube (channel
+levels 0, 51, …, 255).  Pixels are snapped to the nearest cube colour and
+looked up in a 216-entry table.  Black is unexplored terrain and stays
+"unknown"; A* may cross unknown cells at a higher cost, which matters at the
+edge of the minimap and in not-yet-stitched parts of the atlas.
+
+Coordinates
+-----------
+At the default minimap zoom one pixel is one tile, so grid offsets are tile
+offsets.  Grids are indexed ``grid[y, x]``; points are ``(x, y)`` tuples.
+"""
+
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bot.config import ViewportConfig
+
+UNKNOWN = 0
+WALKABLE = 1
+BLOCKED = 2
+STAIRS = 3
+
+# Minimap colours (r, g, b) that cannot be walked on
+_BLOCKING_COLOURS = (
+    (0, 102, 0),        # trees, bushes
+    (51, 0, 204),       # water
+    (102, 102, 102),    # mountains, rocks
+    (153, 51, 0),       # cave walls
+    (255, 51, 0),       # walls
+    (255, 102, 0),      # lava
+)
+# Ladders, stairs, holes and ramps – walking onto them changes the floor
+_STAIRS_COLOURS = (
+    (255, 255, 0),
+)
+
+# Tibia makes diagonal steps far slower than straight ones; at 2 or more a
+# diagonal is never cheaper than two straight steps, so the Manhattan
+# distance stays an admissible heuristic.
+_DIAGONAL_COST = 3.0
+# Cells searched before giving up on a path (bounds the worst case)
+_MAX_EXPANSIONS = 40_000
+# Largest grid side searched at once (larger grids, i.e. atlas floors, are
+# cropped around the player); goals farther away are pulled back toward it
+_MAX_WINDOW = 256
+# Minimum room kept around a pulled-back goal for detours inside the window
+_WINDOW_MARGIN = 32
+
+
+def _build_tables() -> Tuple[np.ndarray, np.ndarray]:
+    # Channel value → nearest cube level (0-5); cube index = 36·r + 6·g + b
+    level = ((np.arange(256) + 25) // 51).astype(np.uint8)
+    classes = np.full(216, WALKABLE, dtype=np.uint8)
+    classes[0] = UNKNOWN
+    for colours, cls in ((_BLOCKING_COLOURS, BLOCKED), (_STAIRS_COLOURS, STAIRS)):
+        for r, g, b in colours:
+            classes[(r // 51) * 36 + (g // 51) * 6 + b // 51] = cls
+    return level, classes
+
+
+_LEVEL, _CLASSES = _build_tables()
+
+
+def classify(minimap: np.ndarray) -> np.ndarray:
+    """Classify a BGR minimap (or atlas region) into a uint8 walkability grid."""
+    q = _LEVEL[minimap[:, :, :3]]
+    idx = q[:, :, 2] * 36 + q[:, :, 1] * 6 + q[:, :, 0]
+    return _CLASSES[idx]
+
+
+# ── per-floor cache ──────────────────────────────────────────────────────────
+
+class WalkabilityMap:
+    """Per-floor walkability grids in atlas coordinates.
+
+    A floor's grid is built once from the stored atlas mosaic the first time
+    it is needed and then kept current by :meth:`integrate`, so planning
+    never re-classifies the mosaic.  Building a large floor takes tens of
+    milliseconds; callers on the event loop build it in a worker thread.
+    """
+
+    def __init__(self, size: int, atlas=None) -> None:
+        self.size = size
+        self._atlas = atlas
+        self._floors: Dict[int, np.ndarray] = {}
+
+    def floor(self, z: int) -> np.ndarray:
+        grid = self._floors.get(z)
+        if grid is None:
+            grid = np.zeros((self.size, self.size), dtype=np.uint8)
+            covered = self._atlas.region(z) if self._atlas is not None else None
+            if covered is not None:
+                mosaic, (x0, y0) = covered
+                h, w = mosaic.shape[:2]
+                grid[y0 : y0 + h, x0 : x0 + w] = classify(np.asarray(mosaic))
+            self._floors[z] = grid
+        return grid
+
+    def integrate(self, minimap: np.ndarray, z: int, x: int, y: int) -> None:
+        """Write the classified *minimap*, centred at atlas (x, y), into floor *z*.
+
+        Unlike the atlas itself the latest observation wins, so opened doors
+        and similar changes show up on the next plan.  Floors not built yet
+        are left alone: the mosaic they are built from holds the frame too.
+        """
+        if z not in self._floors:
+            return
+        h, w = minimap.shape[:2]
+        x0, y0 = x - w // 2, y - h // 2
+        if x0 < 0 or y0 < 0 or x0 + w > self.size or y0 + h > self.size:
+            return
+        cells = classify(minimap)
+        region = self.floor(z)[y0 : y0 + h, x0 : x0 + w]
+        np.copyto(region, cells, where=cells != UNKNOWN)
+
+
+# ── search ───────────────────────────────────────────────────────────────────
+
+def find_path(
+    grid: np.ndarray,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    unknown_cost: float = 2.0,
+    max_expansions: int = _MAX_EXPANSIONS,
+) -> Optional[List[Tuple[int, int]]]:
+    """A* from *start* to *goal* on an 8-connected grid.
+
+    Blocked and stairs cells are impassable except as the goal itself;
+    diagonal steps may not cut past a blocked corner.  Returns the path as
+    ``(x, y)`` points from start to goal, or None if the goal is unreachable
+    within *max_expansions* cells.
+    """
+    h, w = grid.shape
+    # One-cell blocked border removes all bounds checks from the inner loop
+    W = w + 2
+    padded = np.full((h + 2, W), BLOCKED, dtype=np.uint8)
+    padded[1:-1, 1:-1] = grid
+    s = (start[1] + 1) * W + start[0] + 1
+    g = (goal[1] + 1) * W + goal[0] + 1
+    padded.flat[g] = WALKABLE
+    # Per-cell step cost; 0 marks impassable cells
+    cost = np.array([unknown_cost, 1.0, 0.0, 0.0])[padded].ravel().tolist()
+    gx, gy = goal[0] + 1, goal[1] + 1
+
+    straight = ((-1, 0, 0), (1, 0, 0), (-W, 0, 0), (W, 0, 0))
+    # Diagonal offset plus the two straight cells it must not cut past
+    diagonal = ((-W - 1, -W, -1), (-W + 1, -W, 1), (W - 1, W, -1), (W + 1, W, 1))
+
+    n = len(cost)
+    best = [math.inf] * n
+    parent = [-1] * n
+    closed = bytearray(n)
+    best[s] = 0.0
+    heap = [(0.0, 0, s)]
+    expansions = 0
+    while heap:
+        _, _, cur = heapq.heappop(heap)
+        if cur == g:
+            break
+        if closed[cur]:
+            continue
+        closed[cur] = 1
+        expansions += 1
+        if expansions > max_expansions:
+            return None
+        base = best[cur]
+        for offsets, step in ((straight, 1.0), (diagonal, _DIAGONAL_COST)):
+            for d, c1, c2 in offsets:
+                nxt = cur + d
+                c = cost[nxt]
+                if not c or closed[nxt]:
+                    continue
+                if c1 and not (cost[cur + c1] and cost[cur + c2]):
+                    continue
+                new = base + step * c
+                if new < best[nxt]:
+                    best[nxt] = new
+                    parent[nxt] = cur
+                    hx = abs(nxt % W - gx) + abs(nxt // W - gy)
+                    heapq.heappush(heap, (new + hx, hx, nxt))
+    else:
+        return None
+
+    path = []
+    cur = g
+    while cur != s:
+        path.append((cur % W - 1, cur // W - 1))
+        cur = parent[cur]
+    path.append((start[0], start[1]))
+    path.reverse()
+    return path
+
+
+def line_clear(grid: np.ndarray, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+    """True if no blocked or stairs cell lies on the straight line a → b."""
+    n = max(abs(b[0] - a[0]), abs(b[1] - a[1])) + 1
+    xs = np.rint(np.linspace(a[0], b[0], n)).astype(np.intp)
+    ys = np.rint(np.linspace(a[1], b[1], n)).astype(np.intp)
+    return bool((grid[ys[1:-1], xs[1:-1]] < BLOCKED).all())
+
+
+def click_point(
+    grid: np.ndarray, path: List[Tuple[int, int]], reach: Tuple[int, int]
+) -> Tuple[int, int]:
+    """Farthest point on *path* within *reach* (x, y tiles) and line of sight."""
+    sx, sy = path[0]
+    rx, ry = reach
+    for p in reversed(path[1:]):
+        if abs(p[0] - sx) <= rx and abs(p[1] - sy) <= ry and line_clear(grid, path[0], p):
+            return p
+    return path[min(1, len(path) - 1)]
+
+
+# ── planner ──────────────────────────────────────────────────────────────────
+
+def viewport_reach(vp: ViewportConfig) -> Tuple[int, int]:
+    """Tiles from the character to the nearest viewport edge, minus one."""
+    rx = min(vp.center_x - vp.left, vp.left + vp.width - vp.center_x) // vp.tile_size - 1
+    ry = min(vp.center_y - vp.top, vp.top + vp.height - vp.center_y) // vp.tile_size - 1
+    return max(1, rx), max(1, ry)
+
+
+class PathPlanner:
+    """Turns "go to (dx, dy)" into the best single click offset.
+
+    Usage::
+
+        planner = PathPlanner(reach=(12, 9))
+        step = planner.next_click(classify(minimap_bgr), centre, target)
+        # → (dx, dy) tiles from the player to click, or None (no path)
+    """
+
+    def __init__(self, reach: Tuple[int, int], unknown_cost: float = 2.0) -> None:
+        self.reach = reach
+        self.unknown_cost = unknown_cost
+
+    def next_click(
+        self,
+        grid: np.ndarray,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+    ) -> Optional[Tuple[int, int]]:
+        """Plan from *start* to *goal* (grid coordinates) and pick the click.
+
+        Grids larger than ``_MAX_WINDOW`` (a whole atlas floor) are cropped
+        to a window centred between start and goal; a goal beyond the window
+        or outside the grid is pulled back toward the player.
+        """
+        h, w = grid.shape
+        if not (0 <= start[0] < w and 0 <= start[1] < h):
+            return None
+        gx, gy = _clamp_toward(start, goal, _MAX_WINDOW - 2 * _WINDOW_MARGIN)
+
+        x0, x1 = _window_span(start[0], gx, w)
+        y0, y1 = _window_span(start[1], gy, h)
+        gx = max(x0, min(x1 - 1, gx))
+        gy = max(y0, min(y1 - 1, gy))
+        window = grid[y0:y1, x0:x1]
+
+        path = find_path(
+            window, (start[0] - x0, start[1] - y0), (gx - x0, gy - y0), self.unknown_cost
+        )
+        if path is None or len(path) < 2:
+            return None
+        px, py = click_point(window, path, self.reach)
+        return px + x0 - start[0], py + y0 - start[1]
+
+
+def _clamp_toward(
+    start: Tuple[int, int], goal: Tuple[int, int], limit: int
+) -> Tuple[int, int]:
+    dx, dy = goal[0] - start[0], goal[1] - start[1]
+    far = max(abs(dx), abs(dy))
+    if far <= limit:
+        return goal
+    scale = limit / far
+    return start[0] + int(round(dx * scale)), start[1] + int(round(dy * scale))
+
+
+def _window_span(a: int, b: int, size: int) -> Tuple[int, int]:
+    """``_MAX_WINDOW``-wide span of [0, size) centred between a and b."""
+    if size <= _MAX_WINDOW:
+        return 0, size
+    lo = min(max(0, (a + b) // 2 - _MAX_WINDOW // 2), size - _MAX_WINDOW)
+    return lo, lo + _MAX_WINDOW
@@ -0,0 +1,194 @@
+"""Dead-reckoned position estimate with sparse absolute OCR fixes.
+
+Reading the X, Y, Z display with Tesseract is the most expensive thing the
+bot does, and it fails often.  Between OCR reads the position is tracked by
+dead reckoning instead:
+
+* **Minimap odometry** (``bot.minimap_odometry``) gives the actual motion
+  every tick with sub-tile precision.
+* **Issued clicks** give the commanded motion.  It is only used when the
+  odometry has gone quiet (minimap covered, region not calibrated), walking
+  the remaining click distance at ``walk_speed`` tiles per second.
+
+Uncertainty
+-----------
+The estimate carries a standard deviation ``sigma`` in tiles.  An OCR fix
+resets it to ``_FIX_SIGMA``; every tile of dead reckoning adds a fraction of
+a tile (far more for click reckoning than for odometry).  Growing linearly
+rather than with the square root is deliberately pessimistic: odometry
+errors are partly systematic (sub-pixel bias), not independent.
+
+When to read OCR
+----------------
+:meth:`PositionEstimator.needs_fix` asks for a fix only when
+
+* there has never been one,
+* ``sigma`` exceeded ``max_sigma``,
+* the floor may have changed (the odometry lost track of the minimap),
+* the caller requested one (e.g. to confirm arrival at a waypoint), or
+* the last fix is older than ``max_fix_age``.
+
+Reads are at least ``_MIN_FIX_INTERVAL`` apart, and failed reads back off
+exponentially, so a broken OCR setup cannot spin the CPU.
+"""
+
+import math
+import time
+from typing import Optional, Tuple
+
+from bot.state import Position
+
+# Sigma (tiles) right after an OCR fix – coordinates are exact, the moment
+# they were captured at is not
+_FIX_SIGMA = 0.5
+# Sigma added per tile of odometry / click dead reckoning
+_ODOMETRY_DRIFT = 0.05
+_CLICK_DRIFT = 0.3
+# Seconds without an odometry step before clicks take over dead reckoning
+_ODOMETRY_TIMEOUT = 0.5
+# Bounds of the interval between OCR attempts (backoff after failures)
+_MIN_FIX_INTERVAL = 0.5
+_MAX_FIX_BACKOFF = 5.0
+
+
+class PositionEstimator:
+    """Fuses odometry, clicks and OCR fixes into one position estimate.
+
+    Usage::
+
+        est = PositionEstimator()
+        est.odometry(dx, dy)                 # every tick
+        est.click(dx, dy)                    # after every navigation click
+        if est.needs_fix():
+            pos = read_ocr()
+            est.correct(pos) if pos else est.fix_failed()
+        pos, confidence = est.estimate()
+    """
+
+    def __init__(
+        self,
+        max_sigma: float = 1.5,
+        max_fix_age: float = 15.0,
+        walk_speed: float = 3.0,
+    ) -> None:
+        self.max_sigma = max_sigma
+        self.max_fix_age = max_fix_age
+        self.walk_speed = walk_speed
+
+        self.x: float = 0.0
+        self.y: float = 0.0
+        self.z: int = 0
+        self.sigma: float = math.inf
+
+        self._fix_at: float = 0.0
+        self._attempt_at: float = 0.0
+        self._backoff: float = _MIN_FIX_INTERVAL
+        self._fix_wanted: bool = True
+        self._odometry_at: float = 0.0
+        self._reckoned_at: float = 0.0
+        # Click displacement (tiles) not yet accounted for by observed motion
+        self._pending: Tuple[float, float] = (0.0, 0.0)
+        # Statistics for the OCR-rate log line
+        self.fixes: int = 0
+        self.attempts: int = 0
+
+    @property
+    def has_fix(self) -> bool:
+        return math.isfinite(self.sigma)
+
+    # ── dead reckoning ───────────────────────────────────────────────────────
+
+    def odometry(self, dx: float, dy: float) -> None:
+        """Apply one minimap odometry step of (dx, dy) tiles."""
+        now = time.monotonic()
+        self.x += dx
+        self.y += dy
+        self.sigma += _ODOMETRY_DRIFT * math.hypot(dx, dy)
+        self._odometry_at = now
+        # Observed motion uses up the commanded motion it fulfils
+        px, py = self._pending
+        self._pending = (_consume(px, dx), _consume(py, dy))
+
+    def odometry_lost(self) -> None:
+        """The minimap changed beyond recognition – possibly a floor change."""
+        self._fix_wanted = True
+
+    def click(self, dx: int, dy: int) -> None:
+        """Record a navigation click (dx, dy) tiles away from the estimate."""
+        self._pending = (float(dx), float(dy))
+        self._reckoned_at = time.monotonic()
+
+    def _reckon_clicks(self, now: float) -> None:
+        if now - self._odometry_at < _ODOMETRY_TIMEOUT:
+            self._reckoned_at = now
+            return
+        px, py = self._pending
+        left = math.hypot(px, py)
+        if left < 1e-3:
+            return
+        step = min(left, self.walk_speed * max(0.0, now - self._reckoned_at))
+        self._reckoned_at = now
+        if step <= 0.0:
+            return
+        fx, fy = px * step / left, py * step / left
+        self.x += fx
+        self.y += fy
+        self.sigma += _CLICK_DRIFT * step
+        self._pending = (px - fx, py - fy)
+
+    # ── absolute fixes ───────────────────────────────────────────────────────
+
+    def request_fix(self) -> None:
+        """Ask for an OCR read at the next opportunity."""
+        self._fix_wanted = True
+
+    def needs_fix(self) -> bool:
+        now = time.monotonic()
+        if now - self._attempt_at < self._backoff:
+            return False
+        return (
+            self._fix_wanted
+            or self.sigma > self.max_sigma
+            or now - self._fix_at > self.max_fix_age
+        )
+
+    def correct(self, pos: Position) -> None:
+        """Apply an absolute position read (OCR)."""
+        now = time.monotonic()
+        self.x, self.y, self.z = float(pos.x), float(pos.y), pos.z
+        self.sigma = _FIX_SIGMA
+        self._pending = (0.0, 0.0)
+        self._fix_at = now
+        self._attempt_at = now
+        self._backoff = _MIN_FIX_INTERVAL
+        self._fix_wanted = False
+        self.fixes += 1
+        self.attempts += 1
+
+    def fix_failed(self) -> None:
+        self._attempt_at = time.monotonic()
+        self._backoff = min(_MAX_FIX_BACKOFF, self._backoff * 2)
+        self.attempts += 1
+
+    # ── output ───────────────────────────────────────────────────────────────
+
+    def estimate(self) -> Tuple[Optional[Position], float]:
+        """Current ``(Position, confidence)``; ``(None, 0.0)`` before any fix.
+
+        Confidence is ``1 / (1 + sigma)``: 0.67 right after a fix, 0.4 at the
+        default ``max_sigma``.
+        """
+        self._reckon_clicks(time.monotonic())
+        if not self.has_fix:
+            return None, 0.0
+        pos = Position(x=int(round(self.x)), y=int(round(self.y)), z=self.z)
+        return pos, 1.0 / (1.0 + self.sigma)
+
+
+def _consume(pending: float, moved: float) -> float:
+    """Reduce one axis of pending click motion by motion in the same direction."""
+    if pending * moved <= 0.0:
+        return pending
+    if abs(moved) >= abs(pending):
+        return 0.0
+    return pending - moved
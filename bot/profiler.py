@@ -0,0 +1,271 @@
+"""Per-module tick profiler and event-loop lag monitor.
+
+All modules share one asyncio loop, so whatever a module does between two
+``await``\\ s blocks every other module.  With ``python -m bot.main
+--profile`` the bot measures that directly:
+
+* **Slices** – each module's ``run()`` coroutine is driven through a thin
+  wrapper that times every ``send`` into it: one slice is the synchronous
+  work from one resumption to the next suspension.  Wall time
+  (``perf_counter``) and CPU time (``thread_time`` – the loop thread only,
+  not the capture thread) are kept per module in a ring buffer.
+* **Offenders** – the longest slices of the run, with the module and the
+  ``await`` each one ended at (the innermost suspended coroutine frame).
+* **Loop lag** – a probe task sleeps a fixed interval and records how late
+  it wakes up: the delay every module's ``asyncio.sleep`` suffers.
+* **Calls** – functions decorated with :func:`timed` (``find_template``,
+  OCR, input actions) count their calls and time when a profiler is active;
+  otherwise the decorator costs one global lookup.
+
+Every ``interval`` seconds a summary of the last interval (p50 / p95 / max
+per module, loop lag, calls, worst offenders so far) is printed and the same
+numbers are written as JSON to the stats file.
+"""
+
+import asyncio
+import functools
+import heapq
+import json
+import os
+import threading
+import time
+from collections.abc import Coroutine
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from bot.ring_buffer import RingBuffer
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Samples kept per series (slices per module, lag probes, calls per name)
+_CAPACITY = 8192
+_LAG_INTERVAL = 0.1
+_TOP_OFFENDERS = 10
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+_active: Optional["Profiler"] = None
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Count and time calls of the decorated function under *name* while a
+    profiler is active."""
+    def wrap(fn: F) -> F:
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.record_call(name, time.perf_counter() - t0)
+        return inner  # type: ignore[return-value]
+    return wrap
+
+
+def _where(coro: Any) -> str:
+    """``file:line`` of the innermost coroutine *coro* is suspended in,
+    skipping asyncio's own (``asyncio.sleep`` is a coroutine too)."""
+    loc = "finished"
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None)
+        if frame is None:
+            break
+        path = frame.f_code.co_filename
+        if _ASYNCIO_DIR not in path:
+            loc = f"{os.path.basename(path)}:{frame.f_lineno}"
+        coro = getattr(coro, "cr_await", None)
+    return loc
+
+
+def _stats(values: np.ndarray) -> Dict[str, float]:
+    if not len(values):
+        return {"n": 0}
+    p50, p95 = np.percentile(values, (50, 95))
+    return {
+        "n": int(len(values)),
+        "p50_ms": round(float(p50) * 1e3, 3),
+        "p95_ms": round(float(p95) * 1e3, 3),
+        "max_ms": round(float(values.max()) * 1e3, 3),
+        "total_s": round(float(values.sum()), 4),
+    }
+
+
+class _ProfiledCoroutine(Coroutine):
+    """Forwards ``send`` / ``throw`` to *coro*, timing each one."""
+
+    def __init__(self, coro: Coroutine, name: str, profiler: "Profiler") -> None:
+        self._coro = coro
+        self._name = name
+        self._profiler = profiler
+
+    def _step(self, fn: Callable, *args):
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            return fn(*args)
+        finally:
+            self._profiler.record_slice(
+                self._name, time.perf_counter() - t0, time.thread_time() - c0, self._coro
+            )
+
+    def send(self, value):
+        return self._step(self._coro.send, value)
+
+    def throw(self, *args):
+        return self._step(self._coro.throw, *args)
+
+    def close(self) -> None:
+        self._coro.close()
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+
+class Profiler:
+    """Collects slice times, loop lag and call counts.
+
+    Usage::
+
+        profiler = Profiler()
+        profiler.install()                       # enables @timed counters
+        task = asyncio.create_task(profiler.wrap("Health", module.run()))
+        asyncio.create_task(profiler.lag_probe())
+        asyncio.create_task(profiler.report(30.0, "profile_stats.json"))
+    """
+
+    def __init__(self, lag_interval: float = _LAG_INTERVAL, top: int = _TOP_OFFENDERS) -> None:
+        self.lag_interval = lag_interval
+        self.top = top
+        self.started_at = time.monotonic()
+        self._slices: Dict[str, RingBuffer] = {}     # (t, wall, cpu)
+        self._calls: Dict[str, RingBuffer] = {}      # (t, seconds)
+        # @timed functions also run in worker threads (asyncio.to_thread)
+        self._calls_lock = threading.Lock()
+        self._lag = RingBuffer(_CAPACITY, columns=2)  # (t, seconds late)
+        # Min-heap of the longest slices: (wall, t, module, location)
+        self._offenders: List[Tuple[float, float, str, str]] = []
+
+    def install(self) -> None:
+        global _active
+        _active = self
+
+    def uninstall(self) -> None:
+        global _active
+        if _active is self:
+            _active = None
+
+    # ── recording ────────────────────────────────────────────────────────────
+
+    def wrap(self, name: str, coro: Coroutine) -> Coroutine:
+        """*coro* with every slice recorded under *name*."""
+        self._slices.setdefault(name, RingBuffer(_CAPACITY, columns=3))
+        return _ProfiledCoroutine(coro, name, self)
+
+    def record_slice(self, name: str, wall: float, cpu: float, coro: Any = None) -> None:
+        now = time.monotonic()
+        self._slices[name].append(now, wall, cpu)
+        heap = self._offenders
+        if len(heap) < self.top or wall > heap[0][0]:
+            entry = (wall, now, name, _where(coro))
+            if len(heap) < self.top:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heapreplace(heap, entry)
+
+    def record_call(self, name: str, seconds: float) -> None:
+        now = time.monotonic()
+        with self._calls_lock:
+            buf = self._calls.get(name)
+            if buf is None:
+                buf = self._calls[name] = RingBuffer(_CAPACITY, columns=2)
+            buf.append(now, seconds)
+
+    async def lag_probe(self) -> None:
+        """Sleep ``lag_interval`` forever, recording how late each wake-up is."""
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            self._lag.append(time.monotonic(), max(0.0, loop.time() - t0 - self.lag_interval))
+
+    # ── reporting ────────────────────────────────────────────────────────────
+
+    def summary(self, since: Optional[float] = None) -> Dict[str, Any]:
+        """Stats of the samples since *since* (default: all kept)."""
+        since = self.started_at if since is None else since
+        now = time.monotonic()
+        span = max(1e-9, now - since)
+        modules = {}
+        for name, buf in self._slices.items():
+            rows = buf.since(since)
+            s = _stats(rows[:, 1])
+            s["cpu_s"] = round(float(rows[:, 2].sum()), 4)
+            s["busy_pct"] = round(100.0 * float(rows[:, 1].sum()) / span, 2)
+            modules[name] = s
+        with self._calls_lock:
+            call_rows = {name: buf.since(since)[:, 1].copy() for name, buf in self._calls.items()}
+        calls = {name: _stats(rows) for name, rows in call_rows.items()}
+        return {
+            "elapsed_s": round(now - self.started_at, 1),
+            "window_s": round(span, 1),
+            "modules": modules,
+            "loop_lag": _stats(self._lag.since(since)[:, 1]),
+            "calls": calls,
+            "offenders": [
+                {"module": name, "ms": round(wall * 1e3, 3), "at": loc,
+                 "t_s": round(t - self.started_at, 1)}
+                for wall, t, name, loc in sorted(self._offenders, reverse=True)
+            ],
+        }
+
+    @staticmethod
+    def format(stats: Dict[str, Any]) -> str:
+        def row(label: str, s: Dict[str, float], extra: str = "") -> str:
+            if not s.get("n"):
+                return f"  {label:<24} {'–':>7}"
+            return (f"  {label:<24} {s['n']:>7}  {s['p50_ms']:8.2f}  {s['p95_ms']:8.2f}  "
+                    f"{s['max_ms']:8.2f}{extra}")
+
+        lines = [
+            f"[Profile] last {stats['window_s']:.0f}s (run {stats['elapsed_s']:.0f}s)",
+            f"  {'':<24} {'n':>7}  {'p50 ms':>8}  {'p95 ms':>8}  {'max ms':>8}",
+        ]
+        for name, s in sorted(stats["modules"].items()):
+            extra = f"  cpu {s['cpu_s']:.2f}s  busy {s['busy_pct']:.1f}%" if s.get("n") else ""
+            lines.append(row(name, s, extra))
+        lines.append(row("loop lag", stats["loop_lag"]))
+        for name, s in sorted(stats["calls"].items()):
+            lines.append(row(f"call {name}", s))
+        if stats["offenders"]:
+            lines.append("  worst slices:")
+            for o in stats["offenders"][:5]:
+                lines.append(f"    {o['ms']:8.2f} ms  {o['module']:<24} at {o['at']}  "
+                             f"(t={o['t_s']}s)")
+        return "\n".join(lines)
+
+    def write(self, path: str, stats: Dict[str, Any]) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp, path)
+
+    async def report(self, interval: float, path: Optional[str] = None) -> None:
+        """Print (and write to *path*) a summary every *interval* seconds."""
+        since = self.started_at
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            stats = self.summary(since)
+            since = now
+            print(self.format(stats))
+            if path:
+                self.write(path, stats)
@@ -0,0 +1,159 @@
+"""Fixed-capacity numpy ring buffers for timestamped samples.
+
+Appends are O(1) (one row write, no shifting or reallocation) and queries
+run vectorised over the stored rows, so a buffer can hold minutes of
+history at a few kilobytes per thousand samples.
+
+:class:`RingBuffer` stores rows of ``float64`` columns, the first of which is
+always a ``time.monotonic()`` timestamp.  :class:`TrackHistory` adds motion
+queries for ``(t, x, y, z)`` position tracks.
+
+Neither class locks; :class:`bot.state.GameState` guards its buffers with its
+own lock.
+"""
+
+import math
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of ``(timestamp, value, …)`` rows.
+
+    Usage::
+
+        buf = RingBuffer(1024, columns=2)
+        buf.append(time.monotonic(), hp)
+        recent = buf.since(time.monotonic() - 5.0)   # (n, 2) array, oldest first
+    """
+
+    def __init__(self, capacity: int, columns: int) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self._data = np.zeros((capacity, columns), dtype=np.float64)
+        self._next = 0      # row written by the next append
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, *row: float) -> None:
+        self._data[self._next] = row
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
+
+    def last(self) -> Optional[np.ndarray]:
+        """Newest row (a view), or None when empty."""
+        if not self._size:
+            return None
+        return self._data[self._next - 1]
+
+    def array(self) -> np.ndarray:
+        """All rows, oldest first (a view unless the buffer has wrapped)."""
+        if self._size < self.capacity:
+            return self._data[: self._size]
+        if self._next == 0:
+            return self._data
+        return np.concatenate((self._data[self._next :], self._data[: self._next]))
+
+    def since(self, t0: float, anchor: bool = False) -> np.ndarray:
+        """Rows with timestamp ``>= t0``, oldest first.
+
+        With *anchor* the newest row older than *t0* is included too, so
+        differences over the window start from where things stood at *t0*.
+        Only the matching tail is copied, found by binary search on each of
+        the (at most two) contiguous segments.
+        """
+        if not self._size:
+            return self._data[:0]
+        if self._size < self.capacity or self._next == 0:
+            rows = self._data[: self._size]
+            i = int(np.searchsorted(rows[:, 0], t0, side="left"))
+            return rows[max(0, i - 1) if anchor else i :]
+
+        older, newer = self._data[self._next :], self._data[: self._next]
+        if newer[0, 0] >= t0:
+            # Window starts in the older segment
+            i = int(np.searchsorted(older[:, 0], t0, side="left"))
+            if anchor:
+                i = max(0, i - 1)
+            return np.concatenate((older[i:], newer))
+        i = int(np.searchsorted(newer[:, 0], t0, side="left"))
+        if anchor and i == 0:
+            return np.concatenate((older[-1:], newer))
+        return newer[max(0, i - 1) if anchor else i :]
+
+
+class TrackHistory(RingBuffer):
+    """Ring buffer of ``(t, x, y, z)`` positions with motion queries.
+
+    Positions are in tiles; *z* is the floor.  All window queries take a
+    duration in seconds ending now.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity, columns=4)
+
+    def add(self, x: float, y: float, z: float = 0.0, t: Optional[float] = None) -> None:
+        self.append(time.monotonic() if t is None else t, x, y, z)
+
+    def window(self, seconds: float) -> np.ndarray:
+        """Samples of the last *seconds*, anchored at the position before."""
+        return self.since(time.monotonic() - seconds, anchor=True)
+
+    def displacement(self, seconds: float) -> Tuple[float, float]:
+        """Net ``(dx, dy)`` tiles moved over the last *seconds*."""
+        rows = self.window(seconds)
+        if len(rows) < 2:
+            return 0.0, 0.0
+        return float(rows[-1, 1] - rows[0, 1]), float(rows[-1, 2] - rows[0, 2])
+
+    def mean_velocity(self, seconds: float) -> Tuple[float, float]:
+        """Average ``(vx, vy)`` in tiles/s over the last *seconds*."""
+        rows = self.window(seconds)
+        if len(rows) < 2:
+            return 0.0, 0.0
+        dt = float(rows[-1, 0] - rows[0, 0])
+        if dt <= 0.0:
+            return 0.0, 0.0
+        return (
+            float(rows[-1, 1] - rows[0, 1]) / dt,
+            float(rows[-1, 2] - rows[0, 2]) / dt,
+        )
+
+    def moved_more_than(self, distance: float, seconds: float) -> bool:
+        """True if the track spans more than *distance* tiles in the window.
+
+        Uses the diagonal of the window's bounding box, so pacing back and
+        forth counts as moving even when the net displacement is zero.  Any
+        floor change counts as movement.
+        """
+        rows = self.window(seconds)
+        if len(rows) < 2:
+            return False
+        span = np.ptp(rows[:, 1:4], axis=0)
+        return bool(span[2] > 0 or math.hypot(span[0], span[1]) > distance)
+
+    def stationary_seconds(self, distance: float) -> float:
+        """Seconds since the track was last more than *distance* tiles from
+        its newest position (inf when the buffer is empty).
+
+        The whole buffer is scanned in one vectorised pass; when every sample
+        is within *distance*, the age of the oldest sample is returned.
+        """
+        rows = self.array()
+        if not len(rows):
+            return math.inf
+        latest = rows[-1]
+        d2 = (rows[:, 1] - latest[1]) ** 2 + (rows[:, 2] - latest[2]) ** 2
+        away = np.flatnonzero((d2 > distance * distance) | (rows[:, 3] != latest[3]))
+        since = rows[away[-1] + 1, 0] if len(away) else rows[0, 0]
+        return time.monotonic() - since
@@ -0,0 +1,240 @@
+"""Single-file route bundles for minimap navigation.
+
+A route used to be a JSON list of paths plus one PNG per waypoint, which
+means hundreds of small files to decode at start-up and a layout that breaks
+as soon as one file is moved.  A bundle packs the whole route into one file
+that is memory-mapped at load time, so start-up does no image decoding at
+all.
+
+File layout
+-----------
+::
+
+    b"TBROUTE1"                  8-byte magic (format version in the last byte)
+    uint32 little-endian         length N of the JSON header
+    N bytes                      UTF-8 JSON header (see below)
+    zero padding                 up to the next multiple of 64 bytes
+    uint8 data                   all templates, back to back
+
+Header::
+
+    {
+      "name": "cave",
+      "minimap": {"x": 1633, "y": 44, "width": 106, "height": 109,
+                  "template_size": 40},
+      "waypoints": [
+        {"offset": 0, "shape": [40, 40], "crc32": 1234},   # template waypoint
+        {"atlas": [1050, 987]},                             # atlas coordinate
+        ...
+      ],
+      "data_size": 3200,
+      "data_crc32": 5678
+    }
+
+``offset`` is relative to the start of the data block.  Template views
+returned by :func:`load_bundle` point straight into the memory map.
+"""
+
+import json
+import os
+import struct
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from bot.log import get_logger
+
+log = get_logger("Route")
+
+MAGIC = b"TBROUTE1"
+EXTENSION = ".route"
+_ALIGN = 64
+# Header fields every bundle written by write_bundle has
+_HEADER_KEYS = {"waypoints", "data_size", "data_crc32"}
+
+# A waypoint is either a greyscale template or an (x, y) atlas coordinate
+Waypoint = Union[np.ndarray, Tuple[int, int]]
+
+
+class RouteBundleError(ValueError):
+    """Raised when a bundle file is malformed or fails its checksum."""
+
+
+@dataclass
+class RouteBundle:
+    name: str
+    # Minimap geometry the route was recorded with (x, y, width, height,
+    # template_size); empty when unknown (e.g. converted legacy routes).
+    minimap: Dict[str, int] = field(default_factory=dict)
+    # One entry per waypoint: a template view or None for atlas waypoints.
+    templates: List[Optional[np.ndarray]] = field(default_factory=list)
+    # One entry per waypoint: atlas (x, y) or None for template waypoints.
+    atlas: List[Optional[Tuple[int, int]]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+
+def is_bundle(path: str) -> bool:
+    """True if *path* starts with the bundle magic."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# ── writing ──────────────────────────────────────────────────────────────────
+
+def write_bundle(
+    path: str,
+    name: str,
+    waypoints: Sequence[Waypoint],
+    minimap: Optional[Dict[str, int]] = None,
+) -> None:
+    """Write *waypoints* to *path* atomically (temp file + rename)."""
+    entries: List[dict] = []
+    blobs: List[bytes] = []
+    offset = 0
+    for wp in waypoints:
+        if isinstance(wp, np.ndarray):
+            tmpl = np.ascontiguousarray(wp, dtype=np.uint8)
+            if tmpl.ndim != 2:
+                raise RouteBundleError(f"templates must be 2-D greyscale, got {tmpl.shape}")
+            blob = tmpl.tobytes()
+            entries.append({
+                "offset": offset,
+                "shape": list(tmpl.shape),
+                "crc32": zlib.crc32(blob),
+            })
+            blobs.append(blob)
+            offset += len(blob)
+        else:
+            entries.append({"atlas": [int(wp[0]), int(wp[1])]})
+
+    data = b"".join(blobs)
+    header = json.dumps({
+        "name": name,
+        "minimap": dict(minimap or {}),
+        "waypoints": entries,
+        "data_size": len(data),
+        "data_crc32": zlib.crc32(data),
+    }).encode("utf-8")
+
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    padding = b"\0" * (-len(prefix) % _ALIGN)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(prefix)
+        f.write(padding)
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ── reading ──────────────────────────────────────────────────────────────────
+
+def _read_header(path: str) -> Tuple[dict, int]:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise RouteBundleError(f"{path} is not a route bundle")
+        raw_len = f.read(4)
+        if len(raw_len) != 4:
+            raise RouteBundleError(f"{path} is truncated")
+        (header_len,) = struct.unpack("<I", raw_len)
+        try:
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        except ValueError:      # UnicodeDecodeError, JSONDecodeError
+            raise RouteBundleError(f"{path}: bad header") from None
+    if (not isinstance(header, dict) or not _HEADER_KEYS <= header.keys()
+            or not isinstance(header["waypoints"], list)):
+        raise RouteBundleError(f"{path}: bad header")
+    prefix_len = len(MAGIC) + 4 + header_len
+    return header, prefix_len + (-prefix_len % _ALIGN)
+
+
+def load_bundle(path: str, verify: bool = True) -> RouteBundle:
+    """Memory-map the bundle at *path*.
+
+    With *verify* the data block's CRC32 is checked (a few hundred KB for
+    large routes, i.e. well under a millisecond); on a mismatch the
+    per-template checksums pinpoint the damaged waypoint.
+    """
+    header, data_start = _read_header(path)
+    try:
+        data_size = int(header["data_size"])
+        data_crc = int(header["data_crc32"])
+        minimap = {k: int(v) for k, v in header.get("minimap", {}).items()}
+    except (AttributeError, TypeError, ValueError):
+        raise RouteBundleError(f"{path}: bad header") from None
+    if os.path.getsize(path) < data_start + data_size:
+        raise RouteBundleError(f"{path} is truncated")
+
+    data = (
+        np.memmap(path, dtype=np.uint8, mode="r", offset=data_start, shape=(data_size,))
+        if data_size else np.empty(0, dtype=np.uint8)
+    )
+
+    data_ok = not verify or zlib.crc32(data) == data_crc
+
+    bundle = RouteBundle(
+        name=header.get("name", os.path.splitext(os.path.basename(path))[0]),
+        minimap=minimap,
+    )
+    for i, entry in enumerate(header["waypoints"]):
+        try:
+            if "atlas" in entry:
+                x, y = entry["atlas"][:2]
+                bundle.templates.append(None)
+                bundle.atlas.append((int(x), int(y)))
+                continue
+            h, w = (int(v) for v in entry["shape"])
+            start = int(entry["offset"])
+            crc = int(entry["crc32"])
+        except (KeyError, TypeError, ValueError):
+            raise RouteBundleError(f"{path}: waypoint {i} has a bad header entry") from None
+        view = data[start : start + h * w]
+        if view.size != h * w:
+            raise RouteBundleError(f"{path}: waypoint {i} lies outside the data block")
+        if not data_ok and zlib.crc32(view) != crc:
+            raise RouteBundleError(f"{path}: waypoint {i} failed its checksum")
+        bundle.templates.append(view.reshape(h, w))
+        bundle.atlas.append(None)
+    if not data_ok:
+        raise RouteBundleError(f"{path}: data block failed its checksum")
+    return bundle
+
+
+# ── legacy conversion ────────────────────────────────────────────────────────
+
+def convert_json_route(
+    json_path: str,
+    bundle_path: str,
+    minimap: Optional[Dict[str, int]] = None,
+) -> RouteBundle:
+    """Convert a JSON + PNG route (old recorder output) into a bundle.
+
+    PNGs that cannot be read are reported and skipped.  Returns the loaded
+    bundle so callers can report what was written.
+    """
+    with open(json_path) as f:
+        data = json.load(f)
+    name = data.get("name", os.path.splitext(os.path.basename(json_path))[0])
+
+    waypoints: List[Waypoint] = []
+    for entry in data.get("waypoints", []):
+        if isinstance(entry, (list, tuple)):
+            waypoints.append((int(entry[0]), int(entry[1])))
+            continue
+        tmpl = cv2.imread(entry, cv2.IMREAD_GRAYSCALE)
+        if tmpl is None:
+            log.warning(f"could not load template {entry} – skipped")
+            continue
+        waypoints.append(tmpl)
+
+    write_bundle(bundle_path, name, waypoints, minimap)
+    return load_bundle(bundle_path)
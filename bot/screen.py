@@ -4,15 +4,56 @@ A single thread captures the screen at a fixed FPS and stores the latest
 frame in shared memory.  Every module reads from this shared frame instead
 of issuing its own screen-grab, cutting redundant I/O from O(N modules) to
 O(1) per tick.
+
+Frames come from a :class:`FrameSource`: the screen via mss by default, or
+e.g. the rendered frames of ``bot.sim``.  mss is imported only when the
+screen source is opened.
 """
 
 import threading
 import time
-from typing import Optional
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
 
-import mss
 import numpy as np
 
+# Smoothing factor of the grab-time moving average
+_GRAB_ALPHA = 0.1
+
+
+class FrameSource(ABC):
+    """Produces the frames ScreenCapture publishes (BGRA, H×W×4)."""
+
+    def open(self) -> None:
+        """Called once on the capture thread before the first grab."""
+
+    def close(self) -> None:
+        """Called once on the capture thread after the last grab."""
+
+    @abstractmethod
+    def grab(self) -> np.ndarray:
+        ...
+
+
+class MssSource(FrameSource):
+    """The top-left *width* × *height* pixels of the screen."""
+
+    def __init__(self, width: int, height: int) -> None:
+        self._monitor = {"top": 0, "left": 0, "width": width, "height": height}
+        self._sct = None
+
+    def open(self) -> None:
+        import mss
+        self._sct = mss.mss()
+
+    def close(self) -> None:
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
+
+    def grab(self) -> np.ndarray:
+        return np.array(self._sct.grab(self._monitor))   # BGRA
+
 
 class ScreenCapture:
     """Captures the full screen in a background daemon thread.
@@ -24,13 +65,24 @@ class ScreenCapture:
         sc.wait_for_frame()
         frame = sc.get_frame()   # numpy BGRA array, updated ~20 Hz
         roi   = sc.get_roi(x, y, w, h)
+
+    Pass ``source=`` to capture from something other than the screen.
     """
 
-    def __init__(self, width: int, height: int, fps: int = 20):
+    def __init__(
+        self, width: int, height: int, fps: int = 20, source: Optional[FrameSource] = None
+    ):
         self._width = width
         self._height = height
+        self._source = source or MssSource(width, height)
         self._interval = 1.0 / fps
         self._frame: Optional[np.ndarray] = None
+        # Capture stats (see stats()): frames grabbed, when the latest one
+        # was, and a moving average of the grab time
+        self.frames = 0
+        self.captured_at = 0.0
+        self._grab_avg = 0.0
+        self._started_at = 0.0
         self._lock = threading.RLock()
         self._stop = threading.Event()
         self._thread = threading.Thread(
@@ -40,6 +92,7 @@ class ScreenCapture:
     # ── lifecycle ────────────────────────────────────────────────────────────
 
     def start(self) -> None:
+        self._started_at = time.monotonic()
         self._thread.start()
 
     def stop(self) -> None:
@@ -59,6 +112,18 @@ class ScreenCapture:
             return None
         return frame[y : y + height, x : x + width].copy()
 
+    def stats(self) -> Dict[str, Any]:
+        """Frames grabbed, achieved fps, grab time and age of the latest frame."""
+        now = time.monotonic()
+        elapsed = now - self._started_at if self._started_at else 0.0
+        return {
+            "frames": self.frames,
+            "fps": round(self.frames / elapsed, 2) if elapsed else 0.0,
+            "target_fps": round(1.0 / self._interval, 2),
+            "grab_ms": round(self._grab_avg * 1e3, 2),
+            "frame_age_ms": round((now - self.captured_at) * 1e3, 1) if self.frames else None,
+        }
+
     def wait_for_frame(self, timeout: float = 5.0) -> bool:
         """Block until at least one frame has been captured."""
         deadline = time.monotonic() + timeout
@@ -71,20 +136,19 @@ class ScreenCapture:
     # ── private ──────────────────────────────────────────────────────────────
 
     def _capture_loop(self) -> None:
-        monitor = {
-            "top": 0,
-            "left": 0,
-            "width": self._width,
-            "height": self._height,
-        }
-        with mss.mss() as sct:
+        self._source.open()
+        try:
             while not self._stop.is_set():
                 t0 = time.perf_counter()
-                raw = sct.grab(monitor)
-                frame = np.array(raw)  # BGRA
+                frame = self._source.grab()
                 with self._lock:
                     self._frame = frame
                 elapsed = time.perf_counter() - t0
+                self.frames += 1
+                self.captured_at = time.monotonic()
+                self._grab_avg += _GRAB_ALPHA * (elapsed - self._grab_avg)
                 remaining = self._interval - elapsed
                 if remaining > 0:
                     time.sleep(remaining)
+        finally:
+            self._source.close()
@@ -0,0 +1,9 @@
+"""Headless game simulator for end-to-end latency benchmarks.
+
+``world``      simulated game state, rendered as client-like frames
+``devices``    frame source and recording input backend for the bot
+``scenarios``  stimulus → answer latency measurements (heal, attack, loot)
+``runner``     runs the real modules against the simulator
+
+See ``benchmarks/bench_latency.py`` for the command-line runner.
+"""
@@ -0,0 +1,65 @@
+"""Simulator ends of the bot's two pluggable devices.
+
+* :class:`SimFrameSource` – a ``bot.screen.FrameSource`` that renders the
+  :class:`~bot.sim.world.SimWorld` instead of grabbing the screen.
+* :class:`RecordingInput` – a ``bot.inputs.InputBackend`` that timestamps
+  every key press and click, keeps them, and applies them to the world.
+"""
+
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from bot.inputs import InputBackend
+from bot.screen import FrameSource
+from bot.sim.world import InputEvent, SimWorld
+
+
+class SimFrameSource(FrameSource):
+    """Frames rendered from *world*; counts them and their render time."""
+
+    def __init__(self, world: SimWorld) -> None:
+        self.world = world
+        self.frames = 0
+        self.render_seconds = 0.0
+
+    def grab(self) -> np.ndarray:
+        t0 = time.perf_counter()
+        frame = self.world.render()
+        self.render_seconds += time.perf_counter() - t0
+        self.frames += 1
+        return frame
+
+
+class RecordingInput(InputBackend):
+    """Records the bot's input events and forwards them to *world*.
+
+    Usage::
+
+        rec = RecordingInput(world)
+        bot.inputs.set_backend(rec)
+        ...
+        presses = [e for e in rec.events if e.kind == "press"]
+    """
+
+    def __init__(self, world: Optional[SimWorld] = None) -> None:
+        self.world = world
+        self.events: List[InputEvent] = []
+
+    def _record(self, event: InputEvent) -> None:
+        self.events.append(event)
+        if self.world is not None:
+            self.world.apply(event)
+
+    def press(self, key: str) -> None:
+        self._record(InputEvent(time.monotonic(), "press", key))
+
+    def click(self, x: int, y: int, button: str = "left") -> None:
+        self._record(InputEvent(time.monotonic(), "click", x=int(x), y=int(y), button=button))
+
+    def key_down(self, key: str) -> None:
+        self._record(InputEvent(time.monotonic(), "key_down", key))
+
+    def key_up(self, key: str) -> None:
+        self._record(InputEvent(time.monotonic(), "key_up", key))
@@ -0,0 +1,159 @@
+"""Runs the real bot modules against the simulator and collects latencies.
+
+:func:`run_scenario` builds a :class:`~bot.sim.world.SimWorld`, a
+``ScreenCapture`` fed by :class:`~bot.sim.devices.SimFrameSource` and a
+:class:`~bot.sim.devices.RecordingInput` installed as the input backend,
+starts the health, mana, combat and loot modules exactly as ``bot.main``
+does, and runs the scenario's trials in real time.
+
+Nothing here touches the screen, keyboard or mouse, so it runs on a
+headless box (no mss / pyautogui needed).
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from bot import inputs, log
+from bot.config import BotConfig, load_config
+from bot.cooldowns import CooldownManager
+from bot.hp_trend import heal_rules
+from bot.modules.combat import CombatModule
+from bot.modules.health import HealthModule
+from bot.modules.loot import LootModule
+from bot.modules.mana import ManaModule
+from bot.screen import ScreenCapture
+from bot.sim.devices import RecordingInput, SimFrameSource
+from bot.sim.scenarios import Scenario
+from bot.sim.world import SimLayout, SimWorld
+from bot.state import GameState
+
+_ITEM_NAME = "sim_item"
+# HP restored by a heal key in the simulated game
+_HEAL_AMOUNT = 60.0
+# Seconds the modules get to locate their UI anchors before the first trial
+_WARMUP_TIMEOUT = 10.0
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: List[float] = field(default_factory=list)   # seconds
+    timeouts: int = 0
+    frames: int = 0
+    render_ms: float = 0.0          # mean simulator render time per frame
+    events: int = 0                 # input events the bot sent
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return float(np.percentile(self.latencies, q))
+
+
+def _item_icon(size: int, rng: np.random.Generator) -> np.ndarray:
+    # High-contrast noise: normalised correlation with a flat background
+    # stays far below the loot module's 0.90 threshold
+    return np.where(rng.random((size, size, 1)) < 0.5, 0, 255).astype(np.uint8).repeat(3, axis=2)
+
+
+def sim_config(cfg: BotConfig, layout: SimLayout, templates_dir: str) -> BotConfig:
+    """Give *cfg* the geometry of *layout* and the simulator's loot item."""
+    cfg.screen.width, cfg.screen.height = layout.width, layout.height
+    cfg.viewport = layout.viewport
+    x, y, w, h = layout.minimap
+    cfg.minimap.x, cfg.minimap.y, cfg.minimap.width, cfg.minimap.height = x, y, w, h
+    cfg.healing.mana_key = None
+    cfg.loot.enabled = True
+    cfg.loot.templates_dir = templates_dir
+    cfg.loot.whitelist = [_ITEM_NAME]
+    cfg.healing.hp_trace_file = None
+    return cfg
+
+
+async def _run(scenario: Scenario, trials: int, cfg: BotConfig, world: SimWorld,
+               seed: int) -> ScenarioResult:
+    source = SimFrameSource(world)
+    screen = ScreenCapture(cfg.screen.width, cfg.screen.height, cfg.screen.capture_fps, source)
+    recorder = RecordingInput(world)
+    inputs.set_backend(recorder)
+    state = GameState(cooldowns=CooldownManager.from_config(cfg.cooldowns))
+    modules = [
+        HealthModule(screen, state, cfg.healing),
+        ManaModule(screen, state, cfg.healing),
+        CombatModule(screen, state, cfg.combat, cfg.viewport),
+        LootModule(screen, state, cfg.loot, cfg.viewport),
+    ]
+    result = ScenarioResult(scenario.name)
+    screen.start()
+    tasks = [asyncio.create_task(m.run(), name=type(m).__name__) for m in modules]
+    try:
+        deadline = time.monotonic() + _WARMUP_TIMEOUT
+        while state.battle_updated_at == 0.0:
+            if time.monotonic() > deadline:
+                raise RuntimeError("modules did not find the simulated UI")
+            await asyncio.sleep(0.05)
+
+        rng = np.random.default_rng(seed)
+        for _ in range(trials):
+            latency = await scenario.trial(world, state, rng)
+            if latency is None:
+                result.timeouts += 1
+            else:
+                result.latencies.append(latency)
+    finally:
+        state.running = False
+        screen.stop()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        inputs.set_backend(None)
+    result.frames = source.frames
+    result.render_ms = source.render_seconds / max(1, source.frames) * 1e3
+    result.events = len(recorder.events)
+    return result
+
+
+def run_scenario(
+    scenario: Scenario,
+    trials: Optional[int] = None,
+    config_path: Optional[str] = None,
+    seed: int = 0,
+    verbose: bool = False,
+) -> ScenarioResult:
+    """Run *scenario* end to end; module output is hidden unless *verbose*.
+
+    The bot config is the defaults, or *config_path* (its healing, combat and
+    cooldown settings), with the simulator's screen geometry and loot item.
+    """
+    layout = SimLayout()
+    rng = np.random.default_rng(seed)
+    cfg = load_config(config_path) if config_path else BotConfig()
+    with tempfile.TemporaryDirectory() as tmp:
+        icon = _item_icon(layout.slot_size, rng)
+        cv2.imwrite(os.path.join(tmp, f"{_ITEM_NAME}.png"), icon)
+        sim_config(cfg, layout, tmp)
+        scenario.configure(cfg)
+        world = SimWorld(
+            layout,
+            heal_keys={rule.key: _HEAL_AMOUNT for rule in heal_rules(cfg.healing)},
+            attack_key=cfg.combat.attack_key,
+            item_icon=icon,
+            seed=seed,
+        )
+        out = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with out:
+            try:
+                return asyncio.run(
+                    _run(scenario, trials or scenario.default_trials, cfg, world, seed)
+                )
+            finally:
+                # Module log lines are written by a thread; keep them inside
+                log.flush()
@@ -0,0 +1,114 @@
+"""Latency scenarios: a stimulus in the world, the bot's answer, the delay.
+
+Each trial changes the :class:`~bot.sim.world.SimWorld` at a random moment
+(so stimuli fall at random phases of the capture and module ticks) and
+waits for the world change the bot's input causes.  The latency is measured
+end to end on the ``time.monotonic()`` clock: capture interval, vision,
+decision and module sleeps all count, as they do in the real client.
+
+=========  ==============================  ==================================
+scenario   stimulus                        answer
+=========  ==============================  ==================================
+heal       HP drops below the threshold    a heal key is pressed
+attack     an enemy enters the list        it is targeted
+loot       the target dies                 the last item leaves the corpse
+=========  ==============================  ==================================
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from bot.config import BotConfig
+from bot.sim.world import SimWorld
+from bot.state import GameState
+
+# Trial timeouts (s); a trial past its timeout counts as a miss
+_HEAL_TIMEOUT = 3.0
+_ATTACK_TIMEOUT = 3.0
+_LOOT_TIMEOUT = 15.0
+_POLL = 0.002
+
+
+async def _wait_for(condition: Callable[[], bool], timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(_POLL)
+    return True
+
+
+class Scenario(ABC):
+    """One kind of stimulus → answer measurement."""
+
+    name: str = ""
+    default_trials: int = 10
+
+    def configure(self, cfg: BotConfig) -> None:
+        """Adjust the simulator's bot config for this scenario."""
+
+    @abstractmethod
+    async def trial(
+        self, world: SimWorld, state: GameState, rng: np.random.Generator
+    ) -> Optional[float]:
+        """Run one trial; the latency in seconds, or None on a timeout."""
+
+
+class HealScenario(Scenario):
+    name = "heal"
+    default_trials = 20
+
+    def configure(self, cfg: BotConfig) -> None:
+        cfg.loot.enabled = False
+
+    async def trial(self, world, state, rng):
+        world.set_hp(100.0)
+        # Longer than the heal key's cooldown, so it is ready again
+        await asyncio.sleep(rng.uniform(1.0, 1.5))
+        t0 = world.hit(rng.uniform(40.0, 60.0))
+        if not await _wait_for(lambda: world.healed_at >= t0, _HEAL_TIMEOUT):
+            return None
+        return world.healed_at - t0
+
+
+class AttackScenario(Scenario):
+    name = "attack"
+    default_trials = 20
+
+    def configure(self, cfg: BotConfig) -> None:
+        cfg.loot.enabled = False
+
+    async def trial(self, world, state, rng):
+        await asyncio.sleep(rng.uniform(0.5, 1.0))
+        t0 = world.spawn(int(rng.integers(-3, 4)) or 1, int(rng.integers(-3, 4)), ttk=0.3)
+        answered = await _wait_for(lambda: world.targeted_at >= t0, _ATTACK_TIMEOUT)
+        # Let the kill play out before the next trial
+        await _wait_for(lambda: not world.enemies and not state.currently_attacking, 5.0)
+        return world.targeted_at - t0 if answered else None
+
+
+class LootScenario(Scenario):
+    name = "loot"
+    default_trials = 5
+
+    async def trial(self, world, state, rng):
+        await asyncio.sleep(rng.uniform(0.5, 1.0))
+        dx, dy = int(rng.integers(-1, 2)) or 1, int(rng.integers(-1, 2))
+        t0 = world.spawn(dx, dy, ttk=0.3, items=int(rng.integers(1, 4)))
+        if not await _wait_for(lambda: world.killed_at >= t0, _ATTACK_TIMEOUT + 1.0):
+            return None
+        killed = world.killed_at
+        looted = await _wait_for(lambda: world.looted_at >= killed, _LOOT_TIMEOUT)
+        # The module still opens the remaining tiles; wait until it is idle
+        await _wait_for(lambda: not state.loot_pending and not state.looting_active, 10.0)
+        world.clear_corpses()
+        return world.looted_at - killed if looted else None
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    s.name: s for s in (HealScenario(), AttackScenario(), LootScenario())
+}
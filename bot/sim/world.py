@@ -0,0 +1,369 @@
+"""Simulated game: a tiny world model that renders client-like frames.
+
+The frames follow the layout the modules look for, so the real modules run
+against them unchanged:
+
+* the ``images/*.png`` UI templates pasted at :class:`SimLayout` positions,
+  with the HP / mana bars at the rows and columns the health and mana
+  modules read relative to them,
+* a battle list below ``images/battle.png`` – empty-slot grey, one entry
+  per enemy (icon, name glyphs, HP bar), red border on the target,
+* a health bar above every enemy in the viewport (creature detector),
+* a minimap cut from a random texture that scrolls as the character walks,
+* a container window with item icons while a corpse is open.
+
+Input events (from ``bot.sim.devices.RecordingInput``) change the world:
+heal keys restore HP, ``attack_key`` or a click on a battle-list entry
+targets an enemy, which dies ``ttk`` seconds later and leaves a corpse;
+shift+right-click on the corpse tile opens it, ctrl+click takes an item,
+escape closes the container (or cancels the attack), a left click in the
+viewport walks there.
+
+The ``*_at`` attributes record when the world last changed in a way the
+latency scenarios wait for (``time.monotonic()`` clock, as the bot's).
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+
+from bot.config import ViewportConfig
+
+# Colours (BGR) – bar colours are the ones the modules match
+_PANEL = (70, 70, 70)                 # also the battle list's empty slot
+_GRASS = (40, 90, 50)
+_HP_BGR = (113, 113, 255)
+_MANA_BGR = (240, 98, 101)
+_BAR_EMPTY = (30, 30, 30)
+_ENTRY_ICON = (40, 120, 200)
+_ENTRY_BAR = (0, 192, 0)
+_TEXT = (192, 192, 192)
+_TARGET = (0, 0, 255)
+_CREATURE_FILL = (0, 192, 0)
+
+# Module offsets from the templates (bot/modules/health.py, mana.py, combat.py)
+_HP_BAR_OFFSET = (7, 5)
+_MANA_BAR_OFFSET = (6, 5)
+_BAR_WIDTH = 92
+_BATTLE_SLOT0_OFFSET = (10, -4)       # battle pixel (+20, +6) + indicator (-10, -10)
+_ENTRY_HEIGHT = 22
+_ENTRY_BAR_WIDTH = 132
+# Creature health bar (bot/creature_detector.py)
+_CREATURE_BAR_WIDTH = 25
+_CREATURE_BAR_ABOVE = 9               # fill row above the tile's top edge
+
+_MINIMAP_TEXTURE = 512
+_WALK_TILES_PER_SECOND = 4.0
+
+
+@dataclass
+class SimLayout:
+    """Where things are drawn on the simulated screen; (row, col) pairs."""
+    width: int = 1280
+    height: int = 720
+    health: Tuple[int, int] = (130, 1000)
+    mana: Tuple[int, int] = (150, 1000)
+    battle: Tuple[int, int] = (190, 1000)
+    follow: Tuple[int, int] = (170, 1220)
+    container: Tuple[int, int] = (450, 1000)    # first item slot
+    slot_size: int = 32
+    slot_pitch: int = 36
+    slot_columns: int = 4
+    # Minimap region (x, y, width, height)
+    minimap: Tuple[int, int, int, int] = (1150, 10, 106, 109)
+    viewport: ViewportConfig = field(default_factory=lambda: ViewportConfig(
+        left=0, top=0, width=960, height=704, center_x=480, center_y=352, tile_size=64,
+    ))
+
+
+@dataclass
+class InputEvent:
+    """One key press or click as the bot sent it."""
+    t: float
+    kind: str                   # "press", "click", "key_down" or "key_up"
+    key: str = ""
+    x: int = 0
+    y: int = 0
+    button: str = "left"
+
+
+@dataclass
+class _Enemy:
+    dx: int
+    dy: int
+    ttk: float
+    items: int
+    targeted_at: Optional[float] = None
+
+    def hp(self, now: float) -> float:
+        if self.targeted_at is None:
+            return 100.0
+        return max(1.0, 100.0 * (1.0 - (now - self.targeted_at) / self.ttk))
+
+
+def _load_bgr(path: str) -> np.ndarray:
+    img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise FileNotFoundError(path)
+    return img[:, :, :3]
+
+
+class SimWorld:
+    """The simulated game state and its renderer.
+
+    Usage::
+
+        world = SimWorld(heal_keys={"f1": 40.0}, item_icon=icon)
+        frame = world.render()                # BGRA, layout of SimLayout
+        world.apply(InputEvent(t, "press", "f1"))
+        t0 = world.hit(60.0)                  # HP drops; heal lands → world.healed_at
+    """
+
+    def __init__(
+        self,
+        layout: Optional[SimLayout] = None,
+        heal_keys: Optional[Dict[str, float]] = None,
+        attack_key: str = "space",
+        item_icon: Optional[np.ndarray] = None,
+        images_dir: str = "images",
+        seed: int = 0,
+    ) -> None:
+        self.layout = layout or SimLayout()
+        self.heal_keys = dict(heal_keys or {})
+        self.attack_key = attack_key
+        self.item_icon = item_icon
+        self._lock = threading.Lock()
+        rng = np.random.default_rng(seed)
+
+        self.hp: float = 100.0
+        self.mana: float = 100.0
+        self.position: Tuple[float, float] = (0.0, 0.0)
+        self._walk_to: Optional[Tuple[float, float]] = None
+        self._walk_at: float = 0.0
+        self.enemies: List[_Enemy] = []
+        self.corpses: Dict[Tuple[int, int], int] = {}    # tile → items left
+        self.container: Optional[Tuple[int, int]] = None
+        self.held: Set[str] = set()
+
+        self.hit_at: float = 0.0
+        self.healed_at: float = 0.0
+        self.spawned_at: float = 0.0
+        self.targeted_at: float = 0.0
+        self.killed_at: float = 0.0
+        self.looted_at: float = 0.0
+
+        self._templates = {
+            name: _load_bgr(f"{images_dir}/{name}.png")
+            for name in ("health", "mana", "battle", "follow")
+        }
+        self._background = self._draw_background()
+        self._minimap = cv2.resize(
+            rng.integers(0, 256, (_MINIMAP_TEXTURE // 4, _MINIMAP_TEXTURE // 4, 3), dtype=np.uint8),
+            (_MINIMAP_TEXTURE, _MINIMAP_TEXTURE),
+            interpolation=cv2.INTER_NEAREST,
+        )
+        # Name glyphs shared by every enemy (one creature kind)
+        self._glyphs = rng.random((11, 96)) < 0.3
+
+    # ── scenario controls ────────────────────────────────────────────────────
+
+    def hit(self, damage: float) -> float:
+        """Take *damage* % HP now; returns the time it happened."""
+        with self._lock:
+            self.hp = max(1.0, self.hp - damage)
+            self.hit_at = time.monotonic()
+            return self.hit_at
+
+    def set_hp(self, hp: float) -> None:
+        with self._lock:
+            self.hp = hp
+
+    def spawn(self, dx: int, dy: int, ttk: float = 0.5, items: int = 0) -> float:
+        """Put an enemy on tile (dx, dy) that dies *ttk* s after it is
+        targeted and leaves *items* items; returns the time."""
+        with self._lock:
+            self.enemies.append(_Enemy(dx, dy, ttk, items))
+            self.spawned_at = time.monotonic()
+            return self.spawned_at
+
+    def clear_corpses(self) -> None:
+        with self._lock:
+            self.corpses.clear()
+            self.container = None
+
+    # ── input ────────────────────────────────────────────────────────────────
+
+    def apply(self, event: InputEvent) -> None:
+        with self._lock:
+            if event.kind == "key_down":
+                self.held.add(event.key)
+            elif event.kind == "key_up":
+                self.held.discard(event.key)
+            elif event.kind == "press":
+                self._press(event.key, event.t)
+            elif event.kind == "click":
+                self._click(event.x, event.y, event.button, event.t)
+
+    def _press(self, key: str, t: float) -> None:
+        if key in self.heal_keys:
+            self.hp = min(100.0, self.hp + self.heal_keys[key])
+            self.healed_at = t
+        elif key == self.attack_key and self.enemies:
+            self._target(self.enemies[0], t)
+        elif key == "escape":
+            if self.container is not None:
+                self.container = None
+            else:
+                for e in self.enemies:
+                    e.targeted_at = None
+
+    def _target(self, enemy: _Enemy, t: float) -> None:
+        for e in self.enemies:
+            if e is not enemy:
+                e.targeted_at = None
+        if enemy.targeted_at is None:
+            enemy.targeted_at = t
+            self.targeted_at = t
+
+    def _click(self, x: int, y: int, button: str, t: float) -> None:
+        lay = self.layout
+        vp = lay.viewport
+        # Battle-list entry?
+        row0 = lay.battle[0] + _BATTLE_SLOT0_OFFSET[0]
+        col0 = lay.battle[1] + _BATTLE_SLOT0_OFFSET[1]
+        slot = (y - row0) // _ENTRY_HEIGHT
+        if col0 <= x < col0 + 20 and 0 <= slot < len(self.enemies) and button == "left":
+            self._target(self.enemies[slot], t)
+            return
+        # Container slot?
+        if self.container is not None and "ctrl" in self.held:
+            i = self._slot_at(x, y)
+            if i is not None and i < self.corpses.get(self.container, 0):
+                self.corpses[self.container] -= 1
+                if self.corpses[self.container] == 0:
+                    self.looted_at = t
+            return
+        # Viewport tile?
+        if not (vp.left <= x < vp.left + vp.width and vp.top <= y < vp.top + vp.height):
+            return
+        dx = round((x - vp.center_x) / vp.tile_size)
+        dy = round((y - vp.center_y) / vp.tile_size)
+        if button == "right" and "shift" in self.held:
+            if self.corpses.get((dx, dy), 0) > 0:
+                self.container = (dx, dy)
+        elif button == "left" and not self.held:
+            px, py = self.position
+            self._walk_to = (px + dx, py + dy)
+
+    def _slot_at(self, x: int, y: int) -> Optional[int]:
+        lay = self.layout
+        r = (y - lay.container[0]) // lay.slot_pitch
+        c = (x - lay.container[1]) // lay.slot_pitch
+        if r < 0 or not 0 <= c < lay.slot_columns:
+            return None
+        return int(r * lay.slot_columns + c)
+
+    # ── simulation ───────────────────────────────────────────────────────────
+
+    def _step(self, now: float) -> None:
+        for e in list(self.enemies):
+            if e.targeted_at is not None and now - e.targeted_at >= e.ttk:
+                self.enemies.remove(e)
+                self.corpses[(e.dx, e.dy)] = e.items
+                self.killed_at = e.targeted_at + e.ttk
+        dt, self._walk_at = now - self._walk_at, now
+        if self._walk_to is not None:
+            px, py = self.position
+            tx, ty = self._walk_to
+            dist = max(abs(tx - px), abs(ty - py))
+            step = _WALK_TILES_PER_SECOND * min(dt, 0.2)
+            if dist <= step:
+                self.position, self._walk_to = (tx, ty), None
+            else:
+                self.position = (px + (tx - px) * step / dist, py + (ty - py) * step / dist)
+
+    # ── rendering ────────────────────────────────────────────────────────────
+
+    def _draw_background(self) -> np.ndarray:
+        lay = self.layout
+        vp = lay.viewport
+        frame = np.empty((lay.height, lay.width, 4), dtype=np.uint8)
+        frame[:, :, :3] = _PANEL
+        frame[:, :, 3] = 255
+        frame[vp.top : vp.top + vp.height, vp.left : vp.left + vp.width, :3] = _GRASS
+        return frame
+
+    def render(self, now: Optional[float] = None) -> np.ndarray:
+        """Advance the world to *now* and draw it (BGRA)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._step(now)
+            frame = self._background.copy()
+            self._draw_bar(frame, self.layout.health, _HP_BAR_OFFSET, self.hp, _HP_BGR)
+            self._draw_bar(frame, self.layout.mana, _MANA_BAR_OFFSET, self.mana, _MANA_BGR)
+            self._draw_battle_list(frame, now)
+            for name, (row, col) in zip(
+                ("health", "mana", "battle", "follow"),
+                (self.layout.health, self.layout.mana, self.layout.battle, self.layout.follow),
+            ):
+                t = self._templates[name]
+                frame[row : row + t.shape[0], col : col + t.shape[1], :3] = t
+            self._draw_minimap(frame)
+            self._draw_creatures(frame, now)
+            self._draw_container(frame)
+        return frame
+
+    @staticmethod
+    def _draw_bar(frame, anchor, offset, percent, colour) -> None:
+        row, col = anchor[0] + offset[0], anchor[1] + offset[1]
+        fill = int(round(percent * _BAR_WIDTH / 100.0))
+        frame[row, col : col + _BAR_WIDTH, :3] = _BAR_EMPTY
+        frame[row, col : col + fill, :3] = colour
+
+    def _draw_battle_list(self, frame: np.ndarray, now: float) -> None:
+        row0 = self.layout.battle[0] + _BATTLE_SLOT0_OFFSET[0]
+        col = self.layout.battle[1] + _BATTLE_SLOT0_OFFSET[1]
+        for i, e in enumerate(self.enemies):
+            top = row0 + i * _ENTRY_HEIGHT
+            frame[top : top + 20, col : col + 20, :3] = _ENTRY_ICON
+            name = frame[top + 1 : top + 12, col + 22 : col + 118, :3]
+            name[self._glyphs] = _TEXT
+            bar = frame[top + 15, col + 22 : col + 22 + _ENTRY_BAR_WIDTH, :3]
+            bar[:] = _BAR_EMPTY
+            bar[: max(1, int(e.hp(now) * _ENTRY_BAR_WIDTH / 100.0))] = _ENTRY_BAR
+            if e.targeted_at is not None:
+                cv2.rectangle(frame, (col, top), (col + 19, top + 19), (*_TARGET, 255), 1)
+
+    def _draw_creatures(self, frame: np.ndarray, now: float) -> None:
+        vp = self.layout.viewport
+        for e in self.enemies:
+            y = vp.center_y + e.dy * vp.tile_size - vp.tile_size // 2 - _CREATURE_BAR_ABOVE
+            x = vp.center_x + e.dx * vp.tile_size - _CREATURE_BAR_WIDTH // 2
+            if y < vp.top + 1 or x < vp.left + 1 or x + _CREATURE_BAR_WIDTH >= vp.left + vp.width:
+                continue
+            frame[y - 1 : y + 3, x - 1 : x + _CREATURE_BAR_WIDTH + 1, :3] = 0
+            width = max(1, int(e.hp(now) * _CREATURE_BAR_WIDTH / 100.0))
+            frame[y : y + 2, x : x + width, :3] = _CREATURE_FILL
+
+    def _draw_minimap(self, frame: np.ndarray) -> None:
+        x, y, w, h = self.layout.minimap
+        px, py = self.position
+        n = _MINIMAP_TEXTURE
+        rows = (int(round(py)) + np.arange(h) - h // 2) % n
+        cols = (int(round(px)) + np.arange(w) - w // 2) % n
+        frame[y : y + h, x : x + w, :3] = self._minimap[rows[:, None], cols[None, :]]
+
+    def _draw_container(self, frame: np.ndarray) -> None:
+        if self.container is None or self.item_icon is None:
+            return
+        lay = self.layout
+        s = lay.slot_size
+        for i in range(self.corpses.get(self.container, 0)):
+            r, c = divmod(i, lay.slot_columns)
+            top = lay.container[0] + r * lay.slot_pitch
+            left = lay.container[1] + c * lay.slot_pitch
+            frame[top : top + s, left : left + s, :3] = self.item_icon
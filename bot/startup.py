@@ -0,0 +1,114 @@
+"""Startup timing: from launch to the first heal-ready tick.
+
+``bot.main`` imports the code of a module only when the module is enabled
+(:func:`load`) and marks each startup step (:func:`mark`) – config loaded,
+first frame, modules started, HP bar located.  With ``python -m bot.main
+--startup-report`` a :class:`StartupReport` collects both and prints, once
+the health module is ready to heal:
+
+* **Milestones** – milliseconds since ``bot.main`` started importing, and
+  the time each step added.
+* **Imports** – how long each lazily imported module took (including the
+  dependencies it pulled in first).
+* **Heavy dependencies** – which of numpy, OpenCV, mss, pyautogui,
+  pytesseract … ended up loaded, i.e. what the enabled modules paid for.
+
+Without a report, :func:`mark` costs one global lookup and :func:`load` is
+``importlib.import_module``.
+"""
+
+import asyncio
+import importlib
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# bot.main imports this module first: its import is the launch time
+_T0 = time.perf_counter()
+
+# Third-party packages worth knowing whether the run loaded
+HEAVY = ("numpy", "cv2", "yaml", "mss", "pyautogui", "pytesseract", "pynput", "PIL")
+# The milestone the report waits for
+HEAL_READY = "heal ready"
+
+_active: Optional["StartupReport"] = None
+
+
+def mark(name: str) -> None:
+    """Record that startup step *name* is done, if a report is running."""
+    report = _active
+    if report is not None:
+        report.mark(name)
+
+
+def load(module: str, attr: str) -> Any:
+    """``getattr(import_module(module), attr)``, timed when a report runs."""
+    report = _active
+    t0 = time.perf_counter()
+    obj = getattr(importlib.import_module(module), attr)
+    if report is not None:
+        report.imports.append((module, time.perf_counter() - t0))
+    return obj
+
+
+class StartupReport:
+    """Collects startup milestones and lazy import times.
+
+    Usage::
+
+        report = StartupReport(t0)        # t0: perf_counter at launch
+        report.start()                    # enables startup.mark() / load()
+        ...
+        await report.wait(HEAL_READY, timeout=30)
+        print(report.format())
+    """
+
+    def __init__(self, t0: float = _T0) -> None:
+        self.t0 = t0
+        self.marks: List[Tuple[str, float]] = []
+        self.imports: List[Tuple[str, float]] = []
+        self._seen: Dict[str, asyncio.Event] = {}
+
+    def start(self) -> None:
+        global _active
+        _active = self
+
+    def stop(self) -> None:
+        global _active
+        if _active is self:
+            _active = None
+
+    def mark(self, name: str) -> None:
+        if any(n == name for n, _ in self.marks):
+            return
+        self.marks.append((name, time.perf_counter()))
+        event = self._seen.get(name)
+        if event is not None:
+            event.set()
+
+    async def wait(self, name: str, timeout: float) -> bool:
+        """Wait until *name* is marked; False after *timeout* seconds."""
+        if any(n == name for n, _ in self.marks):
+            return True
+        event = self._seen.setdefault(name, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def format(self) -> str:
+        lines = ["[Startup]", f"  {'milestone':<28} {'since launch':>12}  {'step':>9}"]
+        prev = self.t0
+        for name, t in self.marks:
+            lines.append(f"  {name:<28} {(t - self.t0) * 1e3:10.0f}ms  {(t - prev) * 1e3:7.0f}ms")
+            prev = t
+        if self.imports:
+            lines.append(f"  {'lazy import':<28} {'':>12}  {'took':>9}")
+            for module, secs in self.imports:
+                lines.append(f"  {module:<28} {'':>12}  {secs * 1e3:7.0f}ms")
+        loaded = [name for name in HEAVY if name in sys.modules]
+        skipped = [name for name in HEAVY if name not in sys.modules]
+        lines.append(f"  loaded: {', '.join(loaded) or '–'}")
+        lines.append(f"  not loaded: {', '.join(skipped) or '–'}")
+        return "\n".join(lines)
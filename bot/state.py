@@ -8,7 +8,18 @@ other while still being able to react to each other's observations.
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bot.battle_list import BATTLE_ENTRY_DTYPE
+from bot.cooldowns import CooldownManager
+from bot.creature_detector import CREATURE_DTYPE
+from bot.ring_buffer import TrackHistory
+from bot.unreachable import UnreachableIndex
+
+# Exponential smoothing factor applied to odometry velocity samples
+_VELOCITY_ALPHA = 0.3
 
 
 @dataclass
@@ -29,7 +40,11 @@ class Position:
 class GameState:
     """Thread-safe shared state consumed by all bot modules."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        history_capacity: int = 4096,
+        cooldowns: Optional[CooldownManager] = None,
+    ) -> None:
         self._lock = threading.RLock()
 
         # ── resources ────────────────────────────────────────────────────────
@@ -39,40 +54,75 @@ class GameState:
         # ── position ─────────────────────────────────────────────────────────
         self.position: Position = Position()
         self.position_updated_at: float = 0.0
-        # ring buffer: (timestamp, Position)
-        self._position_history: List[Tuple[float, Position]] = []
+        # 0–1; 1.0 for direct reads, lower for dead-reckoned estimates
+        self.position_confidence: float = 0.0
+        # Absolute positions (OCR / atlas) as (t, x, y, z)
+        self.position_history = TrackHistory(history_capacity)
         self._last_moved_at: float = time.monotonic()
 
+        # ── odometry ─────────────────────────────────────────────────────────
+        # Dead-reckoned displacement (tiles) accumulated from minimap motion,
+        # and the smoothed velocity (tiles / s) derived from it.
+        self.odometry: Tuple[float, float] = (0.0, 0.0)
+        self.velocity: Tuple[float, float] = (0.0, 0.0)
+        self.odometry_updated_at: float = 0.0
+        # Accumulated odometry as (t, x, y, 0) – relative, so kept apart from
+        # the absolute position track
+        self.odometry_history = TrackHistory(history_capacity)
+
         # ── combat ───────────────────────────────────────────────────────────
         self.enemy_in_battle_list: bool = False
         self.currently_attacking: bool = False
         self.attack_started_at: Optional[float] = None
+        # One BATTLE_ENTRY_DTYPE record per visible battle-list entry
+        self.battle_entries: np.ndarray = np.empty(0, dtype=BATTLE_ENTRY_DTYPE)
+        self.battle_updated_at: float = 0.0
+        # One CREATURE_DTYPE record per health bar seen in the viewport
+        self.creatures: np.ndarray = np.empty(0, dtype=CREATURE_DTYPE)
+        self.creatures_updated_at: float = 0.0
 
-        # area → expiry timestamp; cleared automatically when expired
-        self._unreachable: Dict[Tuple[int, int, int], float] = {}
+        # Blacklisted tiles with expiry; purged on time, queried by radius
+        self._unreachable = UnreachableIndex()
 
         # ── loot ─────────────────────────────────────────────────────────────
         # Set by CombatModule when an enemy dies; cleared by LootModule when done
         self.loot_pending: bool = False
         self.looting_active: bool = False
+        # Tile offset (dx, dy) of the last kill from the character, when the
+        # creature detector saw where it happened
+        self.kill_offset: Optional[Tuple[int, int]] = None
+
+        # ── conditions ───────────────────────────────────────────────────────
+        # Bitmask of the status icons shown; bit i is condition_names[i]
+        self.conditions: int = 0
+        self.condition_names: Tuple[str, ...] = ()
+        self.conditions_updated_at: float = 0.0
 
         # ── navigation ───────────────────────────────────────────────────────
         self.waypoint_index: int = 0
 
+        # ── actions ──────────────────────────────────────────────────────────
+        # Cooldowns of every hotkey the modules press (fed by the modules)
+        self.cooldowns: CooldownManager = cooldowns or CooldownManager()
+
+        # ── UI regions ───────────────────────────────────────────────────────
+        # Screen rectangles (x, y, width, height) the modules located and
+        # read, by name – what the flight recorder keeps of each frame
+        self.ui_regions: Dict[str, Tuple[int, int, int, int]] = {}
+
         # ── lifecycle ────────────────────────────────────────────────────────
         self.running: bool = True
 
     # ── position helpers ─────────────────────────────────────────────────────
 
-    def update_position(self, pos: Position) -> None:
+    def update_position(self, pos: Position, confidence: float = 1.0) -> None:
         with self._lock:
             if pos != self.position:
                 self._last_moved_at = time.monotonic()
             self.position = pos
+            self.position_confidence = confidence
             self.position_updated_at = time.monotonic()
-            self._position_history.append((time.monotonic(), pos))
-            if len(self._position_history) > 20:
-                self._position_history.pop(0)
+            self.position_history.add(pos.x, pos.y, pos.z, self.position_updated_at)
 
     def position_stale(self, max_age: float = 3.0) -> bool:
         """True if the last position read is older than max_age seconds."""
@@ -82,20 +132,150 @@ class GameState:
         with self._lock:
             return time.monotonic() - self._last_moved_at
 
+    def update_odometry(self, dx: float, dy: float, min_step: float = 0.5) -> None:
+        """Accumulate one odometry step of (dx, dy) tiles.
+
+        Steps of at least *min_step* tiles count as movement for
+        ``seconds_since_last_move``, so stuck detection works even when no
+        absolute position source (OCR) is running.
+        """
+        now = time.monotonic()
+        with self._lock:
+            ox, oy = self.odometry
+            self.odometry = (ox + dx, oy + dy)
+            dt = now - self.odometry_updated_at
+            if 0.0 < dt < 1.0:
+                vx, vy = self.velocity
+                self.velocity = (
+                    vx + _VELOCITY_ALPHA * (dx / dt - vx),
+                    vy + _VELOCITY_ALPHA * (dy / dt - vy),
+                )
+            else:
+                self.velocity = (0.0, 0.0)
+            self.odometry_updated_at = now
+            self.odometry_history.add(ox + dx, oy + dy, 0.0, now)
+            if abs(dx) >= min_step or abs(dy) >= min_step:
+                self._last_moved_at = now
+
+    def moved_within(self, distance: float, seconds: float) -> bool:
+        """True if either position track moved more than *distance* tiles
+        during the last *seconds*."""
+        with self._lock:
+            return (
+                self.position_history.moved_more_than(distance, seconds)
+                or self.odometry_history.moved_more_than(distance, seconds)
+            )
+
+    def stationary_seconds(self, distance: float = 1.0) -> float:
+        """Seconds the player has stayed within *distance* tiles.
+
+        Takes the shorter of the absolute-position and odometry tracks;
+        falls back to ``seconds_since_last_move`` when neither has samples.
+        """
+        with self._lock:
+            still = min(
+                self.position_history.stationary_seconds(distance),
+                self.odometry_history.stationary_seconds(distance),
+            )
+            if still == float("inf"):
+                return time.monotonic() - self._last_moved_at
+            return still
+
+    # ── battle list helpers ──────────────────────────────────────────────────
+
+    def update_battle_list(self, entries: np.ndarray) -> None:
+        """Publish the latest battle-list read (replaced, never mutated)."""
+        with self._lock:
+            self.battle_entries = entries
+            self.battle_updated_at = time.monotonic()
+
+    def update_creatures(self, creatures: np.ndarray) -> None:
+        """Publish the latest viewport creature detection."""
+        with self._lock:
+            self.creatures = creatures
+            self.creatures_updated_at = time.monotonic()
+
+    # ── condition helpers ────────────────────────────────────────────────────
+
+    def update_conditions(self, mask: int, names: Sequence[str]) -> None:
+        """Publish the latest condition strip read."""
+        with self._lock:
+            self.conditions = mask
+            self.condition_names = tuple(names)
+            self.conditions_updated_at = time.monotonic()
+
+    def has_condition(self, name: str) -> bool:
+        """True if condition *name* (e.g. ``"poisoned"``) is shown."""
+        with self._lock:
+            if name not in self.condition_names:
+                return False
+            return bool(self.conditions >> self.condition_names.index(name) & 1)
+
+    # ── UI region helpers ────────────────────────────────────────────────────
+
+    def set_region(self, name: str, x: int, y: int, width: int, height: int) -> None:
+        """Publish the screen rectangle module data *name* is read from."""
+        with self._lock:
+            self.ui_regions = {**self.ui_regions, name: (int(x), int(y), int(width), int(height))}
+
     # ── reachability helpers ─────────────────────────────────────────────────
 
     def mark_unreachable(self, pos: Position, duration: float = 30.0) -> None:
         """Temporarily blacklist an area so navigation skips it."""
         with self._lock:
-            self._unreachable[(pos.x, pos.y, pos.z)] = time.monotonic() + duration
+            self._unreachable.mark((pos.x, pos.y, pos.z), duration)
 
-    def is_unreachable(self, pos: Position) -> bool:
+    def is_unreachable(self, pos: Position, radius: int = 0) -> bool:
+        """True if a blacklisted tile lies within *radius* tiles of *pos*."""
         with self._lock:
-            key = (pos.x, pos.y, pos.z)
-            expiry = self._unreachable.get(key)
-            if expiry is None:
-                return False
-            if time.monotonic() > expiry:
-                del self._unreachable[key]
-                return False
-            return True
+            return self._unreachable.near((pos.x, pos.y, pos.z), radius)
+
+    # ── snapshots ────────────────────────────────────────────────────────────
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The state as plain JSON-able data, for status reports.
+
+        Only references are read under the lock – positions and arrays are
+        replaced, never mutated – and converted to lists after it is
+        released, so a snapshot never holds up a module's tick.
+        """
+        with self._lock:
+            pos = self.position
+            position_updated_at = self.position_updated_at
+            confidence = self.position_confidence
+            odometry, velocity = self.odometry, self.velocity
+            battle, battle_at = self.battle_entries, self.battle_updated_at
+            creatures, creatures_at = self.creatures, self.creatures_updated_at
+            conditions, names = self.conditions, self.condition_names
+            moved_at = self._last_moved_at
+            regions = self.ui_regions
+        now = time.monotonic()
+
+        def rows(arr: np.ndarray) -> list:
+            return [dict(zip(arr.dtype.names, r)) for r in arr.tolist()]
+
+        def age(t: float) -> Optional[float]:
+            return round(now - t, 2) if t else None
+
+        return {
+            "running": self.running,
+            "hp": round(self.hp_percent, 1),
+            "mana": round(self.mana_percent, 1),
+            "position": {"x": pos.x, "y": pos.y, "z": pos.z,
+                         "confidence": round(confidence, 2),
+                         "age_s": age(position_updated_at)},
+            "odometry": [round(v, 2) for v in odometry],
+            "velocity": [round(v, 2) for v in velocity],
+            "still_s": round(now - moved_at, 1),
+            "waypoint": self.waypoint_index,
+            "enemy_in_battle_list": self.enemy_in_battle_list,
+            "attacking": self.currently_attacking,
+            "loot_pending": self.loot_pending,
+            "looting": self.looting_active,
+            "conditions": [n for i, n in enumerate(names) if conditions >> i & 1],
+            "battle_list": rows(battle),
+            "battle_age_s": age(battle_at),
+            "creatures": rows(creatures),
+            "creatures_age_s": age(creatures_at),
+            "ui_regions": {k: list(v) for k, v in regions.items()},
+        }
@@ -0,0 +1,594 @@
+"""Supervisor: several bot instances on one machine.
+
+``python -m bot.supervisor supervisor.yaml`` runs one bot process per
+``instances`` entry instead of one ``bot.main`` per character.
+
+Capture
+-------
+One capture worker process per display grabs the screen (mss, once) and
+publishes every frame into a :class:`SharedFrame` – a shared-memory block
+guarded by a sequence counter.  Each instance reads only its ``region`` of
+the display from it (:class:`SharedFrameSource`), as if that region were
+the whole screen, and copies it only when a new frame was published.
+
+Instances
+---------
+Every instance is a process running the normal bot (``bot.main.run``) on
+its own config, pinned to one core (``cpu``, default: round robin).  Clicks
+are shifted from region to display coordinates; with ``x_display`` set (an
+Xvfb display per client) the instance's input goes to that display, which
+also keeps keyboard focus apart.  Telemetry and flight-recorder output go
+to a sub-directory per instance name; the control socket, the log file and
+the HP trace get the name as a suffix (``tibiabot-<name>.sock``).  A
+process that exits while the supervisor runs is restarted after
+``restart_delay`` s, doubled for every crash within a minute of starting,
+up to ``max_restart_delay``.
+
+Templates
+---------
+The UI, loot and anchor templates of all instances are loaded once, before
+the processes start, and marked read-only; on platforms that fork the
+children share those pages instead of each decoding its own copy.
+
+Stats
+-----
+Instances report their CPU use, event-loop lag and frame age (capture to
+use) every few seconds; the supervisor prints one table for all of them
+every ``stats_interval`` s and writes it as JSON to ``stats_file``.
+
+Usage
+-----
+    python -m bot.supervisor supervisor.yaml
+"""
+
+import argparse
+import io
+import json
+import multiprocessing as mp
+import os
+import queue
+import signal
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bot import inputs, log
+from bot.config import (
+    DisplayConfig,
+    InstanceConfig,
+    SupervisorConfig,
+    load_config,
+    load_supervisor_config,
+)
+from bot.inputs import InputBackend
+from bot.screen import FrameSource, MssSource
+from bot.vision import preload_templates
+
+logger = log.get_logger("Supervisor")
+
+# Bytes before the pixels: sequence counter (u64), capture time (f8)
+_HEADER = 16
+# Attempts to read a frame the writer keeps overwriting
+_READ_RETRIES = 5
+_POLL = 0.5                 # s between supervisor checks
+_STOP_POLL = 0.2            # s between an instance's checks of the stop flag
+_LAG_INTERVAL = 0.1         # s between loop-lag probes
+_REPORT_EVERY = 5.0         # s between an instance's stats messages
+_STABLE_AFTER = 60.0        # s up after which a crash no longer doubles the delay
+_JOIN_TIMEOUT = 10.0        # s to wait for processes on shutdown
+
+Region = Tuple[int, int, int, int]
+
+
+# ── shared frames ────────────────────────────────────────────────────────────
+
+class SharedFrame:
+    """A BGRA frame in shared memory, written by one process, read by many.
+
+    The writer makes the sequence counter odd while it copies a frame in and
+    even again after; a reader copies its region and keeps it only if the
+    counter was even and unchanged across the copy.
+
+    Usage::
+
+        shared = SharedFrame.create(2560, 1440)     # before forking
+        shared.write(frame)                         # capture worker
+        frame, t, seq = shared.read((0, 0, 1280, 1440))   # an instance
+        shared.close(unlink=True)                   # creator, at the end
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, width: int, height: int) -> None:
+        self.shm = shm
+        self.width = width
+        self.height = height
+        self._views()
+
+    def _views(self) -> None:
+        buf = self.shm.buf
+        self._seq = np.ndarray((1,), np.uint64, buffer=buf, offset=0)
+        self._time = np.ndarray((1,), np.float64, buffer=buf, offset=8)
+        self._pixels = np.ndarray((self.height, self.width, 4), np.uint8,
+                                  buffer=buf, offset=_HEADER)
+
+    @classmethod
+    def create(cls, width: int, height: int) -> "SharedFrame":
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER + width * height * 4)
+        shm.buf[:_HEADER] = bytes(_HEADER)
+        return cls(shm, width, height)
+
+    # Pickled for spawn-based platforms: re-attach by name in the child
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"name": self.shm.name, "width": self.width, "height": self.height}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.shm = shared_memory.SharedMemory(name=state["name"])
+        self.width, self.height = state["width"], state["height"]
+        self._views()
+
+    @property
+    def seq(self) -> int:
+        return int(self._seq[0])
+
+    def write(self, frame: np.ndarray) -> None:
+        self._seq[0] += 1                   # odd: being written
+        self._pixels[...] = frame
+        self._time[0] = time.monotonic()
+        self._seq[0] += 1
+
+    def read(self, region: Region) -> Optional[Tuple[np.ndarray, float, int]]:
+        """Copy of *region* (x, y, w, h), its capture time and sequence
+        number; None before the first frame or while the writer races."""
+        x, y, w, h = region
+        for _ in range(_READ_RETRIES):
+            seq = self.seq
+            if seq == 0:
+                return None
+            if seq & 1:
+                time.sleep(0.0005)
+                continue
+            frame = self._pixels[y : y + h, x : x + w].copy()
+            t = float(self._time[0])
+            if self.seq == seq:
+                return frame, t, seq
+        return None
+
+    def close(self, unlink: bool = False) -> None:
+        # Views into the buffer must go before the mapping can close
+        del self._seq, self._time, self._pixels
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class SharedFrameSource(FrameSource):
+    """An instance's *region* of a :class:`SharedFrame` as its screen."""
+
+    def __init__(self, shared: SharedFrame, region: Region) -> None:
+        self.shared = shared
+        self.region = region
+        self.captured_at = 0.0          # monotonic capture time of the frame
+        self._frame: Optional[np.ndarray] = None
+        self._seq = -1
+
+    def grab(self) -> Optional[np.ndarray]:
+        if self.shared.seq == self._seq:
+            return self._frame          # nothing new: no copy
+        got = self.shared.read(self.region)
+        if got is not None:
+            self._frame, self.captured_at, self._seq = got
+        return self._frame
+
+
+class _OffsetInput(InputBackend):
+    """Clicks shifted from region to display coordinates."""
+
+    def __init__(self, inner: InputBackend, dx: int, dy: int) -> None:
+        self.inner = inner
+        self.dx = dx
+        self.dy = dy
+
+    def press(self, key: str) -> None:
+        self.inner.press(key)
+
+    def click(self, x: int, y: int, button: str = "left") -> None:
+        self.inner.click(x + self.dx, y + self.dy, button)
+
+    def key_down(self, key: str) -> None:
+        self.inner.key_down(key)
+
+    def key_up(self, key: str) -> None:
+        self.inner.key_up(key)
+
+
+class _Prefixed(io.TextIOBase):
+    """Stream that starts every line with the instance name."""
+
+    def __init__(self, stream: Any, prefix: str) -> None:
+        self._stream = stream
+        self._prefix = prefix
+        self._line_start = True
+
+    def write(self, s: str) -> int:
+        out = []
+        for line in s.splitlines(keepends=True):
+            if self._line_start:
+                out.append(self._prefix)
+            out.append(line)
+            self._line_start = line.endswith("\n")
+        self._stream.write("".join(out))
+        return len(s)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+# ── child processes ──────────────────────────────────────────────────────────
+
+def _pin(cpu: Optional[int]) -> None:
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    p50, p95 = np.percentile(samples, (50, 95)) * 1e3
+    return {"p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2),
+            "max_ms": round(max(samples) * 1e3, 2)}
+
+
+def _capture_main(name: str, display: DisplayConfig, shared: SharedFrame,
+                  stop: Any, stats: Any) -> None:
+    """Capture worker: grab *display* into *shared* until *stop* is set."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # stopped through *stop*
+    if display.x_display:
+        os.environ["DISPLAY"] = display.x_display
+    source = MssSource(display.width, display.height)
+    source.open()
+    interval = 1.0 / display.fps
+    grabs: List[float] = []
+    reported = time.monotonic()
+    try:
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            shared.write(source.grab())
+            elapsed = time.perf_counter() - t0
+            grabs.append(elapsed)
+            now = time.monotonic()
+            if now - reported >= _REPORT_EVERY:
+                _send(stats, {"kind": "capture", "name": f"capture:{name}", "pid": os.getpid(),
+                              "frames": len(grabs), "fps": round(len(grabs) / (now - reported), 1),
+                              "grab": _percentiles(grabs)})
+                grabs, reported = [], now
+            if interval > elapsed:
+                time.sleep(interval - elapsed)
+    finally:
+        source.close()
+
+
+def _suffixed(path: str, name: str) -> str:
+    """*path* with ``-<name>`` before its extension."""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{name}{ext}"
+
+
+def _send(stats: Any, msg: Dict[str, Any]) -> None:
+    try:
+        stats.put_nowait(msg)
+    except queue.Full:
+        pass
+
+
+async def _watch_stop(stop: Any, stop_event: Any) -> None:
+    import asyncio
+    while not stop.is_set():
+        await asyncio.sleep(_STOP_POLL)
+    stop_event.set()
+
+
+async def _report_stats(name: str, source: SharedFrameSource, stats: Any) -> None:
+    """Loop lag, frame age and CPU share of this instance, every few seconds."""
+    import asyncio
+    lags: List[float] = []
+    ages: List[float] = []
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    while True:
+        t0 = time.monotonic()
+        await asyncio.sleep(_LAG_INTERVAL)
+        now = time.monotonic()
+        lags.append(max(0.0, now - t0 - _LAG_INTERVAL))
+        if source.captured_at:
+            ages.append(now - source.captured_at)
+        if now - wall0 >= _REPORT_EVERY:
+            cpu = time.process_time()
+            _send(stats, {"kind": "instance", "name": name, "pid": os.getpid(),
+                          "cpu_pct": round(100 * (cpu - cpu0) / (now - wall0), 1),
+                          "loop_lag": _percentiles(lags), "frame_age": _percentiles(ages)})
+            lags, ages = [], []
+            cpu0, wall0 = cpu, now
+
+
+def _instance_main(inst: InstanceConfig, display: DisplayConfig, shared: SharedFrame,
+                   cpu: Optional[int], stop: Any, stats: Any) -> None:
+    """One bot: the normal ``bot.main`` run on *inst*'s region of *shared*."""
+    import asyncio
+
+    from bot import main as bot_main
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # stopped through *stop*
+    _pin(cpu)
+    if display.x_display:
+        os.environ["DISPLAY"] = display.x_display
+    sys.stdout = _Prefixed(sys.stdout, f"{inst.name} | ")
+
+    cfg = load_config(inst.config)
+    region = inst.region or (0, 0, display.width, display.height)
+    cfg.screen.width, cfg.screen.height = region[2], region[3]
+    cfg.telemetry.dir = os.path.join(cfg.telemetry.dir, inst.name)
+    cfg.flight_recorder.output_dir = os.path.join(cfg.flight_recorder.output_dir, inst.name)
+    cfg.control.socket = _suffixed(cfg.control.socket, inst.name)
+    if cfg.logging.file:
+        cfg.logging.file = _suffixed(cfg.logging.file, inst.name)
+    if cfg.healing.hp_trace_file:
+        cfg.healing.hp_trace_file = _suffixed(cfg.healing.hp_trace_file, inst.name)
+    log.configure(cfg.logging)
+    if region[:2] != (0, 0):
+        inputs.set_backend(_OffsetInput(inputs.backend(), region[0], region[1]))
+    source = SharedFrameSource(shared, region)
+
+    async def _entry() -> None:
+        stop_event = asyncio.Event()
+        helpers = [
+            asyncio.create_task(_watch_stop(stop, stop_event)),
+            asyncio.create_task(_report_stats(inst.name, source, stats)),
+        ]
+        try:
+            await bot_main.run(cfg, stop_event, bot_main.parse_args(["--config", inst.config]),
+                               source)
+        finally:
+            for t in helpers:
+                t.cancel()
+
+    asyncio.run(_entry())
+
+
+# ── supervisor ───────────────────────────────────────────────────────────────
+
+class _Child:
+    """A supervised process, restarted with back-off when it exits."""
+
+    def __init__(self, name: str, start: Callable[[], mp.process.BaseProcess],
+                 delay: float) -> None:
+        self.name = name
+        self._start = start
+        self.base_delay = delay
+        self.delay = delay
+        self.process: Optional[mp.process.BaseProcess] = None
+        self.started_at = 0.0
+        self.restart_at: Optional[float] = None
+        self.restarts = 0
+
+    def start(self) -> None:
+        self.process = self._start()
+        self.started_at = time.monotonic()
+        self.restart_at = None
+
+
+class Supervisor:
+    """Starts the capture workers and instances of *config* and keeps them up.
+
+    Usage::
+
+        sup = Supervisor(load_supervisor_config("supervisor.yaml"))
+        sup.start()
+        sup.run_until(stop_flag)      # polls, restarts, prints stats
+        sup.stop()
+    """
+
+    def __init__(self, config: SupervisorConfig) -> None:
+        self.config = config
+        methods = mp.get_all_start_methods()
+        # fork: children share the preloaded templates and inherit the
+        # shared-memory mappings
+        self._mp = mp.get_context("fork" if "fork" in methods else None)
+        self._stop = self._mp.Event()
+        self._stats = self._mp.Queue(maxsize=1000)
+        self._shared: Dict[str, SharedFrame] = {}
+        self._children: List[_Child] = []
+        self._latest: Dict[str, Dict[str, Any]] = {}
+
+    # ── startup ──────────────────────────────────────────────────────────────
+
+    def _preload(self) -> int:
+        """Load every template the instances will match, once."""
+        paths = []
+        if os.path.isdir("images"):
+            paths += [os.path.join("images", f) for f in sorted(os.listdir("images"))
+                      if f.endswith(".png")]
+        for inst in self.config.instances:
+            cfg = load_config(inst.config)
+            paths += [os.path.join(cfg.loot.templates_dir, f"{name}.png")
+                      for name in cfg.loot.whitelist if name != "*"]
+            if cfg.conditions.anchor_template:
+                paths.append(cfg.conditions.anchor_template)
+        return preload_templates(sorted(set(paths)))
+
+    def start(self) -> None:
+        cfg = self.config
+        for inst in cfg.instances:
+            if inst.display not in cfg.displays:
+                raise ValueError(f"instance {inst.name}: unknown display {inst.display!r}")
+        loaded = self._preload()
+        logger.info(f"{loaded} templates preloaded")
+
+        cores = os.cpu_count() or 1
+        used = {inst.display for inst in cfg.instances}
+        for name, display in cfg.displays.items():
+            if name not in used:
+                continue
+            shared = self._shared[name] = SharedFrame.create(display.width, display.height)
+            self._add(f"capture:{name}", _capture_main, (name, display, shared))
+        for i, inst in enumerate(cfg.instances):
+            display = cfg.displays[inst.display]
+            cpu = inst.cpu if inst.cpu is not None else i % cores
+            self._add(inst.name, _instance_main,
+                      (inst, display, self._shared[inst.display], cpu))
+        for child in self._children:
+            child.start()
+            logger.info(f"{child.name} started (pid {child.process.pid})")
+
+    def _add(self, name: str, target: Callable, args: tuple) -> None:
+        def start() -> mp.process.BaseProcess:
+            p = self._mp.Process(target=target, args=(*args, self._stop, self._stats),
+                                 name=name, daemon=False)
+            p.start()
+            return p
+
+        self._children.append(_Child(name, start, self.config.restart_delay))
+
+    # ── running ──────────────────────────────────────────────────────────────
+
+    def poll(self) -> None:
+        """Restart exited children when due and collect stats messages."""
+        now = time.monotonic()
+        for child in self._children:
+            p = child.process
+            if child.restart_at is None and p is not None and not p.is_alive():
+                if now - child.started_at < _STABLE_AFTER:
+                    child.delay = min(child.delay * 2, self.config.max_restart_delay) \
+                        if child.restarts else child.base_delay
+                else:
+                    child.delay = child.base_delay
+                child.restart_at = now + child.delay
+                logger.warning(f"{child.name} exited with code {p.exitcode} – "
+                             f"restarting in {child.delay:g}s")
+            elif child.restart_at is not None and now >= child.restart_at:
+                child.restarts += 1
+                self._latest.pop(child.name, None)     # the old process's stats
+                child.start()
+                logger.info(f"{child.name} restarted (pid {child.process.pid})")
+        while True:
+            try:
+                msg = self._stats.get_nowait()
+            except queue.Empty:
+                break
+            self._latest[msg["name"]] = msg
+
+    def summary(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        children = {c.name: c for c in self._children}
+        out: Dict[str, Any] = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                               "instances": {}, "captures": {}}
+        for name, child in children.items():
+            entry = dict(self._latest.get(name, {}))
+            entry.pop("kind", None)
+            entry.pop("name", None)
+            up = child.process is not None and child.process.is_alive()
+            entry.update(restarts=child.restarts, running=up,
+                         uptime_s=round(now - child.started_at) if up else 0)
+            key = "captures" if name.startswith("capture:") else "instances"
+            out[key][name.split(":", 1)[-1] if key == "captures" else name] = entry
+        return out
+
+    @staticmethod
+    def format(stats: Dict[str, Any]) -> str:
+        def ms(d: Dict[str, float], key: str) -> str:
+            return f"{d[key]:7.1f}" if key in d else f"{'–':>7}"
+
+        lines = [f"[Supervisor] {stats['time']}",
+                 f"  {'instance':<16} {'up':>6} {'restarts':>8} {'cpu %':>6}  "
+                 f"{'lag p50':>7} {'lag p95':>7}  {'age p50':>7} {'age max':>7}  (ms)"]
+        for name, s in stats["instances"].items():
+            lag, age = s.get("loop_lag", {}), s.get("frame_age", {})
+            cpu = f"{s['cpu_pct']:6.1f}" if "cpu_pct" in s else f"{'–':>6}"
+            lines.append(f"  {name:<16} {s['uptime_s']:>5}s {s['restarts']:>8} {cpu}  "
+                         f"{ms(lag, 'p50_ms')} {ms(lag, 'p95_ms')}  "
+                         f"{ms(age, 'p50_ms')} {ms(age, 'max_ms')}")
+        for name, s in stats["captures"].items():
+            grab = s.get("grab", {})
+            lines.append(f"  capture {name:<8} {s['uptime_s']:>5}s {s['restarts']:>8} "
+                         f"{s.get('fps', 0):5.1f} fps, grab p50 {ms(grab, 'p50_ms')} ms")
+        return "\n".join(lines)
+
+    def write(self, path: str, stats: Dict[str, Any]) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp, path)
+
+    def run_until(self, stopped: Callable[[], bool]) -> None:
+        next_stats = time.monotonic() + self.config.stats_interval
+        while True:
+            time.sleep(_POLL)
+            if stopped():
+                break
+            self.poll()
+            if time.monotonic() >= next_stats:
+                next_stats += self.config.stats_interval
+                stats = self.summary()
+                print(self.format(stats))
+                if self.config.stats_file:
+                    self.write(self.config.stats_file, stats)
+
+    def stop(self) -> None:
+        self._stop.set()
+        deadline = time.monotonic() + _JOIN_TIMEOUT
+        for child in self._children:
+            p = child.process
+            if p is None:
+                continue
+            p.join(max(0.0, deadline - time.monotonic()))
+            if p.is_alive():
+                logger.warning(f"{child.name} did not stop – terminating")
+                p.terminate()
+                p.join(1.0)
+        for shared in self._shared.values():
+            shared.close(unlink=True)
+        self._shared.clear()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Run several bot instances on one machine")
+    p.add_argument("config", nargs="?", default="supervisor.yaml",
+                   help="supervisor config: displays and instances")
+    args = p.parse_args()
+
+    cfg = load_supervisor_config(args.config)
+    if not cfg.instances:
+        sys.exit(f"{args.config}: no instances")
+    print("=== TibiaBot supervisor ===")
+    for inst in cfg.instances:
+        region = "whole display" if inst.region is None else "×".join(map(str, inst.region[2:])) \
+            + f" at ({inst.region[0]},{inst.region[1]})"
+        print(f"  {inst.name:<16}: {inst.config} on {inst.display}, {region}")
+    print()
+
+    stopping = False
+
+    def _on_stop(*_: Any) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, _on_stop)
+    signal.signal(signal.SIGTERM, _on_stop)
+
+    sup = Supervisor(cfg)
+    sup.start()
+    try:
+        sup.run_until(lambda: stopping)
+    finally:
+        print("\nStopping instances…")
+        sup.stop()
+        stats = sup.summary()
+        print(sup.format(stats))
+        if cfg.stats_file:
+            sup.write(cfg.stats_file, stats)
+            print(f"Stats → {cfg.stats_file}")
+        log.shutdown()
+
+
+if __name__ == "__main__":
+    main()
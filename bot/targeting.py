@@ -0,0 +1,202 @@
+"""Target selection over the decoded battle list, plus time-to-kill stats.
+
+Pressing ``attack_key`` lets the client pick the next creature.  The
+:class:`Targeter` picks it instead: every frame it scores the entries of
+``GameState.battle_entries`` and, when the best one is not the current
+target, ``CombatModule`` left-clicks that entry (which attacks it).
+
+Scoring
+-------
+Higher is better::
+
+    score = priority[name_hash] + hp_weight * (1 - hp / 100) - distance_weight * slot
+
+* **priority** – per creature, keyed by the battle list's name hash (the
+  hash is logged the first time a creature is seen, so it can be copied into
+  ``combat.target_priorities``).  Unlisted creatures score 0.
+* **hp** – prefer creatures that are already hurt (finish kills first).
+* **distance** – the battle list has no coordinates, so the slot index is
+  the distance proxy.  Set the client's battle list to *sort by distance*
+  for this to mean "closest first".
+
+Hysteresis
+----------
+An engaged target is only abandoned for one that scores ``switch_margin``
+higher, and not before ``min_dwell`` seconds into the engagement, so small
+HP changes or list reordering do not flip targets every frame.  A chosen
+but not yet confirmed target (no red border) is re-clicked at most every
+``_CLICK_RETRY`` seconds.
+
+Time to kill
+------------
+:class:`KillTimer` only observes the battle list, so it measures the
+``attack_key`` mode and the targeting mode alike.  An engagement starts when
+an entry first shows the red border and counts as a kill when the border
+leaves it and one entry of that name has disappeared; a border that moves to
+another creature, or is cancelled, while the creature stays is not a kill.
+"""
+
+import statistics
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set
+
+import numpy as np
+
+from bot.log import get_logger
+
+log = get_logger("Targeting")
+
+# Seconds before an unconfirmed target click is repeated
+_CLICK_RETRY = 0.3
+# Kill durations kept for the rolling statistics
+_TTK_WINDOW = 200
+
+
+def _count(entries: np.ndarray, name_hash: int) -> int:
+    return int(np.count_nonzero(entries["name_hash"] == np.uint64(name_hash)))
+
+
+class Targeter:
+    """Chooses which battle-list entry to attack.
+
+    Usage::
+
+        targeter = Targeter({0x1f2e3d4c5b6a7988: 10.0})
+        entry = targeter.choose(entries)     # a BATTLE_ENTRY_DTYPE record or None
+        if entry is not None:
+            inputs.click(int(entry["x"]), int(entry["y"]))
+    """
+
+    def __init__(
+        self,
+        priorities: Optional[Dict[int, float]] = None,
+        hp_weight: float = 1.0,
+        distance_weight: float = 0.5,
+        switch_margin: float = 0.5,
+        min_dwell: float = 1.0,
+    ) -> None:
+        self.priorities = dict(priorities or {})
+        self.hp_weight = hp_weight
+        self.distance_weight = distance_weight
+        self.switch_margin = switch_margin
+        self.min_dwell = min_dwell
+
+        self._engaged_hash: Optional[int] = None
+        self._engaged_at: float = 0.0
+        self._clicked_hash: Optional[int] = None
+        self._clicked_at: float = 0.0
+        self._seen: Set[int] = set()
+
+    def scores(self, entries: np.ndarray) -> np.ndarray:
+        """Score of every entry (float64, same order as *entries*)."""
+        prio = np.fromiter(
+            (self.priorities.get(int(h), 0.0) for h in entries["name_hash"]),
+            dtype=np.float64,
+            count=len(entries),
+        )
+        hurt = 1.0 - entries["hp"].astype(np.float64) / 100.0
+        return prio + self.hp_weight * hurt - self.distance_weight * entries["slot"]
+
+    def _log_new(self, entries: np.ndarray) -> None:
+        for e in entries:
+            h = int(e["name_hash"])
+            if h not in self._seen:
+                self._seen.add(h)
+                prio = self.priorities.get(h)
+                note = f"priority {prio:g}" if prio is not None else "no priority set"
+                log.info(f"New creature {h:#018x} in slot {e['slot']} ({note})")
+
+    def choose(self, entries: np.ndarray, now: Optional[float] = None) -> Optional[np.void]:
+        """Entry to click this frame, or None to leave the current target."""
+        now = time.monotonic() if now is None else now
+        if not len(entries):
+            self.reset()
+            return None
+        self._log_new(entries)
+
+        scores = self.scores(entries)
+        best = int(np.argmax(scores))
+        best_hash = int(entries["name_hash"][best])
+
+        targeted = np.flatnonzero(entries["targeted"])
+        if len(targeted):
+            cur = int(targeted[0])
+            cur_hash = int(entries["name_hash"][cur])
+            if cur_hash != self._engaged_hash:
+                self._engaged_hash = cur_hash
+                self._engaged_at = now
+            self._clicked_hash = None
+            if (
+                best != cur
+                and best_hash != cur_hash
+                and scores[best] > scores[cur] + self.switch_margin
+                and now - self._engaged_at >= self.min_dwell
+            ):
+                return self._click(entries[best], best_hash, now)
+            return None
+
+        self._engaged_hash = None
+        if best_hash == self._clicked_hash and now - self._clicked_at < _CLICK_RETRY:
+            return None
+        return self._click(entries[best], best_hash, now)
+
+    def reset(self) -> None:
+        """Forget the engagement, e.g. when combat is suspended."""
+        self._engaged_hash = None
+        self._clicked_hash = None
+
+    def _click(self, entry: np.void, name_hash: int, now: float) -> np.void:
+        self._clicked_hash = name_hash
+        self._clicked_at = now
+        return entry
+
+
+class KillTimer:
+    """Measures time-to-kill from consecutive battle-list reads."""
+
+    def __init__(self) -> None:
+        self.kills: int = 0
+        self.durations: Deque[float] = deque(maxlen=_TTK_WINDOW)
+        self._target_hash: Optional[int] = None
+        self._target_count: int = 0
+        self._started_at: float = 0.0
+        self._first_at: Optional[float] = None
+
+    def update(self, entries: np.ndarray, now: Optional[float] = None) -> Optional[float]:
+        """Feed one read; returns the time-to-kill when a kill just happened."""
+        now = time.monotonic() if now is None else now
+        targeted = np.flatnonzero(entries["targeted"]) if len(entries) else []
+        cur_hash = int(entries["name_hash"][targeted[0]]) if len(targeted) else None
+
+        ttk = None
+        if self._target_hash is not None and cur_hash != self._target_hash:
+            if _count(entries, self._target_hash) < self._target_count:
+                ttk = now - self._started_at
+                self.kills += 1
+                self.durations.append(ttk)
+            self._target_hash = None
+
+        if cur_hash is not None and self._target_hash is None:
+            self._target_hash = cur_hash
+            self._started_at = now
+            if self._first_at is None:
+                self._first_at = now
+        if self._target_hash is not None:
+            self._target_count = _count(entries, self._target_hash)
+        return ttk
+
+    def kills_per_hour(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        if self._first_at is None or now <= self._first_at:
+            return 0.0
+        return self.kills * 3600.0 / (now - self._first_at)
+
+    def summary(self) -> str:
+        if not self.durations:
+            return "no kills yet"
+        return (
+            f"median TTK {statistics.median(self.durations):.1f}s, "
+            f"mean {statistics.fmean(self.durations):.1f}s, "
+            f"{self.kills_per_hour():.0f} kills/h"
+        )
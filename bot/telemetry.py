@@ -0,0 +1,244 @@
+"""Session telemetry in append-only columnar files.
+
+A :class:`Telemetry` task samples ``GameState`` every ``interval`` seconds
+and modules report discrete events (a kill, a heal, an item looted) through
+:func:`event`.  Both go into preallocated numpy buffers – a sample or an
+event is one structured-array row assignment – and a full buffer is
+appended to disk by a writer thread, off the event loop.
+
+Layout
+------
+::
+
+    telemetry/<YYYYmmdd-HHMMSS>/        one directory per bot run
+        samples/schema.json             {"columns": {name: dtype}}
+        samples/<column>.bin            raw little-endian values, one per row
+        events/schema.json
+        events/<column>.bin
+
+Each column is a fixed-width array appended in batches, so a table is read
+back with one ``np.memmap`` per column (:func:`open_table`) – no parsing,
+and only the columns an analysis touches are paged in.  After a crash the
+columns may differ in length by part of a batch; readers cut them to the
+shortest.
+
+``analyze_telemetry.py`` computes kills/hour, heals per minute, phase times
+(walking, fighting, looting, idle) and more over any number of sessions.
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from bot.config import TelemetryConfig
+from bot.state import GameState
+
+# What the character was doing at a sample (the ``phase`` column)
+PHASES = ("idle", "walking", "fighting", "looting")
+# Event kinds (the ``kind`` column); ``value`` meaning in the comment
+EVENTS = (
+    "kill",          # time to kill (s)
+    "heal",          # HP % when the heal key was pressed
+    "mana",          # mana % when the mana key was pressed
+    "loot_item",     # –
+    "waypoint",      # index of the waypoint reached
+    "stuck",         # seconds without progress
+    "spell",         # –
+)
+
+SAMPLE_DTYPE = np.dtype([
+    ("t", np.float64),          # time.time()
+    ("hp", np.float32),
+    ("mana", np.float32),
+    ("x", np.int32),
+    ("y", np.int32),
+    ("z", np.int8),
+    ("phase", np.uint8),        # index into PHASES
+    ("enemies", np.uint8),      # battle-list entries
+    ("attacking", np.bool_),
+    ("looting", np.bool_),
+    ("waypoint", np.int16),
+])
+
+EVENT_DTYPE = np.dtype([
+    ("t", np.float64),
+    ("kind", np.uint8),         # index into EVENTS
+    ("value", np.float32),
+    ("ref", np.uint64),         # e.g. the creature's name hash for kills
+])
+
+_KIND = {name: i for i, name in enumerate(EVENTS)}
+# Seconds without movement after which a sample is no longer "walking"
+_WALK_TIMEOUT = 1.0
+
+_active: Optional["Telemetry"] = None
+
+
+def event(kind: str, value: float = 0.0, ref: int = 0) -> None:
+    """Record event *kind* (one of :data:`EVENTS`) if telemetry is running."""
+    telemetry = _active
+    if telemetry is not None:
+        telemetry.event(kind, value, ref)
+
+
+class ColumnWriter:
+    """Appends rows of *dtype* to one ``<column>.bin`` file per field."""
+
+    def __init__(self, path: str, dtype: np.dtype) -> None:
+        self.path = path
+        self.dtype = dtype
+        os.makedirs(path, exist_ok=True)
+        schema = {"columns": {name: dtype[name].str for name in dtype.names}}
+        with open(os.path.join(path, "schema.json"), "w") as f:
+            json.dump(schema, f, indent=2)
+        self.rows = 0
+
+    def append(self, rows: np.ndarray) -> None:
+        for name in self.dtype.names:
+            with open(os.path.join(self.path, f"{name}.bin"), "ab") as f:
+                f.write(np.ascontiguousarray(rows[name]).tobytes())
+        self.rows += len(rows)
+
+
+class _Buffer:
+    """Preallocated rows of *dtype*; filled on the loop, emptied by flush."""
+
+    __slots__ = ("rows", "n")
+
+    def __init__(self, dtype: np.dtype, size: int) -> None:
+        self.rows = np.zeros(size, dtype=dtype)
+        self.n = 0
+
+
+class Telemetry:
+    """Samples *state* and collects events into a session directory.
+
+    Usage::
+
+        telemetry = Telemetry(cfg.telemetry, state)
+        telemetry.start()                      # enables telemetry.event()
+        asyncio.create_task(telemetry.run())
+        ...
+        await telemetry.close()                # appends what is buffered
+    """
+
+    def __init__(self, config: TelemetryConfig, state: GameState,
+                 session: Optional[str] = None) -> None:
+        self.config = config
+        self.state = state
+        session = session or time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(config.dir, session)
+        self._samples = ColumnWriter(os.path.join(self.path, "samples"), SAMPLE_DTYPE)
+        self._events = ColumnWriter(os.path.join(self.path, "events"), EVENT_DTYPE)
+        self._sample_buf = _Buffer(SAMPLE_DTYPE, config.flush_rows)
+        self._event_buf = _Buffer(EVENT_DTYPE, config.flush_rows)
+        # One thread, so batches of a table are appended in order
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Telemetry")
+        self._flushing: List[asyncio.Future] = []
+        self._flushed_at = time.monotonic()
+
+    def start(self) -> None:
+        global _active
+        _active = self
+
+    # ── recording ────────────────────────────────────────────────────────────
+
+    def sample(self, now: Optional[float] = None) -> None:
+        """Append one row describing the current game state."""
+        s = self.state
+        if s.looting_active:
+            phase = 3
+        elif s.currently_attacking or s.enemy_in_battle_list:
+            phase = 2
+        elif s.seconds_since_last_move() < _WALK_TIMEOUT:
+            phase = 1
+        else:
+            phase = 0
+        buf = self._sample_buf
+        pos = s.position
+        buf.rows[buf.n] = (
+            time.time() if now is None else now, s.hp_percent, s.mana_percent,
+            pos.x, pos.y, pos.z, phase, min(255, len(s.battle_entries)),
+            s.currently_attacking, s.looting_active, s.waypoint_index,
+        )
+        buf.n += 1
+        if buf.n == len(buf.rows):
+            self._sample_buf = self._swap(buf, self._samples)
+
+    def event(self, kind: str, value: float = 0.0, ref: int = 0) -> None:
+        buf = self._event_buf
+        buf.rows[buf.n] = (time.time(), _KIND[kind], value, ref)
+        buf.n += 1
+        if buf.n == len(buf.rows):
+            self._event_buf = self._swap(buf, self._events)
+
+    def _swap(self, buf: _Buffer, writer: ColumnWriter) -> _Buffer:
+        """Hand *buf*'s rows to the writer thread; a fresh buffer replaces it."""
+        if not buf.n:
+            return buf
+        rows = buf.rows[: buf.n]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            writer.append(rows)
+        else:
+            self._flushing = [f for f in self._flushing if not f.done()]
+            self._flushing.append(loop.run_in_executor(self._writer, writer.append, rows))
+        return _Buffer(buf.rows.dtype, len(buf.rows))
+
+    def flush(self) -> None:
+        self._sample_buf = self._swap(self._sample_buf, self._samples)
+        self._event_buf = self._swap(self._event_buf, self._events)
+        self._flushed_at = time.monotonic()
+
+    async def run(self) -> None:
+        """Sample every ``interval`` s; append at least every ``flush_interval`` s."""
+        while True:
+            await asyncio.sleep(self.config.interval)
+            self.sample()
+            if time.monotonic() - self._flushed_at >= self.config.flush_interval:
+                self.flush()
+
+    async def close(self) -> None:
+        """Append everything buffered and wait for the writes."""
+        global _active
+        if _active is self:
+            _active = None
+        self.flush()
+        if self._flushing:
+            await asyncio.gather(*self._flushing)
+            self._flushing = []
+        self._writer.shutdown(wait=True)
+
+
+# ── reading ──────────────────────────────────────────────────────────────────
+
+def open_table(path: str) -> Dict[str, np.ndarray]:
+    """Memory-map every column of the table in *path* (read only), cut to
+    the length of the shortest column."""
+    with open(os.path.join(path, "schema.json")) as f:
+        columns = json.load(f)["columns"]
+    maps: Dict[str, np.ndarray] = {}
+    for name, dt in columns.items():
+        file = os.path.join(path, f"{name}.bin")
+        dtype = np.dtype(dt)
+        size = os.path.getsize(file) if os.path.exists(file) else 0
+        n = size // dtype.itemsize
+        maps[name] = np.memmap(file, dtype=dtype, mode="r", shape=(n,)) if n else np.empty(0, dtype)
+    rows = min((len(a) for a in maps.values()), default=0)
+    return {name: a[:rows] for name, a in maps.items()}
+
+
+def sessions(root: str) -> List[str]:
+    """Session directories under *root*, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        os.path.join(root, d) for d in os.listdir(root)
+        if os.path.isfile(os.path.join(root, d, "samples", "schema.json"))
+    )
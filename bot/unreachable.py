@@ -0,0 +1,117 @@
+"""Time-limited blacklist of unreachable map areas.
+
+When the character gets stuck attacking, ``CombatModule`` blacklists the
+tile it is standing on for ``unreachable_cooldown`` seconds.  This index
+answers "is any blacklisted tile within *r* tiles of here?" and forgets
+entries on time without anyone having to query them:
+
+* **Expiry** – a min-heap ordered by expiry time.  Every call first pops the
+  entries that have expired (O(1) when none have, O(log n) per expired
+  entry), so stale entries never accumulate.  Re-marking a tile pushes a new
+  heap item; the superseded one is discarded when it surfaces.
+* **Radius queries** – entries are bucketed into ``cell_size``-tile grid
+  cells per floor, so a query only looks at the few cells overlapping its
+  square instead of every entry.
+* **Bound** – at most ``max_entries`` tiles are kept; beyond that the ones
+  closest to expiry are dropped first.
+
+Distances are Chebyshev (``max(|dx|, |dy|)``), i.e. a radius covers a square
+of tiles, like Tibia's own "within n tiles" checks.
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+Tile = Tuple[int, int, int]
+
+
+class UnreachableIndex:
+    """Expiring set of blacklisted tiles with spatial radius lookup.
+
+    Usage::
+
+        index = UnreachableIndex()
+        index.mark((x, y, z), duration=30.0)
+        index.near((x + 1, y, z), radius=2)    # → True for 30 s
+    """
+
+    def __init__(self, cell_size: int = 8, max_entries: int = 10_000) -> None:
+        self.cell_size = cell_size
+        self.max_entries = max_entries
+        self._expiry: Dict[Tile, float] = {}
+        self._heap: List[Tuple[float, Tile]] = []
+        self._cells: Dict[Tile, Set[Tile]] = {}
+
+    def __len__(self) -> int:
+        self.purge()
+        return len(self._expiry)
+
+    def _cell(self, tile: Tile) -> Tile:
+        return tile[0] // self.cell_size, tile[1] // self.cell_size, tile[2]
+
+    # ── updates ──────────────────────────────────────────────────────────────
+
+    def mark(self, tile: Tile, duration: float, now: Optional[float] = None) -> None:
+        """Blacklist *tile* for *duration* seconds (extends an existing entry)."""
+        now = time.monotonic() if now is None else now
+        self.purge(now)
+        expiry = now + duration
+        if self._expiry.get(tile, 0.0) >= expiry:
+            return
+        if tile not in self._expiry:
+            self._cells.setdefault(self._cell(tile), set()).add(tile)
+        self._expiry[tile] = expiry
+        heapq.heappush(self._heap, (expiry, tile))
+        while len(self._expiry) > self.max_entries:
+            self._pop()
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        now = time.monotonic() if now is None else now
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            removed += self._pop()
+        # Superseded heap items (tiles re-marked later) would otherwise make
+        # the heap outgrow the live set without bound
+        if len(self._heap) > 2 * len(self._expiry) + 64:
+            self._heap = [(e, t) for t, e in self._expiry.items()]
+            heapq.heapify(self._heap)
+        return removed
+
+    def _pop(self) -> int:
+        expiry, tile = heapq.heappop(self._heap)
+        if self._expiry.get(tile) != expiry:
+            return 0    # superseded by a later mark
+        del self._expiry[tile]
+        cell = self._cell(tile)
+        members = self._cells[cell]
+        members.discard(tile)
+        if not members:
+            del self._cells[cell]
+        return 1
+
+    # ── queries ──────────────────────────────────────────────────────────────
+
+    def contains(self, tile: Tile, now: Optional[float] = None) -> bool:
+        self.purge(now)
+        return tile in self._expiry
+
+    def within(self, tile: Tile, radius: int, now: Optional[float] = None) -> List[Tile]:
+        """Blacklisted tiles on the same floor within *radius* of *tile*."""
+        self.purge(now)
+        if radius <= 0:
+            return [tile] if tile in self._expiry else []
+        x, y, z = tile
+        cs = self.cell_size
+        found = []
+        for cy in range((y - radius) // cs, (y + radius) // cs + 1):
+            for cx in range((x - radius) // cs, (x + radius) // cs + 1):
+                for t in self._cells.get((cx, cy, z), ()):
+                    if abs(t[0] - x) <= radius and abs(t[1] - y) <= radius:
+                        found.append(t)
+        return found
+
+    def near(self, tile: Tile, radius: int, now: Optional[float] = None) -> bool:
+        """True if any blacklisted tile lies within *radius* of *tile*."""
+        return bool(self.within(tile, radius, now))
@@ -4,22 +4,29 @@ Single responsibility: turn numpy frames into game-meaningful data.
 No side-effects, no state, no pyautogui calls.
 """
 
+import importlib.util
 import re
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
-try:
-    import pytesseract
-    _OCR_AVAILABLE = True
-except ImportError:
-    _OCR_AVAILABLE = False
+from bot.profiler import timed
+
+# pytesseract (and the PIL it imports) is loaded on the first OCR call –
+# bots without OCR navigation never pay for it
+_OCR_AVAILABLE = importlib.util.find_spec("pytesseract") is not None
+_pytesseract = None
 
 # ── template cache ────────────────────────────────────────────────────────────
 
 _template_cache: Dict[str, Optional[np.ndarray]] = {}
 
+# find_all_templates: above this many raw candidates, reduce to 3×3 local
+# maxima before non-maximum suppression
+_MAX_RAW_CANDIDATES = 4096
+_PEAK_KERNEL = np.ones((3, 3), dtype=np.uint8)
+
 
 def _load_template(path: str) -> Optional[np.ndarray]:
     if path not in _template_cache:
@@ -28,6 +35,19 @@ def _load_template(path: str) -> Optional[np.ndarray]:
     return _template_cache[path]
 
 
+def preload_templates(paths: List[str]) -> int:
+    """Load *paths* into the template cache now, read-only; returns how many
+    loaded.  Processes forked afterwards share the pixel data."""
+    loaded = 0
+    for path in paths:
+        tmpl = _load_template(path)
+        if tmpl is not None:
+            tmpl.flags.writeable = False
+            loaded += 1
+    return loaded
+
+
+@timed("find_template")
 def find_template(
     frame: np.ndarray,
     template_path: str,
@@ -55,6 +75,67 @@ def find_template(
     return row, col
 
 
+@timed("find_all_templates")
+def find_all_templates(
+    frame: np.ndarray,
+    template_path: str,
+    threshold: float = 0.99,
+    method: int = cv2.TM_CCORR_NORMED,
+    max_hits: Optional[int] = None,
+) -> List[Tuple[int, int, float]]:
+    """Return every (row, col, score) match above *threshold*, best first.
+
+    Same matching as :func:`find_template` (one ``matchTemplate`` pass), but
+    instead of keeping only the ``minMaxLoc`` peak every location above the
+    threshold is extracted in one vectorised step.  Overlapping hits are then
+    removed by non-maximum suppression: a candidate is dropped when it lies
+    within one template width/height of a better-scoring hit, so each
+    on-screen instance (e.g. every gold coin stack in a container) is
+    reported exactly once.
+    """
+    template = _load_template(template_path)
+    if template is None:
+        return []
+
+    f = frame[:, :, :3] if frame.ndim == 3 and frame.shape[2] == 4 else frame
+    t = template[:, :, :3] if template.ndim == 3 and template.shape[2] == 4 else template
+    th, tw = t.shape[:2]
+    if f.shape[0] < th or f.shape[1] < tw:
+        return []
+
+    result = cv2.matchTemplate(f, t, method)
+
+    # Candidates above threshold.  With a sensible threshold only a handful
+    # of pixels around each true match survive; if a low threshold lets
+    # through a flood of them, thin them to 3×3 local maxima first so NMS
+    # stays cheap.
+    peaks = result >= threshold
+    rows, cols = np.nonzero(peaks)
+    if rows.size == 0:
+        return []
+    if rows.size > _MAX_RAW_CANDIDATES:
+        peaks &= result == cv2.dilate(result, _PEAK_KERNEL)
+        rows, cols = np.nonzero(peaks)
+    scores = result[rows, cols]
+    order = np.argsort(-scores, kind="stable")
+    rows, cols, scores = rows[order], cols[order], scores[order]
+
+    # Greedy NMS by template size.  Each kept hit suppresses all remaining
+    # candidates in one vectorised comparison, so the Python loop runs once
+    # per *instance* rather than once per candidate pixel.
+    alive = np.ones(rows.size, dtype=bool)
+    hits: List[Tuple[int, int, float]] = []
+    for i in range(rows.size):
+        if not alive[i]:
+            continue
+        r, c = int(rows[i]), int(cols[i])
+        hits.append((r, c, float(scores[i])))
+        if max_hits is not None and len(hits) >= max_hits:
+            break
+        alive &= (np.abs(rows - r) >= th) | (np.abs(cols - c) >= tw)
+    return hits
+
+
 # ── pixel helpers ─────────────────────────────────────────────────────────────
 
 def pixel_rgb(frame: np.ndarray, x: int, y: int) -> Tuple[int, int, int]:
@@ -100,6 +181,7 @@ def read_bar_percent(
 
 # ── coordinate OCR ────────────────────────────────────────────────────────────
 
+@timed("ocr")
 def read_coordinates_ocr(roi: np.ndarray) -> Optional[Tuple[int, int, int]]:
     """Extract (X, Y, Z) world coordinates from a minimap coordinate ROI.
 
@@ -109,8 +191,12 @@ def read_coordinates_ocr(roi: np.ndarray) -> Optional[Tuple[int, int, int]]:
     Requires pytesseract + Tesseract to be installed.  Returns None if
     pytesseract is unavailable or the text can't be parsed.
     """
+    global _pytesseract
     if not _OCR_AVAILABLE:
         return None
+    if _pytesseract is None:
+        import pytesseract
+        _pytesseract = pytesseract
 
     # Convert to BGR if BGRA
     if roi.ndim == 3 and roi.shape[2] == 4:
@@ -124,7 +210,7 @@ def read_coordinates_ocr(roi: np.ndarray) -> Optional[Tuple[int, int, int]]:
     # Threshold: white text on dark → invert so digits are black on white
     _, binary = cv2.threshold(gray, 100, 255, cv2.THRESH_BINARY)
 
-    text = pytesseract.image_to_string(
+    text = _pytesseract.image_to_string(
         binary,
         config="--psm 7 --oem 3 -c tessedit_char_whitelist=0123456789, ",
     ).strip()
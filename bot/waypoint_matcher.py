@@ -0,0 +1,108 @@
+"""Batched frequency-domain matching of minimap waypoint templates.
+
+``cv2.matchTemplate`` transforms both the image and the template on every
+call.  For minimap navigation the templates never change and the image is
+the same for every waypoint checked in a tick, so almost all of that work can
+be hoisted:
+
+* each template's (conjugated) spectrum is computed once, at load time;
+* the live minimap is transformed once per tick;
+* each waypoint in the look-ahead window then costs one spectrum product and
+  one inverse DFT;
+* the ``TM_CCORR_NORMED`` denominator (sliding image energy) comes from one
+  integral image shared by all templates of the same size.
+
+Scores are identical to ``cv2.matchTemplate(..., cv2.TM_CCORR_NORMED)`` up to
+float rounding, so existing confidence thresholds keep their meaning.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+_EPS = 1e-6
+
+
+class WaypointMatcher:
+    """Matches any subset of a fixed list of templates against minimap frames.
+
+    Usage::
+
+        matcher = WaypointMatcher(templates, minimap_shape=(109, 106))
+        hits = matcher.match(minimap_gray, [3, 4, 5])
+        # → [(dx, dy, confidence) or None, ...] relative to the minimap centre
+    """
+
+    def __init__(
+        self,
+        templates: Sequence[Optional[np.ndarray]],
+        minimap_shape: Tuple[int, int],
+        min_confidence: float = 0.65,
+    ) -> None:
+        self.min_confidence = min_confidence
+        self._shape = minimap_shape
+        h, w = minimap_shape
+        self._dft_shape = (cv2.getOptimalDFTSize(h), cv2.getOptimalDFTSize(w))
+
+        self._spectra: List[Optional[np.ndarray]] = []
+        self._norms: List[float] = []
+        self._buf = np.zeros(self._dft_shape, dtype=np.float32)
+        for tmpl in templates:
+            if tmpl is None or tmpl.shape[0] > h or tmpl.shape[1] > w:
+                self._spectra.append(None)
+                self._norms.append(0.0)
+                continue
+            t = tmpl.astype(np.float32)
+            self._buf[:] = 0
+            self._buf[: t.shape[0], : t.shape[1]] = t
+            self._spectra.append(cv2.dft(self._buf))
+            self._norms.append(float(np.sqrt((t * t).sum())))
+        self._sizes = [None if t is None else t.shape[:2] for t in templates]
+
+    def match(
+        self, minimap: np.ndarray, indices: Sequence[int]
+    ) -> List[Optional[Tuple[int, int, float]]]:
+        """Match the templates at *indices* against a greyscale *minimap*.
+
+        Returns, per index, ``(dx, dy, confidence)`` – the offset from the
+        minimap centre to the best match centre – or None when the template
+        is missing or its best score is below ``min_confidence``.
+        """
+        h, w = minimap.shape[:2]
+        if (h, w) != self._shape:
+            return [None] * len(indices)
+
+        self._buf[:] = 0
+        self._buf[:h, :w] = minimap
+        image_spec = cv2.dft(self._buf)
+
+        # Sliding-window image energy per template size, shared across templates
+        sqsum = cv2.integral2(minimap, sdepth=cv2.CV_64F)[1]
+        energy: Dict[Tuple[int, int], np.ndarray] = {}
+
+        results: List[Optional[Tuple[int, int, float]]] = []
+        for idx in indices:
+            spec = self._spectra[idx]
+            if spec is None:
+                results.append(None)
+                continue
+            th, tw = self._sizes[idx]
+            e = energy.get((th, tw))
+            if e is None:
+                e = np.sqrt(
+                    sqsum[th:, tw:] - sqsum[:-th, tw:] - sqsum[th:, :-tw] + sqsum[:-th, :-tw]
+                ).astype(np.float32)
+                energy[(th, tw)] = e
+
+            prod = cv2.mulSpectrums(image_spec, spec, 0, conjB=True)
+            corr = cv2.idft(prod, flags=cv2.DFT_REAL_OUTPUT | cv2.DFT_SCALE)
+            valid = corr[: h - th + 1, : w - tw + 1]
+            score = valid / (e * self._norms[idx] + _EPS)
+
+            _, max_val, _, (mx, my) = cv2.minMaxLoc(score)
+            if max_val < self.min_confidence:
+                results.append(None)
+                continue
+            results.append((mx + tw // 2 - w // 2, my + th // 2 - h // 2, float(max_val)))
+        return results
@@ -0,0 +1,134 @@
+"""Talk to a running bot through its control socket (see bot/control.py).
+
+Usage
+-----
+    uv run python botctl.py status                  # state, module timings, capture
+    uv run python botctl.py status --json           # the raw snapshot
+    uv run python botctl.py pause combat            # … resume combat
+    uv run python botctl.py set healing.hp_threshold 60
+    uv run python botctl.py skip                    # give up the current waypoint
+    uv run python botctl.py dump "ran into a trap"  # flight recorder dump
+    uv run python botctl.py --socket tibiabot-knight.sock status
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict
+
+from bot.config import ControlConfig, load_config
+
+_TIMEOUT = 5.0
+
+
+def request(path: str, req: Dict[str, Any], timeout: float = _TIMEOUT) -> Dict[str, Any]:
+    """Send one request to the bot listening on *path*; its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(path)
+        s.sendall(json.dumps(req).encode() + b"\n")
+        buf = b""
+        while not buf.endswith(b"\n"):
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            buf += chunk
+    return json.loads(buf)
+
+
+def _value(text: str) -> Any:
+    """A command-line value as JSON (60, true, null, "f1"), else the text."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _ms(s: Dict[str, Any], key: str) -> str:
+    return f"{s[key]:7.2f}" if key in s else f"{'–':>7}"
+
+
+def _print_status(r: Dict[str, Any]) -> None:
+    st = r["state"]
+    pos = st["position"]
+    print(f"HP {st['hp']:.0f}%  mana {st['mana']:.0f}%  "
+          f"position {pos['x']},{pos['y']},{pos['z']} (conf {pos['confidence']:.2f})  "
+          f"waypoint {st['waypoint']}  still {st['still_s']:.0f}s")
+    fight = "attacking" if st["attacking"] else "not attacking"
+    print(f"battle list {len(st['battle_list'])}, {fight}, "
+          f"{len(st['creatures'])} creature(s) in view  "
+          f"looting {'yes' if st['looting'] else 'no'}  "
+          f"conditions {', '.join(st['conditions']) or '–'}")
+    cap = r["capture"]
+    age = "–" if cap["frame_age_ms"] is None else f"{cap['frame_age_ms']:.0f} ms"
+    print(f"capture {cap['fps']:.1f}/{cap['target_fps']:g} fps, grab {cap['grab_ms']:.1f} ms, "
+          f"frame age {age}")
+    if "loop_lag" in r:
+        lag = r["loop_lag"]
+        print(f"loop lag p50 {_ms(lag, 'p50_ms').strip()} / p95 {_ms(lag, 'p95_ms').strip()} / "
+              f"max {_ms(lag, 'max_ms').strip()} ms  (last {r['window_s']:.0f}s)")
+    print(f"\n  {'module':<26} {'status':<10} {'p50 ms':>7} {'p95 ms':>7} {'max ms':>7} "
+          f"{'busy %':>7}")
+    for name, m in r["modules"].items():
+        busy = f"{m['busy_pct']:7.1f}" if "busy_pct" in m else f"{'–':>7}"
+        print(f"  {name:<26} {m['status']:<10} {_ms(m, 'p50_ms')} {_ms(m, 'p95_ms')} "
+              f"{_ms(m, 'max_ms')} {busy}")
+    if "flight_recorder" in r:
+        fr = r["flight_recorder"]
+        print(f"\nflight recorder {fr['frames']} frames, {fr['memory_mb']:.1f} MB, "
+              f"{fr['dumps']} dump(s)")
+    print(f"up {r['uptime_s']:.0f}s")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Control a running bot")
+    p.add_argument("--config", default="bot_config.yaml", help="bot config naming the socket")
+    p.add_argument("--socket", help="control socket path (default: control.socket of --config)")
+    p.add_argument("--json", action="store_true", help="print the raw reply")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    st = sub.add_parser("status", help="state, module timings, capture stats")
+    st.add_argument("--window", type=float, default=10.0, help="seconds of timings (default 10)")
+    for name in ("pause", "resume"):
+        sub.add_parser(name, help=f"{name} a module").add_argument("module")
+    s = sub.add_parser("set", help="change a config value, e.g. healing.hp_threshold 60")
+    s.add_argument("key")
+    s.add_argument("value", type=_value)
+    sub.add_parser("skip", help="skip the current waypoint")
+    d = sub.add_parser("dump", help="dump the flight recorder")
+    d.add_argument("detail", nargs="?", default="")
+    sub.add_parser("help", help="the commands the bot accepts")
+    args = p.parse_args()
+
+    path = args.socket
+    if path is None:
+        cfg = load_config(args.config) if os.path.exists(args.config) else None
+        path = cfg.control.socket if cfg else ControlConfig.socket
+
+    req: Dict[str, Any] = {"cmd": "skip_waypoint" if args.cmd == "skip" else args.cmd}
+    for key in ("window", "module", "key", "value", "detail"):
+        if hasattr(args, key):
+            req[key] = getattr(args, key)
+    try:
+        reply = request(path, req)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sys.exit(f"No bot listening on {path} – is it running with control.enabled?")
+    except socket.timeout:
+        sys.exit(f"No reply from {path} within {_TIMEOUT:g}s")
+
+    if not reply.pop("ok", False):
+        sys.exit(f"ERROR: {reply.get('error')}")
+    if args.json:
+        print(json.dumps(reply, indent=2))
+    elif args.cmd == "status":
+        _print_status(reply)
+    elif args.cmd == "help":
+        for name, doc in reply["commands"].items():
+            print(f"  {name:<14} {doc}")
+    else:
+        print(", ".join(f"{k}: {v}" for k, v in reply.items()))
+
+
+if __name__ == "__main__":
+    main()
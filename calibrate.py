@@ -17,6 +17,11 @@ python calibrate.py --show-viewport
     Draws the configured viewport boundary and character centre on a
     saved screenshot so you can verify tile_size alignment.
 
+python calibrate.py --show-conditions
+    Outlines the condition icon cells and saves every icon shown to
+    calibration_conditions/.  Rename the ones you need after their condition
+    (poisoned.png, haste.png…) and move them to images/conditions/.
+
 python calibrate.py --dump-frame
     Saves a full screenshot to  calibration_frame.png  for manual inspection.
 """
@@ -297,6 +302,58 @@ def cmd_show_attack_indicator(cfg: dict) -> None:
         print("      red square lands on the red border of the selected entry.")
 
 
+def cmd_show_conditions(cfg: dict) -> None:
+    from bot.conditions import ConditionReader
+    from bot.vision import find_template
+    import os
+
+    co = cfg.get("conditions", {})
+    size = co.get("icon_size", 9)
+    pitch = co.get("icon_pitch", 11)
+    n = co.get("max_icons", 12)
+    templates_dir = co.get("templates_dir", "images/conditions")
+
+    print("Taking screenshot in 2 s – get a condition or two in Tibia first…")
+    time.sleep(2)
+    frame = _grab_frame(cfg)
+
+    anchor = co.get("anchor_template")
+    if anchor:
+        pos = find_template(frame, anchor)
+        if not pos:
+            print(f"ERROR: {anchor} not found on screen")
+            return
+        r_off, c_off = co.get("anchor_offset", [0, 0])
+        row, col = pos[0] + r_off, pos[1] + c_off
+    else:
+        row, col = co.get("y", 300), co.get("x", 1770)
+
+    reader = ConditionReader((row, col), size, pitch, n, templates_dir)
+    vis = frame[:, :, :3].copy()
+    for i in range(n):
+        x = col + i * pitch
+        cv2.rectangle(vis, (x, row), (x + size - 1, row + size - 1), (0, 255, 0), 1)
+
+    out_dir = "calibration_conditions"
+    os.makedirs(out_dir, exist_ok=True)
+    cells = reader.cells(frame)
+    for i, cell in enumerate(cells):
+        cv2.imwrite(os.path.join(out_dir, f"icon_{i}.png"), cell)
+    mask = reader.read(frame)
+
+    crop = vis[max(0, row - 10) : row + size + 10, max(0, col - 10) : col + n * pitch + 10]
+    out_zoom = "calibration_conditions_zoom.png"
+    cv2.imwrite(out_zoom, cv2.resize(crop, None, fx=8, fy=8, interpolation=cv2.INTER_NEAREST))
+
+    print(f"Strip at ({col}, {row}), {size}px icons every {pitch}px")
+    print(f"Templates     : {reader.loaded} from {templates_dir}")
+    print(f"Icons shown   : {len(cells)}  →  {out_dir}/icon_*.png")
+    print(f"Recognised    : {', '.join(reader.decode(mask)) or 'none'}")
+    print(f"Zoom (8×) of the strip → {out_zoom}")
+    print("\nHint: the green boxes must frame the icons exactly; adjust conditions.x/y,")
+    print("      icon_size and icon_pitch in bot_config.yaml until they do.")
+
+
 # ── main ──────────────────────────────────────────────────────────────────────
 
 def main() -> None:
@@ -307,6 +364,7 @@ def main() -> None:
     p.add_argument("--show-viewport",          action="store_true")
     p.add_argument("--show-attack-indicator",  action="store_true")
     p.add_argument("--show-minimap",           action="store_true")
+    p.add_argument("--show-conditions",        action="store_true")
     p.add_argument("--dump-frame",             action="store_true")
     args = p.parse_args()
 
@@ -322,6 +380,8 @@ def main() -> None:
         cmd_show_attack_indicator(cfg)
     elif args.show_minimap:
         cmd_show_minimap(cfg)
+    elif args.show_conditions:
+        cmd_show_conditions(cfg)
     elif args.dump_frame:
         cmd_dump_frame(cfg)
     else:
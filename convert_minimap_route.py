@@ -0,0 +1,55 @@
+"""Convert a legacy minimap route (JSON + one PNG per waypoint) into a bundle.
+
+Usage
+-----
+    uv run python convert_minimap_route.py waypoints/minimap_route.json
+    uv run python convert_minimap_route.py waypoints/cave.json waypoints/cave.route
+
+The output defaults to the input path with a ``.route`` extension.  The
+minimap geometry from bot_config.yaml is stored in the bundle header so the
+bot can warn when a route was recorded with different minimap settings.
+Point ``minimap.waypoints_file`` at the new file afterwards.
+"""
+
+import argparse
+import os
+import sys
+
+import yaml
+
+from bot.route_bundle import EXTENSION, convert_json_route
+
+
+def _minimap_geometry(config_path: str) -> dict:
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path) as f:
+        mm = (yaml.safe_load(f) or {}).get("minimap", {})
+    return {
+        k: int(mm[k])
+        for k in ("x", "y", "width", "height", "template_size")
+        if k in mm
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Convert a JSON minimap route to a route bundle")
+    p.add_argument("json_path", help="legacy route JSON written by record_minimap_waypoints.py")
+    p.add_argument("output", nargs="?", help="bundle to write (default: <json_path>.route)")
+    p.add_argument("--config", default="bot_config.yaml",
+                   help="config to read the minimap geometry from (default: bot_config.yaml)")
+    args = p.parse_args()
+
+    if not os.path.exists(args.json_path):
+        print(f"ERROR: {args.json_path} not found")
+        sys.exit(1)
+    output = args.output or os.path.splitext(args.json_path)[0] + EXTENSION
+
+    bundle = convert_json_route(args.json_path, output, _minimap_geometry(args.config))
+    n_atlas = sum(a is not None for a in bundle.atlas)
+    print(f"Wrote {len(bundle)} waypoints ({len(bundle) - n_atlas} templates, "
+          f"{n_atlas} atlas) → {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Evaluate predictive healing against recorded HP traces.
+
+Record traces by setting ``healing.hp_trace_file`` in bot_config.yaml (one
+``t,hp`` line per HP reading), then replay them here through both the plain
+threshold policy and the predictive policy, with the heal tiers from the
+config.
+
+For every tier, each time the recorded HP falls below its threshold after
+staying above it for a while is a *crossing*.  A policy answers a crossing
+with the first time it fires that tier's key near it; the **lead time** is
+how long before the crossing that was (negative = after, so the threshold
+policy never leads).  A heal is **in time** when it lands – fire time plus
+``input_latency`` – no later than the crossing.  Fires above the threshold
+with no crossing shortly after are **false** (wasted potions / mana).
+
+The replay only measures decisions: recorded HP already contains the effect
+of whatever heals were cast while recording.
+
+Usage
+-----
+    uv run python evaluate_healing.py traces/hp_*.csv
+    uv run python evaluate_healing.py traces/hunt.csv --latency 0.2 --window 0.8
+    uv run python evaluate_healing.py --synthetic 600      # generated burst trace
+"""
+
+import argparse
+import statistics
+import sys
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from bot.config import HealingConfig, HealRule, load_config
+from bot.hp_trend import HealPolicy, heal_rules
+
+# Seconds around a crossing in which a fire of the tier answers it
+_ANSWER_BEFORE = 2.0
+_ANSWER_AFTER = 1.0
+# Bar width in pixels – recorded readings are quantised to it
+_BAR_WIDTH = 92
+
+
+def _load_trace(path: str) -> np.ndarray:
+    rows = []
+    with open(path) as f:
+        for line in f:
+            parts = line.strip().split(",")
+            try:
+                rows.append((float(parts[0]), float(parts[1])))
+            except (IndexError, ValueError):
+                continue    # header or partial line
+    return np.array(rows, dtype=np.float64).reshape(-1, 2)
+
+
+def _synthetic_trace(seconds: float, rng: np.random.Generator, hz: float = 20.0) -> np.ndarray:
+    """Random bursts of 2–4 quick hits; HP recovers quickly below 70 % (as
+    if healed) and slowly above."""
+    t = np.arange(0.0, seconds, 1.0 / hz)
+    hp = np.empty_like(t)
+    level, next_burst, hits = 100.0, 2.0, []
+    for i, now in enumerate(t):
+        if now >= next_burst:
+            n = int(rng.integers(2, 5))
+            hits = list(now + np.sort(rng.uniform(0.0, 0.6, n)))
+            next_burst = now + rng.exponential(4.0) + 1.0
+        while hits and hits[0] <= now:
+            hits.pop(0)
+            level -= rng.uniform(6.0, 16.0)
+        level = min(100.0, max(5.0, level + (6.0 if level >= 70.0 else 30.0) / hz))
+        hp[i] = np.floor(level * _BAR_WIDTH / 100.0) * 100.0 / _BAR_WIDTH
+    return np.column_stack((t, hp))
+
+
+def _crossings(trace: np.ndarray, below: float) -> np.ndarray:
+    """Times HP fell below *below* after at least _ANSWER_BEFORE s above it."""
+    under = trace[:, 1] < below
+    starts = np.flatnonzero(under[1:] & ~under[:-1]) + 1
+    t = trace[:, 0]
+    fresh = [i for i in starts if not under[np.searchsorted(t, t[i] - _ANSWER_BEFORE) : i].any()]
+    return t[fresh]
+
+
+def _replay(trace: np.ndarray, rules: List[HealRule], predictive: bool,
+            latency: float, window: float) -> List[Tuple[float, float, str]]:
+    """``(t, hp, key)`` of every heal the policy fires over *trace*."""
+    policy = HealPolicy(rules, latency=latency, window=window, predictive=predictive)
+    fires = []
+    for t, hp in trace:
+        rule = policy.update(float(hp), float(t))
+        if rule is not None:
+            fires.append((float(t), float(hp), rule.key))
+    return fires
+
+
+def _score(crossings: np.ndarray, fires: np.ndarray, fire_hp: np.ndarray,
+           below: float, latency: float) -> dict:
+    leads: List[float] = []
+    used = np.zeros(len(fires), dtype=bool)
+    for tc in crossings:
+        near = np.flatnonzero(
+            (fires >= tc - _ANSWER_BEFORE) & (fires <= tc + _ANSWER_AFTER) & ~used
+        )
+        if len(near):
+            used[near[0]] = True
+            leads.append(tc - fires[near[0]])
+    # Fires above the threshold that answered nothing
+    false = int(np.count_nonzero(~used & (fire_hp >= below)))
+    return {
+        "leads": leads,
+        "in_time": sum(lead >= latency for lead in leads),
+        "fires": len(fires),
+        "false": false,
+    }
+
+
+def _fmt(v: Optional[float]) -> str:
+    return f"{v * 1e3:+7.0f}ms" if v is not None else f"{'–':>9}"
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Replay HP traces through the heal policies")
+    p.add_argument("traces", nargs="*", help="CSV traces written via healing.hp_trace_file")
+    p.add_argument("--config", default="bot_config.yaml")
+    p.add_argument("--latency", type=float, help="override healing.input_latency (s)")
+    p.add_argument("--window", type=float, help="override healing.hp_trend_window (s)")
+    p.add_argument("--synthetic", type=float, metavar="SECONDS",
+                   help="evaluate a generated burst-damage trace instead")
+    args = p.parse_args()
+
+    cfg: HealingConfig = load_config(args.config).healing
+    latency = cfg.input_latency if args.latency is None else args.latency
+    window = cfg.hp_trend_window if args.window is None else args.window
+    rules = heal_rules(cfg)
+
+    if args.synthetic:
+        traces = [_synthetic_trace(args.synthetic, np.random.default_rng(0))]
+    else:
+        if not args.traces:
+            p.error("give trace files or --synthetic SECONDS")
+        traces = [_load_trace(path) for path in args.traces]
+    traces = [t for t in traces if len(t) > 1]
+    if not traces:
+        print("ERROR: no samples in the given traces")
+        sys.exit(1)
+
+    duration = sum(t[-1, 0] - t[0, 0] for t in traces)
+    samples = sum(len(t) for t in traces)
+    print(f"{len(traces)} trace(s), {duration:.0f}s, {samples} samples – "
+          f"latency {latency * 1e3:.0f}ms, trend window {window:.2f}s")
+
+    replays = {
+        name: [_replay(t, rules, predictive, latency, window) for t in traces]
+        for name, predictive in (("threshold", False), ("predictive", True))
+    }
+    for rule in rules:
+        crossings = [_crossings(t, rule.below) for t in traces]
+        n = sum(len(c) for c in crossings)
+        print(f"\nTier {rule.key} below {rule.below:g}%: {n} crossings")
+        print(f"  {'policy':<10}  {'fires':>5}  {'answered':>8}  {'in time':>7}  "
+              f"{'median lead':>11}  {'mean lead':>9}  {'false':>5}")
+        for name, per_trace in replays.items():
+            total = {"in_time": 0, "fires": 0, "false": 0}
+            leads: List[float] = []
+            for cross, fires in zip(crossings, per_trace):
+                mine = np.array([(t, hp) for t, hp, key in fires if key == rule.key])
+                mine = mine.reshape(-1, 2)
+                s = _score(cross, mine[:, 0], mine[:, 1], rule.below, latency)
+                leads += s.pop("leads")
+                for k in total:
+                    total[k] += s[k]
+            med = statistics.median(leads) if leads else None
+            mean = statistics.fmean(leads) if leads else None
+            print(f"  {name:<10}  {total['fires']:>5}  {len(leads):>8}  "
+                  f"{total['in_time']:>7}  {_fmt(med):>11}  {_fmt(mean):>9}  {total['false']:>5}")
+
+
+if __name__ == "__main__":
+    main()
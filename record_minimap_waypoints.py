@@ -1,17 +1,20 @@
 """Interactive minimap-waypoint recorder.
 
 Stand at each patrol point in Tibia and press INSERT.  A greyscale crop of
-the minimap (centred on the player dot) is saved as a PNG template and added
-to the route JSON.
+the minimap (centred on the player dot) is added as the next waypoint of a
+single-file route bundle (see ``bot/route_bundle.py``).
 
 No OCR or coordinate display is required – navigation is driven entirely by
 visual template matching on the live minimap feed.
 
 Usage
 -----
-    uv run python record_minimap_waypoints.py                        # waypoints/minimap_route.json
-    uv run python record_minimap_waypoints.py waypoints/cave.json    # custom output file
-    uv run python record_minimap_waypoints.py --load waypoints/cave.json  # continue existing
+    uv run python record_minimap_waypoints.py                         # waypoints/minimap.route
+    uv run python record_minimap_waypoints.py waypoints/cave.route    # custom output file
+    uv run python record_minimap_waypoints.py --load waypoints/cave.route  # continue existing
+
+Routes recorded by older versions (JSON + one PNG per waypoint) can be
+converted with  ``uv run python convert_minimap_route.py <route.json>``.
 
 Controls (global – work while Tibia is focused)
 ------------------------------------------------
@@ -21,25 +24,19 @@ Controls (global – work while Tibia is focused)
     Ctrl+L      – list recorded waypoints
     ESC         – save and quit
 
-Output (waypoints/minimap_route.json)
---------------------------------------
-    {
-        "name": "route",
-        "waypoints": [
-            "waypoints/minimap/wp_0.png",
-            "waypoints/minimap/wp_1.png",
-            ...
-        ]
-    }
+Output (waypoints/minimap.route)
+---------------------------------
+One file holding every template back to back plus a small header with the
+route name, the minimap geometry it was recorded with and checksums.  The bot
+memory-maps it at start-up.
 
 Then in bot_config.yaml:
     minimap:
       enabled: true
-      waypoints_file: "waypoints/minimap_route.json"
+      waypoints_file: "waypoints/minimap.route"
 """
 
 import argparse
-import json
 import os
 import sys
 import threading
@@ -50,6 +47,8 @@ import mss
 import numpy as np
 import yaml
 
+from bot.route_bundle import load_bundle, write_bundle
+
 # Radius of the player-dot area to blank in each template (pixels)
 _DOT_RADIUS = 4
 
@@ -104,6 +103,13 @@ class MinimapGrabber:
 
         return tmpl
 
+    def geometry(self) -> dict:
+        """Minimap geometry stored in the bundle header."""
+        return {
+            "x": self._x, "y": self._y, "width": self._w, "height": self._h,
+            "template_size": self._ts,
+        }
+
     def grab_preview(self) -> np.ndarray:
         """Return the full minimap BGR image for visual confirmation."""
         monitor = {"top": 0, "left": 0, "width": self._sw, "height": self._sh}
@@ -113,27 +119,6 @@ class MinimapGrabber:
         return frame_bgr[self._y : self._y + self._h, self._x : self._x + self._w]
 
 
-# ── route I/O ─────────────────────────────────────────────────────────────────
-
-def _save(output_path: str, name: str, wp_paths: list) -> None:
-    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump({"name": name, "waypoints": wp_paths}, f, indent=2)
-
-
-def _load(output_path: str):
-    with open(output_path) as f:
-        data = json.load(f)
-    name = data.get("name", os.path.splitext(os.path.basename(output_path))[0])
-    return name, data.get("waypoints", [])
-
-
-def _template_dir(output_path: str) -> str:
-    """Directory where template PNGs live (sibling of the JSON file)."""
-    base = os.path.splitext(output_path)[0]
-    return base + "_templates"
-
-
 # ── recorder ──────────────────────────────────────────────────────────────────
 
 class MinimapWaypointRecorder:
@@ -141,23 +126,23 @@ class MinimapWaypointRecorder:
         self.output_path = output_path
         self.grabber     = grabber
         self.name        = os.path.splitext(os.path.basename(output_path))[0]
-        self.wp_paths: list = []
+        # Greyscale templates (or atlas (x, y) tuples from loaded bundles)
+        self.waypoints: list = []
         self._lock       = threading.Lock()
 
     def load_existing(self) -> None:
         if os.path.exists(self.output_path):
-            self.name, self.wp_paths = _load(self.output_path)
-            print(f"Loaded {len(self.wp_paths)} existing waypoints from {self.output_path}")
+            bundle = load_bundle(self.output_path)
+            self.name = bundle.name
+            # Copy out of the memory map: the file is rewritten on every save
+            self.waypoints = [
+                np.array(t) if t is not None else a
+                for t, a in zip(bundle.templates, bundle.atlas)
+            ]
+            print(f"Loaded {len(self.waypoints)} existing waypoints from {self.output_path}")
 
     def record_current(self) -> None:
         tmpl = self.grabber.grab_template()
-        with self._lock:
-            idx = len(self.wp_paths)
-
-        tmpl_dir  = _template_dir(self.output_path)
-        os.makedirs(tmpl_dir, exist_ok=True)
-        png_path = os.path.join(tmpl_dir, f"wp_{idx}.png")
-        cv2.imwrite(png_path, tmpl)
 
         # Also save a 4× zoomed preview for quick visual check
         preview = self.grabber.grab_preview()
@@ -165,42 +150,45 @@ class MinimapWaypointRecorder:
         cv2.imwrite("minimap_wp_preview.png", prev_zoom)
 
         with self._lock:
-            self.wp_paths.append(png_path)
+            idx = len(self.waypoints)
+            self.waypoints.append(tmpl)
         self._save_locked()
-        print(f"\r[+] #{idx}  saved {png_path}  (preview → minimap_wp_preview.png)            ")
+        print(f"\r[+] #{idx}  saved to {self.output_path}  (preview → minimap_wp_preview.png)     ")
 
     def undo(self) -> None:
         with self._lock:
-            if not self.wp_paths:
+            if not self.waypoints:
                 print("\r[!] Nothing to undo                                                   ")
                 return
-            removed = self.wp_paths.pop()
+            self.waypoints.pop()
+            remaining = len(self.waypoints)
 
-        if os.path.exists(removed):
-            os.remove(removed)
         self._save_locked()
-        print(f"\r[-] Removed {removed}  –  {len(self.wp_paths)} remaining                    ")
+        print(f"\r[-] Removed waypoint #{remaining}  –  {remaining} remaining                  ")
 
     def list_all(self) -> None:
         with self._lock:
-            paths = list(self.wp_paths)
-        if not paths:
+            wps = list(self.waypoints)
+        if not wps:
             print("\r  (no waypoints recorded yet)                                             ")
             return
-        print(f"\r  {len(paths)} waypoints:")
-        for i, p in enumerate(paths):
-            print(f"    #{i}  {p}")
+        print(f"\r  {len(wps)} waypoints:")
+        for i, wp in enumerate(wps):
+            if isinstance(wp, np.ndarray):
+                print(f"    #{i}  template {wp.shape[1]}×{wp.shape[0]}")
+            else:
+                print(f"    #{i}  atlas ({wp[0]}, {wp[1]})")
 
     def save(self) -> None:
         self._save_locked()
         with self._lock:
-            n = len(self.wp_paths)
+            n = len(self.waypoints)
         print(f"\r[✓] Saved {n} waypoints → {self.output_path}                                ")
 
     def _save_locked(self) -> None:
         with self._lock:
-            paths = list(self.wp_paths)
-        _save(self.output_path, self.name, paths)
+            wps = list(self.waypoints)
+        write_bundle(self.output_path, self.name, wps, self.grabber.geometry())
 
 
 # ── live display ──────────────────────────────────────────────────────────────
@@ -208,7 +196,7 @@ class MinimapWaypointRecorder:
 def _live_display(recorder: MinimapWaypointRecorder, stop: threading.Event) -> None:
     while not stop.is_set():
         with recorder._lock:
-            n = len(recorder.wp_paths)
+            n = len(recorder.waypoints)
         print(
             f"\r  waypoints recorded: {n}  "
             "[INSERT=record  BKSP=undo  Ctrl+S=save  Ctrl+L=list  ESC=quit]  ",
@@ -275,8 +263,8 @@ def main() -> None:
     p.add_argument(
         "output",
         nargs="?",
-        default="waypoints/minimap_route.json",
-        help="JSON file to write waypoints to (default: waypoints/minimap_route.json)",
+        default="waypoints/minimap.route",
+        help="Route bundle to write waypoints to (default: waypoints/minimap.route)",
     )
     p.add_argument("--load", "-l", action="store_true",
                    help="Load existing waypoints and continue recording")
@@ -296,7 +284,7 @@ def main() -> None:
 
     print("=== Minimap Waypoint Recorder ===")
     print(f"  Output file  : {args.output}")
-    print(f"  Waypoints    : {len(recorder.wp_paths)} loaded")
+    print(f"  Waypoints    : {len(recorder.waypoints)} loaded")
     print()
     print("  Walk to each patrol point in Tibia and press INSERT.")
     print("  A minimap snapshot is saved as a navigation template.")
@@ -0,0 +1,167 @@
+"""Replay a flight-recorder dump through the bot.
+
+The flight recorder (``flight_recorder`` in bot_config.yaml) dumps the last
+seconds before a death, a stuck spot or a crash to ``flights/``.  This plays
+such a dump back – the recorded crops pasted into full-size frames – to the
+health, mana, combat and conditions modules, with key presses and clicks
+recorded instead of sent, and prints one timeline: the recorded game state,
+the decisions logged and inputs sent while recording, and the decisions and
+inputs of the replay.  Change the config (or the code) and replay again to
+see whether the bot would now act differently.
+
+Only what was recorded is on the replayed frames, so modules that read other
+parts of the screen (loot containers, OCR coordinates) are not run.
+
+Usage
+-----
+    uv run python replay_flight.py flights/20240101-120000_death
+    uv run python replay_flight.py flights/20240101-120000_death --config my.yaml --speed 0.5
+    uv run python replay_flight.py flights/20240101-120000_death --export frames/
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Tuple
+
+import cv2
+
+from bot import inputs, log
+from bot.config import BotConfig, LoggingConfig, load_config
+from bot.cooldowns import CooldownManager
+from bot.flight_recorder import FlightReplaySource
+from bot.modules.combat import CombatModule
+from bot.modules.conditions import ConditionsModule
+from bot.modules.health import HealthModule
+from bot.modules.mana import ManaModule
+from bot.screen import ScreenCapture
+from bot.sim.devices import RecordingInput
+from bot.sim.world import InputEvent
+from bot.state import GameState
+
+
+class _Collect:
+    """``bot.log`` sink keeping the replay's log records."""
+
+    def __init__(self) -> None:
+        self.records: List[Tuple] = []
+
+    def write(self, rec: Tuple) -> None:
+        self.records.append(rec)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def _input_text(e: InputEvent) -> str:
+    if e.kind == "click":
+        return f"click ({e.x},{e.y}) {e.button}"
+    return f"{e.kind} {e.key}"
+
+
+async def _replay(source: FlightReplaySource, cfg: BotConfig) -> List[InputEvent]:
+    screen = ScreenCapture(source.size[0], source.size[1], cfg.screen.capture_fps, source)
+    recorder = RecordingInput()
+    inputs.set_backend(recorder)
+    state = GameState(cooldowns=CooldownManager.from_config(cfg.cooldowns))
+    modules = [
+        HealthModule(screen, state, cfg.healing),
+        ManaModule(screen, state, cfg.healing),
+        CombatModule(screen, state, cfg.combat, cfg.viewport),
+    ]
+    if cfg.conditions.enabled:
+        modules.append(ConditionsModule(screen, state, cfg.conditions))
+    screen.start()
+    tasks = [asyncio.create_task(m.run(), name=type(m).__name__) for m in modules]
+    try:
+        while not source.finished:
+            await asyncio.sleep(0.05)
+    finally:
+        state.running = False
+        screen.stop()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        inputs.set_backend(None)
+    return recorder.events
+
+
+def _timeline(source: FlightReplaySource, replayed: List[InputEvent],
+              logged: List[Tuple]) -> List[Tuple[float, str]]:
+    rows: List[Tuple[float, str]] = []
+    prev = None
+    for f in source.frames:
+        s = f["state"]
+        text = (f"hp {s['hp']:5.1f}  mana {s['mana']:5.1f}  enemies {s['enemies']}"
+                f"{'  attacking' if s['attacking'] else ''}{'  looting' if s['looting'] else ''}")
+        if text != prev:
+            rows.append((f["t"], f"  state   {text}"))
+            prev = text
+    for ev in source.events:
+        if ev["kind"] == "log":
+            rows.append((ev["t"], f"  log     [{ev['logger']}] {ev['msg']}"))
+        elif ev["kind"] == "input":
+            key = ev.get("key") or f"({ev.get('x')},{ev.get('y')}) {ev.get('button')}"
+            rows.append((ev["t"], f"  sent    {ev['action']} {key}"))
+        elif ev["kind"] == "trigger":
+            rows.append((ev["t"], f"* TRIGGER {ev['reason']} {ev.get('detail', '')}"))
+    for e in replayed:
+        rows.append((source.recorded_time(e.t), f"> replay  {_input_text(e)}"))
+    for t, _, name, msg, _ in logged:
+        rows.append((t, f"> replay  [{name}] {msg}"))
+    return sorted(rows, key=lambda r: r[0])
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Replay a flight-recorder dump through the bot")
+    p.add_argument("flight", help="dump directory under flight_recorder.output_dir")
+    p.add_argument("--config", default="bot_config.yaml")
+    p.add_argument("--speed", type=float, default=1.0, help="playback speed factor")
+    p.add_argument("--export", metavar="DIR", help="write the replayed frames as PNGs and exit")
+    args = p.parse_args()
+
+    if not os.path.isdir(args.flight):
+        sys.exit(f"{args.flight}: no such dump")
+    source = FlightReplaySource(args.flight, args.speed)
+    meta, frames = source.meta, source.frames
+    span = frames[-1]["t"] - frames[0]["t"] if frames else 0.0
+    print(f"{meta['reason']} {meta['detail']}".strip())
+    print(f"  {len(frames)} frames over {span:.1f}s, {len(source.events)} events, "
+          f"screen {source.size[0]}×{source.size[1]}")
+    if not frames:
+        return
+
+    if args.export:
+        os.makedirs(args.export, exist_ok=True)
+        for i in range(len(frames)):
+            cv2.imwrite(os.path.join(args.export, f"{i:05d}.png"), source.frame(i)[:, :, :3])
+        print(f"  {len(frames)} frames → {args.export}")
+        return
+
+    cfg = load_config(args.config) if os.path.exists(args.config) else BotConfig()
+    cfg.healing.hp_trace_file = None
+    # Replay decisions go into the timeline rather than to the console
+    log.configure(LoggingConfig(console=False))
+    collect = _Collect()
+    log.add_sink(collect)
+    replayed = asyncio.run(_replay(source, cfg))
+    log.flush()
+    log.remove_sink(collect)
+    # Log records carry wall time; inputs and the replay clock are monotonic
+    offset = time.time() - time.monotonic()
+    logged = [(source.recorded_time(t - offset), *rest) for t, *rest in collect.records]
+
+    print()
+    for t, text in _timeline(source, replayed, logged):
+        print(f"{t - meta['t']:+8.2f}s {text}")
+    sent = sum(1 for ev in source.events if ev["kind"] == "input")
+    print(f"\n  inputs: {sent} sent while recording, {len(replayed)} on replay")
+
+
+if __name__ == "__main__":
+    main()